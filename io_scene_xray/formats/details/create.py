@@ -124,6 +124,7 @@ def create_details_slots_object(
     return slots_base_object, slots_top_object
 
 
+@utils.stats.stage_timer('Images')
 def create_images(
         header,
         meshes,
@@ -1,5 +1,6 @@
 # blender modules
 import bpy
+import numpy
 
 # addon modules
 from . import create
@@ -34,6 +35,7 @@ def read_header(packed_reader):
     return header
 
 
+@utils.stats.stage_timer('Meshes')
 def read_details_meshes(
         file_path,
         base_name,
@@ -75,7 +77,82 @@ def read_details_meshes(
     return bpy_obj_root
 
 
+SLOTS_FIELDS_V3 = (
+    ('data_1', 'I'),
+    ('data_2', 'I'),
+    ('density', '4H')
+)
+
+
+def _get_image_pixels(channel_1, channel_2, channel_3):
+    pixels = numpy.ones((len(channel_1), 4), dtype=numpy.float64)
+    pixels[ : , 0] = channel_1
+    pixels[ : , 1] = channel_2
+    pixels[ : , 2] = channel_3
+    return pixels.ravel().tolist()
+
+
+def read_slots_v3(packed_reader, header, color_indices):
+    slots = packed_reader.get_records(SLOTS_FIELDS_V3, header.slots_count)
+    data_1 = slots['data_1'].astype(numpy.int64)
+    data_2 = slots['data_2'].astype(numpy.int64)
+    density = slots['density'].astype(numpy.int64)
+
+    # slot Y coordinate
+    y_base = data_1 & 0xfff
+    y_height = (data_1 >> 12) & 0xff
+    y_coords_base = y_base * 0.2 - 200.0
+    y_coords = y_coords_base + y_height * 0.1 + 0.05
+
+    # meshes indices
+    meshes = numpy.column_stack((
+        (data_1 >> 20) & 0x3f,
+        (data_1 >> 26) & 0x3f,
+        data_2 & 0x3f,
+        (data_2 >> 6) & 0x3f
+    ))
+
+    # lighting
+    shadow = ((data_2 >> 12) & 0xf) / 0xf
+    hemi = ((data_2 >> 16) & 0xf) / 0xf
+    light_r = ((data_2 >> 20) & 0xf) / 0xf
+    light_g = ((data_2 >> 24) & 0xf) / 0xf
+    light_b = ((data_2 >> 28) & 0xf) / 0xf
+
+    # meshes density, every slot is 2x2 pixels of the image
+    colors = numpy.array(color_indices, dtype=numpy.float64)
+    size_x = header.size.x
+    size_y = header.size.y
+    meshes_images_pixels = []
+
+    for mesh_index in range(4):
+        pixels = numpy.empty((size_y, 2, size_x, 2, 4), dtype=numpy.float64)
+        mesh_colors = colors[meshes[ : , mesh_index], : 3]
+        mesh_colors = mesh_colors.reshape(size_y, size_x, 3)
+        mesh_density = density[ : , mesh_index]
+
+        for corner, (offset_x, offset_y) in fmt.PIXELS_OFFSET_1.items():
+            corner_density = ((mesh_density >> corner * 4) & 0xf) / 0xf
+            pixels[ : , offset_y, : , offset_x, : 3] = mesh_colors
+            pixels[ : , offset_y, : , offset_x, 3] = corner_density.reshape(
+                size_y,
+                size_x
+            )
+
+        meshes_images_pixels.append(pixels.ravel().tolist())
+
+    return (
+        y_coords.tolist(),
+        y_coords_base.tolist(),
+        meshes_images_pixels,
+        _get_image_pixels(light_r, light_g, light_b),
+        _get_image_pixels(shadow, shadow, shadow),
+        _get_image_pixels(hemi, hemi, hemi)
+    )
+
+
 @log.with_context('slots')
+@utils.stats.stage_timer('Slots')
 def read_details_slots(
         base_name,
         context,
@@ -90,76 +167,15 @@ def read_details_slots(
     y_coords = []
     y_coords_base = []
 
-    meshes_images_pixels = [
-        [1.0 for _ in range(header.slots_count * 4 * 4)] for _ in range(4)
-    ]
-
     if header.format_version == fmt.FORMAT_VERSION_3:
-        lights_image_pixels = []
-        shadows_image_pixels = []
-        hemi_image_pixels = []
-        S_IIHHHH = rw.read.PackedReader.prep('2I4H')
-
-        for slot_y in range(header.size.y):
-            for slot_x in range(header.size.x):
-
-                slot_data = packed_reader.getp(S_IIHHHH)
-
-                # slot Y coordinate
-                y_base = slot_data[0] & 0xfff
-                y_height = (slot_data[0] >> 12) & 0xff
-                y_coord_base = y_base * 0.2 - 200.0
-                y_coord = y_coord_base + y_height * 0.1 + 0.05
-                y_coords.append(y_coord)
-                y_coords_base.append(y_coord_base)
-
-                # meshes indices
-                meshes = [
-                    (slot_data[0] >> 20) & 0x3f,
-                    (slot_data[0] >> 26) & 0x3f,
-                    slot_data[1] & 0x3f,
-                    (slot_data[1] >> 6) & 0x3f
-                ]
-
-                # lighting
-                shadow = ((slot_data[1] >> 12) & 0xf) / 0xf
-                shadows_image_pixels.extend((shadow, shadow, shadow, 1.0))
-
-                hemi = ((slot_data[1] >> 16) & 0xf) / 0xf
-                hemi_image_pixels.extend((hemi, hemi, hemi, 1.0))
-
-                light_r = ((slot_data[1] >> 20) & 0xf) / 0xf
-                light_g = ((slot_data[1] >> 24) & 0xf) / 0xf
-                light_b = ((slot_data[1] >> 28) & 0xf) / 0xf
-                lights_image_pixels.extend((light_r, light_g, light_b, 1.0))
-
-                # meshes density
-                density_data = slot_data[2 : 6]
-                for mesh_index, density in enumerate(density_data):
-                    for corner in range(4):
-
-                        corner_density = ((density >> corner * 4) & 0xf) / 0xf
-
-                        pixel_index = \
-                            slot_x * 2 + \
-                            fmt.PIXELS_OFFSET_1[corner][0] + \
-                            header.size.x * 2 * \
-                            (
-                                slot_y * 2 + \
-                                fmt.PIXELS_OFFSET_1[corner][1]
-                            )
-
-                        color = color_indices[meshes[mesh_index]]
-
-                        pixels = meshes_images_pixels[mesh_index]
-                        # Red
-                        pixels[pixel_index * 4] = color[0]
-                        # Green
-                        pixels[pixel_index * 4 + 1] = color[1]
-                        # Blue
-                        pixels[pixel_index * 4 + 2] = color[2]
-                        # Alpha
-                        pixels[pixel_index * 4 + 3] = corner_density
+        (
+            y_coords,
+            y_coords_base,
+            meshes_images_pixels,
+            lights_image_pixels,
+            shadows_image_pixels,
+            hemi_image_pixels
+        ) = read_slots_v3(packed_reader, header, color_indices)
 
         create.create_images(
             header,
@@ -171,6 +187,9 @@ def read_details_slots(
         )
 
     else:    # version 2
+        meshes_images_pixels = [
+            [1.0 for _ in range(header.slots_count * 4 * 4)] for _ in range(4)
+        ]
         S_ffBHBHBHBHH = rw.read.PackedReader.prep('2fBHBHBHB2H')
 
         lighting_image_pixels = [
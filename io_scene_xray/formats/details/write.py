@@ -9,6 +9,7 @@ from .. import dm
 from ... import text
 from ... import log
 from ... import rw
+from ... import utils
 
 
 @log.with_context('mesh')
@@ -117,6 +118,7 @@ def write_header(chunked_writer, lvl_dets):
 
 
 @log.with_context('slots')
+@utils.stats.stage_timer('Slots')
 def write_slots_v3(chunked_writer, lvl_dets):
     base_obj = lvl_dets.slots_base_object
     top_obj = lvl_dets.slots_top_object
@@ -284,6 +286,7 @@ def write_slots_v3(chunked_writer, lvl_dets):
 
 
 @log.with_context('slots')
+@utils.stats.stage_timer('Slots')
 def write_slots_v2(chunked_writer, lvl_dets):
     base_obj = lvl_dets.slots_base_object
     top_obj = lvl_dets.slots_top_object
@@ -3,7 +3,7 @@ import os
 
 # blender modules
 import bpy
-import bmesh
+import numpy
 
 # addon modules
 from ... import text
@@ -95,6 +95,7 @@ def create_bpy_texture(det_model, bpy_material, context):
     bpy_image = context.image(det_model.texture)
     bpy_texture.image = bpy_image
     utils.stats.created_tex()
+    utils.cache.add_texture(bpy_texture)
 
 
 def create_material(det_model, abs_image_path, context):
@@ -149,6 +150,8 @@ def create_material(det_model, abs_image_path, context):
             bpy_texture_slot = bpy_material.texture_slots.add()
             bpy_texture_slot.texture = bpy_texture
 
+    utils.cache.add_material(bpy_material)
+
     return bpy_material
 
 
@@ -162,7 +165,13 @@ def search_material(context, det_model, file_path=None):
     det_model.file_path = file_path
     det_model.context = context
 
-    for material in bpy.data.materials:
+    materials = utils.cache.get_cache().get(
+        'materials',
+        'eshader',
+        det_model.shader
+    )
+
+    for material in materials:
         if not check_estimated_material(material, det_model):
             continue
 
@@ -213,81 +222,57 @@ def reconstruct_mesh(vertices, uvs, triangles):
 
 def read_mesh_data(packed_reader, det_model):
     # read vertices coordinates and uvs
-    S_FFFFF = rw.read.PackedReader.prep('5f')
-    vertices = []
-    uvs = []
-    for _ in range(det_model.mesh.vertices_count):
-        co_x, co_y, co_z, co_u, co_v = packed_reader.getp(S_FFFFF)
-        vertices.append((co_x, co_z, co_y))
-        uvs.append((co_u, 1.0 - co_v))
+    verts = packed_reader.get_records(
+        (('coord', '3f'), ('uv', '2f')),
+        det_model.mesh.vertices_count
+    )
+    vertices = list(map(tuple, verts['coord'][ : , (0, 2, 1)].tolist()))
+    uvs = verts['uv'].astype(numpy.float64)
+    uvs[ : , 1] = 1.0 - uvs[ : , 1]
+    uvs = list(map(tuple, uvs.tolist()))
 
     # read triangles indices
-    S_HHH = rw.read.PackedReader.prep('3H')
-    triangles = []
-    for _ in range(det_model.mesh.indices_count // 3):
-        vert_1, vert_2, vert_3 = packed_reader.getp(S_HHH)
-        triangles.append((vert_1, vert_3, vert_2))
+    triangles = packed_reader.get_ndarray(
+        'H',
+        det_model.mesh.indices_count // 3,
+        vec_len=3
+    )
+    triangles = triangles[ : , (0, 2, 1)].tolist()
 
     return vertices, uvs, triangles
 
 
-def create_geometry(b_mesh, vertices, triangles):
-    # create vertices
-    for vertex_coord in vertices:
-        b_mesh.verts.new(vertex_coord)
-    b_mesh.verts.ensure_lookup_table()
+def create_geometry(bpy_mesh, vertices, triangles):
+    unique_faces = utils.mesh.get_unique_faces(triangles)
+    triangles = numpy.asarray(triangles, dtype=numpy.int64).reshape(-1, 3)
+    utils.mesh.create_geometry(bpy_mesh, vertices, triangles[unique_faces])
+    return unique_faces
 
-    # create triangles
-    bmesh_faces = []
-    for vert_1, vert_2, vert_3 in triangles:
-        try:
-            bmesh_face = b_mesh.faces.new((
-                b_mesh.verts[vert_1],
-                b_mesh.verts[vert_2],
-                b_mesh.verts[vert_3]
-            ))
-            bmesh_face.smooth = True
-            bmesh_faces.append(bmesh_face)
-        except ValueError:
-            bmesh_faces.append(None)
-
-    b_mesh.faces.ensure_lookup_table()
-
-    return bmesh_faces
-
-
-def create_uv(b_mesh, det_model, bmesh_faces, uvs):
-    uv_layer = b_mesh.loops.layers.uv.new(det_model.mesh.uv_map_name)
-    uv_index = 0
-    for face in bmesh_faces:
-        if face:
-            for loop in face.loops:
-                loop[uv_layer].uv = uvs[uv_index]
-                uv_index += 1
-        else:
-            uv_index += 3    # skip 3 loop
+
+def create_uv(bpy_mesh, det_model, unique_faces, uvs, bpy_image):
+    uvs = numpy.asarray(uvs, dtype=numpy.float32).reshape(-1, 3, 2)
+    utils.mesh.create_uv_layer(
+        bpy_mesh,
+        det_model.mesh.uv_map_name,
+        uvs[unique_faces],
+        bpy_image
+    )
 
 
 def create_mesh(packed_reader, det_model):
     if det_model.mesh.indices_count % 3:
         raise log.AppError(text.error.dm_bad_indices)
 
-    b_mesh = bmesh.new()
+    bpy_mesh = det_model.mesh.bpy_mesh
 
     vertices, uvs, triangles = read_mesh_data(packed_reader, det_model)
     vertices, uvs, triangles = reconstruct_mesh(vertices, uvs, triangles)
-    bmesh_faces = create_geometry(b_mesh, vertices, triangles)
-    create_uv(b_mesh, det_model, bmesh_faces, uvs)
+    unique_faces = create_geometry(bpy_mesh, vertices, triangles)
 
-    # assign images
-    if not utils.version.IS_28:
-        texture_layer = b_mesh.faces.layers.tex.new(
-            det_model.mesh.uv_map_name
-        )
+    # image for blender 2.7x
+    if utils.version.IS_28:
+        bpy_image = None
+    else:
         bpy_image = det_model.mesh.bpy_material.texture_slots[0].texture.image
 
-        for face in b_mesh.faces:
-            face[texture_layer].image = bpy_image
-
-    b_mesh.normal_update()
-    b_mesh.to_mesh(det_model.mesh.bpy_mesh)
+    create_uv(bpy_mesh, det_model, unique_faces, uvs, bpy_image)
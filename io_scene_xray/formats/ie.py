@@ -161,3 +161,39 @@ def prop_omf_export_mode():
 
 def prop_omf_high_quality():
     return bpy.props.BoolProperty(name='High Quality Motions', default=False)
+
+
+def prop_omf_lazy_import():
+    return bpy.props.BoolProperty(
+        name='Lazy Import',
+        description=
+            'Add motions to motion list without decoding, '
+            'the action is created when the motion is selected',
+        default=False
+    )
+
+
+def prop_compress_chunks():
+    return bpy.props.BoolProperty(
+        name='Compress Chunks',
+        description='Write geometry and motion chunks compressed (LZHUF)',
+        default=False
+    )
+
+
+def prop_optimize_indices():
+    return bpy.props.BoolProperty(
+        name='Optimize Vertex Cache',
+        description='Reorder triangles and vertices for vertex cache',
+        default=False
+    )
+
+
+def prop_optimize_cform():
+    return bpy.props.BoolProperty(
+        name='Optimize CForm',
+        description=
+            'Weld vertices, remove degenerate triangles and '
+            'report duplicate and overlapping triangles of cform',
+        default=False
+    )
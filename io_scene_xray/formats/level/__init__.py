@@ -2,3 +2,4 @@
 from . import imp
 from . import exp
 from . import fmt
+from . import cform_bvh
@@ -0,0 +1,574 @@
+# blender modules
+import bpy
+import bmesh
+import numpy
+
+# addon modules
+from ... import utils
+
+
+# level cform bounding volume hierarchy: the triangles are sorted by
+# morton code of centroids and packed in leaves of fixed size, the
+# leaves are the bottom level of the complete binary tree. the tree is
+# implicit, node i has children 2i+1 and 2i+2, all queries traverse
+# the tree by levels with numpy.
+
+LEAF_SIZE = 8
+# distance of vertices merged by welding
+WELD_DISTANCE = 0.0001
+# area of degenerate triangles
+MIN_AREA = 1e-8
+# cosine of coplanar triangles normals
+COPLANAR_DOT = 0.9999
+# distance of coplanar triangles planes
+COPLANAR_DISTANCE = 0.001
+# leaf pairs tested at once in overlap search
+PAIRS_BATCH = 1 << 12
+
+EMPTY_INDEX = -1
+
+
+def weld_vertices(positions, distance=WELD_DISTANCE):
+    '''
+    Merge vertices closer than the weld distance.
+    Returns positions of unique vertices and
+    unique vertex index of every vertex.
+    '''
+    positions = numpy.asarray(positions, dtype=numpy.float64).reshape(-1, 3)
+
+    if not len(positions):
+        return positions, numpy.zeros(0, dtype=numpy.int64)
+
+    keys = numpy.round(positions / distance).astype(numpy.int64)
+    _, first_verts, _, remap = utils.mesh.unique_rows(keys)
+
+    # keep the order of the first occurrence
+    order = numpy.argsort(first_verts, kind='mergesort')
+    new_indices = numpy.empty(len(order), dtype=numpy.int64)
+    new_indices[order] = numpy.arange(len(order))
+
+    return positions[first_verts[order]], new_indices[remap]
+
+
+def get_triangles_areas(positions, triangles):
+    verts = positions[triangles]
+    normals = numpy.cross(verts[ : , 1] - verts[ : , 0], verts[ : , 2] - verts[ : , 0])
+    return numpy.sqrt((normals * normals).sum(axis=1)) / 2
+
+
+def get_degenerate_triangles(positions, triangles, min_area=MIN_AREA):
+    '''
+    Triangles with repeated vertices or zero area.
+    Returns boolean mask of the triangles.
+    '''
+    triangles = numpy.asarray(triangles, dtype=numpy.int64).reshape(-1, 3)
+    repeated = (
+        (triangles[ : , 0] == triangles[ : , 1]) |
+        (triangles[ : , 1] == triangles[ : , 2]) |
+        (triangles[ : , 2] == triangles[ : , 0])
+    )
+    return repeated | (get_triangles_areas(positions, triangles) < min_area)
+
+
+def get_duplicate_triangles(triangles):
+    '''
+    Repeated triangles with the same vertices and the same winding,
+    the back faces of two sided surfaces are not duplicates.
+    Returns boolean mask without the first occurrences.
+    '''
+    triangles = numpy.asarray(triangles, dtype=numpy.int64).reshape(-1, 3)
+    duplicates = numpy.zeros(len(triangles), dtype=bool)
+
+    if not len(triangles):
+        return duplicates
+
+    # rotate the corners so that the first vertex is the smallest
+    shift = numpy.argmin(triangles, axis=1)
+    columns = (shift[ : , None] + numpy.arange(3)) % 3
+    rows = numpy.arange(len(triangles))[ : , None]
+    rotated = triangles[rows, columns]
+
+    _, first_tris, _, _ = utils.mesh.unique_rows(rotated)
+    duplicates[ : ] = True
+    duplicates[first_tris] = False
+
+    return duplicates
+
+
+def _get_morton_codes(points):
+    # 10 bits per axis
+    mins = points.min(axis=0)
+    sizes = numpy.maximum(points.max(axis=0) - mins, 1e-12)
+    cells = ((points - mins) / sizes * 1023).astype(numpy.uint64)
+
+    codes = numpy.zeros(len(points), dtype=numpy.uint64)
+    for bit in range(10):
+        for axis in range(3):
+            value = (cells[ : , axis] >> numpy.uint64(bit)) & numpy.uint64(1)
+            codes |= value << numpy.uint64(bit * 3 + axis)
+
+    return codes
+
+
+def _get_children(nodes):
+    return numpy.column_stack((nodes * 2 + 1, nodes * 2 + 2))
+
+
+def _is_inside(points, corners, normals, tolerance=0.0):
+    # the point is on the inner side of every edge of the triangle
+    inside = numpy.ones(len(points), dtype=bool)
+    limit = tolerance * (normals * normals).sum(axis=1)
+    for corner in range(3):
+        start = corners[ : , corner]
+        end = corners[ : , (corner + 1) % 3]
+        edge_normals = numpy.cross(end - start, points - start)
+        inside &= (edge_normals * normals).sum(axis=1) > limit
+    return inside
+
+
+def _closest_on_segments(points, starts, ends):
+    edges = ends - starts
+    lengths = (edges * edges).sum(axis=1)
+    lengths[lengths == 0.0] = 1.0
+    factors = numpy.clip(((points - starts) * edges).sum(axis=1) / lengths, 0.0, 1.0)
+    return starts + edges * factors[ : , None]
+
+
+def get_closest_points(points, corners):
+    '''
+    Closest points of triangles to the points.
+    points - (N, 3) array, corners - triangles corners (N, 3, 3).
+    '''
+    normals = numpy.cross(corners[ : , 1] - corners[ : , 0], corners[ : , 2] - corners[ : , 0])
+    lengths = (normals * normals).sum(axis=1)
+    lengths[lengths == 0.0] = 1.0
+    distances = ((points - corners[ : , 0]) * normals).sum(axis=1) / lengths
+    projected = points - normals * distances[ : , None]
+
+    closest = projected.copy()
+    outside = ~_is_inside(projected, corners, normals)
+
+    if outside.any():
+        edge_points = [
+            _closest_on_segments(
+                points[outside],
+                corners[outside, corner],
+                corners[outside, (corner + 1) % 3]
+            )
+            for corner in range(3)
+        ]
+        edge_distances = numpy.column_stack([
+            ((edge_point - points[outside]) ** 2).sum(axis=1)
+            for edge_point in edge_points
+        ])
+        nearest_edge = numpy.argmin(edge_distances, axis=1)
+        closest[outside] = numpy.stack(edge_points)[
+            nearest_edge,
+            numpy.arange(len(nearest_edge))
+        ]
+
+    return closest
+
+
+class CformBVH:
+    '''
+    Bounding volume hierarchy of the collision triangles.
+    positions - vertex coordinates (V, 3), triangles - vertex indices
+    (T, 3), attributes - optional per triangle data (material, sector).
+    '''
+
+    def __init__(self, positions, triangles, attributes=None):
+        self.positions = numpy.asarray(positions, dtype=numpy.float64).reshape(-1, 3)
+        self.triangles = numpy.asarray(triangles, dtype=numpy.int64).reshape(-1, 3)
+        self.attributes = attributes
+
+        self.corners = self.positions[self.triangles]
+        self.tris_mins = self.corners.min(axis=1)
+        self.tris_maxs = self.corners.max(axis=1)
+
+        self._build()
+
+    def _build(self):
+        tris_count = len(self.triangles)
+        leaves_count = max(1, -(-tris_count // LEAF_SIZE))
+        self.depth = int(leaves_count - 1).bit_length()
+        self.leaves_count = 1 << self.depth
+        self.first_leaf = self.leaves_count - 1
+        nodes_count = self.leaves_count * 2 - 1
+
+        # triangle indices of leaves
+        self.slots = numpy.full(
+            self.leaves_count * LEAF_SIZE,
+            EMPTY_INDEX,
+            dtype=numpy.int64
+        )
+        if tris_count:
+            centroids = self.corners.mean(axis=1)
+            order = numpy.argsort(
+                _get_morton_codes(centroids),
+                kind='mergesort'
+            )
+            self.slots[ : tris_count] = order
+        self.slots = self.slots.reshape(self.leaves_count, LEAF_SIZE)
+
+        # empty nodes have inverted bounds and never pass the tests
+        self.mins = numpy.full((nodes_count, 3), numpy.inf)
+        self.maxs = numpy.full((nodes_count, 3), -numpy.inf)
+
+        tris_mins = numpy.vstack((self.tris_mins, numpy.full((1, 3), numpy.inf)))
+        tris_maxs = numpy.vstack((self.tris_maxs, numpy.full((1, 3), -numpy.inf)))
+        self.mins[self.first_leaf : ] = tris_mins[self.slots].min(axis=1)
+        self.maxs[self.first_leaf : ] = tris_maxs[self.slots].max(axis=1)
+
+        # parent bounds of every level
+        for level in range(self.depth - 1, -1, -1):
+            first = (1 << level) - 1
+            nodes = numpy.arange(first, first * 2 + 1)
+            children = _get_children(nodes)
+            self.mins[nodes] = numpy.minimum(
+                self.mins[children[ : , 0]],
+                self.mins[children[ : , 1]]
+            )
+            self.maxs[nodes] = numpy.maximum(
+                self.maxs[children[ : , 0]],
+                self.maxs[children[ : , 1]]
+            )
+
+    @property
+    def bbox(self):
+        return self.mins[0], self.maxs[0]
+
+    def _get_leaves_triangles(self, nodes):
+        tris = self.slots[nodes - self.first_leaf].ravel()
+        return tris[tris != EMPTY_INDEX]
+
+    def ray_cast(self, origin, direction, max_distance=numpy.inf):
+        '''
+        Find the nearest triangle hit by the ray,
+        both sides of the triangles are hit.
+        Returns (distance, triangle index, hit location) or None.
+        '''
+        origin = numpy.asarray(origin, dtype=numpy.float64)
+        direction = numpy.asarray(direction, dtype=numpy.float64)
+        length = numpy.sqrt((direction * direction).sum())
+        if not length:
+            return None
+        direction = direction / length
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            inverse = 1.0 / direction
+
+            # slab test of nodes by levels
+            nodes = numpy.zeros(1, dtype=numpy.int64)
+            for level in range(self.depth + 1):
+                near = (self.mins[nodes] - origin) * inverse
+                far = (self.maxs[nodes] - origin) * inverse
+                near, far = numpy.minimum(near, far), numpy.maximum(near, far)
+                # nan of parallel rays inside of the slab is ignored
+                enter = numpy.nanmax(near, axis=1)
+                leave = numpy.nanmin(far, axis=1)
+                hit = (enter <= leave) & (leave >= 0.0) & (enter <= max_distance)
+                nodes = nodes[hit]
+                if not len(nodes):
+                    return None
+                if level < self.depth:
+                    nodes = _get_children(nodes).ravel()
+
+        # moller-trumbore test of the leaves triangles
+        tris = self._get_leaves_triangles(nodes)
+        corners = self.corners[tris]
+        edge_1 = corners[ : , 1] - corners[ : , 0]
+        edge_2 = corners[ : , 2] - corners[ : , 0]
+        cross_dir = numpy.cross(direction, edge_2)
+        determinant = (edge_1 * cross_dir).sum(axis=1)
+        valid = numpy.abs(determinant) > 1e-12
+        determinant[~valid] = 1.0
+
+        offset = origin - corners[ : , 0]
+        weight_1 = (offset * cross_dir).sum(axis=1) / determinant
+        cross_offset = numpy.cross(offset, edge_1)
+        weight_2 = (cross_offset * direction).sum(axis=1) / determinant
+        distances = (cross_offset * edge_2).sum(axis=1) / determinant
+
+        valid &= (weight_1 >= 0.0) & (weight_2 >= 0.0) & (weight_1 + weight_2 <= 1.0)
+        valid &= (distances >= 0.0) & (distances <= max_distance)
+
+        if not valid.any():
+            return None
+
+        distances[~valid] = numpy.inf
+        nearest = numpy.argmin(distances)
+        distance = distances[nearest]
+
+        return distance, int(tris[nearest]), origin + direction * distance
+
+    def find_nearest(self, point, max_distance=numpy.inf):
+        '''
+        Find the nearest triangle to the point.
+        Returns (distance, triangle index, closest point) or None.
+        '''
+        point = numpy.asarray(point, dtype=numpy.float64)
+        nodes = numpy.zeros(1, dtype=numpy.int64)
+        bound = max_distance
+
+        for level in range(self.depth + 1):
+            mins = self.mins[nodes]
+            maxs = self.maxs[nodes]
+            valid = (mins <= maxs).all(axis=1)
+            nodes, mins, maxs = nodes[valid], mins[valid], maxs[valid]
+            if not len(nodes):
+                return None
+
+            # every triangle of the node is closer than its far corner
+            near = numpy.maximum(numpy.maximum(mins - point, point - maxs), 0.0)
+            far = numpy.maximum(numpy.abs(mins - point), numpy.abs(maxs - point))
+            near = numpy.sqrt((near * near).sum(axis=1))
+            far = numpy.sqrt((far * far).sum(axis=1))
+            bound = min(bound, far.min())
+
+            nodes = nodes[near <= bound]
+            if not len(nodes):
+                return None
+            if level < self.depth:
+                nodes = _get_children(nodes).ravel()
+
+        tris = self._get_leaves_triangles(nodes)
+        points = numpy.broadcast_to(point, (len(tris), 3))
+        closest = get_closest_points(points, self.corners[tris])
+        distances = numpy.sqrt(((closest - point) ** 2).sum(axis=1))
+
+        nearest = numpy.argmin(distances)
+        distance = distances[nearest]
+        if distance > max_distance:
+            return None
+
+        return distance, int(tris[nearest]), closest[nearest]
+
+    def _get_overlapping_nodes(self, pairs):
+        mins_1 = self.mins[pairs[ : , 0]]
+        maxs_1 = self.maxs[pairs[ : , 0]]
+        mins_2 = self.mins[pairs[ : , 1]]
+        maxs_2 = self.maxs[pairs[ : , 1]]
+        overlap = (
+            (mins_1 <= maxs_2 + COPLANAR_DISTANCE) &
+            (mins_2 <= maxs_1 + COPLANAR_DISTANCE)
+        ).all(axis=1)
+        return pairs[overlap]
+
+    def _get_leaves_pairs(self):
+        # pairs of overlapping leaves, the leaf is paired with itself
+        pairs = numpy.zeros((1, 2), dtype=numpy.int64)
+
+        for level in range(self.depth):
+            pairs = self._get_overlapping_nodes(pairs)
+            same = pairs[ : , 0] == pairs[ : , 1]
+
+            children_1 = _get_children(pairs[ : , 0])
+            children_2 = _get_children(pairs[ : , 1])
+            new_pairs = [
+                numpy.column_stack((children_1[ : , first], children_2[ : , second]))
+                for first in range(2)
+                    for second in range(2)
+            ]
+            # the node pair with itself: the second child with
+            # the first child is already in the pairs
+            new_pairs[2] = new_pairs[2][~same]
+            pairs = numpy.vstack(new_pairs)
+
+        return self._get_overlapping_nodes(pairs) - self.first_leaf
+
+    def _get_planes(self):
+        # unit normals and plane offsets of triangles
+        corners = self.corners
+        normals = numpy.cross(corners[ : , 1] - corners[ : , 0], corners[ : , 2] - corners[ : , 0])
+        lengths = numpy.sqrt((normals * normals).sum(axis=1))
+        lengths[lengths == 0.0] = 1.0
+        normals /= lengths[ : , None]
+        offsets = (normals * corners[ : , 0]).sum(axis=1)
+        return normals, offsets
+
+    def _get_coplanar_overlaps(self, tris_1, tris_2, normals, offsets):
+        # the corners of the second triangle are on the plane of the first
+        corners_2 = self.corners[tris_2]
+        distances = (corners_2 * normals[tris_1][ : , None]).sum(axis=2)
+        distances = numpy.abs(distances - offsets[tris_1][ : , None]).max(axis=1)
+        coplanar = distances <= COPLANAR_DISTANCE
+        tris_1 = tris_1[coplanar]
+        tris_2 = tris_2[coplanar]
+
+        # the centroid of one triangle is inside of another
+        corners_1 = self.corners[tris_1]
+        corners_2 = corners_2[coplanar]
+        normals_1 = normals[tris_1]
+        normals_2 = normals[tris_2]
+        tolerance = 1e-6
+        overlap = (
+            _is_inside(corners_1.mean(axis=1), corners_2, normals_2, tolerance) |
+            _is_inside(corners_2.mean(axis=1), corners_1, normals_1, tolerance)
+        )
+
+        return tris_1[overlap], tris_2[overlap]
+
+    def get_overlapping_triangles(self):
+        '''
+        Coplanar triangles that cover each other, the pairs of
+        the triangles with the same vertices are not included.
+        Returns (P, 2) array of triangle indices pairs.
+        '''
+        if not len(self.triangles):
+            return numpy.zeros((0, 2), dtype=numpy.int64)
+
+        leaves_pairs = self._get_leaves_pairs()
+        normals, offsets = self._get_planes()
+        sorted_tris = numpy.sort(self.triangles, axis=1)
+
+        # triangles data of leaves slots, the empty slots have
+        # inverted bounds and zero normals and never pass the tests
+        empty = numpy.zeros((1, 3))
+        slots_mins = numpy.vstack((self.tris_mins, empty + numpy.inf))[self.slots]
+        slots_maxs = numpy.vstack((self.tris_maxs, empty - numpy.inf))[self.slots]
+        slots_normals = numpy.vstack((normals, empty))[self.slots]
+        slots_mins -= COPLANAR_DISTANCE
+
+        # the leaf with itself gives every pair once
+        ordered = numpy.triu(numpy.ones((LEAF_SIZE, LEAF_SIZE), dtype=bool), 1)
+
+        results = []
+        for start in range(0, len(leaves_pairs), PAIRS_BATCH):
+            batch = leaves_pairs[start : start + PAIRS_BATCH]
+            leaves_1 = batch[ : , 0]
+            leaves_2 = batch[ : , 1]
+
+            # bounds overlap and parallel planes of all triangles pairs
+            mins_1 = slots_mins[leaves_1][ : , : , None]
+            maxs_1 = slots_maxs[leaves_1][ : , : , None]
+            mins_2 = slots_mins[leaves_2][ : , None]
+            maxs_2 = slots_maxs[leaves_2][ : , None]
+            valid = ((mins_1 <= maxs_2) & (mins_2 <= maxs_1)).all(axis=3)
+
+            dots = (
+                slots_normals[leaves_1][ : , : , None] *
+                slots_normals[leaves_2][ : , None]
+            ).sum(axis=3)
+            valid &= numpy.abs(dots) >= COPLANAR_DOT
+            valid[leaves_1 == leaves_2] &= ordered
+
+            pairs, first, second = numpy.nonzero(valid)
+            tris_1 = self.slots[leaves_1[pairs], first]
+            tris_2 = self.slots[leaves_2[pairs], second]
+
+            valid = (sorted_tris[tris_1] != sorted_tris[tris_2]).any(axis=1)
+            tris_1, tris_2 = self._get_coplanar_overlaps(
+                tris_1[valid],
+                tris_2[valid],
+                normals,
+                offsets
+            )
+            results.append(numpy.column_stack((tris_1, tris_2)))
+
+        if not results:
+            return numpy.zeros((0, 2), dtype=numpy.int64)
+
+        pairs = numpy.sort(numpy.vstack(results), axis=1)
+        return utils.mesh.unique_rows(pairs)[0]
+
+
+def get_objects_data(objs):
+    '''
+    Triangulated geometry of the cform objects in the world space.
+    Returns positions, triangles, object index and
+    material slot index of every triangle.
+    '''
+    positions = []
+    triangles = []
+    objects_indices = []
+    materials_indices = []
+    verts_count = 0
+
+    for obj_index, obj in enumerate(objs):
+        bm = bmesh.new()
+        bm.from_mesh(obj.data)
+        bmesh.ops.triangulate(bm, faces=bm.faces)
+
+        matrix = numpy.array(obj.matrix_world)
+        coords = numpy.array([vert.co for vert in bm.verts], dtype=numpy.float64)
+        coords = coords.reshape(-1, 3) @ matrix[ : 3, : 3].T + matrix[ : 3, 3]
+        faces = numpy.array(
+            [[vert.index for vert in face.verts] for face in bm.faces],
+            dtype=numpy.int64
+        ).reshape(-1, 3)
+        mats = numpy.array(
+            [face.material_index for face in bm.faces],
+            dtype=numpy.int64
+        )
+        bm.free()
+
+        positions.append(coords)
+        triangles.append(faces + verts_count)
+        objects_indices.append(numpy.full(len(faces), obj_index, dtype=numpy.int64))
+        materials_indices.append(mats)
+        verts_count += len(coords)
+
+    if not positions:
+        return (
+            numpy.zeros((0, 3)),
+            numpy.zeros((0, 3), dtype=numpy.int64),
+            numpy.zeros(0, dtype=numpy.int64),
+            numpy.zeros(0, dtype=numpy.int64)
+        )
+
+    return (
+        numpy.vstack(positions),
+        numpy.vstack(triangles),
+        numpy.concatenate(objects_indices),
+        numpy.concatenate(materials_indices)
+    )
+
+
+def _get_objects_key(objs):
+    key = []
+    for obj in objs:
+        bpy_mesh = obj.data
+        coords = numpy.empty(len(bpy_mesh.vertices) * 3, dtype=numpy.float32)
+        bpy_mesh.vertices.foreach_get('co', coords)
+        key.append((
+            obj.name,
+            bpy_mesh.name,
+            len(bpy_mesh.polygons),
+            tuple(value for row in obj.matrix_world for value in row),
+            hash(coords.tobytes())
+        ))
+    return tuple(key)
+
+
+_cache = {}
+
+
+def get_objects_bvh(objs):
+    '''
+    Cached bvh of the cform objects. The tree is built again only
+    when the objects, transforms or vertex coordinates are changed.
+    The triangle attributes are object index and material slot index,
+    the objects names are stored in the names list of the tree.
+    '''
+    objs = list(objs)
+    key = _get_objects_key(objs)
+    bvh = _cache.get(key)
+
+    if bvh is None:
+        positions, triangles, objects_indices, materials_indices = \
+            get_objects_data(objs)
+        attributes = numpy.column_stack((objects_indices, materials_indices))
+        bvh = CformBVH(positions, triangles, attributes)
+        bvh.names = [obj.name for obj in objs]
+        _cache.clear()
+        _cache[key] = bvh
+
+    return bvh
+
+
+def get_triangle_material(bvh, triangle):
+    obj_index, material_index = bvh.attributes[triangle].tolist()
+    obj = bpy.data.objects.get(bvh.names[obj_index])
+    if obj and material_index < len(obj.data.materials):
+        return obj.data.materials[material_index]
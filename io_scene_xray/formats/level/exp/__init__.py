@@ -1,2 +1,3 @@
 # addon modules
 from . import ops
+from . import swi
@@ -3,9 +3,11 @@ import os
 
 # blender modules
 import bmesh
+import numpy
 
 # addon modules
 from .. import fmt
+from .. import cform_bvh
 from ... import xr
 from .... import text
 from .... import utils
@@ -13,6 +15,66 @@ from .... import log
 from .... import rw
 
 
+TRIS_DTYPE = numpy.dtype([
+    ('verts', '<u4', 3),
+    ('material', '<u2'),
+    ('sector', '<u2')
+])
+
+
+def _optimize_geometry(positions, triangles, attributes, sectors):
+    # weld vertices of all sectors
+    positions, remap = cform_bvh.weld_vertices(positions)
+    triangles = remap[triangles]
+
+    # remove degenerate triangles
+    degenerate = cform_bvh.get_degenerate_triangles(positions, triangles)
+    degenerate_count = int(degenerate.sum())
+    if degenerate_count:
+        log.warn(
+            text.warn.level_cform_degenerate_tris,
+            count=degenerate_count
+        )
+        valid = ~degenerate
+        triangles = triangles[valid]
+        attributes = attributes[valid]
+        sectors = sectors[valid]
+
+    # remove unused vertices
+    used_verts, triangles = numpy.unique(triangles, return_inverse=True)
+    triangles = triangles.reshape(-1, 3)
+    positions = positions[used_verts]
+
+    # report bad faces
+    duplicates_count = int(cform_bvh.get_duplicate_triangles(triangles).sum())
+    if duplicates_count:
+        log.warn(
+            text.warn.level_cform_duplicate_tris,
+            count=duplicates_count
+        )
+
+    bvh = cform_bvh.CformBVH(positions, triangles)
+    overlaps_count = len(bvh.get_overlapping_triangles())
+    if overlaps_count:
+        log.warn(
+            text.warn.level_cform_overlapping_tris,
+            count=overlaps_count
+        )
+
+    utils.stats.info(
+        'CForm: {0} vertices, {1} triangles, {2} degenerate removed, '
+        '{3} duplicate, {4} overlapping'.format(
+            len(positions),
+            len(triangles),
+            degenerate_count,
+            duplicates_count,
+            overlaps_count
+        )
+    )
+
+    return positions.astype(numpy.float32), triangles, attributes, sectors
+
+
 def get_bbox(bbox_1, bbox_2, function):
     if not bbox_1:
         return bbox_2
@@ -69,13 +131,13 @@ def write_cform(file_path, level):
                 gamemtl_id = 0
         game_materials[material.name] = gamemtl_id
 
-    # write geometry
-    tris_count = 0
+    # collect geometry
+    positions = []
+    triangles = []
+    attributes = []
+    sectors = []
     verts_count = 0
 
-    verts_writer = rw.write.PackedWriter()
-    tris_writer = rw.write.PackedWriter()
-
     sectors_count = len(level.cform_objects)
 
     for sector_index in range(sectors_count):
@@ -86,40 +148,76 @@ def write_cform(file_path, level):
         bm.from_mesh(cform_object.data)
         bmesh.ops.triangulate(bm, faces=bm.faces)
 
-        # write vertices
-        for vert in bm.verts:
-            verts_writer.putf('<3f', vert.co.x, vert.co.z, vert.co.y)
-
-        # write triangles
-        for face in bm.faces:
-
-            # write vertex indices
-            vert_1, vert_2, vert_3 = face.verts
-            tris_writer.putf(
-                '<3I',
-                vert_1.index + verts_count,
-                vert_3.index + verts_count,
-                vert_2.index + verts_count
-            )
-
-            # write material and sector
-            mat = cform_object.data.materials[face.material_index]
+        coords = numpy.array(
+            [vert.co for vert in bm.verts],
+            dtype=numpy.float32
+        ).reshape(-1, 3)
+        faces = numpy.array(
+            [[vert.index for vert in face.verts] for face in bm.faces],
+            dtype=numpy.int64
+        ).reshape(-1, 3)
+        mat_indices = numpy.array(
+            [face.material_index for face in bm.faces],
+            dtype=numpy.int64
+        )
+        bm.free()
+
+        # material and sector attributes of material slots
+        slots_attributes = []
+        for mat_index, mat in enumerate(cform_object.data.materials):
             if not mat:
-                raise log.AppError(
-                    text.error.level_cform_empty_mat_slot,
-                    log.props(
-                        cform_object=cform_object.name,
-                        material_slot_index=face.material_index
+                if (mat_indices == mat_index).any():
+                    raise log.AppError(
+                        text.error.level_cform_empty_mat_slot,
+                        log.props(
+                            cform_object=cform_object.name,
+                            material_slot_index=mat_index
+                        )
                     )
-                )
+                slots_attributes.append(0)
+                continue
             material_id = game_materials[mat.name]
             suppress_shadows = (int(mat.xray.suppress_shadows) << 14) & 0x4000
             suppress_wm = (int(mat.xray.suppress_wm) << 15) & 0x8000
             tris_attributes = material_id | suppress_shadows | suppress_wm
-            tris_writer.putf('<2H', tris_attributes, sector_index)
+            slots_attributes.append(tris_attributes)
+
+        slots_attributes = numpy.array(slots_attributes, dtype=numpy.uint16)
+        mat_indices = numpy.minimum(mat_indices, len(slots_attributes) - 1)
 
-        verts_count += len(bm.verts)
-        tris_count += len(bm.faces)
+        positions.append(coords)
+        triangles.append(faces + verts_count)
+        attributes.append(slots_attributes[mat_indices])
+        sectors.append(numpy.full(len(faces), sector_index, dtype=numpy.uint16))
+
+        verts_count += len(coords)
+
+    positions = numpy.vstack(positions)
+    triangles = numpy.vstack(triangles)
+    attributes = numpy.concatenate(attributes)
+    sectors = numpy.concatenate(sectors)
+
+    if level.context.optimize_cform:
+        positions, triangles, attributes, sectors = _optimize_geometry(
+            positions,
+            triangles,
+            attributes,
+            sectors
+        )
+
+    verts_count = len(positions)
+    tris_count = len(triangles)
+
+    # write geometry
+    verts_writer = rw.write.PackedWriter()
+    verts_writer.put_ndarray('f', positions[ : , (0, 2, 1)])
+
+    tris = numpy.empty(tris_count, dtype=TRIS_DTYPE)
+    tris['verts'] = triangles[ : , (0, 2, 1)]
+    tris['material'] = attributes
+    tris['sector'] = sectors
+    tris_writer = rw.write.PackedWriter()
+    tris_writer.putb(tris.tobytes())
 
     # write header
     header_writer = rw.write.PackedWriter()
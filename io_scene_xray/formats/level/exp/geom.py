@@ -1,35 +1,77 @@
 # standart modules
 import os
 
+# blender modules
+import numpy
+
 # addon modules
 from . import header
+from . import swi
 from .. import fmt
 from .... import rw
 
 
-def _write_geom_swis(geom_writer):
+def _write_geom_swis(geom_writer, swis):
     swis_writer = rw.write.PackedWriter()
-    swis_writer.putf('<I', 0)    # swis count
-    geom_writer.put(fmt.Chunks13.SWIS, swis_writer)
+    swis_writer.putf('<I', len(swis))    # swis count
 
+    for windows in swis:
+        swi.write_swi_buffer(swis_writer, windows)
 
-def _write_geom_ibs(geom_writer, ibs):
-    ib_writer = rw.write.PackedWriter()
+    geom_writer.put(fmt.Chunks13.SWIS, swis_writer)
 
+
+def _write_geom_ibs(geom_writer, ibs, buffers):
     buffers_count = len(ibs)
-    ib_writer.putf('<I', buffers_count)
+    geom_writer.putf('<I', buffers_count)
 
     for ib in ibs:
-        indices_count = len(ib) // fmt.INDEX_SIZE
-        ib_writer.putf('<I', indices_count)
-        ib_writer.data.extend(ib)
-
-    geom_writer.put(fmt.Chunks13.IB, ib_writer)
-
-
-def _write_geom_vbs(geom_writer, vbs):
-    vbs_writer = rw.write.PackedWriter()
-
+        geom_writer.putf('<I', ib.indices_count)
+        buffers.copy(ib.segments, geom_writer)
+
+
+def get_vertices(vertex_format, components):
+    # interleave vertex components, every vertex is 32 bytes.
+    # components - unsigned bytes arrays with row for every vertex
+    count = len(components['position'])
+    uv_fix = components['uv_fix']
+
+    vertices = [
+        components['position'],
+        # normal, hemi
+        components['normal'],
+        components['color_hemi'],
+        # tangent
+        components['tangent'],
+        uv_fix[ : , 0 : 1],
+        # binormal
+        components['binormal'],
+        uv_fix[ : , 1 : 2]
+    ]
+
+    if vertex_format == 'NORMAL':
+        # texture coordinate, light map texture coordinate
+        vertices.append(components['uv'])
+        vertices.append(components['uv_lmap'])
+
+    elif vertex_format == 'TREE':
+        # texture coordinate
+        vertices.append(components['uv'])
+        # tree shader data (wind coefficient and unused 2 bytes)
+        vertices.append(components['shader_data'])
+        vertices.append(numpy.zeros((count, 2), dtype=numpy.uint8))
+
+    elif vertex_format == 'COLOR':
+        # vertex color
+        vertices.append(components['color_light'])
+        vertices.append(components['color_sun'])
+        # texture coordinate
+        vertices.append(components['uv'])
+
+    return numpy.hstack(vertices)
+
+
+def _write_geom_vbs(vbs_writer, vbs, buffers):
     buffers_count = len(vbs)
     vbs_writer.putf('<I', buffers_count)
 
@@ -77,102 +119,50 @@ def _write_geom_vbs(geom_writer, vbs):
         vbs_writer.putf('<I', vb.vertex_count)    # vertices count
 
         # write vertices
-        if vb.vertex_format == 'NORMAL':
-            for index in range(vb.vertex_count):
-                vbs_writer.data.extend(vb.position[index*12 : index*12 + 12])
-                vbs_writer.data.extend((
-                    *vb.normal[index*3 : index*3 + 3],
-                    vb.color_hemi[index]
-                ))    # normal, hemi
-                uv_fix = vb.uv_fix[index*2 : index*2 + 2]
-                # tangent
-                vbs_writer.data.extend((
-                    *vb.tangent[index*3 : index*3 + 3],
-                    uv_fix[0]
-                ))
-                # binormal
-                vbs_writer.data.extend((
-                    *vb.binormal[index*3 : index*3 + 3],
-                    uv_fix[1]
-                ))
-                # texture coordinate
-                vbs_writer.data.extend(vb.uv[index*4 : index*4 + 4])
-                # light map texture coordinate
-                vbs_writer.data.extend(vb.uv_lmap[index*4 : index*4 + 4])
+        buffers.copy(vb.segments, vbs_writer)
 
-        elif vb.vertex_format == 'TREE':
-            for index in range(vb.vertex_count):
-                vbs_writer.data.extend(vb.position[index*12 : index*12 + 12])
-                vbs_writer.data.extend((
-                    *vb.normal[index*3 : index*3 + 3],
-                    vb.color_hemi[index]
-                ))    # normal, hemi
-                uv_fix = vb.uv_fix[index*2 : index*2 + 2]
-                # tangent
-                vbs_writer.data.extend((
-                    *vb.tangent[index*3 : index*3 + 3],
-                    uv_fix[0]
-                ))
-                # binormal
-                vbs_writer.data.extend((
-                    *vb.binormal[index*3 : index*3 + 3],
-                    uv_fix[1]
-                ))
-                # texture coordinate
-                vbs_writer.data.extend(vb.uv[index*4 : index*4 + 4])
-                # tree shader data (wind coefficient and unused 2 bytes)
-                frac = vb.shader_data[index*2 : index*2 + 2]
-                frac.extend((0, 0))
-                vbs_writer.data.extend(frac)
-
-        elif vb.vertex_format == 'COLOR':
-            for index in range(vb.vertex_count):
-                vbs_writer.data.extend(vb.position[index*12 : index*12 + 12])
-                vbs_writer.data.extend((
-                    *vb.normal[index*3 : index*3 + 3],
-                    vb.color_hemi[index]
-                ))    # normal, hemi
-                uv_fix = vb.uv_fix[index*2 : index*2 + 2]
-                # tangent
-                vbs_writer.data.extend((
-                    *vb.tangent[index*3 : index*3 + 3],
-                    uv_fix[0]
-                ))
-                # binormal
-                vbs_writer.data.extend((
-                    *vb.binormal[index*3 : index*3 + 3],
-                    uv_fix[1]
-                ))
-                # vertex color
-                vbs_writer.data.extend((
-                    *vb.color_light[index*3 : index*3 + 3],
-                    vb.color_sun[index]
-                ))
-                # texture coordinate
-                vbs_writer.data.extend(vb.uv[index*4 : index*4 + 4])
-
-        elif vb.vertex_format == 'FASTPATH':
-            vbs_writer.data.extend(vb.position)
-
-    geom_writer.put(fmt.Chunks13.VB, vbs_writer)
 
+def _write_geom_chunk(geom_writer, chunk_id, compress, write_fun, *args):
+    if compress:
+        # compressed chunk is written in memory
+        chunk_writer = rw.write.PackedWriter()
+        write_fun(chunk_writer, *args)
+        geom_writer.put(chunk_id, chunk_writer, compress=True)
 
-def write_geom(file_path, vbs, ibs, ext):
-    # level.geom/level.geomx chunked writer
-    geom_writer = rw.write.ChunkedWriter()
+    else:
+        with geom_writer.chunk(chunk_id):
+            write_fun(geom_writer, *args)
 
-    # header
-    header.write_header(geom_writer)
 
-    # vertex buffers
-    _write_geom_vbs(geom_writer, vbs)
-
-    # index buffers
-    _write_geom_ibs(geom_writer, ibs)
-
-    # slide window items
-    _write_geom_swis(geom_writer)
-
-    # save level.geom/level.geomx file
+def write_geom(file_path, vbs, ibs, ext, buffers, swis=(), compress=False):
+    # level.geom/level.geomx file is written by parts,
+    # the buffers are copied from the temporary storage
     geom_path = file_path + os.extsep + ext
-    rw.utils.save_file(geom_path, geom_writer)
+
+    with rw.utils.stream_file(geom_path) as geom_writer:
+
+        # header
+        header.write_header(geom_writer)
+
+        # vertex buffers
+        _write_geom_chunk(
+            geom_writer,
+            fmt.Chunks13.VB,
+            compress,
+            _write_geom_vbs,
+            vbs,
+            buffers
+        )
+
+        # index buffers
+        _write_geom_chunk(
+            geom_writer,
+            fmt.Chunks13.IB,
+            compress,
+            _write_geom_ibs,
+            ibs,
+            buffers
+        )
+
+        # slide window items
+        _write_geom_swis(geom_writer, swis)
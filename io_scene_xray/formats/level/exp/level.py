@@ -31,6 +31,7 @@ def write_level(context, file_path, bpy_obj):
 
     context.level_name = level.name
     level.context = context
+    level.buffers = types.BuffersStorage()
 
     # header
     header.write_header(level_writer)
@@ -22,13 +22,40 @@ def export_file(context, bpy_obj, dir_path):
     utils.stats.status('Export File', file_path)
 
     # write level file
-    vbs, ibs, fp_vbs, fp_ibs, lvl = level.write_level(context, file_path, bpy_obj)
-
-    # write level.geom file
-    geom.write_geom(file_path, vbs, ibs, GEOM_EXT)
-
-    # write level.geomx file
-    geom.write_geom(file_path, fp_vbs, fp_ibs, GEOMX_EXT)
+    with utils.stats.stage_timer('Level'):
+        vbs, ibs, fp_vbs, fp_ibs, lvl = level.write_level(
+            context,
+            file_path,
+            bpy_obj
+        )
+
+    try:
+        # write level.geom file
+        with utils.stats.stage_timer('Geometry'):
+            geom.write_geom(
+                file_path,
+                vbs,
+                ibs,
+                GEOM_EXT,
+                lvl.buffers,
+                swis=lvl.swis,
+                compress=context.compress_chunks
+            )
+
+        # write level.geomx file
+        with utils.stats.stage_timer('Fast Path Geometry'):
+            geom.write_geom(
+                file_path,
+                fp_vbs,
+                fp_ibs,
+                GEOMX_EXT,
+                lvl.buffers,
+                compress=context.compress_chunks
+            )
+
+    finally:
+        lvl.buffers.close()
 
     # write level.cform file
-    cform.write_cform(file_path, lvl)
+    with utils.stats.stage_timer('CForm'):
+        cform.write_cform(file_path, lvl)
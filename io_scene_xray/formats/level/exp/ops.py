@@ -4,6 +4,7 @@ import bpy
 # addon modules
 from . import main
 from . import types
+from ... import ie
 from .... import utils
 from .... import text
 from .... import log
@@ -68,14 +69,23 @@ class XRAY_OT_export_level(utils.ie.BaseOperator):
         default=file_filter_export,
         options={'HIDDEN'}
     )
+    compress_chunks = ie.prop_compress_chunks()
+    optimize_indices = ie.prop_optimize_indices()
+    optimize_cform = ie.prop_optimize_cform()
     processed = bpy.props.BoolProperty(default=False, options={'HIDDEN'})
 
     def draw(self, context):    # pragma: no cover
         utils.ie.open_imp_exp_folder(self, 'levels_folder')
+        self.layout.prop(self, 'compress_chunks')
+        self.layout.prop(self, 'optimize_indices')
+        self.layout.prop(self, 'optimize_cform')
 
     def export(self, level_object, context):
         context = types.ExportLevelContext()
         context.operator = self
+        context.compress_chunks = self.compress_chunks
+        context.optimize_indices = self.optimize_indices
+        context.optimize_cform = self.optimize_cform
         main.export_file(context, level_object, self.directory)
         return {'FINISHED'}
 
@@ -0,0 +1,31 @@
+# addon modules
+from .... import rw
+
+
+def write_swi_buffer(packed_writer, windows):
+    # reserved
+    packed_writer.putf('<4I', 0, 0, 0, 0)
+
+    packed_writer.putf('<I', len(windows))
+    for offset, triangles_count, vertices_count in windows:
+        packed_writer.putf('<I2H', offset, triangles_count, vertices_count)
+
+
+def write_swidata(windows):
+    packed_writer = rw.write.PackedWriter()
+    write_swi_buffer(packed_writer, windows)
+    return packed_writer
+
+
+def write_swicontainer(windows, level):
+    # index of the level slide windows buffer,
+    # multiple usage visuals share the buffer
+    if windows in level.swis:
+        swi_index = level.swis.index(windows)
+    else:
+        swi_index = len(level.swis)
+        level.swis.append(windows)
+
+    packed_writer = rw.write.PackedWriter()
+    packed_writer.putf('<I', swi_index)
+    return packed_writer
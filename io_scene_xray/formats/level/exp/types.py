@@ -1,3 +1,6 @@
+# standart modules
+import tempfile
+
 # blender modules
 import bpy
 
@@ -15,6 +18,8 @@ class Level(object):
         self.ibs_offsets = []
         self.fp_vbs_offsets = []
         self.fp_ibs_offsets = []
+        self.swis = []
+        self.buffers = None
 
         self.materials = {}
         self.saved_visuals = {}
@@ -32,22 +37,55 @@ class VertexBuffer(object):
         self.vertex_count = 0
         self.vertex_format = None
 
-        self.position = bytearray()
-        self.normal = bytearray()
-        self.tangent = bytearray()
-        self.binormal = bytearray()
-        self.color_hemi = bytearray()
-        self.color_light = bytearray()
-        self.color_sun = bytearray()
-        self.uv = bytearray()
-        self.uv_fix = bytearray()
-        self.uv_lmap = bytearray()
-        self.shader_data = bytearray()
+        # interleaved vertices in the buffers storage
+        self.segments = []
+
+
+class IndexBuffer(object):
+    def __init__(self):
+        self.indices_count = 0
+
+        # indices in the buffers storage
+        self.segments = []
+
+
+class BuffersStorage:
+    # vertex and index buffers are kept in the temporary file
+    # while visuals are exported, the geometry files copy them by parts
+    copy_size = 2 * 1024 * 1024
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        self.size = 0
+
+    def append(self, segments, data):
+        offset = self.size
+        self.file.seek(offset)
+        self.file.write(data)
+        self.size += len(data)
+
+        # merge with the previous segment of the buffer
+        if segments and sum(segments[-1]) == offset:
+            segments[-1] = (segments[-1][0], segments[-1][1] + len(data))
+        else:
+            segments.append((offset, len(data)))
+
+    def copy(self, segments, writer):
+        for offset, size in segments:
+            self.file.seek(offset)
+            while size:
+                data = self.file.read(min(size, self.copy_size))
+                writer.putb(data)
+                size -= len(data)
+
+    def close(self):
+        self.file.close()
 
 
 class Visual(object):
     def __init__(self):
         self.shader_index = None
+        self.swi = None
 
 
 class VisualsCache:
@@ -71,3 +109,6 @@ class VisualsCache:
 class ExportLevelContext(contexts.ExportMeshContext):
     def __init__(self):
         super().__init__()
+        self.compress_chunks = None
+        self.optimize_indices = None
+        self.optimize_cform = None
@@ -1,15 +1,17 @@
 # standart modules
 import math
-import struct
 
 # blender modules
 import bpy
 import bmesh
 import mathutils
+import numpy
 
 # addon modules
+from . import geom
 from . import shader
 from . import sector
+from . import swi
 from . import types
 from .. import fmt
 from ... import ogf
@@ -81,47 +83,121 @@ def get_bbox_center(bbox):
     return bbox_center
 
 
-def find_distance(vertex_1, vertex_2):
-    distance = (
-        (vertex_2[0] - vertex_1[0]) ** 2 + \
-        (vertex_2[1] - vertex_1[1]) ** 2 + \
-        (vertex_2[2] - vertex_1[2]) ** 2
+def find_distances(vertices, vertex):
+    distances = (
+        (vertices[ : , 0] - vertex[0]) ** 2 + \
+        (vertices[ : , 1] - vertex[1]) ** 2 + \
+        (vertices[ : , 2] - vertex[2]) ** 2
     ) ** (1 / 2)
-    return distance
+    return distances
 
 
-def clamp(value, min_value, max_value):
-    if value > max_value:
-        value = max_value
-    elif value < min_value:
-        value = min_value
-    return value
+def quant_values(float_values):
+    values = (float_values * QUANT).astype(numpy.int64)
+    return numpy.clip(values, -32768, 32767)
 
 
-def quant_value(float_value):
-    return clamp(int(float_value * QUANT), -32768, 32767)
-
-
-def get_tex_coord_correct(coord_f, coord_h, uv_coeff):
-    # coord_f - float texture coordinate
-    # coord_h - unsigned 16 bit integer texture coordinate
+def get_tex_coords_correct(coords_f, coords_h, uv_coeff):
+    # coords_f - float texture coordinates
+    # coords_h - unsigned 16 bit integer texture coordinates
     # uv_coeff - max unsigned 16 bit integer value for texture coordinate
 
-    if coord_f > 0:
-        diff = coord_f - (coord_h / uv_coeff)
-    else:
-        diff = (1 + (coord_f * uv_coeff - coord_h)) / uv_coeff
-        coord_h -= 1
+    positive = coords_f > 0
+    diff = numpy.where(
+        positive,
+        coords_f - (coords_h / uv_coeff),
+        (1 + (coords_f * uv_coeff - coords_h)) / uv_coeff
+    )
+    coords_h = numpy.where(positive, coords_h, coords_h - 1)
 
     tex_correct = (255 * 0x8000 * diff) / 32
 
     # clamp uv
-    if coord_h > 0x7fff:
-        coord_h = 0x7fff
-    elif coord_h < -0x8000:
-        coord_h = -0x8000
+    coords_h = numpy.clip(coords_h, -0x8000, 0x7fff)
+
+    return numpy.round(tex_correct), coords_h
+
+
+def get_uv_offsets(uvs):
+    # Calculate UV offset.
+    # Here the offset is calculated for the entire triangle.
+    # This is necessary in order to move the triangle as a whole,
+    # and not along a separate vertex.
+
+    face_uvs = uvs.reshape(-1, 3, 2)
+    max_uv = face_uvs.max(axis=1)
+    min_uv = face_uvs.min(axis=1)
+
+    offsets = numpy.where(
+        max_uv > 32,
+        max_uv - max_uv % 32,
+        numpy.where(min_uv < -32, min_uv - min_uv % -32, 0.0)
+    )
+
+    return numpy.repeat(offsets, 3, axis=0)
+
+
+def get_binormals(normals, tangents):
+    # normal.cross(tangent).normalized()
+    binormals = numpy.cross(normals, tangents)
+    return utils.mesh.normalize_vectors(binormals)
+
 
-    return int(round(tex_correct, 0)), coord_h
+def get_normal_bytes(normals):
+    # x, y, z normal components -> y, z, x unsigned bytes
+    normals = normals.astype(numpy.float64)[ : , (1, 2, 0)]
+    return (((normals + 1.0) / 2) * 255).astype(numpy.uint8)
+
+
+def get_color_bytes(colors):
+    colors = colors.astype(numpy.float64)
+    return numpy.round(colors * 255).astype(numpy.uint8)
+
+
+def get_bytes(array):
+    # array rows as unsigned bytes
+    array = numpy.ascontiguousarray(array)
+    return array.view(numpy.uint8).reshape(len(array), -1)
+
+
+def is_progressive(bpy_obj):
+    return bpy_obj.xray.level.visual_type in ('PROGRESSIVE', 'TREE_PM')
+
+
+def get_triangles(bpy_obj, indices, unique_loops, positions, level):
+    # triangles in the engine vertex order,
+    # optionally reordered for vertex cache.
+    # progressive visuals contain triangles of all detail levels
+    triangles = indices.reshape(-1, 3)[ : , (0, 2, 1)]
+    windows = None
+
+    if is_progressive(bpy_obj):
+        order, triangles, windows = utils.progressive.build_slide_windows(
+            positions[unique_loops],
+            triangles
+        )
+        unique_loops = unique_loops[order]
+
+        if level.context.optimize_indices:
+            # vertices are not reordered, the detail levels
+            # use the first vertices of the vertex buffer
+            triangles = numpy.vstack([
+                utils.vertex_cache.optimize_vertex_cache(
+                    triangles[offset // 3 : offset // 3 + tris_count],
+                    len(unique_loops)
+                )
+                for offset, tris_count, _ in windows
+            ])
+
+    elif level.context.optimize_indices:
+        triangles, order = utils.vertex_cache.optimize(
+            bpy_obj.name,
+            triangles,
+            len(unique_loops)
+        )
+        unique_loops = unique_loops[order]
+
+    return triangles, unique_loops, windows
 
 
 def write_gcontainer(bpy_obj, vbs, ibs, level):
@@ -158,7 +234,8 @@ def write_gcontainer(bpy_obj, vbs, ibs, level):
     packed_writer = rw.write.PackedWriter()
 
     # multiple usage visuals
-    gcontainer = level.saved_visuals.get(bpy_mesh.name, None)
+    visual_key = (bpy_mesh.name, is_progressive(bpy_obj))
+    gcontainer = level.saved_visuals.get(visual_key, None)
     if gcontainer:
         packed_writer.putf('<I', gcontainer[0])    # vb_index
         packed_writer.putf('<I', gcontainer[1])    # vb_offset
@@ -168,6 +245,8 @@ def write_gcontainer(bpy_obj, vbs, ibs, level):
         packed_writer.putf('<I', gcontainer[4])    # ib_offset
         packed_writer.putf('<I', gcontainer[5])    # ib_size
 
+        visual.swi = gcontainer[6]    # slide windows
+
         return packed_writer, visual
 
     bm = bmesh.new()
@@ -256,235 +335,163 @@ def write_gcontainer(bpy_obj, vbs, ibs, level):
         ib = ibs[-1]
         ib_offset = level.ibs_offsets[-1]
         indices_buffer_index = ibs.index(ib)
-        if len(ib) > TWO_MEGABYTES:
-            ib = bytearray()
+        if ib.indices_count * fmt.INDEX_SIZE > TWO_MEGABYTES:
+            ib = types.IndexBuffer()
             ibs.append(ib)
             ib_offset = 0
             indices_buffer_index += 1
             level.ibs_offsets.append(ib_offset)
 
     else:
-        ib = bytearray()
+        ib = types.IndexBuffer()
         ibs.append(ib)
         ib_offset = 0
         level.ibs_offsets.append(ib_offset)
         indices_buffer_index = 0
 
-    vertices_count = 0
-    indices_count = 0
-    vertex_index = 0
-
-    unique_verts = {}
-    vertex_indices = {}
-
     if uv_lmap_lay or sun_col:
         uv_coeff = fmt.UV_COEFFICIENT
     else:
         uv_coeff = fmt.UV_COEFFICIENT_2
 
-    # tree shader params
-    frac_low = get_bbox_center(bpy_obj.bound_box)
-    frac_low[2] = bpy_obj.bound_box[0][2]
-    frac_y_size = bpy_obj.bound_box[6][2] - bpy_obj.bound_box[0][2]
-
-    for face in bm.faces:
-        face_indices = []
-
-        # Calculate UV offset.
-        # Here the offset is calculated for the entire triangle.
-        # This is necessary in order to move the triangle as a whole,
-        # and not along a separate vertex.
-
-        max_u = -1000000.0
-        max_v = -1000000.0
-
-        min_u = +1000000.0
-        min_v = +1000000.0
-
-        for loop in face.loops:
-            tex_u, tex_v = loop[uv_layer].uv
-
-            max_u = max(max_u, tex_u)
-            min_u = min(min_u, tex_u)
-
-            max_v = max(max_v, tex_v)
-            min_v = min(min_v, tex_v)
-
-        u_offset = 0
-        v_offset = 0
-
-        if max_u > 32:
-            u_offset = max_u - max_u % 32
-
-        elif min_u < -32:
-            u_offset = min_u - min_u % -32
-
-        if max_v > 32:
-            v_offset = max_v - max_v % 32
-
-        elif min_v < -32:
-            v_offset = min_v - min_v % -32
-
-        for loop in face.loops:
-            vert = loop.vert
-
-            # light map uv
-            if uv_lmap_lay:
-                tex_uv_lmap = loop[uv_lmap_lay].uv
-            else:
-                tex_uv_lmap = None
-
-            # hemi
-            hemi = loop[hemi_col][0]
-
-            # sun
-            if sun_col:
-                sun = loop[sun_col][0]
-            else:
-                sun = None
-
-            # light
-            if light_col:
-                light = loop[light_col]
-            else:
-                light = None
-
-            # uv
-            tex_u = loop[uv_layer].uv[0] - u_offset
-            tex_v = loop[uv_layer].uv[1] - v_offset
-
-            # normal
-            normal = export_mesh.loops[loop.index].normal
-
-            vert_key = tuple(vert.co)
-
-            vert_data = (
-                (tex_u, tex_v),
-                tex_uv_lmap,
-                normal,
-                hemi,
-                sun,
-                light
-            )
-
-            vert_data_list = unique_verts.get(vert_key, None)
-
-            if vert_data_list is None:
-                unique_verts[vert_key] = [vert_data, ]
-                vertex_indices[vert_key] = [vertex_index, ]
-
-            else:
-
-                if vert_data in vert_data_list:
-                    # is duplicate vertex
-                    for i, data in enumerate(vert_data_list):
-                        if vert_data == data:
-                            index = vertex_indices[vert_key][i]
-                            packed_vertex_index = struct.pack('<H', index)
-                            face_indices.append(packed_vertex_index)
-                            indices_count += 1
-                            break
-                    continue
-
-                else:
-                    unique_verts[vert_key].append(vert_data)
-                    vertex_indices[vert_key].append(vertex_index)
-
-            packed_vertex_index = struct.pack('<H', vertex_index)
-            face_indices.append(packed_vertex_index)
-            indices_count += 1
-
-            vb.vertex_count += 1
-            vertices_count += 1
-            vertex_index += 1
+    # collect loops data
+    loops = export_mesh.loops
+    verts_indices = utils.mesh.get_data_array(
+        loops,
+        'vertex_index',
+        dtype=numpy.int32
+    )
+    coords = utils.mesh.get_data_array(export_mesh.vertices, 'co', 3)
+    coords = coords[verts_indices]
+    normals = utils.mesh.get_data_array(loops, 'normal', 3)
+    tangents = utils.mesh.get_data_array(loops, 'tangent', 3)
+    uvs = utils.mesh.get_data_array(
+        export_mesh.uv_layers[uv_layer.name].data,
+        'uv',
+        2
+    ).astype(numpy.float64)
+    hemi = utils.mesh.get_color_layer_data(export_mesh, hemi_col.name)[ : , 0]
+
+    # vertex components of every loop
+    components = []
+
+    # position
+    positions = get_bytes(coords[ : , (0, 2, 1)])
+    components.append(positions)
+
+    # normal
+    normal = get_normal_bytes(normals)
+    components.append(normal)
+
+    # hemi
+    color_hemi = get_color_bytes(hemi)
+    components.append(color_hemi[ : , None])
+
+    # uv
+    tex_uvs = uvs - get_uv_offsets(uvs)
+    coords_u = (tex_uvs[ : , 0] * uv_coeff).astype(numpy.int64)
+    coords_v = ((1.0 - tex_uvs[ : , 1]) * uv_coeff).astype(numpy.int64)
+
+    # uv corrector
+    correct_u, coords_u = get_tex_coords_correct(
+        tex_uvs[ : , 0],
+        coords_u,
+        uv_coeff
+    )
+    correct_v, coords_v = get_tex_coords_correct(
+        1 - tex_uvs[ : , 1],
+        coords_v,
+        uv_coeff
+    )
 
-            # position
-            vb.position.extend(
-                struct.pack('<3f', vert.co[0], vert.co[2], vert.co[1])
-            )
+    uv = get_bytes(
+        numpy.column_stack((coords_u, coords_v)).astype(numpy.int16)
+    )
+    uv_fix = numpy.column_stack((correct_u, correct_v)).astype(numpy.uint8)
+    components.extend((uv, uv_fix))
+
+    # light map uv
+    if uv_lmap_lay:
+        uvs_lmap = utils.mesh.get_data_array(
+            export_mesh.uv_layers[uv_lmap_lay.name].data,
+            'uv',
+            2
+        ).astype(numpy.float64)
+        uvs_lmap[ : , 1] = 1.0 - uvs_lmap[ : , 1]
+        uv_lmap = numpy.round(uvs_lmap * fmt.LIGHT_MAP_UV_COEFFICIENT)
+        uv_lmap = get_bytes(uv_lmap.astype(numpy.int16))
+        components.append(uv_lmap)
+
+    # sun and light
+    if sun_col:
+        sun = utils.mesh.get_color_layer_data(export_mesh, sun_col.name)
+        color_sun = get_color_bytes(sun[ : , 0])
+        light = utils.mesh.get_color_layer_data(export_mesh, light_col.name)
+        color_light = get_color_bytes(light[ : , (2, 1, 0)])
+        components.extend((color_sun[ : , None], color_light))
+
+    # merge loops with the same vertex data,
+    # tangent and binormal are taken from the first loop
+    unique_loops, indices = utils.mesh.weld_vertices(
+        numpy.hstack(components)
+    )
+    vertices_count = len(unique_loops)
+    triangles, unique_loops, visual.swi = get_triangles(
+        bpy_obj,
+        indices,
+        unique_loops,
+        coords,
+        level
+    )
+    indices_count = triangles.size
 
-            # normal
-            vb.normal.extend(struct.pack(
-                '<3B',
-                int(((normal[1] + 1.0) / 2) * 255),
-                int(((normal[2] + 1.0) / 2) * 255),
-                int(((normal[0] + 1.0) / 2) * 255)
-            ))
-
-            # tangent
-            tangent = export_mesh.loops[loop.index].tangent
-            vb.tangent.extend(struct.pack(
-                '<3B',
-                int(((tangent[1] + 1.0) / 2) * 255),
-                int(((tangent[2] + 1.0) / 2) * 255),
-                int(((tangent[0] + 1.0) / 2) * 255)
-            ))
-
-            # binormal
-            binorm = mathutils.Vector(normal).cross(tangent).normalized()
-            vb.binormal.extend(struct.pack(
-                '<3B',
-                int(((-binorm[1] + 1.0) / 2) * 255),
-                int(((-binorm[2] + 1.0) / 2) * 255),
-                int(((-binorm[0] + 1.0) / 2) * 255)
-            ))
-
-            # hemi
-            vb.color_hemi.append(int(round(hemi * 255, 0)))
-
-            # sun
-            if sun_col:
-                vb.color_sun.append(int(round(sun * 255, 0)))
-
-                # light
-                vb.color_light.extend(struct.pack(
-                    '<3B',
-                    int(round(light[2] * 255, 0)),
-                    int(round(light[1] * 255, 0)),
-                    int(round(light[0] * 255, 0))
-                ))
-
-            # uv
-            coord_u = int(tex_u * uv_coeff)
-            coord_v = int((1.0 - tex_v) * uv_coeff)
-
-            # uv corrector
-            correct_u, coord_u = get_tex_coord_correct(
-                tex_u,
-                coord_u,
-                uv_coeff
-            )
-            correct_v, coord_v = get_tex_coord_correct(
-                1 - tex_v,
-                coord_v,
-                uv_coeff
-            )
+    tangents = tangents[unique_loops]
+    binormals = get_binormals(normals[unique_loops], tangents)
 
-            # write uv
-            vb.uv.extend(struct.pack('<2h', coord_u, coord_v))
+    vertex_components = {
+        'position': positions[unique_loops],
+        'normal': normal[unique_loops],
+        'tangent': get_normal_bytes(tangents),
+        'binormal': get_normal_bytes(-binormals),
+        'color_hemi': color_hemi[unique_loops, None],
+        'uv': uv[unique_loops],
+        'uv_fix': uv_fix[unique_loops]
+    }
 
-            # write uv corrector
-            vb.uv_fix.extend(struct.pack('<2B', correct_u, correct_v))
+    if uv_lmap_lay:
+        vertex_components['uv_lmap'] = uv_lmap[unique_loops]
 
-            if uv_lmap_lay:
-                lmap_u = int(round(
-                    tex_uv_lmap[0] * fmt.LIGHT_MAP_UV_COEFFICIENT,
-                    0
-                ))
-                lmap_v = int(round(
-                    (1.0 - tex_uv_lmap[1]) * fmt.LIGHT_MAP_UV_COEFFICIENT,
-                    0
-                ))
-                vb.uv_lmap.extend(struct.pack('<2h', lmap_u, lmap_v))
+    if sun_col:
+        vertex_components['color_sun'] = color_sun[unique_loops, None]
+        vertex_components['color_light'] = color_light[unique_loops]
+
+    # tree shader data (wind coefficient)
+    if not (uv_lmap_lay or sun_col or light_col):
+        frac_low = get_bbox_center(bpy_obj.bound_box)
+        frac_low[2] = bpy_obj.bound_box[0][2]
+        frac_y_size = bpy_obj.bound_box[6][2] - bpy_obj.bound_box[0][2]
+
+        verts_coords = coords[unique_loops].astype(numpy.float64)
+        f1 = (verts_coords[ : , 2] - frac_low[2]) / frac_y_size
+        f2 = find_distances(verts_coords, frac_low) / frac_y_size
+        frac = quant_values((f1 + f2) / 2)    # wind coefficient
+        vertex_components['shader_data'] = get_bytes(
+            frac.astype(numpy.uint16)[ : , None]
+        )
 
-            # tree shader data (wind coefficient)
-            if not (uv_lmap_lay or sun_col or light_col):
-                f1 = (vert.co[2] - frac_low[2]) / frac_y_size
-                f2 = find_distance(vert.co, frac_low) / frac_y_size
-                frac = quant_value((f1 + f2) / 2)    # wind coefficient
-                vb.shader_data.extend(struct.pack('<H', frac))
+    # interleaved vertices
+    vb.vertex_count += vertices_count
+    level.buffers.append(
+        vb.segments,
+        geom.get_vertices(vertex_format, vertex_components).tobytes()
+    )
 
-        ib.extend((*face_indices[0], *face_indices[2], *face_indices[1]))
+    # triangles indices
+    ib.indices_count += indices_count
+    level.buffers.append(
+        ib.segments,
+        triangles.astype(numpy.uint16).tobytes()
+    )
 
     vertex_buffer_index = vbs.index(vb)
 
@@ -502,7 +509,7 @@ def write_gcontainer(bpy_obj, vbs, ibs, level):
     # ib_size
     packed_writer.putf('<I', indices_count)
 
-    level.saved_visuals[bpy_mesh.name] = (
+    level.saved_visuals[visual_key] = (
         # vertices info
         vertex_buffer_index,
         level.vbs_offsets[vertex_buffer_index],
@@ -511,7 +518,10 @@ def write_gcontainer(bpy_obj, vbs, ibs, level):
         # indices info
         indices_buffer_index,
         ib_offset,
-        indices_count
+        indices_count,
+
+        # progressive mesh info
+        visual.swi
     )
 
     level.vbs_offsets[vertex_buffer_index] += vertices_count
@@ -612,49 +622,52 @@ def write_fastpath_gcontainer(fastpath_obj, fp_vbs, fp_ibs, level):
         ib = fp_ibs[-1]
         ib_offset = level.fp_ibs_offsets[-1]
         indices_buffer_index = fp_ibs.index(ib)
-        if len(ib) > TWO_MEGABYTES:
-            ib = bytearray()
+        if ib.indices_count * fmt.INDEX_SIZE > TWO_MEGABYTES:
+            ib = types.IndexBuffer()
             fp_ibs.append(ib)
             ib_offset = 0
             indices_buffer_index += 1
             level.fp_ibs_offsets.append(ib_offset)
     else:
-        ib = bytearray()
+        ib = types.IndexBuffer()
         fp_ibs.append(ib)
         ib_offset = 0
         level.fp_ibs_offsets.append(ib_offset)
         indices_buffer_index = 0
 
-    vertices_count = 0
-    indices_count = 0
-    vertex_index = 0
-
-    unique_verts = {}
-    verts_indices = {}
-    for face in bm.faces:
-        for vert in face.verts:
-            packed_co = struct.pack('<3f', vert.co[0], vert.co[2], vert.co[1])
-
-            if unique_verts.get(packed_co, None) is None:
-                unique_verts[packed_co] = vertex_index
-                verts_indices[vert.index] = vertex_index
-                vb.position.extend(packed_co)
-                vb.vertex_count += 1
-                vertices_count += 1
-                vertex_index += 1
-            else:
-                duplicate_vertex_index = unique_verts[packed_co]
-                verts_indices[vert.index] = duplicate_vertex_index
+    # collect loops data
+    export_mesh = bpy.data.meshes.new('temp_mesh')
+    bm.to_mesh(export_mesh)
+    verts_indices = utils.mesh.get_data_array(
+        export_mesh.loops,
+        'vertex_index',
+        dtype=numpy.int32
+    )
+    coords = utils.mesh.get_data_array(export_mesh.vertices, 'co', 3)
+    bpy.data.meshes.remove(export_mesh)
 
-    for face in bm.faces:
-        face_indices = []
-        for vert in face.verts:
-            vert_index = verts_indices[vert.index]
-            packed_vert_index = struct.pack('<H', vert_index)
-            face_indices.append(packed_vert_index)
-            indices_count += 1
+    # merge loops with the same position
+    positions = get_bytes(coords[verts_indices][ : , (0, 2, 1)])
+    unique_loops, indices = utils.mesh.weld_vertices(positions)
+    vertices_count = len(unique_loops)
+    triangles, unique_loops, windows = get_triangles(
+        fastpath_obj,
+        indices,
+        unique_loops,
+        coords[verts_indices],
+        level
+    )
+    indices_count = triangles.size
 
-        ib.extend((*face_indices[0], *face_indices[2], *face_indices[1]))
+    vb.vertex_count += vertices_count
+    level.buffers.append(vb.segments, positions[unique_loops].tobytes())
+
+    # triangles indices
+    ib.indices_count += indices_count
+    level.buffers.append(
+        ib.segments,
+        triangles.astype(numpy.uint16).tobytes()
+    )
 
     vertex_buffer_index = fp_vbs.index(vb)
 
@@ -675,13 +688,21 @@ def write_fastpath_gcontainer(fastpath_obj, fp_vbs, fp_ibs, level):
     level.fp_vbs_offsets[vertex_buffer_index] += vertices_count
     level.fp_ibs_offsets[-1] += indices_count
 
-    return packed_writer
+    return packed_writer, windows
 
 
 def write_fastpath(fastpath_obj, fp_vbs, fp_ibs, level):
     chunked_writer = rw.write.ChunkedWriter()
-    writer = write_fastpath_gcontainer(fastpath_obj, fp_vbs, fp_ibs, level)
+    writer, windows = write_fastpath_gcontainer(
+        fastpath_obj,
+        fp_vbs,
+        fp_ibs,
+        level
+    )
     chunked_writer.put(ogf.fmt.Chunks_v4.GCONTAINER, writer)
+    if windows:
+        swi_writer = swi.write_swidata(windows)
+        chunked_writer.put(ogf.fmt.Chunks_v4.SWIDATA, swi_writer)
     return chunked_writer
 
 
@@ -723,22 +744,48 @@ def write_visual(
             level
         )
 
-        if level_props.visual_type in ('TREE_ST', 'TREE_PM'):
+        if level_props.visual_type == 'TREE_ST':
             header_writer = write_visual_header(
                 level,
                 bpy_obj,
                 visual=visual,
-                visual_type=7
+                visual_type=ogf.fmt.ModelType_v4.TREE_ST
             )
             tree_def_2_writer = write_tree_def_2(bpy_obj)
             visual_writer.put(ogf.fmt.HEADER, header_writer)
             visual_writer.put(ogf.fmt.Chunks_v4.GCONTAINER, gcontainer_writer)
             visual_writer.put(ogf.fmt.Chunks_v4.TREEDEF2, tree_def_2_writer)
 
+        elif level_props.visual_type == 'TREE_PM':
+            header_writer = write_visual_header(
+                level,
+                bpy_obj,
+                visual=visual,
+                visual_type=ogf.fmt.ModelType_v4.TREE_PM
+            )
+            swi_writer = swi.write_swicontainer(visual.swi, level)
+            tree_def_2_writer = write_tree_def_2(bpy_obj)
+            visual_writer.put(ogf.fmt.HEADER, header_writer)
+            visual_writer.put(ogf.fmt.Chunks_v4.GCONTAINER, gcontainer_writer)
+            visual_writer.put(ogf.fmt.Chunks_v4.SWICONTAINER, swi_writer)
+            visual_writer.put(ogf.fmt.Chunks_v4.TREEDEF2, tree_def_2_writer)
+
         else:    # NORMAL or PROGRESSIVE visual
-            header_writer = write_visual_header(level, bpy_obj, visual=visual)
+            if level_props.visual_type == 'PROGRESSIVE':
+                visual_type = ogf.fmt.ModelType_v4.PROGRESSIVE
+            else:
+                visual_type = ogf.fmt.ModelType_v4.NORMAL
+            header_writer = write_visual_header(
+                level,
+                bpy_obj,
+                visual=visual,
+                visual_type=visual_type
+            )
             visual_writer.put(ogf.fmt.HEADER, header_writer)
             visual_writer.put(ogf.fmt.Chunks_v4.GCONTAINER, gcontainer_writer)
+            if visual.swi:
+                swi_writer = swi.write_swidata(visual.swi)
+                visual_writer.put(ogf.fmt.Chunks_v4.SWIDATA, swi_writer)
             if len(level.visuals_cache.children[bpy_obj.name]):
                 raise log.AppError(
                     text.error.level_has_children,
@@ -1026,7 +1073,11 @@ def write_visuals(level_writer, level_object, level):
         fastpath_indices_buffers
     )
 
-    level_writer.put(fmt.Chunks13.VISUALS, visuals_writer)
+    level_writer.put(
+        fmt.Chunks13.VISUALS,
+        visuals_writer,
+        compress=level.context.compress_chunks
+    )
 
     return (
         vertex_buffers,
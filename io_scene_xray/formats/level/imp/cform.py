@@ -3,7 +3,7 @@ import os
 
 # blender modules
 import bpy
-import bmesh
+import numpy
 
 # addon modules
 from . import name
@@ -15,6 +15,49 @@ from .... import text
 from .... import rw
 
 
+TRIS_FIELDS_V4 = (
+    ('verts', '3I'),
+    ('material', 'H'),
+    ('sector', 'H')
+)
+TRIS_FIELDS_V2 = (
+    ('verts', '3I'),
+    ('unknown', '3I'),
+    ('unknown_2', 'H'),
+    ('sector', 'H'),
+    ('material', 'I')
+)
+
+
+def _get_material(mat_key):
+    # material key is material id with shadows and wallmarks bits
+    mat_id = mat_key >> 2
+    shadows = bool(mat_key & 0b10)
+    wallmarks = bool(mat_key & 0b01)
+    return mat_id, shadows, wallmarks
+
+
+def read_tris(packed_reader, version, tris_count):
+    # returns vertex indices, sectors and material keys of triangles
+    if version == fmt.CFORM_VERSION_4:
+        tris = packed_reader.get_records(TRIS_FIELDS_V4, tris_count)
+        mat = tris['material'].astype(numpy.int64)
+        # 0-14 bits material id
+        mat_ids = mat & 0x3fff
+        # 15 bit suppress shadows
+        shadows = (mat >> 14) & 1
+        # 16 bit suppress wallmarks
+        wallmarks = (mat >> 15) & 1
+        mat_keys = mat_ids * 4 + shadows * 2 + wallmarks
+
+    # faces in version 2 or 3
+    else:
+        tris = packed_reader.get_records(TRIS_FIELDS_V2, tris_count)
+        mat_keys = tris['material'].astype(numpy.int64) * 4
+
+    return tris['verts'], tris['sector'], mat_keys
+
+
 def _import_main(context, level, cform_path, data):
     # get reader
     packed_reader = rw.read.PackedReader(data)
@@ -31,7 +74,7 @@ def _import_main(context, level, cform_path, data):
     packed_reader.skip(24)    # min/max bbox 6 float
 
     # read verts
-    verts = packed_reader.get_array('f', verts_count, vec_len=3)
+    verts = packed_reader.get_ndarray('f', verts_count, vec_len=3)
 
     # read game materials
     game_mtl_names = {}
@@ -45,70 +88,30 @@ def _import_main(context, level, cform_path, data):
             break
 
     # read tris
-    sectors_tris = {}
-    sectors_verts = {}
-    sectors_mats = {}    # unique sectors materials
-    for sector_index in level.sectors_objects.keys():
-        sectors_tris[sector_index] = []
-        sectors_verts[sector_index] = set()
-        sectors_mats[sector_index] = set()
-    tris = [None, ] * tris_count
-    unique_materials = set()
-
-    # faces in version 4
-    if version == fmt.CFORM_VERSION_4:
-        prep = packed_reader.prep('3I2H')
-        for tris_index in range(tris_count):
-            vert_1, vert_2, vert_3, mat, sector = packed_reader.getp(prep)
-            # 0-14 bits material id
-            mat_id = mat & 0x3fff
-            # 15 bit suppress shadows
-            shadows = bool(mat & 0x4000)
-            # 16 bit suppress wallmarks
-            wallmarks = bool(mat & 0x8000)
-            tris[tris_index] = (
-                vert_1, vert_2, vert_3,
-                mat_id, shadows, wallmarks
-            )
-            unique_materials.add((mat_id, shadows, wallmarks))
-            sectors_tris[sector].append(tris_index)
-            sectors_verts[sector].update((vert_1, vert_2, vert_3))
-            sectors_mats[sector].add((mat_id, shadows, wallmarks))
-
-    # faces in version 2 or 3
-    elif version in (fmt.CFORM_VERSION_2, fmt.CFORM_VERSION_3):
-        prep = packed_reader.prep('6I2HI')
-        for tris_index in range(tris_count):
-            (
-                vert_1, vert_2, vert_3,
-                _, _, _, _,
-                sector, mat_id
-            ) = packed_reader.getp(prep)
-            shadows = False
-            wallmarks = False
-            tris[tris_index] = (
-                vert_1, vert_2, vert_3,
-                mat_id, shadows, wallmarks
-            )
-            unique_materials.add((mat_id, shadows, wallmarks))
-            sectors_tris[sector].append(tris_index)
-            sectors_verts[sector].update((vert_1, vert_2, vert_3))
-            sectors_mats[sector].add((mat_id, shadows, wallmarks))
-
-    # sector sets to lists
-    for sector_index in sectors_tris:
-        sectors_mats[sector_index] = list(sectors_mats[sector_index])
-        sectors_verts[sector_index] = list(sectors_verts[sector_index])
+    tris_verts, tris_sectors, mat_keys = read_tris(
+        packed_reader,
+        version,
+        tris_count
+    )
+
+    # material index of every triangle
+    unique_keys, tris_mats = numpy.unique(mat_keys, return_inverse=True)
+    tris_mats = tris_mats.ravel()
+    unique_materials = [
+        _get_material(mat_key)
+        for mat_key in unique_keys.tolist()
+    ]
 
     # create bpy materials
     bpy_materials = {}
+    data_cache = utils.cache.get_cache()
     for mat_id, shadows, wallmarks in unique_materials:
         gmtl = game_mtl_names.get(mat_id, str(mat_id))
         mat_name = '{0}_{1}_{2}'.format(gmtl, int(shadows), int(wallmarks))
 
         # search material
         material = None
-        for bpy_mat in bpy.data.materials:
+        for bpy_mat in data_cache.get('materials', 'gamemtl', gmtl):
             if not bpy_mat.name.startswith(mat_name):
                 continue
             xray = bpy_mat.xray
@@ -130,67 +133,66 @@ def _import_main(context, level, cform_path, data):
             material.xray.suppress_shadows = shadows
             material.xray.suppress_wm = wallmarks
             utils.stats.created_mat()
+            utils.cache.add_material(material)
 
         bpy_materials[mat_id] = material
 
+    # group triangles by sectors
+    sectors_order = numpy.argsort(tris_sectors, kind='mergesort')
+    sorted_sectors = tris_sectors[sectors_order]
+
+    # material slot of every material in the sector
+    slots = numpy.full(len(unique_keys), -1, dtype=numpy.int64)
+
     # create geometry
-    for sector, triangles in sectors_tris.items():
-        # create verts
-        sector_verts = sectors_verts[sector]
-        bm = bmesh.new()
-        remap_verts = {}
-        for remap_vertex_index, vert_index in enumerate(sector_verts):
-            vert_co = verts[vert_index]
-            bm.verts.new((vert_co[0], vert_co[2], vert_co[1]))
-            remap_verts[vert_index] = remap_vertex_index
-        bm.verts.ensure_lookup_table()
-        bm.verts.index_update()
-        verts_count = len(bm.verts)
-
-        # create tris
-        tris_2 = []    # two sided tris
-        verts_2 = set()    # two sided verts
-        for tris_index in triangles:
-            vert_1, vert_2, vert_3, mat_id, shadow, wm = tris[tris_index]
-            try:
-                face = bm.faces.new((
-                    bm.verts[remap_verts[vert_1]],
-                    bm.verts[remap_verts[vert_3]],
-                    bm.verts[remap_verts[vert_2]]
-                ))
-                material = sectors_mats[sector].index((mat_id, shadow, wm))
-                face.material_index = material
-                face.smooth = True
-            except ValueError:
-                face = None
-                tris_2.append((vert_1, vert_2, vert_3, mat_id, shadow, wm))
-                verts_2.update((vert_1, vert_2, vert_3))
+    for sector in level.sectors_objects.keys():
+        start, end = numpy.searchsorted(sorted_sectors, (sector, sector + 1))
+        sector_tris = sectors_order[start : end]
+
+        # remap verts
+        sector_verts, faces = numpy.unique(
+            tris_verts[sector_tris].ravel(),
+            return_inverse=True
+        )
+        faces = faces.reshape(-1, 3)[ : , (0, 2, 1)].astype(numpy.int64)
+        verts_count = len(sector_verts)
+
+        # remap materials by lookup table
+        sector_mats = tris_mats[sector_tris]
+        used_mats = numpy.flatnonzero(
+            numpy.bincount(sector_mats, minlength=len(unique_keys))
+        )
+        slots[used_mats] = numpy.arange(len(used_mats))
+        materials = slots[sector_mats]
+
+        # the second occurrence of the triangle is a two sided triangle,
+        # it gets its own copy of vertices, the rest are skipped
+        occurrence = utils.mesh.get_faces_occurrence(faces)
+        faces_1 = occurrence == 0
+        faces_2 = occurrence == 1
 
         # create two sided verts
-        remap_vertices = {}
-        for remap_vert_index, vertex_index in enumerate(verts_2):
-            vert_co = verts[vertex_index]
-            bm.verts.new((vert_co[0], vert_co[2], vert_co[1]))
-            remap_vertices[vertex_index] = remap_vert_index + verts_count
-        bm.verts.ensure_lookup_table()
-        bm.verts.index_update()
-
-        # create two sided tris
-        for vert_1, vert_2, vert_3, mat_id, shadow, wm in tris_2:
-            try:
-                face = bm.faces.new((
-                    bm.verts[remap_vertices[vert_1]],
-                    bm.verts[remap_vertices[vert_3]],
-                    bm.verts[remap_vertices[vert_2]]
-                ))
-                mat = sectors_mats[sector].index((mat_id, shadow, wm))
-                face.material_index = mat
-                face.smooth = True
-            except ValueError:    # face already exists
-                pass
-        bm.faces.ensure_lookup_table()
-        bm.faces.index_update()
-        bm.normal_update()
+        verts_2, faces_2_remap = numpy.unique(
+            faces[faces_2],
+            return_inverse=True
+        )
+        faces_2_remap = faces_2_remap.reshape(-1, 3) + verts_count
+
+        sector_verts = sector_verts.astype(numpy.int64)
+        verts_indices = numpy.concatenate((
+            sector_verts,
+            sector_verts[verts_2]
+        ))
+        sector_coords = verts[verts_indices]
+
+        # swap y and z
+        sector_coords = sector_coords[:, (0, 2, 1)]
+
+        sector_faces = numpy.concatenate((faces[faces_1], faces_2_remap))
+        sector_materials = numpy.concatenate((
+            materials[faces_1],
+            materials[faces_2]
+        ))
 
         # create mesh
         obj_name = 'cform_{:0>3}'.format(sector)
@@ -198,12 +200,18 @@ def _import_main(context, level, cform_path, data):
         utils.stats.created_msh()
 
         # append materials
-        for mat_id, _, _ in sectors_mats[sector]:
+        for mat_index in used_mats.tolist():
+            mat_id, _, _ = unique_materials[mat_index]
             bpy_material = bpy_materials[mat_id]
             bpy_mesh.materials.append(bpy_material)
 
         # create object
-        bm.to_mesh(bpy_mesh)
+        utils.mesh.create_geometry(
+            bpy_mesh,
+            sector_coords,
+            sector_faces,
+            sector_materials
+        )
         bpy_obj = bpy.data.objects.new(obj_name, bpy_mesh)
         bpy_obj.parent = level.sectors_objects[sector]
         bpy_obj.xray.version = level.addon_version
@@ -220,7 +228,7 @@ def _import_main(context, level, cform_path, data):
 def import_cform(context, level, chunks, chunks_ids):
     if level.xrlc_version >= fmt.VERSION_10:
         cform_path = os.path.join(level.path, 'level.cform')
-        cform_data = rw.utils.read_file(cform_path)
+        cform_data = rw.utils.read_file(cform_path, use_mmap=True)
     else:
         cform_path = level.file
         cform_data = chunks.pop(chunks_ids.CFORM)
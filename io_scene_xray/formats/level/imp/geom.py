@@ -19,7 +19,8 @@ def read_geom(level, chunks, context):
         geom_reader = rw.utils.get_file_reader(
             geom_path,
             chunked=True,
-            update_log=False
+            update_log=False,
+            use_mmap=True
         )
         geom_chunks = rw.utils.get_reader_chunks(geom_reader)
         header.get_version(None, geom_chunks, geom_path)
@@ -102,48 +102,60 @@ def _create_level_collections(level):
 
 def _import_level(level, context, chunks, chunks_ids, level_object):
     # shaders
-    shader.import_shaders(level, context, chunks, chunks_ids)
+    with utils.stats.stage_timer('Shaders'):
+        shader.import_shaders(level, context, chunks, chunks_ids)
 
     # textures
-    shader.import_textures(level, chunks, chunks_ids)
+    with utils.stats.stage_timer('Textures'):
+        shader.import_textures(level, chunks, chunks_ids)
 
     # vertices
-    vb.import_vertex_buffers(level, chunks, chunks_ids)
+    with utils.stats.stage_timer('Vertex Buffers'):
+        vb.import_vertex_buffers(level, chunks, chunks_ids)
 
     # indices
-    ib.import_indices_buffers(level, chunks, chunks_ids)
+    with utils.stats.stage_timer('Index Buffers'):
+        ib.import_indices_buffers(level, chunks, chunks_ids)
 
     # swis
-    swi.import_swi_buffers(level, chunks, chunks_ids)
+    with utils.stats.stage_timer('SWI Buffers'):
+        swi.import_swi_buffers(level, chunks, chunks_ids)
 
     # visuals
-    visual.import_visuals(level, chunks, chunks_ids)
+    with utils.stats.stage_timer('Visuals'):
+        visual.import_visuals(level, chunks, chunks_ids)
 
     # sectors
-    sector.import_sectors(level, level_object, chunks, chunks_ids)
+    with utils.stats.stage_timer('Sectors'):
+        sector.import_sectors(level, level_object, chunks, chunks_ids)
 
     # portals
-    portal.import_portals(level, level_object, chunks, chunks_ids)
+    with utils.stats.stage_timer('Portals'):
+        portal.import_portals(level, level_object, chunks, chunks_ids)
 
     # glows
-    glow.import_glows(level, level_object, chunks, chunks_ids)
+    with utils.stats.stage_timer('Glows'):
+        glow.import_glows(level, level_object, chunks, chunks_ids)
 
     # lights
-    light.import_lights(level, level_object, chunks, chunks_ids)
+    with utils.stats.stage_timer('Lights'):
+        light.import_lights(level, level_object, chunks, chunks_ids)
 
     # cforms
-    cform.import_cform(context, level, chunks, chunks_ids)
+    with utils.stats.stage_timer('CForm'):
+        cform.import_cform(context, level, chunks, chunks_ids)
 
 
 def _import_main(context, level):
     # level chunks
-    chunks = rw.utils.get_file_chunks(level.file)
+    chunks = rw.utils.get_file_chunks(level.file, use_mmap=True)
 
     # level version
     header.get_version(level, chunks, context.filepath)
 
     # read level.geom
-    geom.read_geom(level, chunks, context)
+    with utils.stats.stage_timer('Geometry'):
+        geom.read_geom(level, chunks, context)
 
     # get chunks
     chunks_ids = fmt.ver_chunks[level.xrlc_version]
@@ -107,7 +107,16 @@ def _search_material(context, rel_tex, engine_shader, light_maps):
     found_mat = None
     found_img = None
 
-    for mat in bpy.data.materials:
+    # materials with the texture image
+    abs_tex_path, abs_lvl_path = texture.get_image_paths(context, rel_tex)
+    materials = utils.cache.get_cache().get(
+        'materials',
+        'image',
+        (engine_shader, abs_lvl_path),
+        (engine_shader, abs_tex_path)
+    )
+
+    for mat in materials:
 
         if not mat.name.startswith(rel_tex):
             continue
@@ -180,22 +189,26 @@ def _create_material(level, context, rel_tex, engine_shader, light_maps):
 
         # find texture
         bpy_texture = None
-        for tex in bpy.data.textures:
-            if hasattr(tex, 'image'):
-                image_path = bpy.path.abspath(tex.image.filepath)
-                if texture.is_same_image_paths(bpy_img, image_path):
-                    bpy_texture = tex
-                    break
+        textures = utils.cache.get_cache().get(
+            'textures',
+            'image',
+            bpy.path.abspath(bpy_img.filepath)
+        )
+        if textures:
+            bpy_texture = textures[0]
 
         # create texture
         if not bpy_texture:
             bpy_texture = bpy.data.textures.new(rel_tex, 'IMAGE')
             bpy_texture.image = bpy_img
             utils.stats.created_tex()
+            utils.cache.add_texture(bpy_texture)
 
         tex_slot.texture = bpy_texture
         tex_slot.use_map_alpha = True
 
+    utils.cache.add_material(bpy_mat)
+
     return bpy_mat, bpy_img
 
 
@@ -69,8 +69,7 @@ def is_same_light_maps(context, bpy_mat, light_maps):
     return is_same_tex_count
 
 
-def is_same_image(context, bpy_mat, texture):
-    result = None
+def get_image_paths(context, texture):
     level_dir = os.path.dirname(context.filepath)
 
     # absolute texture path in textures folder
@@ -78,6 +77,13 @@ def is_same_image(context, bpy_mat, texture):
     # absolute texture path in level folder
     abs_lvl_path = _get_abs_tex_path(level_dir, texture)
 
+    return abs_tex_path, abs_lvl_path
+
+
+def is_same_image(context, bpy_mat, texture):
+    result = None
+    abs_tex_path, abs_lvl_path = get_image_paths(context, texture)
+
     if utils.version.IS_28:
         for node in bpy_mat.node_tree.nodes:
             if node.type in utils.version.IMAGE_NODES:
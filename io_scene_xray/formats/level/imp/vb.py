@@ -1,3 +1,9 @@
+# standart modules
+import struct
+
+# blender modules
+import numpy
+
 # addon modules
 from .. import fmt
 from .... import rw
@@ -45,166 +51,194 @@ class Code:
         return '\n'.join(self.lines)
 
 
-UV_CORRECTOR = '({} / 255) * (32 / 0x8000)'
-CORRECTOR_U = UV_CORRECTOR.format('correct_u')
-CORRECTOR_V = UV_CORRECTOR.format('correct_v')
+def _get_components(data_format):
+    # split struct format to single components: '2h2H' -> h, h, H, H
+    components = []
+    count = ''
 
+    for char in data_format:
+        if char.isdigit():
+            count += char
+        else:
+            components.extend([char, ] * int(count or 1))
+            count = ''
 
-def _get_tex_uv_code(code, ver, data_type, reader_code, has_corr):
-    if data_type == fmt.FLOAT2:
-        code.add_line('coord_u, coord_v' + reader_code)
-        code.add_line('vb.uv.append((coord_u, 1 - coord_v))')
+    return components
 
-    elif data_type == fmt.SHORT2:
-        code.add_line('coord_u, coord_v' + reader_code)
 
-        if has_corr:
-            code.add_line(
-                'vb.uv.append(('
-                    'coord_u / fmt.UV_COEFFICIENT + {0}, '
-                    '1 - coord_v / fmt.UV_COEFFICIENT - {1}'
-                '))'.format(
-                    CORRECTOR_U,
-                    CORRECTOR_V
-                )
-            )
-        else:
-            code.add_line(
-                'vb.uv.append(('
-                    'coord_u / fmt.UV_COEFFICIENT, '
-                    '1 - coord_v / fmt.UV_COEFFICIENT'
-                '))'
-            )
-
-    elif data_type == fmt.SHORT4:
-
-        if ver >= fmt.VERSION_12:
-            # MU meshes
-            code.add_line(
-                'coord_u, coord_v, wind_coef, _' + reader_code
-            )
-
-            if has_corr:
-                code.add_line(
-                    'vb.uv.append(('
-                        'coord_u / fmt.UV_COEFFICIENT_2 + {0}, '
-                        '1 - coord_v / fmt.UV_COEFFICIENT_2 - {1}'
-                    '))'.format(
-                        CORRECTOR_U,
-                        CORRECTOR_V
-                    )
-                )
-            else:
-                code.add_line(
-                    'vb.uv.append(('
-                        'coord_u / fmt.UV_COEFFICIENT_2, '
-                        '1 - coord_v / fmt.UV_COEFFICIENT_2'
-                    '))'
-                )
+def _get_vertex_dtype(usage_list):
+    names = []
+    formats = []
+    offsets = []
+    offset = 0
 
-        else:
-            code.add_line('coord_u, coord_v, lmap_u, lmap_v' + reader_code)
-            code.add_line(
-                'vb.uv.append(('
-                    'coord_u / fmt.UV_COEFFICIENT, '
-                    '1 - coord_v / fmt.UV_COEFFICIENT'
-                '))'
-            )
-            code.add_line(
-                'vb.uv_lmap.append(('
-                    'lmap_u / fmt.LIGHT_MAP_UV_COEFFICIENT, '
-                    '1 - lmap_v / fmt.LIGHT_MAP_UV_COEFFICIENT'
-                '))'
-            )
-
-
-def _get_uv_code(code, ver, data_type, usage_index, reader_code, has_corr):
-    # texture uv
-    if usage_index == 0:
-        _get_tex_uv_code(code, ver, data_type, reader_code, has_corr)
+    for usage_index, usage_info in enumerate(usage_list):
+        data_format = fmt.types_struct[usage_info[2]]
 
-    # lmap uv
-    elif usage_index == 1:
-        code.add_line('lmap_u, lmap_v' + reader_code)
+        for comp_index, comp_fmt in enumerate(_get_components(data_format)):
+            names.append('{}_{}'.format(usage_index, comp_index))
+            formats.append('<' + comp_fmt)
+            offsets.append(offset)
+            offset += struct.calcsize(comp_fmt)
 
-        if data_type == fmt.SHORT2:
-            code.add_line('lmap_u /= fmt.LIGHT_MAP_UV_COEFFICIENT')
-            code.add_line('lmap_v /= fmt.LIGHT_MAP_UV_COEFFICIENT')
+    return numpy.dtype({
+        'names': names,
+        'formats': formats,
+        'offsets': offsets,
+        'itemsize': offset
+    })
 
-        code.add_line('vb.uv_lmap.append((lmap_u, 1 - lmap_v))')
 
-    else:
-        raise ValueError(
-            'Unsupported UV usage index: {}'.format(usage_index)
-        )
+def _get_column(verts, usage_index, comp_index):
+    return verts['{}_{}'.format(usage_index, comp_index)]
 
 
-def _import_vertices_d3d9(ver, reader, vb, verts_count, usage_list):
-    code = Code()
+def _get_float_column(verts, usage_index, comp_index):
+    column = _get_column(verts, usage_index, comp_index)
+    return column.astype(numpy.float64)
 
-    code.add_line('for _ in range({}):'.format(verts_count))
-    code.add_indent()
 
-    # has uv corrector
-    has_corr = False
+def _get_uv_column(verts, usage_index, coef=None, corr=None):
+    coord_u = _get_float_column(verts, usage_index, 0)
+    coord_v = _get_float_column(verts, usage_index, 1)
+
+    if coef:
+        coord_u = coord_u / coef
+        coord_v = coord_v / coef
+
+    coord_v = 1 - coord_v
 
-    for usage_info in usage_list:
+    if corr:
+        # the tangent or binormal can be missing
+        correct_u, correct_v = corr
+        if correct_u is not None:
+            coord_u = coord_u + correct_u
+        if correct_v is not None:
+            coord_v = coord_v - correct_v
 
-        data_type = usage_info[2]
-        usage = usage_info[4]
-        usage_index = usage_info[5]
-        data_format = fmt.types_struct[data_type]
-        data_type = fmt.types[data_type]
-        usage = fmt.usage[usage]
+    return numpy.column_stack((coord_u, coord_v))
 
-        reader_code = ' = reader.getf("<{}")'.format(data_format)
+
+def _get_corrector_column(verts, usage_index):
+    correct = _get_float_column(verts, usage_index, 3)
+    return (correct / 255) * (32 / 0x8000)
+
+
+def _import_vertices_d3d9(ver, reader, vb, verts_count, usage_list):
+    dtype = _get_vertex_dtype(usage_list)
+    verts = numpy.frombuffer(reader.getv(), dtype=dtype, count=verts_count)
+    reader.skip(dtype.itemsize * verts_count)
+
+    # uv corrector
+    correct_u = None
+    correct_v = None
+    corr = None
+
+    for usage_index, usage_info in enumerate(usage_list):
+
+        data_type = fmt.types[usage_info[2]]
+        usage = fmt.usage[usage_info[4]]
+        usage_id = usage_info[5]
 
         # position
         if usage == fmt.POSITION:
-            code.add_line('pos_x, pos_y, pos_z' + reader_code)
-            code.add_line('vb.position.append((pos_x, pos_z, pos_y))')
+            vb.position = numpy.column_stack((
+                _get_float_column(verts, usage_index, 0),
+                _get_float_column(verts, usage_index, 2),
+                _get_float_column(verts, usage_index, 1)
+            ))
 
         # normal
         elif usage == fmt.NORMAL:
-            code.add_line('norm_x, norm_y, norm_z, hemi' + reader_code)
-            code.add_line('vb.normal.append((norm_z, norm_x, norm_y))')
-            code.add_line('vb.color_hemi.append(hemi / 255)')
+            vb.normal = numpy.column_stack((
+                _get_column(verts, usage_index, 2),
+                _get_column(verts, usage_index, 0),
+                _get_column(verts, usage_index, 1)
+            ))
+            vb.color_hemi = _get_float_column(verts, usage_index, 3) / 255
 
         # tangent
         elif usage == fmt.TANGENT:
-            has_corr = True
-            code.add_line('tan_x, tan_y, tan_z, correct_u' + reader_code)
+            correct_u = _get_corrector_column(verts, usage_index)
+            corr = (correct_u, correct_v)
 
         # binormal
         elif usage == fmt.BINORMAL:
-            has_corr = True
-            code.add_line('bin_x, bin_y, bin_z, correct_v' + reader_code)
+            correct_v = _get_corrector_column(verts, usage_index)
+            corr = (correct_u, correct_v)
 
         # uv
         elif usage == fmt.TEXCOORD:
-            _get_uv_code(
-                code,
-                ver,
-                data_type,
-                usage_index,
-                reader_code,
-                has_corr
-            )
+
+            # texture uv
+            if usage_id == 0:
+
+                if data_type == fmt.FLOAT2:
+                    vb.uv = _get_uv_column(verts, usage_index)
+
+                elif data_type == fmt.SHORT2:
+                    vb.uv = _get_uv_column(
+                        verts,
+                        usage_index,
+                        fmt.UV_COEFFICIENT,
+                        corr
+                    )
+
+                elif data_type == fmt.SHORT4:
+
+                    # MU meshes
+                    if ver >= fmt.VERSION_12:
+                        vb.uv = _get_uv_column(
+                            verts,
+                            usage_index,
+                            fmt.UV_COEFFICIENT_2,
+                            corr
+                        )
+
+                    else:
+                        vb.uv = _get_uv_column(
+                            verts,
+                            usage_index,
+                            fmt.UV_COEFFICIENT
+                        )
+                        lmap_u = _get_float_column(verts, usage_index, 2)
+                        lmap_v = _get_float_column(verts, usage_index, 3)
+                        coef = fmt.LIGHT_MAP_UV_COEFFICIENT
+                        vb.uv_lmap = numpy.column_stack((
+                            lmap_u / coef,
+                            1 - lmap_v / coef
+                        ))
+
+            # lmap uv
+            elif usage_id == 1:
+
+                if data_type == fmt.SHORT2:
+                    coef = fmt.LIGHT_MAP_UV_COEFFICIENT
+                else:
+                    coef = None
+
+                vb.uv_lmap = _get_uv_column(verts, usage_index, coef)
+
+            else:
+                raise ValueError(
+                    'Unsupported UV usage index: {}'.format(usage_id)
+                )
 
         # vertex color
         elif usage == fmt.COLOR:
-            code.add_line('blue, green, red, sun' + reader_code)
+            blue, green, red, sun = [
+                _get_float_column(verts, usage_index, comp_index)
+                for comp_index in range(4)
+            ]
 
             if data_type == fmt.D3DCOLOR:
-                code.add_line('red /= 255')
-                code.add_line('green /= 255')
-                code.add_line('blue /= 255')
-                code.add_line('sun /= 255')
+                red /= 255
+                green /= 255
+                blue /= 255
+                sun /= 255
 
-            code.add_line('vb.color_light.append((red, green, blue))')
-            code.add_line('vb.color_sun.append(sun)')
-
-    exec(code.get_code())
+            vb.color_light = numpy.column_stack((red, green, blue))
+            vb.color_sun = sun
 
 
 def _import_vertices_d3d7(ver, reader, vb, verts_count, fvf):
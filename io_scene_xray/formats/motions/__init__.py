@@ -3,5 +3,6 @@ from . import envelope
 from . import interp
 from . import utilites
 from . import const
+from . import bake
 from . import imp
 from . import exp
@@ -0,0 +1,652 @@
+# standart modules
+import hashlib
+import collections
+
+# blender modules
+import bpy
+import numpy
+
+# addon modules
+from . import const
+from ... import utils
+
+
+# the bone matrices of action are baked by the evaluation of f-curves,
+# the pose is composed through the bones hierarchy without scene update.
+# scene frame is changed only if the pose depends on constraints,
+# drivers, nla or dependency object.
+
+METHOD_FCURVES = 'F-Curves'
+METHOD_FRAME_SET = 'Frame Set'
+METHOD_CACHE = 'Cache'
+
+BONE_PATH_PREFIX = 'pose.bones["'
+BONE_PATH_SUFFIX = '"].'
+
+POSE_PROPS = (
+    'location',
+    'rotation_quaternion',
+    'rotation_euler',
+    'rotation_axis_angle',
+    'scale'
+)
+KEYFRAME_FLOAT_PROPS = (
+    ('co', 2),
+    ('handle_left', 2),
+    ('handle_right', 2),
+    ('back', 1),
+    ('amplitude', 1),
+    ('period', 1)
+)
+
+ROTATION_PROPS = {
+    'QUATERNION': 'rotation_quaternion',
+    'AXIS_ANGLE': 'rotation_axis_angle'
+}
+
+
+def get_exportable_bones(arm_obj):
+    '''
+    Exportable pose bones and pose bones of exportable parents,
+    the parent of root bones is None.
+    '''
+    pose_bones = []
+    parents = []
+
+    for bone in arm_obj.data.bones:
+        if not utils.bone.is_exportable_bone(bone):
+            continue
+
+        pose_bones.append(arm_obj.pose.bones[bone.name])
+        real_parent = utils.bone.find_bone_exportable_parent(bone)
+        if real_parent:
+            parents.append(arm_obj.pose.bones[real_parent.name])
+        else:
+            parents.append(None)
+
+    return pose_bones, parents
+
+
+def _has_full_inherit_scale(bone):
+    inherit_scale = getattr(bone, 'inherit_scale', None)
+    if inherit_scale is None:
+        return bone.use_inherit_scale
+    return inherit_scale == 'FULL'
+
+
+def get_frame_set_reason(arm_obj, dep_obj=None):
+    '''
+    Reason why the pose cannot be composed from f-curves.
+    Returns None if f-curves baking is possible.
+    '''
+    if dep_obj:
+        return 'dependency object'
+
+    anim_data = arm_obj.animation_data
+    if anim_data:
+        if anim_data.drivers:
+            return 'drivers'
+        if getattr(anim_data, 'action_influence', 1.0) != 1.0:
+            return 'action influence'
+        if anim_data.use_nla:
+            for track in anim_data.nla_tracks:
+                if not track.mute:
+                    return 'nla'
+
+    data_anim = arm_obj.data.animation_data
+    if data_anim and data_anim.drivers:
+        return 'drivers'
+
+    for pose_bone in arm_obj.pose.bones:
+        for constraint in pose_bone.constraints:
+            if not constraint.mute:
+                return 'constraints'
+
+        bone = pose_bone.bone
+        if (
+                not bone.use_inherit_rotation or
+                not _has_full_inherit_scale(bone) or
+                not bone.use_local_location or
+                bone.use_relative_parent
+            ):
+            return 'bone inheritance'
+
+    return None
+
+
+def _parse_bone_path(data_path):
+    # pose.bones["name"].prop -> (name, prop)
+    if not data_path.startswith(BONE_PATH_PREFIX):
+        return None, None
+
+    end = data_path.rfind(BONE_PATH_SUFFIX)
+    if end == -1:
+        return None, None
+
+    name = data_path[len(BONE_PATH_PREFIX) : end]
+    name = name.replace('\\"', '"').replace('\\\\', '\\')
+    prop = data_path[end + len(BONE_PATH_SUFFIX) : ]
+
+    return name, prop
+
+
+def _get_bones_fcurves(action):
+    bones_fcurves = {}
+
+    for fcurve in action.fcurves:
+        if fcurve.mute or (fcurve.group and fcurve.group.mute):
+            continue
+
+        name, prop = _parse_bone_path(fcurve.data_path)
+        if name is None:
+            continue
+
+        bones_fcurves.setdefault(name, {})[prop, fcurve.array_index] = fcurve
+
+    return bones_fcurves
+
+
+def _evaluate_prop(pose_bone, prop, fcurves, frames):
+    # values of pose bone property for every frame,
+    # not animated components keep the pose value
+    values = numpy.array(getattr(pose_bone, prop), dtype=numpy.float64)
+    values = numpy.tile(values, (len(frames), 1))
+
+    for index in range(values.shape[1]):
+        fcurve = fcurves.get((prop, index))
+        if fcurve:
+            values[ : , index] = [fcurve.evaluate(frame) for frame in frames]
+
+    return values
+
+
+def get_quaternion_matrices(quaternions):
+    # (F, 4) w, x, y, z quaternions -> (F, 3, 3) rotation matrices
+    norm = numpy.linalg.norm(quaternions, axis=1)
+    zero = norm == 0.0
+    norm[zero] = 1.0
+    quaternions = quaternions / norm[ : , None]
+    quaternions[zero] = (1.0, 0.0, 0.0, 0.0)
+    w, x, y, z = quaternions.T
+
+    return numpy.stack((
+        numpy.stack((1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)), axis=-1),
+        numpy.stack((2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)), axis=-1),
+        numpy.stack((2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)), axis=-1)
+    ), axis=1)
+
+
+def _get_axis_matrices(axis, angles):
+    # rotation matrices around x, y or z axis
+    cos = numpy.cos(angles)
+    sin = numpy.sin(angles)
+    matrices = numpy.zeros((len(angles), 3, 3))
+    first, second = (axis + 1) % 3, (axis + 2) % 3
+    matrices[ : , axis, axis] = 1.0
+    matrices[ : , first, first] = cos
+    matrices[ : , first, second] = -sin
+    matrices[ : , second, first] = sin
+    matrices[ : , second, second] = cos
+    return matrices
+
+
+def get_euler_matrices(eulers, order):
+    # (F, 3) euler angles -> (F, 3, 3) rotation matrices,
+    # the first axis of the order is applied first
+    matrices = None
+
+    for axis_name in order:
+        axis = 'XYZ'.index(axis_name)
+        axis_matrices = _get_axis_matrices(axis, eulers[ : , axis])
+        if matrices is None:
+            matrices = axis_matrices
+        else:
+            matrices = axis_matrices @ matrices
+
+    return matrices
+
+
+def get_axis_angle_matrices(axis_angles):
+    # (F, 4) angle, x, y, z -> (F, 3, 3) rotation matrices
+    angles = axis_angles[ : , 0]
+    axes = axis_angles[ : , 1 : ]
+    norm = numpy.linalg.norm(axes, axis=1)
+    zero = norm == 0.0
+    norm[zero] = 1.0
+    axes = axes / norm[ : , None]
+    angles = numpy.where(zero, 0.0, angles)
+
+    half = angles / 2
+    quaternions = numpy.column_stack((
+        numpy.cos(half),
+        axes * numpy.sin(half)[ : , None]
+    ))
+
+    return get_quaternion_matrices(quaternions)
+
+
+def _get_basis_matrices(pose_bone, fcurves, frames):
+    # local transforms of pose bone: translation @ rotation @ scale
+    location = _evaluate_prop(pose_bone, 'location', fcurves, frames)
+    scale = _evaluate_prop(pose_bone, 'scale', fcurves, frames)
+
+    mode = pose_bone.rotation_mode
+    prop = ROTATION_PROPS.get(mode, 'rotation_euler')
+    rotation = _evaluate_prop(pose_bone, prop, fcurves, frames)
+
+    if mode == 'QUATERNION':
+        rotation_matrices = get_quaternion_matrices(rotation)
+    elif mode == 'AXIS_ANGLE':
+        rotation_matrices = get_axis_angle_matrices(rotation)
+    else:
+        rotation_matrices = get_euler_matrices(rotation, mode)
+
+    matrices = numpy.zeros((len(frames), 4, 4))
+    matrices[ : , : 3, : 3] = rotation_matrices * scale[ : , None, : ]
+    matrices[ : , : 3, 3] = location
+    matrices[ : , 3, 3] = 1.0
+
+    return matrices
+
+
+def _get_pose_matrices(arm_obj, action, frames):
+    # armature space matrices of all pose bones
+    bones_fcurves = _get_bones_fcurves(action)
+    pose_matrices = {}
+
+    for bone in arm_obj.data.bones:
+        pose_bone = arm_obj.pose.bones[bone.name]
+        fcurves = bones_fcurves.get(bone.name, {})
+        basis = _get_basis_matrices(pose_bone, fcurves, frames)
+        rest = numpy.array(bone.matrix_local)
+
+        if bone.parent:
+            parent_rest = numpy.array(bone.parent.matrix_local)
+            rest = numpy.linalg.inv(parent_rest) @ rest
+            parent_matrices = pose_matrices[bone.parent.name]
+            pose_matrices[bone.name] = parent_matrices @ (rest @ basis)
+        else:
+            pose_matrices[bone.name] = rest @ basis
+
+    return pose_matrices
+
+
+def _bake_fcurves(arm_obj, action, pose_bones, parents, frames):
+    pose_matrices = _get_pose_matrices(arm_obj, action, frames)
+    root_matrix = numpy.array(const.MATRIX_BONE_INVERTED)
+    matrices = numpy.zeros((len(frames), len(pose_bones), 4, 4))
+
+    for bone_index, (pose_bone, parent) in enumerate(zip(pose_bones, parents)):
+        bone_matrices = pose_matrices[pose_bone.name]
+        if parent:
+            parent_matrices = numpy.linalg.inv(pose_matrices[parent.name])
+        else:
+            parent_matrices = root_matrix
+        matrices[ : , bone_index] = parent_matrices @ bone_matrices
+
+    return matrices
+
+
+def _set_action(obj, action):
+    anim_data = obj.animation_data
+    if not anim_data:
+        anim_data = obj.animation_data_create()
+    old_action = anim_data.action
+    anim_data.action = action
+    return old_action
+
+
+def _bake_frame_set(arm_obj, action, pose_bones, parents, frames, dep_obj):
+    scene = bpy.context.scene
+    frame_old = scene.frame_current
+    multiply = utils.version.get_multiply()
+    matrices = numpy.zeros((len(frames), len(pose_bones), 4, 4))
+
+    act_old = _set_action(arm_obj, action)
+    if dep_obj:
+        dep_act_old = _set_action(dep_obj, action)
+
+    try:
+        for frame_index, frame in enumerate(frames):
+            scene.frame_set(frame)
+            for bone_index, (pose_bone, parent) in enumerate(zip(pose_bones, parents)):
+                if parent:
+                    parent_matrix = parent.matrix.inverted()
+                else:
+                    parent_matrix = const.MATRIX_BONE_INVERTED
+                matrix = multiply(parent_matrix, pose_bone.matrix)
+                matrices[frame_index, bone_index] = matrix
+
+    finally:
+        if act_old:
+            arm_obj.animation_data.action = act_old
+        if dep_obj:
+            dep_obj.animation_data.action = dep_act_old
+        scene.frame_set(frame_old)
+
+    return matrices
+
+
+def _get_frames(action):
+    frame_start = int(action.frame_range[0])
+    frame_end = int(action.frame_range[1])
+    return list(range(frame_start, frame_end + 1))
+
+
+def _bake(arm_obj, action, pose_bones, parents, dep_obj, reason):
+    frames = _get_frames(action)
+
+    if reason is None:
+        return _bake_fcurves(arm_obj, action, pose_bones, parents, frames)
+
+    return _bake_frame_set(
+        arm_obj,
+        action,
+        pose_bones,
+        parents,
+        frames,
+        dep_obj
+    )
+
+
+def _report(action, method, reason=None):
+    if reason:
+        method = '{0} ({1})'.format(method, reason)
+    utils.stats.info('Bake "{0}": {1}'.format(action.name, method))
+
+
+def bake_action(arm_obj, action, pose_bones, parents, dep_obj=None):
+    '''
+    Bake bone matrices of action. The matrix of bone is relative to
+    the exportable parent, root bones are relative to armature.
+    Returns array (frames, bones, 4, 4) and the bake method.
+    '''
+    reason = get_frame_set_reason(arm_obj, dep_obj)
+    if reason is None:
+        method = METHOD_FCURVES
+    else:
+        method = METHOD_FRAME_SET
+
+    matrices = _bake(arm_obj, action, pose_bones, parents, dep_obj, reason)
+    _report(action, method, reason)
+
+    return matrices, method
+
+
+def get_matrices_quaternions(matrices):
+    # (N, 4, 4) matrices -> (N, 4) w, x, y, z quaternions of
+    # the rotation part, the scale of the axes is removed
+    rotations = matrices[ : , : 3, : 3]
+    lengths = numpy.linalg.norm(rotations, axis=1)
+    lengths[lengths == 0.0] = 1.0
+    rotations = rotations / lengths[ : , None, : ]
+
+    m00 = rotations[ : , 0, 0]
+    m11 = rotations[ : , 1, 1]
+    m22 = rotations[ : , 2, 2]
+
+    # the largest component is calculated first
+    candidates = numpy.column_stack((
+        1.0 + m00 + m11 + m22,
+        1.0 + m00 - m11 - m22,
+        1.0 - m00 + m11 - m22,
+        1.0 - m00 - m11 + m22
+    ))
+    largest = candidates.argmax(axis=1)
+    quaternions = numpy.zeros((len(matrices), 4))
+
+    for component in range(4):
+        mask = largest == component
+        if not mask.any():
+            continue
+
+        mat = rotations[mask]
+        root = numpy.sqrt(numpy.maximum(candidates[mask, component], 0.0))
+        scale = 0.5 / numpy.where(root == 0.0, 1.0, root)
+        # differences and sums of symmetric elements
+        diff_x = (mat[ : , 2, 1] - mat[ : , 1, 2]) * scale
+        diff_y = (mat[ : , 0, 2] - mat[ : , 2, 0]) * scale
+        diff_z = (mat[ : , 1, 0] - mat[ : , 0, 1]) * scale
+        sum_xy = (mat[ : , 0, 1] + mat[ : , 1, 0]) * scale
+        sum_xz = (mat[ : , 0, 2] + mat[ : , 2, 0]) * scale
+        sum_yz = (mat[ : , 1, 2] + mat[ : , 2, 1]) * scale
+        half = root * 0.5
+
+        if component == 0:
+            values = (half, diff_x, diff_y, diff_z)
+        elif component == 1:
+            values = (diff_x, half, sum_xy, sum_xz)
+        elif component == 2:
+            values = (diff_y, sum_xy, half, sum_yz)
+        else:
+            values = (diff_z, sum_xz, sum_yz, half)
+
+        quaternions[mask] = numpy.column_stack(values)
+
+    # canonical quaternions with non-negative w
+    quaternions[quaternions[ : , 0] < 0.0] *= -1.0
+    norm = numpy.linalg.norm(quaternions, axis=1)
+    norm[norm == 0.0] = 1.0
+
+    return quaternions / norm[ : , None]
+
+
+def get_matrices_eulers(matrices, order):
+    # (N, 3, 3) or (N, 4, 4) matrices -> (N, 3) euler angles.
+    # the same solution as in mathutils Matrix.to_euler is chosen
+    rotations = matrices[ : , : 3, : 3]
+    lengths = numpy.linalg.norm(rotations, axis=1)
+    lengths[lengths == 0.0] = 1.0
+    rotations = rotations / lengths[ : , None, : ]
+
+    i, j, k = ('XYZ'.index(axis_name) for axis_name in order)
+    parity = (j - i) % 3 != 1
+
+    m_ii = rotations[ : , i, i]
+    m_ji = rotations[ : , j, i]
+    m_ki = rotations[ : , k, i]
+    m_kj = rotations[ : , k, j]
+    m_kk = rotations[ : , k, k]
+    cos_j = numpy.hypot(m_ii, m_ji)
+
+    eulers_1 = numpy.zeros((len(matrices), 3))
+    eulers_1[ : , i] = numpy.arctan2(m_kj, m_kk)
+    eulers_1[ : , j] = numpy.arctan2(-m_ki, cos_j)
+    eulers_1[ : , k] = numpy.arctan2(m_ji, m_ii)
+
+    eulers_2 = numpy.zeros((len(matrices), 3))
+    eulers_2[ : , i] = numpy.arctan2(-m_kj, -m_kk)
+    eulers_2[ : , j] = numpy.arctan2(-m_ki, -cos_j)
+    eulers_2[ : , k] = numpy.arctan2(-m_ji, -m_ii)
+
+    # gimbal lock
+    lock = cos_j <= 16.0 * numpy.finfo(numpy.float32).eps
+    eulers_1[lock, i] = numpy.arctan2(
+        -rotations[lock, j, k],
+        rotations[lock, j, j]
+    )
+    eulers_1[lock, k] = 0.0
+    eulers_2[lock] = eulers_1[lock]
+
+    if parity:
+        eulers_1 = -eulers_1
+        eulers_2 = -eulers_2
+
+    # the solution with the smallest angles
+    use_second = (
+        numpy.abs(eulers_1).sum(axis=1) > numpy.abs(eulers_2).sum(axis=1)
+    )
+    eulers_1[use_second] = eulers_2[use_second]
+
+    return eulers_1
+
+
+BAKE_CACHE_BUDGET = 256 * 1024 * 1024
+
+
+class BakeCache:
+    '''
+    Baked motions of the session. The least recently used
+    motions are removed when the memory budget is exceeded.
+    '''
+
+    def __init__(self, budget=BAKE_CACHE_BUDGET):
+        self.budget = budget
+        self.size = 0
+        self.__motions = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.__motions)
+
+    @staticmethod
+    def __get_size(motion):
+        return sum(array.nbytes for array in motion)
+
+    def get(self, key):
+        motion = self.__motions.get(key)
+        if motion is not None:
+            self.__motions.move_to_end(key)
+        return motion
+
+    def put(self, key, motion):
+        size = self.__get_size(motion)
+        if size > self.budget:
+            return
+
+        old_motion = self.__motions.pop(key, None)
+        if old_motion is not None:
+            self.size -= self.__get_size(old_motion)
+
+        # the arrays are shared by the cache hits
+        for array in motion:
+            array.flags.writeable = False
+
+        self.__motions[key] = motion
+        self.size += size
+
+        while self.size > self.budget:
+            _, removed_motion = self.__motions.popitem(last=False)
+            self.size -= self.__get_size(removed_motion)
+
+    def clear(self):
+        self.__motions.clear()
+        self.size = 0
+
+
+bake_cache = BakeCache()
+
+
+def _get_action_hash(action):
+    # hash of the f-curves keys, actions with
+    # f-curve modifiers are not cached
+    hasher = hashlib.sha1()
+    hasher.update(repr(tuple(action.frame_range)).encode())
+
+    for fcurve in action.fcurves:
+        if len(fcurve.modifiers):
+            return None
+
+        group_mute = bool(fcurve.group and fcurve.group.mute)
+        hasher.update(repr((
+            fcurve.data_path,
+            fcurve.array_index,
+            fcurve.mute,
+            group_mute,
+            fcurve.extrapolation
+        )).encode())
+
+        keyframes = fcurve.keyframe_points
+        count = len(keyframes)
+        for prop, size in KEYFRAME_FLOAT_PROPS:
+            values = numpy.empty(count * size, dtype=numpy.float32)
+            keyframes.foreach_get(prop, values)
+            hasher.update(values.tobytes())
+
+        for keyframe in keyframes:
+            hasher.update(keyframe.interpolation.encode())
+            hasher.update(keyframe.easing.encode())
+
+    return hasher.hexdigest()
+
+
+def _get_pose_hash(arm_obj):
+    # hash of the rest pose and the pose values of
+    # bones that are used by not animated channels
+    hasher = hashlib.sha1()
+
+    for bone in arm_obj.data.bones:
+        pose_bone = arm_obj.pose.bones[bone.name]
+        hasher.update(bone.name.encode())
+        hasher.update(pose_bone.rotation_mode.encode())
+        if bone.parent:
+            hasher.update(bone.parent.name.encode())
+        values = [value for row in bone.matrix_local for value in row]
+        for prop in POSE_PROPS:
+            values.extend(getattr(pose_bone, prop))
+        hasher.update(numpy.array(values, dtype=numpy.float64).tobytes())
+
+    return hasher.hexdigest()
+
+
+def _get_cache_key(arm_obj, action, pose_bones, parents):
+    action_hash = _get_action_hash(action)
+    if action_hash is None:
+        return None
+
+    bones = tuple(
+        (pose_bone.name, parent.name if parent else None)
+        for pose_bone, parent in zip(pose_bones, parents)
+    )
+
+    return (
+        arm_obj.name,
+        action.name,
+        action_hash,
+        _get_pose_hash(arm_obj),
+        bones
+    )
+
+
+def bake_motion(arm_obj, action, pose_bones, parents, dep_obj=None):
+    '''
+    Baked motion of action shared by the motion exporters.
+    The motions baked from f-curves are cached for the session.
+    Returns float32 arrays of local translations (frames, bones, 3)
+    and quaternions (frames, bones, 4) in w, x, y, z order and float64
+    array of ZXY euler angles (frames, bones, 3) of skl format.
+    '''
+    reason = get_frame_set_reason(arm_obj, dep_obj)
+    key = None
+
+    if reason is None:
+        key = _get_cache_key(arm_obj, action, pose_bones, parents)
+        if key is not None:
+            motion = bake_cache.get(key)
+            if motion is not None:
+                _report(action, METHOD_CACHE)
+                return motion
+        method = METHOD_FCURVES
+
+    else:
+        method = METHOD_FRAME_SET
+
+    matrices = _bake(arm_obj, action, pose_bones, parents, dep_obj, reason)
+    _report(action, method, reason)
+
+    frames_count, bones_count = matrices.shape[ : 2]
+    matrices = matrices.reshape(-1, 4, 4)
+    translations = matrices[ : , : 3, 3].reshape(frames_count, bones_count, 3)
+    quaternions = get_matrices_quaternions(matrices)
+    quaternions = quaternions.reshape(frames_count, bones_count, 4)
+    eulers = get_matrices_eulers(matrices, 'ZXY')
+    eulers = eulers.reshape(frames_count, bones_count, 3)
+
+    motion = (
+        translations.astype(numpy.float32),
+        quaternions.astype(numpy.float32),
+        eulers
+    )
+    if key is not None:
+        bake_cache.put(key, motion)
+
+    return motion
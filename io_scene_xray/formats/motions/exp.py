@@ -1,8 +1,8 @@
 # blender modules
 import bpy
-import mathutils
 
 # addon modules
+from . import bake
 from . import const
 from . import write
 from . import interp
@@ -66,46 +66,24 @@ def _export_motion_data(
 
     epsilons = [epsilon_loc, epsilon_rot]
     _, scale = utils.ie.get_obj_scale_matrix(root_obj, armature)
-    if scale == mathutils.Vector((1.0, 1.0, 1.0)):
-        scale = None
 
     # write motions
-    for bone, bone_anim in bones_anims:
+    for bone, translations, eulers in bones_anims:
         # write bone motion parameters
         writer.puts(bone.name)
         writer.putf('<B', MOTION_DEFAULT_FLAGS)
 
-        # collect translation and rotation curves
-        curves = []
-        for curve_id in range(const.CURVE_COUNT):
-            curves.append([])
-
-        if scale:
-            for matrix in bone_anim:
-                translate = matrix.to_translation()
-                translate.x *= scale.x
-                translate.y *= scale.y
-                translate.z *= scale.z
-                rotate = matrix.to_euler('ZXY')
-
-                curves[0].append(+translate[0])
-                curves[1].append(+translate[1])
-                curves[2].append(-translate[2])
-                curves[3].append(-rotate[1])
-                curves[4].append(-rotate[0])
-                curves[5].append(+rotate[2])
-
-        else:
-            for matrix in bone_anim:
-                translate = matrix.to_translation()
-                rotate = matrix.to_euler('ZXY')
-
-                curves[0].append(+translate[0])
-                curves[1].append(+translate[1])
-                curves[2].append(-translate[2])
-                curves[3].append(-rotate[1])
-                curves[4].append(-rotate[0])
-                curves[5].append(+rotate[2])
+        # collect translation and rotation curves,
+        # eulers are made of the float64 matrices
+        translations = translations * tuple(scale)
+        curves = [
+            translations[ : , 0].tolist(),
+            translations[ : , 1].tolist(),
+            (-translations[ : , 2]).tolist(),
+            (-eulers[ : , 1]).tolist(),
+            (-eulers[ : , 0]).tolist(),
+            eulers[ : , 2].tolist()
+        ]
 
         if bone.name in root_bone_names:
             time_end = (frame_end - frame_start) / fps
@@ -139,66 +117,29 @@ def _export_motion_data(
             writer.putp(keyframes_writer)
 
 
-def _bake_motion_data(action, armature):
-    exportable_bones = _prepare_bones(armature)
+def _bake_motion_data(action, armature, dep_obj):
+    pose_bones, parents = bake.get_exportable_bones(armature)
+    translations, _, eulers = bake.bake_motion(
+        armature,
+        action,
+        pose_bones,
+        parents,
+        dep_obj
+    )
 
-    # find preview action
-    anim_data = armature.animation_data
-    if anim_data:
-        act_old = anim_data.action
-    else:
-        act_old = None
-        anim_data = armature.animation_data_create()
-
-    frame_old = bpy.context.scene.frame_current
-
-    try:
-        root_bone_names = set()
-        anim_data.action = action
-        frame_start = int(action.frame_range[0])
-        frame_end = int(action.frame_range[1])
-        multiply = utils.version.get_multiply()
-
-        for frame_index in range(frame_start, frame_end + 1):
-            bpy.context.scene.frame_set(frame_index)
-            for bone, parent, data in exportable_bones:
-                if parent:
-                    parent_matrix = parent.matrix.inverted()
-                else:
-                    parent_matrix = const.MATRIX_BONE_INVERTED
-                    root_bone_names.add(bone.name)
-                matrix = multiply(parent_matrix, bone.matrix)
-                data.append(matrix)
-
-    finally:
-        if act_old:
-            anim_data.action = act_old
-        bpy.context.scene.frame_set(frame_old)
-
-    for bone_anim in exportable_bones:
-        # remove bone parent
-        bone_anim.pop(1)
-
-    return exportable_bones, root_bone_names
-
-
-def _prepare_bone(armature, bone):
-    pose_bone = armature.pose.bones[bone.name]
-    real_parent = utils.bone.find_bone_exportable_parent(bone)
-    if real_parent:
-        pose_bone_parent = armature.pose.bones[real_parent.name]
-    else:
-        pose_bone_parent = None
-    anim_data = []
-    return [pose_bone, pose_bone_parent, anim_data]
+    bones_anims = []
+    root_bone_names = set()
 
+    for bone_index, (pose_bone, parent) in enumerate(zip(pose_bones, parents)):
+        if not parent:
+            root_bone_names.add(pose_bone.name)
+        bones_anims.append((
+            pose_bone,
+            translations[ : , bone_index],
+            eulers[ : , bone_index]
+        ))
 
-def _prepare_bones(armature):
-    return [
-        _prepare_bone(armature, bone)
-        for bone in armature.data.bones
-            if utils.bone.is_exportable_bone(bone)
-    ]
+    return bones_anims, root_bone_names
 
 
 @log.with_context('motion')
@@ -206,20 +147,15 @@ def export_motion(writer, action, armature, root_obj):
     log.update(action=action.name)
 
     dep_obj = None
-    old_action = None
     dep_obj_name = armature.xray.dependency_object
     if dep_obj_name:
         dep_obj = bpy.data.objects.get(dep_obj_name)
-        if dep_obj:
-            if not dep_obj.animation_data:
-                dep_obj.animation_data_create()
-            old_action = dep_obj.animation_data.action
-            dep_obj.animation_data.action = action
 
     # bake
     bones_anims, root_bone_names = _bake_motion_data(
         action,
-        armature
+        armature,
+        dep_obj
     )
 
     # export
@@ -232,9 +168,6 @@ def export_motion(writer, action, armature, root_obj):
         root_obj
     )
 
-    if dep_obj:
-        dep_obj.animation_data.action = old_action
-
 
 @utils.action.initial_state
 def export_motions(writer, actions, context, root_obj):
@@ -36,7 +36,7 @@ def export_keyframes(writer, keyframes, fps, time_end, anm_ver):
             writer.putf('<2f', keyframe.value, keyframe.time)
             writer.putf(shape_format, keyframe.shape.value & 0xff)
 
-            writer.data.extend(params_data)
+            writer.putb(params_data)
 
     # version 4 and 5
     else:
@@ -48,7 +48,7 @@ def export_keyframes(writer, keyframes, fps, time_end, anm_ver):
             writer.putf(shape_format, keyframe.shape.value)
 
             if keyframe.shape != interp.Shape.STEPPED:
-                writer.data.extend(params_data)
+                writer.putb(params_data)
 
     # so that the animation doesn't change its length
     if time_end is not None:
@@ -58,7 +58,7 @@ def export_keyframes(writer, keyframes, fps, time_end, anm_ver):
             writer.putf(shape_format, interp.Shape.STEPPED.value)
 
             if anm_ver == 3:
-                writer.data.extend(params_data)
+                writer.putb(params_data)
 
             count += 1
 
@@ -41,9 +41,9 @@ class ObjectExporter:
         log.update(object=self.root_obj.name)
 
     def export_body(self):
-        self.body_writer = rw.write.ChunkedWriter()
-        self.export_main()
-        self.file_writer.put(fmt.Chunks.Object.MAIN, self.body_writer)
+        with self.file_writer.chunk(fmt.Chunks.Object.MAIN) as body_writer:
+            self.body_writer = body_writer
+            self.export_main()
 
     def export_main(self):
         self.export_version()
@@ -208,6 +208,7 @@ class ObjectExporter:
 
         return non_empty_groups
 
+    @utils.stats.stage_timer('Motions')
     def export_motions(self):
         if self.arm_obj and self.context.export_motions:
 
@@ -254,13 +255,11 @@ class ObjectExporter:
 
     def export_bones(self):
         if self.bone_writers:
-            writer = rw.write.ChunkedWriter()
-
-            for bone_index, bone_writer in enumerate(self.bone_writers):
-                writer.put(bone_index, bone_writer)
-
-            self.body_writer.put(fmt.Chunks.Object.BONES1, writer)
+            with self.body_writer.chunk(fmt.Chunks.Object.BONES1) as writer:
+                for bone_index, bone_writer in enumerate(self.bone_writers):
+                    writer.put(bone_index, bone_writer)
 
+    @utils.stats.stage_timer('Surfaces')
     def export_surfaces(self):
         writer = rw.write.PackedWriter()
 
@@ -317,6 +316,7 @@ class ObjectExporterMeshes:
             self.scl_space
         ) = utils.ie.get_object_world_matrix(self.body.root_obj)
 
+    @utils.stats.stage_timer('Mesh')
     def write_mesh(self, bpy_obj, arm_obj):
         # write mesh chunk
         mesh_writer = rw.write.ChunkedWriter()
@@ -524,15 +524,13 @@ class ObjectExporterMeshes:
             self.check_bone_groups()
             self.check_root_bones()
 
+    @utils.stats.stage_timer('Meshes')
     def write_meshes(self):
-        meshes_writer = rw.write.ChunkedWriter()
-
-        mesh_index = 0
-        for mesh_writer in self.mesh_writers:
-            meshes_writer.put(mesh_index, mesh_writer)
-            mesh_index += 1
+        body_writer = self.body.body_writer
 
-        self.body.body_writer.put(fmt.Chunks.Object.MESHES, meshes_writer)
+        with body_writer.chunk(fmt.Chunks.Object.MESHES) as meshes_writer:
+            for mesh_index, mesh_writer in enumerate(self.mesh_writers):
+                meshes_writer.put(mesh_index, mesh_writer)
 
     def export(self):
         exp_objs = utils.obj.get_exp_objs(self.body.context, self.body.root_obj)
@@ -143,8 +143,8 @@ def remove_bad_geometry(bm, bml, bpy_obj):
 def export_vertices(chunked_writer, bm):
     packed_writer = rw.write.PackedWriter()
     packed_writer.putf('<I', len(bm.verts))
-    for vertex in bm.verts:
-        packed_writer.putv3f(vertex.co)
+    coords = [vertex.co for vertex in bm.verts]
+    packed_writer.put_array('f', [(co[0], co[2], co[1]) for co in coords])
     chunked_writer.put(fmt.Chunks.Mesh.VERTS, packed_writer)
 
 
@@ -161,13 +161,15 @@ def export_faces(chunked_writer, bm, bpy_obj):
 
     packed_writer = rw.write.PackedWriter()
     packed_writer.putf('<I', len(bm.faces))
+    faces = []
     for face in bm.faces:
         for vert_index in (0, 2, 1):
-            packed_writer.putf('<2I', face.verts[vert_index].index, len(uvs))
+            faces.append((face.verts[vert_index].index, len(uvs)))
             uv_coord = face.loops[vert_index][uv_layer].uv
             uvs.append((uv_coord[0], 1 - uv_coord[1]))
             vert_indices.append(face.verts[vert_index].index)
             face_indices.append(face.index)
+    packed_writer.put_array('I', faces)
     chunked_writer.put(fmt.Chunks.Mesh.FACES, packed_writer)
 
     return uvs, vert_indices, face_indices
@@ -268,8 +270,7 @@ def export_mesh(
             log.warn(err, object=bpy_obj.name, mesh=bpy_obj.data.name)
     else:
         smooth_groups = _export_sg_cs_cop(bm.faces)
-    for smooth_group in smooth_groups:
-        packed_writer.putf('<I', smooth_group)
+    packed_writer.put_array('I', list(smooth_groups))
     chunked_writer.put(fmt.Chunks.Mesh.SG, packed_writer)
 
     if arm_obj:
@@ -377,8 +378,7 @@ def export_mesh(
             packed_writer.putf('<I', faces_count)
             for mat_id in mat_data['materials_ids']:
                 material_face_indices = face_materials[(mat_name, mat_id)]
-                for face_index in material_face_indices:
-                    packed_writer.putf('<I', face_index)
+                packed_writer.put_array('I', material_face_indices)
     chunked_writer.put(fmt.Chunks.Mesh.SFACE, packed_writer)
 
     # write vmaps chunk
@@ -395,12 +395,9 @@ def export_mesh(
     packed_writer.putf('<I', len(uvs))
 
     # write uv coords
-    for uvc in uvs:
-        packed_writer.putf('<2f', *uvc)
-    for vidx in vert_indices:
-        packed_writer.putf('<I', vidx)
-    for fidx in face_indices:
-        packed_writer.putf('<I', fidx)
+    packed_writer.put_array('f', uvs)
+    packed_writer.put_array('I', vert_indices)
+    packed_writer.put_array('I', face_indices)
 
     # write vertex weights
     for group_index, vertex_group in enumerate(bpy_obj.vertex_groups):
@@ -413,10 +410,12 @@ def export_mesh(
         packed_writer.putf('<B', 0)    # discon
         packed_writer.putf('<B', fmt.VMapTypes.WEIGHTS)    # type
         packed_writer.putf('<I', len(vert_indices))
-        for vert_index in vert_indices:
-            weight = bm.verts[vert_index][weights_layer][group_index]
-            packed_writer.putf('<f', weight)
-        packed_writer.putf('<' + str(len(vert_indices)) + 'I', *vert_indices)
+        weights = [
+            bm.verts[vert_index][weights_layer][group_index]
+            for vert_index in vert_indices
+        ]
+        packed_writer.put_array('f', weights)
+        packed_writer.put_array('I', vert_indices)
     chunked_writer.put(fmt.Chunks.Mesh.VMAPS2, packed_writer)
 
     # normals chunk
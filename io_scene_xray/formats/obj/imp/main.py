@@ -18,6 +18,7 @@ from .... import rw
 
 
 @utils.stats.timer_stage
+@utils.stats.stage_timer('Motions')
 def _import_motions(context, data, bpy_arm_obj, object_name):
     utils.stats.stage('Motions')
 
@@ -37,14 +38,15 @@ def _import_motions(context, data, bpy_arm_obj, object_name):
 def import_file(file_path, context):
     utils.stats.status('Import File', file_path)
 
-    main_reader = rw.utils.get_file_reader(file_path, chunked=True)
+    main_chunks = rw.utils.get_file_chunks(file_path)
 
     # find main chunk
     chunked_reader = None
 
-    for chunk_id, chunk_data in main_reader:
+    for chunk_id in main_chunks.keys():
         if chunk_id == fmt.Chunks.Object.MAIN:
-            chunked_reader = rw.read.ChunkedReader(chunk_data)
+            main_data = main_chunks.get_all(chunk_id)[-1]
+            chunked_reader = rw.read.ChunkedReader(main_data)
         else:
             log.debug('unknown chunk', chunk_id=chunk_id)
 
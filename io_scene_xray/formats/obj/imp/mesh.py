@@ -228,6 +228,7 @@ def read_vertex_map_reference(reader, struct_2i):
 
 
 @log.with_context(name='mesh')
+@utils.stats.stage_timer('Mesh')
 def import_mesh(context, chunked_reader, renamemap, file_name):
 
     # mesh version
@@ -497,6 +498,7 @@ def import_mesh(context, chunked_reader, renamemap, file_name):
                 bpy.data.materials.new(name)
             bpy_mat.xray.version = context.version
             utils.stats.created_mat()
+            utils.cache.add_material(bpy_mat)
 
         material_index = len(bm_data.materials)
         bm_data.materials.append(bpy_mat)
@@ -5,10 +5,12 @@ import time
 import bpy
 import bmesh
 import mathutils
+import numpy
 
 # addon modules
 from .. import fmt
 from ... import omf
+from ... import level
 from ... import motions
 from .... import text
 from .... import inspect
@@ -272,10 +274,17 @@ def _export_child(
     bpy_mesh.auto_smooth_angle = bpy_obj.data.auto_smooth_angle
     mesh.to_mesh(bpy_mesh)
 
+    # progressive dynamic objects contain detail levels
+    progressive = root_obj.xray.flags_simple == 'pd'
+    if progressive:
+        model_type = fmt.ModelType_v4.SKELETON_GEOMDEF_PM
+    else:
+        model_type = fmt.ModelType_v4.SKELETON_GEOMDEF_ST
+
     # write header chunk
     header_writer = rw.write.PackedWriter()
     header_writer.putf('<B', fmt.FORMAT_VERSION_4)
-    header_writer.putf('<B', fmt.ModelType_v4.SKELETON_GEOMDEF_ST)
+    header_writer.putf('<B', model_type)
     header_writer.putf('<H', 0)    # shader id
     header_writer.putv3f(bbox[0])
     header_writer.putv3f(bbox[1])
@@ -332,47 +341,100 @@ def _export_child(
     uv_layer = mesh.loops.layers.uv.active
     weight_layer = mesh.verts.layers.deform.verify()
     bpy_mesh.calc_tangents(uvmap=uv_layer.name)
+    utils.mesh.fix_ensure_lookup_table(mesh.verts)
+
+    loops = bpy_mesh.loops
+    verts_indices = utils.mesh.get_data_array(
+        loops,
+        'vertex_index',
+        dtype=numpy.int32
+    )
+    normals = utils.mesh.get_data_array(loops, 'normal', 3)
+    tangents = utils.mesh.get_data_array(loops, 'tangent', 3)
+    bitangents = utils.mesh.get_data_array(loops, 'bitangent', 3)
+    bitangents = utils.mesh.normalize_vectors(bitangents)
+    uvs = utils.mesh.get_data_array(
+        bpy_mesh.uv_layers[uv_layer.name].data,
+        'uv',
+        2
+    )
+
+    # merge loops with the same vertex data,
+    # adding zero turns negative zero into positive zero
+    unique_loops, indices = utils.mesh.weld_vertices(numpy.hstack((
+        verts_indices.reshape(-1, 1).view(numpy.uint8),
+        (normals + 0.0).view(numpy.uint8),
+        (tangents + 0.0).view(numpy.uint8),
+        (bitangents + 0.0).view(numpy.uint8),
+        (uvs + 0.0).view(numpy.uint8)
+    )))
+    triangles = indices.reshape(-1, 3)
+    coords = utils.mesh.get_data_array(bpy_mesh.vertices, 'co', 3)
+    windows = None
+
+    if progressive:
+        order, triangles, windows = utils.progressive.build_slide_windows(
+            coords[verts_indices[unique_loops]],
+            triangles
+        )
+        unique_loops = unique_loops[order]
+
+        if context.optimize_indices:
+            # vertices are not reordered, the detail levels
+            # use the first vertices of the vertex buffer
+            triangles = numpy.vstack([
+                utils.vertex_cache.optimize_vertex_cache(
+                    triangles[offset // 3 : offset // 3 + tris_count],
+                    len(unique_loops)
+                )
+                for offset, tris_count, _ in windows
+            ])
+
+    elif context.optimize_indices:
+        triangles, order = utils.vertex_cache.optimize(
+            bpy_obj.name,
+            triangles,
+            len(unique_loops)
+        )
+        unique_loops = unique_loops[order]
+
+    verts_indices = verts_indices[unique_loops]
+
     vertices = []
-    triangles = []
-    vertices_map = {}
+    vertices_weights = {}
     vertex_max_weights = 0
 
-    for face in mesh.faces:
-        face_indices = []
-        for loop_index, loop in enumerate(face.loops):
-            bpy_loop = bpy_mesh.loops[face.index * 3 + loop_index]
-            uv = loop[uv_layer].uv
-
-            # collect vertex weights
+    for vert_index, coord, normal, tangent, bitan, uv in zip(
+            verts_indices.tolist(),
+            coords[verts_indices].tolist(),
+            normals[unique_loops].tolist(),
+            tangents[unique_loops].tolist(),
+            bitangents[unique_loops].tolist(),
+            uvs[unique_loops].tolist()
+        ):
+
+        # collect vertex weights
+        weights = vertices_weights.get(vert_index, None)
+        if weights is None:
             weights = []
-            weights_count = 0
-            for group_index, weight in loop.vert[weight_layer].items():
+            vert = mesh.verts[vert_index]
+            for group_index, weight in vert[weight_layer].items():
                 remap_group_index = vertex_groups_map.get(group_index, None)
                 if remap_group_index is not None:
                     weights.append((remap_group_index, weight))
-                    weights_count += 1
-
-            vertex_max_weights = max(vertex_max_weights, weights_count)
-
-            bitan = bpy_loop.bitangent.normalized().to_tuple()
-            vertex = (
-                loop.vert.index,
-                loop.vert.co.to_tuple(),
-                bpy_loop.normal.to_tuple(),
-                bpy_loop.tangent.to_tuple(),
-                (-bitan[0], -bitan[1], -bitan[2]),
-                (uv[0], 1 - uv[1]),
-                tuple(weights)
-            )
-            vertex_index = vertices_map.get(vertex)
-            if vertex_index is None:
-                vertices_map[vertex] = vertex_index = len(vertices)
-                vertices.append(vertex)
-            face_indices.append(vertex_index)
+            weights = vertices_weights[vert_index] = tuple(weights)
 
-        triangles.append(face_indices)
+        vertex_max_weights = max(vertex_max_weights, len(weights))
 
-    utils.mesh.fix_ensure_lookup_table(mesh.verts)
+        vertices.append((
+            vert_index,
+            tuple(coord),
+            tuple(normal),
+            tuple(tangent),
+            (-bitan[0], -bitan[1], -bitan[2]),
+            (uv[0], 1 - uv[1]),
+            weights
+        ))
 
     # write vertices chunk
     vertices_writer = rw.write.PackedWriter()
@@ -451,17 +513,27 @@ def _export_child(
         indices_count *= 2
     indices_writer.putf('<I', indices_count)
 
-    for tris in triangles:
-        indices_writer.putf('<3H', tris[0], tris[2], tris[1])
+    if windows and two_sided:
+        # back faces of the detail level follow its front faces
+        levels_triangles = [
+            triangles[offset // 3 : offset // 3 + tris_count]
+            for offset, tris_count, _ in windows
+        ]
+        windows = [
+            (offset * 2, tris_count * 2, vertices_count)
+            for offset, tris_count, _ in windows
+        ]
+    else:
+        levels_triangles = [triangles, ]
+
+    for level_triangles in levels_triangles:
+        indices_writer.put_array('H', level_triangles[ : , (0, 2, 1)])
 
-    if two_sided:
-        offset = vertices_count // 2
-        for tris in triangles:
-            indices_writer.putf(
-                '<3H',
-                offset + tris[1],
-                offset + tris[2],
-                offset + tris[0]
+        if two_sided:
+            back_offset = vertices_count // 2
+            indices_writer.put_array(
+                'H',
+                back_offset + level_triangles[ : , (1, 2, 0)]
             )
 
     # remove temp mesh
@@ -469,6 +541,11 @@ def _export_child(
 
     chunked_writer.put(fmt.Chunks_v4.INDICES, indices_writer)
 
+    # write slide windows chunk
+    if windows:
+        swi_writer = level.exp.swi.write_swidata(windows)
+        chunked_writer.put(fmt.Chunks_v4.SWIDATA, swi_writer)
+
 
 def _write_header_bounds(obj, header_writer):
     # get bounds
@@ -549,6 +626,7 @@ def _get_motion_context(context, arm_obj):
     motion_context.export_bone_parts = True
     motion_context.need_motions = True
     motion_context.need_bone_groups = True
+    motion_context.compress_chunks = context.compress_chunks
 
     if context.fmt_ver == 'soc':
         motion_context.params_ver = 3
@@ -560,12 +638,13 @@ def _get_motion_context(context, arm_obj):
     return motion_context
 
 
+@utils.stats.stage_timer('Motions')
 def _write_motions(xray, context, arm_obj, ogf_writer):
     if context.export_motions and xray.motions_collection:
         motion_context = _get_motion_context(context, arm_obj)
         motions_writer = omf.exp.export_omf(motion_context)
         # append motions chunks
-        ogf_writer.data.extend(motions_writer.data)
+        ogf_writer.putp(motions_writer)
 
 
 def _write_lod(root_obj, ogf_writer):
@@ -746,13 +825,18 @@ def _write_ik_data(bones, scale, ogf_writer):
     ogf_writer.put(fmt.Chunks_v4.S_IKDATA_2, ik_writer)
 
 
-def _write_children(meshes, ogf_writer):
+@utils.stats.stage_timer('Meshes')
+def _write_children(meshes, ogf_writer, context):
     children_writer = rw.write.ChunkedWriter()
 
     for child_index, mesh_writer in enumerate(meshes):
         children_writer.put(child_index, mesh_writer)
 
-    ogf_writer.put(fmt.Chunks_v4.CHILDREN, children_writer)
+    ogf_writer.put(
+        fmt.Chunks_v4.CHILDREN,
+        children_writer,
+        compress=context.compress_chunks
+    )
 
 
 def _get_default_bone_bound():
@@ -1013,7 +1097,7 @@ def _export_main(root_obj, ogf_writer, context):
     # write
     _write_header(root_obj, ogf_writer, context)
     _write_revision(root_obj, ogf_writer)
-    _write_children(meshes, ogf_writer)
+    _write_children(meshes, ogf_writer, context)
     _write_bone_names(bones, scale, ogf_writer)
     _write_ik_data(bones, scale, ogf_writer)
     _write_userdata(root_obj, ogf_writer)
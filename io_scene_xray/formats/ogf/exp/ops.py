@@ -21,6 +21,8 @@ class ExportOgfContext(
         super().__init__()
         self.fmt_ver = None
         self.hq_export = None
+        self.compress_chunks = None
+        self.optimize_indices = None
 
 
 op_text = 'Game Object'
@@ -36,6 +38,8 @@ def draw_props(self, context):    # pragma: no cover
     row.prop(self, 'hq_export')
     layout.prop(self, 'use_export_paths')
     layout.prop(self, 'texture_name_from_image_path')
+    layout.prop(self, 'compress_chunks')
+    layout.prop(self, 'optimize_indices')
 
 
 class XRAY_OT_export_ogf_file(
@@ -60,6 +64,8 @@ class XRAY_OT_export_ogf_file(
     hq_export = ie.prop_omf_high_quality()
     use_export_paths = ie.PropUseExportPaths()
     export_motions = ie.PropObjectMotionsExport()
+    compress_chunks = ie.prop_compress_chunks()
+    optimize_indices = ie.prop_optimize_indices()
 
     def draw(self, context):    # pragma: no cover
         utils.ie.open_imp_exp_folder(self, 'meshes_folder')
@@ -77,6 +83,8 @@ class XRAY_OT_export_ogf_file(
         export_context.texname_from_path = self.texture_name_from_image_path
         export_context.fmt_ver = self.fmt_version
         export_context.hq_export = self.hq_export
+        export_context.compress_chunks = self.compress_chunks
+        export_context.optimize_indices = self.optimize_indices
         export_context.export_motions = self.export_motions
 
         selected_objs = context.selected_objects
@@ -120,6 +128,8 @@ class XRAY_OT_export_ogf_file(
         self.use_export_paths = pref.ogf_export_use_export_paths
         self.export_motions = pref.ogf_export_motions
         self.hq_export = pref.ogf_export_hq_motions
+        self.compress_chunks = pref.ogf_export_compress_chunks
+        self.optimize_indices = pref.ogf_export_optimize_indices
 
         ctx = ExportOgfContext()
         root_objs = utils.obj.get_root_objs(ctx)
@@ -164,6 +174,8 @@ class XRAY_OT_export_ogf(utils.ie.BaseOperator):
     fmt_version = ie.PropSDKVersion()
     hq_export = ie.prop_omf_high_quality()
     use_export_paths = ie.PropUseExportPaths()
+    compress_chunks = ie.prop_compress_chunks()
+    optimize_indices = ie.prop_optimize_indices()
     processed = bpy.props.BoolProperty(default=False, options={'HIDDEN'})
 
     def draw(self, context):    # pragma: no cover
@@ -182,6 +194,8 @@ class XRAY_OT_export_ogf(utils.ie.BaseOperator):
         export_context.export_motions = self.export_motions
         export_context.fmt_ver = self.fmt_version
         export_context.hq_export = self.hq_export
+        export_context.compress_chunks = self.compress_chunks
+        export_context.optimize_indices = self.optimize_indices
 
         root_objs = utils.obj.get_root_objs(export_context)
 
@@ -218,6 +232,8 @@ class XRAY_OT_export_ogf(utils.ie.BaseOperator):
         self.texture_name_from_image_path = pref.ogf_texture_names_from_path
         self.fmt_version = utils.ie.get_sdk_ver(pref.ogf_export_fmt_ver)
         self.hq_export = pref.ogf_export_hq_motions
+        self.compress_chunks = pref.ogf_export_compress_chunks
+        self.optimize_indices = pref.ogf_export_optimize_indices
 
         ctx = ExportOgfContext()
         root_objs = utils.obj.get_root_objs(ctx)
@@ -6,6 +6,7 @@ def load_vcontainer(visual, lvl, vb_index, vb_offset, vb_size):
     vb = lvl.vertex_buffers[vb_index]
     vb_slice = slice(vb_offset, vb_offset + vb_size)
 
+    # slices of numpy buffers are views, the data is not copied
     visual.vertices = vb.position[vb_slice]
     visual.normals = vb.normal[vb_slice]
     visual.uvs = vb.uv[vb_slice]
@@ -13,10 +14,10 @@ def load_vcontainer(visual, lvl, vb_index, vb_offset, vb_size):
     visual.hemi = vb.color_hemi[vb_slice]
     visual.vb_index = vb_index
 
-    if vb.color_light:
+    if len(vb.color_light):
         visual.light = vb.color_light[vb_slice]
 
-    if vb.color_sun:
+    if len(vb.color_sun):
         visual.sun = vb.color_sun[vb_slice]
 
 
@@ -1,10 +1,13 @@
+# blender modules
+import numpy
+
 # addon modules
 from .... import rw
 
 
 def read_ib(packed_reader):
     indices_count = packed_reader.uint32()
-    indices_buffer = packed_reader.getf('<{0}H'.format(indices_count))
+    indices_buffer = packed_reader.get_ndarray('H', indices_count)
     return indices_buffer, indices_count
 
 
@@ -15,11 +18,7 @@ def read_indices(chunks, ogf_chunks, visual):
 
 
 def convert_indices_to_triangles(visual):
-    for index in range(0, visual.indices_count, 3):
-        visual.triangles.append((
-            visual.indices[index],
-            visual.indices[index + 2],
-            visual.indices[index + 1]
-        ))
+    indices = numpy.asarray(visual.indices[ : visual.indices_count])
+    visual.triangles = indices.reshape(-1, 3)[ : , (0, 2, 1)]
 
     visual.indices = None
@@ -16,10 +16,11 @@ from .... import rw
 from .... import text
 
 
-def import_ogf_visual(context, data, visual):
+def import_ogf_visual(context, data, visual, chunks=None):
     # visual from *.ogf file
 
-    chunks = utility.get_ogf_chunks(data)
+    if chunks is None:
+        chunks = utility.get_ogf_chunks(data)
 
     header.read_ogf_file_header(chunks, visual)
 
@@ -102,12 +103,23 @@ def import_level_visual(data, visual_id, lvl):
     import_function(chunks, visual, lvl)
 
 
+def parse_file(file_path):
+    # first import stage, does not use bpy
+    data = rw.utils.read_file(file_path)
+    return utility.get_ogf_chunks(data).load_all()
+
+
 @log.with_context(name='import-ogf')
 @utils.stats.timer
-def import_file(file_path, context):
+def import_file(file_path, context, chunks=None):
     utils.stats.status('Import File', file_path)
 
-    data = rw.utils.get_file_data(file_path)
+    if chunks is None:
+        data = rw.utils.get_file_data(file_path)
+    else:
+        data = None
+        log.update(file=os.path.abspath(file_path))
+
     file_name = os.path.basename(file_path)
 
     # init visual
@@ -117,4 +129,4 @@ def import_file(file_path, context):
     visual.name = file_name
     visual.is_root = True
 
-    import_ogf_visual(context, data, visual)
+    import_ogf_visual(context, data, visual, chunks)
@@ -1,4 +1,5 @@
 # addon modules
+from . import utility
 from .. import fmt
 from ... import level
 
@@ -51,8 +52,8 @@ def assign_level_material(bpy_mesh, visual, lvl):
 
             # for draft terrain
             elif (
-                    visual.light and
-                    not visual.uvs_lmap and
+                    utility.has_values(visual.light) and
+                    not utility.has_values(visual.uvs_lmap) and
                     visual.model_type in normals
                 ):
                 bpy_material.xray.uv_light_map = ''
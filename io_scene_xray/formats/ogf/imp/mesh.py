@@ -3,7 +3,7 @@ import math
 
 # blender modules
 import bpy
-import bmesh
+import numpy
 
 # addon modules
 from . import utility
@@ -28,41 +28,35 @@ def assign_visual_vertex_weights(visual, bpy_object, remap_vertices):
 
 
 def get_vert_normals(visual):
-    temp_mesh = bmesh.new()
-
-    # init vertex normals list and create vertices
-    vert_normals = {}
-    for vertex_index, vertex_coord in enumerate(visual.vertices):
-        vert = temp_mesh.verts.new(vertex_coord)
-        vert_normals[tuple(vert.co)] = []
-
-    temp_mesh.verts.ensure_lookup_table()
-    temp_mesh.verts.index_update()
-
-    # create triangles
-    for triangle in visual.triangles:
-        try:
-            temp_mesh.faces.new((
-                temp_mesh.verts[triangle[0]],
-                temp_mesh.verts[triangle[1]],
-                temp_mesh.verts[triangle[2]]
-            ))
-        except ValueError:    # face already exists
-            pass
-
-    temp_mesh.faces.ensure_lookup_table()
-    temp_mesh.normal_update()
+    # create temp mesh without merged vertices
+    temp_mesh = bpy.data.meshes.new('temp_' + str(visual.name))
+    triangles = get_triangles(visual)
+    unique_faces = utils.mesh.get_unique_faces(triangles)
+    utils.mesh.create_geometry(
+        temp_mesh,
+        visual.vertices,
+        triangles[unique_faces]
+    )
 
     # collect vertex normals
-    for vert in temp_mesh.verts:
+    verts_count = len(visual.vertices)
+    coords = numpy.empty(verts_count * 3, dtype=numpy.float32)
+    normals = numpy.empty(verts_count * 3, dtype=numpy.float32)
+    temp_mesh.vertices.foreach_get('co', coords)
+    temp_mesh.vertices.foreach_get('normal', normals)
+    bpy.data.meshes.remove(temp_mesh)
+
+    coords = coords.reshape(-1, 3).tolist()
+    normals = normals.reshape(-1, 3).tolist()
+
+    vert_normals = {}
+    for vert_index, (coord, normal) in enumerate(zip(coords, normals)):
         norm = (
-            round(vert.normal[0], 3),
-            round(vert.normal[1], 3),
-            round(vert.normal[2], 3)
+            round(normal[0], 3),
+            round(normal[1], 3),
+            round(normal[2], 3)
         )
-        vert_normals[tuple(vert.co)].append((vert.index, norm))
-
-    temp_mesh.clear()
+        vert_normals.setdefault(tuple(coord), []).append((vert_index, norm))
 
     return vert_normals
 
@@ -81,246 +75,120 @@ def get_back_side(vert_normals):
     return back_side
 
 
-def create_static_vertices(visual, mesh, back_side):
-    unique_verts = {}
-    remap_verts = {}
-    remap_index = 0
-
-    for index, coord in enumerate(visual.vertices):
-        is_back = back_side[index]
-        new_index = unique_verts.get((coord, is_back), None)
+def create_static_vertices(visual, back_side):
+    coords = numpy.asarray(visual.vertices, dtype=numpy.float64)
+    coords = coords.reshape(-1, 3)
+    is_back = numpy.fromiter(
+        (back_side[index] for index in range(len(coords))),
+        dtype=numpy.float64,
+        count=len(coords)
+    )
 
-        if new_index is None:
-            mesh.verts.new(coord)
-            remap_verts[index] = remap_index
-            unique_verts[(coord, is_back)] = remap_index
-            remap_index += 1
+    # negative zero is equal to zero
+    keys = numpy.column_stack((coords + 0.0, is_back))
+    unique_verts, remap_verts = utils.mesh.weld_vertices(keys)
 
-        else:
-            remap_verts[index] = new_index
+    return coords[unique_verts], remap_verts
 
-    return remap_verts
 
-
-def create_skinned_vertices(visual, mesh, back_side):
+def create_skinned_vertices(visual, back_side):
     unique_verts = {}
-    remap_verts = {}
-    remap_index = 0
+    remap_verts = []
+    vertices = []
+
+    coords = numpy.asarray(visual.vertices, dtype=numpy.float64)
+    coords = map(tuple, coords.reshape(-1, 3).tolist())
 
-    for index, coord in enumerate(visual.vertices):
+    for index, coord in enumerate(coords):
         is_back = back_side[index]
         weights = tuple(visual.weights[index])
         new_index = unique_verts.get((coord, weights, is_back), None)
 
         if new_index is None:
-            mesh.verts.new(coord)
-            remap_verts[index] = remap_index
-            unique_verts[(coord, weights, is_back)] = remap_index
-            remap_index += 1
+            new_index = len(vertices)
+            vertices.append(coord)
+            unique_verts[(coord, weights, is_back)] = new_index
 
-        else:
-            remap_verts[index] = new_index
+        remap_verts.append(new_index)
 
-    return remap_verts
+    return vertices, remap_verts
 
 
-def create_vertices(visual, mesh, back_side):
+def create_vertices(visual, back_side):
     if visual.weights:
-        remap_vertices = create_skinned_vertices(visual, mesh, back_side)
+        vertices, remap_vertices = create_skinned_vertices(visual, back_side)
     else:
-        remap_vertices = create_static_vertices(visual, mesh, back_side)
+        vertices, remap_vertices = create_static_vertices(visual, back_side)
 
-    mesh.verts.ensure_lookup_table()
-    mesh.verts.index_update()
+    return vertices, remap_vertices
 
-    return remap_vertices
 
+def get_triangles(visual):
+    triangles = numpy.asarray(visual.triangles, dtype=numpy.int64)
+    return triangles.reshape(-1, 3)
 
-def create_faces_new(visual, mesh, remap_vertices, norm_fun):
-    remap_loops = []
-    custom_normals = []
 
-    # create triangles
-    for triangle in visual.triangles:
-        try:
-            vert_1 = remap_vertices[triangle[0]]
-            vert_2 = remap_vertices[triangle[1]]
-            vert_3 = remap_vertices[triangle[2]]
+def create_faces(visual, remap_vertices):
+    triangles = get_triangles(visual)
+    remap_vertices = numpy.asarray(remap_vertices, dtype=numpy.int64)
 
-            face = mesh.faces.new((
-                mesh.verts[vert_1],
-                mesh.verts[vert_2],
-                mesh.verts[vert_3]
-            ))
-            face.smooth = True
+    faces = remap_vertices[triangles]
+    unique_faces = utils.mesh.get_unique_faces(faces)
 
-            normal_1 = visual.normals[triangle[0]]
-            normal_2 = visual.normals[triangle[1]]
-            normal_3 = visual.normals[triangle[2]]
+    # visual vertex index of every loop
+    remap_loops = triangles[unique_faces].ravel()
 
-            custom_normals.extend((
-                norm_fun(normal_1),
-                norm_fun(normal_2),
-                norm_fun(normal_3)
-            ))
-            remap_loops.extend(triangle)
+    return faces[unique_faces], remap_loops
 
-        except ValueError:    # face already exists
-            pass
 
-    mesh.faces.ensure_lookup_table()
+def get_loops_values(values, remap_loops):
+    values = numpy.asarray(values, dtype=numpy.float32)
+    return values[remap_loops]
 
-    # import uvs and vertex colors
-    current_loop = 0
-    uv_layer = mesh.loops.layers.uv.new('Texture')
-
-    if visual.uvs_lmap:    # light maps
-        hemi_vertex_color = mesh.loops.layers.color.new('Hemi')
-        lmap_uv_layer = mesh.loops.layers.uv.new('Light Map')
-        for face in mesh.faces:
-            for loop in face.loops:
-                index = remap_loops[current_loop]
-                loop[uv_layer].uv = visual.uvs[index]
-                loop[lmap_uv_layer].uv = visual.uvs_lmap[index]
-                # hemi vertex color
-                hemi = visual.hemi[index]
-                hemi_loop = loop[hemi_vertex_color]
-                hemi_loop[0 : 3] = hemi, hemi, hemi
-                current_loop += 1
-
-    elif visual.light:    # vertex colors
-        hemi_vertex_color = mesh.loops.layers.color.new('Hemi')
-        sun_vertex_color = mesh.loops.layers.color.new('Sun')
-        light_vertex_color = mesh.loops.layers.color.new('Light')
-        for face in mesh.faces:
-            for loop in face.loops:
-                index = remap_loops[current_loop]
-                loop[uv_layer].uv = visual.uvs[index]
-                # hemi vertex color
-                hemi = visual.hemi[index]
-                hemi_loop = loop[hemi_vertex_color]
-                hemi_loop[0 : 3] = hemi, hemi, hemi
-                # light vertex color
-                light = visual.light[index]
-                light_loop = loop[light_vertex_color]
-                light_loop[0 : 3] = light
-                # sun vertex color
-                sun = visual.sun[index]
-                sun_loop = loop[sun_vertex_color]
-                sun_loop[0 : 3] = sun, sun, sun
-                current_loop += 1
 
-    else:
-        if visual.hemi:    # trees
-            hemi_vertex_color = mesh.loops.layers.color.new('Hemi')
-            for face in mesh.faces:
-                for loop in face.loops:
-                    index = remap_loops[current_loop]
-                    loop[uv_layer].uv = visual.uvs[index]
-                    # hemi vertex color
-                    hemi = visual.hemi[index]
-                    hemi_loop = loop[hemi_vertex_color]
-                    hemi_loop[0 : 3] = hemi, hemi, hemi
-                    current_loop += 1
-        else:    # ogf file
-            for face in mesh.faces:
-                for loop in face.loops:
-                    index = remap_loops[current_loop]
-                    loop[uv_layer].uv = visual.uvs[index]
-                    current_loop += 1
-
-    return custom_normals
-
-
-def create_faces_old(visual, mesh, remap_vertices, norm_fun):
-    remap_loops = []
-    custom_normals = []
+def get_custom_normals(visual, remap_loops, norm_fun):
+    normals = numpy.asarray(visual.normals)[remap_loops]
+    return [norm_fun(normal) for normal in normals.tolist()]
 
-    # create triangles
-    if visual.normals:
-        for triangle in visual.triangles:
-            try:
-                vert_1 = remap_vertices[triangle[0]]
-                vert_2 = remap_vertices[triangle[1]]
-                vert_3 = remap_vertices[triangle[2]]
-
-                face = mesh.faces.new((
-                    mesh.verts[vert_1],
-                    mesh.verts[vert_2],
-                    mesh.verts[vert_3]
-                ))
-                face.smooth = True
-
-                normal_1 = visual.normals[triangle[0]]
-                normal_2 = visual.normals[triangle[1]]
-                normal_3 = visual.normals[triangle[2]]
-
-                custom_normals.extend((
-                    norm_fun(normal_1),
-                    norm_fun(normal_2),
-                    norm_fun(normal_3)
-                ))
-                remap_loops.extend(triangle)
-
-            except ValueError:    # face already exists
-                pass
 
-    else:
-        for triangle in visual.triangles:
-            try:
-                vert_1 = remap_vertices[triangle[0]]
-                vert_2 = remap_vertices[triangle[1]]
-                vert_3 = remap_vertices[triangle[2]]
+def create_layers_new(visual, bpy_mesh, remap_loops, bpy_image):
+    # import uvs and vertex colors
+    uvs = get_loops_values(visual.uvs, remap_loops)
+    utils.mesh.create_uv_layer(bpy_mesh, 'Texture', uvs, bpy_image)
 
-                face = mesh.faces.new((
-                    mesh.verts[vert_1],
-                    mesh.verts[vert_2],
-                    mesh.verts[vert_3]
-                ))
-                face.smooth = True
+    if utility.has_values(visual.uvs_lmap):    # light maps
+        hemi = get_loops_values(visual.hemi, remap_loops)
+        lmap = get_loops_values(visual.uvs_lmap, remap_loops)
+        utils.mesh.create_color_layer(bpy_mesh, 'Hemi', hemi)
+        utils.mesh.create_uv_layer(bpy_mesh, 'Light Map', lmap)
 
-                remap_loops.extend(triangle)
+    elif utility.has_values(visual.light):    # vertex colors
+        hemi = get_loops_values(visual.hemi, remap_loops)
+        sun = get_loops_values(visual.sun, remap_loops)
+        light = get_loops_values(visual.light, remap_loops)
+        utils.mesh.create_color_layer(bpy_mesh, 'Hemi', hemi)
+        utils.mesh.create_color_layer(bpy_mesh, 'Sun', sun)
+        utils.mesh.create_color_layer(bpy_mesh, 'Light', light)
 
-            except ValueError:    # face already exists
-                pass
+    elif utility.has_values(visual.hemi):    # trees
+        hemi = get_loops_values(visual.hemi, remap_loops)
+        utils.mesh.create_color_layer(bpy_mesh, 'Hemi', hemi)
 
-    mesh.faces.ensure_lookup_table()
 
+def create_layers_old(visual, bpy_mesh, remap_loops, bpy_image):
     # import uvs and vertex colors
-    current_loop = 0
-    uv_layer = mesh.loops.layers.uv.new('Texture')
+    uvs = get_loops_values(visual.uvs, remap_loops)
+    utils.mesh.create_uv_layer(bpy_mesh, 'Texture', uvs, bpy_image)
 
     # light maps
-    if visual.uvs_lmap:
-        lmap_uv_layer = mesh.loops.layers.uv.new('Light Map')
-        for face in mesh.faces:
-            for loop in face.loops:
-                index = remap_loops[current_loop]
-                loop[uv_layer].uv = visual.uvs[index]
-                loop[lmap_uv_layer].uv = visual.uvs_lmap[index]
-                current_loop += 1
+    if utility.has_values(visual.uvs_lmap):
+        lmap = get_loops_values(visual.uvs_lmap, remap_loops)
+        utils.mesh.create_uv_layer(bpy_mesh, 'Light Map', lmap)
 
     # vertex colors
-    elif visual.light:
-        light_vertex_color = mesh.loops.layers.color.new('Light')
-        for face in mesh.faces:
-            for loop in face.loops:
-                index = remap_loops[current_loop]
-                loop[uv_layer].uv = visual.uvs[index]
-                # light vertex color
-                light = visual.light[index]
-                light_loop = loop[light_vertex_color]
-                light_loop[0 : 3] = light
-                current_loop += 1
-
-    else:
-        for face in mesh.faces:
-            for loop in face.loops:
-                index = remap_loops[current_loop]
-                loop[uv_layer].uv = visual.uvs[index]
-                current_loop += 1
-
-    return custom_normals
+    elif utility.has_values(visual.light):
+        light = get_loops_values(visual.light, remap_loops)
+        utils.mesh.create_color_layer(bpy_mesh, 'Light', light)
 
 
 def update_verts_coords_v3(mesh_obj, arm_obj, split_norms):
@@ -356,13 +224,13 @@ def update_verts_coords_v3(mesh_obj, arm_obj, split_norms):
     mesh_obj.data.normals_split_custom_set(custom_normals)
 
 
+@utils.stats.stage_timer('Mesh')
 def create_visual(visual, lvl=None, geometry_key=None):
     vert_normals = get_vert_normals(visual)
     back_side = get_back_side(vert_normals)
 
-    mesh = bmesh.new()
-
-    remap_vertices = create_vertices(visual, mesh, back_side)
+    vertices, remap_vertices = create_vertices(visual, back_side)
+    faces, remap_loops = create_faces(visual, remap_vertices)
 
     # search convert normal function
     if visual.vb_index is None:
@@ -374,7 +242,22 @@ def create_visual(visual, lvl=None, geometry_key=None):
         else:
             convert_normal_fun = utility.convert_normal
 
-    # import triangles
+    # create mesh
+    bpy_mesh = bpy.data.meshes.new(visual.name)
+    bpy_mesh.use_auto_smooth = True
+    bpy_mesh.auto_smooth_angle = math.pi
+    utils.stats.created_msh()
+    utils.mesh.create_geometry(bpy_mesh, vertices, faces)
+
+    # texture image in blender 2.7x
+    bpy_image = None
+    if not utils.version.IS_28:
+        if lvl:
+            bpy_image = lvl.images[visual.shader_id]
+        else:
+            bpy_image = visual.bpy_image
+
+    # import uvs, vertex colors and normals
     is_new_format = False
     if lvl:
         if lvl.xrlc_version >= level.fmt.VERSION_11:
@@ -384,25 +267,18 @@ def create_visual(visual, lvl=None, geometry_key=None):
             is_new_format = True
 
     if is_new_format:
-        custom_normals = create_faces_new(
-            visual,
-            mesh,
-            remap_vertices,
-            convert_normal_fun
-        )
+        create_layers_new(visual, bpy_mesh, remap_loops, bpy_image)
     else:
-        custom_normals = create_faces_old(
+        create_layers_old(visual, bpy_mesh, remap_loops, bpy_image)
+
+    if utility.has_values(visual.normals):
+        custom_normals = get_custom_normals(
             visual,
-            mesh,
-            remap_vertices,
+            remap_loops,
             convert_normal_fun
         )
-
-    # create mesh
-    bpy_mesh = bpy.data.meshes.new(visual.name)
-    bpy_mesh.use_auto_smooth = True
-    bpy_mesh.auto_smooth_angle = math.pi
-    utils.stats.created_msh()
+    else:
+        custom_normals = []
 
     # append material
     if lvl:
@@ -414,21 +290,6 @@ def create_visual(visual, lvl=None, geometry_key=None):
     else:
         bpy_mesh.materials.append(visual.bpy_material)
 
-    # assign texture layer in blender 2.7x
-    if not utils.version.IS_28:
-        if lvl:
-            bpy_image = lvl.images[visual.shader_id]
-        else:
-            bpy_image = visual.bpy_image
-
-        texture_layer = mesh.faces.layers.tex.new('Texture')
-        for face in mesh.faces:
-            face[texture_layer].image = bpy_image
-
-    # convert to bpy-mesh
-    mesh.normal_update()
-    mesh.to_mesh(bpy_mesh)
-
     # create object
     bpy_object = utils.obj.create_object(visual.name, bpy_mesh)
 
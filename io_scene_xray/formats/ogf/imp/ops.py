@@ -89,7 +89,8 @@ class XRAY_OT_import_ogf(
             self.directory,
             self.files,
             main.import_file,
-            import_context
+            import_context,
+            parse_fun=main.parse_file
         )
 
         return {'FINISHED'}
@@ -11,6 +11,11 @@ from .... import log
 from .... import rw
 
 
+def has_values(values):
+    # visual values are lists or numpy arrays
+    return values is not None and len(values) > 0
+
+
 def convert_normal(norm_in):
     norm_out_x = 2.0 * norm_in[0] / 255 - 1.0
     norm_out_y = 2.0 * norm_in[1] / 255 - 1.0
@@ -38,8 +43,11 @@ def check_unread_chunks(chunks, context=''):
     chunks_ids.sort()
 
     for chunk_id in chunks_ids:
-        data = chunks[chunk_id]
-        size = len(data)
+        # the unread chunks are not decompressed
+        if isinstance(chunks, rw.read.ChunkIndex):
+            size = chunks.get_size(chunk_id)
+        else:
+            size = len(chunks[chunk_id])
         if context:
             log.debug('Unknown OGF {} Chunk: {} ({} bytes)'.format(
                 context,
@@ -54,16 +62,12 @@ def check_unread_chunks(chunks, context=''):
 
 
 def read_chunks(data, ignore_compression=False):
-    chunked_reader = rw.read.ChunkedReader(data, ignore_compression)
-    return {id: data for id, data in chunked_reader}
+    return rw.read.ChunkIndex(data, ignore_compression, last=True)
 
 
 def get_ogf_chunks(data):
-    try:
-        return read_chunks(data)
-    except rw.read.ChunkedReader.Errors as err:
-        log.debug(err)
-        return read_chunks(data, ignore_compression=True)
+    # the chunks that cannot be decompressed are read as is
+    return rw.read.ChunkIndex(data, ignore_errors=True, last=True)
 
 
 def set_export_path(context, visual, bpy_object):
@@ -1,3 +1,6 @@
+# blender modules
+import numpy
+
 # addon modules
 from .. import fmt
 from ... import level
@@ -17,119 +20,140 @@ def read_vertices_v3(data, visual, lvl):
     visual.uvs_lmap = vb.uv_lmap
 
 
-def read_verts_1_link(visual, packed_reader, verices_count):
-    if verices_count * 36 == packed_reader.get_size() - 8:
-        for vertex_index in range(verices_count):
-            coord = packed_reader.getv3fp()
-            normal = packed_reader.getv3fp()
-            tex_u, tex_v = packed_reader.getf('<2f')
-            bone_index = packed_reader.uint32()
+VERTS_FIELDS_OGF = (
+    ('coord', '3f'),
+    ('normal', '3f'),
+    ('uv', '2f')
+)
+VERTS_FIELDS_1L = (
+    ('coord', '3f'),
+    ('normal', '3f'),
+    ('uv', '2f'),
+    ('bones', '1I')
+)
+VERTS_FIELDS_1L_TB = (
+    ('coord', '3f'),
+    ('normal', '3f'),
+    ('tangent', '3f'),
+    ('bitangent', '3f'),
+    ('uv', '2f'),
+    ('bones', '1I')
+)
+VERTS_FIELDS_2L = (
+    ('bones', '2H'),
+    ('coord', '3f'),
+    ('normal', '3f'),
+    ('tangent', '3f'),
+    ('bitangent', '3f'),
+    ('weights', '1f'),
+    ('uv', '2f')
+)
+VERTS_FIELDS_3L = (
+    ('bones', '3H'),
+    ('coord', '3f'),
+    ('normal', '3f'),
+    ('tangent', '3f'),
+    ('bitangent', '3f'),
+    ('weights', '2f'),
+    ('uv', '2f')
+)
+VERTS_FIELDS_4L = (
+    ('bones', '4H'),
+    ('coord', '3f'),
+    ('normal', '3f'),
+    ('tangent', '3f'),
+    ('bitangent', '3f'),
+    ('weights', '3f'),
+    ('uv', '2f')
+)
+
+
+def _get_vectors(values):
+    # swap y and z
+    return list(map(tuple, values[ : , (0, 2, 1)].tolist()))
+
+
+def _set_vertices(visual, verts):
+    visual.vertices = _get_vectors(verts['coord'])
+    visual.normals = _get_vectors(verts['normal'])
+
+    uvs = verts['uv'].astype(numpy.float64)
+    uvs[ : , 1] = 1 - uvs[ : , 1]
+    visual.uvs = list(map(tuple, uvs.tolist()))
+
+
+def _get_vertex_weights(bone_indices, bone_weights):
+    vertex_weights = []
+    used_bones = []
+    for bone, weight in zip(bone_indices, bone_weights):
+        if bone in used_bones:
+            continue
+        used_bones.append(bone)
+        vertex_weights.append((bone, weight))
+    return vertex_weights
+
+
+def _set_weights(visual, verts, links_count):
+    bones = verts['bones']
+    visual.deform_bones.update(numpy.unique(bones).tolist())
+
+    if links_count == 1:
+        visual.weights = [[(bone, 1), ] for bone in bones.tolist()]
+        return
+
+    # the last weight is not stored
+    weights = verts['weights'].astype(numpy.float64).reshape(-1, links_count - 1)
+    last_weight = 1
+    for link_index in range(links_count - 1):
+        last_weight = last_weight - weights[ : , link_index]
+    weights = numpy.column_stack((weights, last_weight))
+
+    if links_count == 2:
+        # stored weight is the weight of the second bone
+        visual.weights = [
+            [(bone_1, weight_1), (bone_2, weight_2)]
+            if bone_1 != bone_2 else [(bone_1, 1), ]
+            for (bone_1, bone_2), (weight_2, weight_1) in zip(
+                bones.tolist(),
+                weights.tolist()
+            )
+        ]
 
-            vertex_weights = [(bone_index, 1), ]
+    else:
+        visual.weights = list(map(
+            _get_vertex_weights,
+            bones.tolist(),
+            weights.tolist()
+        ))
 
-            visual.vertices.append(coord)
-            visual.normals.append(normal)
-            visual.uvs.append((tex_u, 1 - tex_v))
-            visual.weights.append(vertex_weights)
-            visual.deform_bones.add(bone_index)
 
+def read_verts_1_link(visual, packed_reader, verices_count):
+    if verices_count * 36 == packed_reader.get_size() - 8:
+        fields = VERTS_FIELDS_1L
     else:
-        for vertex_index in range(verices_count):
-            coord = packed_reader.getv3fp()
-            normal = packed_reader.getv3fp()
-            tangent = packed_reader.getv3fp()
-            bitangent = packed_reader.getv3fp()
-            tex_u, tex_v = packed_reader.getf('<2f')
-            bone_index = packed_reader.uint32()
-
-            vertex_weights = [(bone_index, 1), ]
+        fields = VERTS_FIELDS_1L_TB
 
-            visual.vertices.append(coord)
-            visual.normals.append(normal)
-            visual.uvs.append((tex_u, 1 - tex_v))
-            visual.weights.append(vertex_weights)
-            visual.deform_bones.add(bone_index)
+    verts = packed_reader.get_records(fields, verices_count)
+    _set_vertices(visual, verts)
+    _set_weights(visual, verts, 1)
 
 
 def read_verts_2_link(visual, packed_reader, verices_count):
-    for vertex_index in range(verices_count):
-        bone_1_index, bone_2_index = packed_reader.getf('<2H')
-        coord = packed_reader.getv3fp()
-        normal = packed_reader.getv3fp()
-        tangent = packed_reader.getv3fp()
-        bitangent = packed_reader.getv3fp()
-        weight = packed_reader.getf('<f')[0]
-        tex_u, tex_v = packed_reader.getf('<2f')
-
-        if bone_1_index != bone_2_index:
-            vertex_weights = [
-                (bone_1_index, 1 - weight),
-                (bone_2_index, weight)
-            ]
-        else:
-            vertex_weights = [(bone_1_index, 1), ]
-
-        visual.vertices.append(coord)
-        visual.normals.append(normal)
-        visual.uvs.append((tex_u, 1 - tex_v))
-        visual.weights.append(vertex_weights)
-        visual.deform_bones.update((bone_1_index, bone_2_index))
+    verts = packed_reader.get_records(VERTS_FIELDS_2L, verices_count)
+    _set_vertices(visual, verts)
+    _set_weights(visual, verts, 2)
 
 
 def read_verts_3_link(visual, packed_reader, verices_count):
-    for vertex_index in range(verices_count):
-        bone_indices = packed_reader.getf('<3H')
-        coord = packed_reader.getv3fp()
-        normal = packed_reader.getv3fp()
-        tangent = packed_reader.getv3fp()
-        bitangent = packed_reader.getv3fp()
-        weight_1, weight_2 = packed_reader.getf('<2f')
-        tex_u, tex_v = packed_reader.getf('<2f')
-
-        weight_3 = 1 - weight_1 - weight_2
-
-        vertex_weights = []
-        bone_weights = [weight_1, weight_2, weight_3]
-        used_bones = []
-        for bone, weight in zip(bone_indices, bone_weights):
-            if bone in used_bones:
-                continue
-            used_bones.append(bone)
-            vertex_weights.append((bone, weight))
-
-        visual.vertices.append(coord)
-        visual.normals.append(normal)
-        visual.uvs.append((tex_u, 1 - tex_v))
-        visual.weights.append(vertex_weights)
-        visual.deform_bones.update(bone_indices)
+    verts = packed_reader.get_records(VERTS_FIELDS_3L, verices_count)
+    _set_vertices(visual, verts)
+    _set_weights(visual, verts, 3)
 
 
 def read_verts_4_link(visual, packed_reader, verices_count):
-    for vertex_index in range(verices_count):
-        bone_indices = packed_reader.getf('<4H')
-        coord = packed_reader.getv3fp()
-        normal = packed_reader.getv3fp()
-        tangent = packed_reader.getv3fp()
-        bitangent = packed_reader.getv3fp()
-        weight_1, weight_2, weight_3 = packed_reader.getf('<3f')
-        tex_u, tex_v = packed_reader.getf('<2f')
-
-        weight_4 = 1 - weight_1 - weight_2 - weight_3
-
-        bone_weights = (weight_1, weight_2, weight_3, weight_4)
-        used_bones = []
-        vertex_weights = []
-        for bone, weight in zip(bone_indices, bone_weights):
-            if bone in used_bones:
-                continue
-            used_bones.append(bone)
-            vertex_weights.append((bone, weight))
-
-        visual.vertices.append(coord)
-        visual.normals.append(normal)
-        visual.uvs.append((tex_u, 1 - tex_v))
-        visual.weights.append(vertex_weights)
-        visual.deform_bones.update(bone_indices)
+    verts = packed_reader.get_records(VERTS_FIELDS_4L, verices_count)
+    _set_vertices(visual, verts)
+    _set_weights(visual, verts, 4)
 
 
 def read_skeleton_vertices(chunks, ogf_chunks, visual):
@@ -168,14 +192,8 @@ def read_vertices(chunks, ogf_chunks, visual):
     vertices_count = packed_reader.uint32()
 
     if vertex_format == level.fmt.FVF_OGF:
-        for vertex_index in range(vertices_count):
-            coord = packed_reader.getv3fp()
-            normal = packed_reader.getv3fp()
-            tex_u, tex_v = packed_reader.getf('<2f')
-
-            visual.vertices.append(coord)
-            visual.normals.append(normal)
-            visual.uvs.append((tex_u, 1 - tex_v))
+        verts = packed_reader.get_records(VERTS_FIELDS_OGF, vertices_count)
+        _set_vertices(visual, verts)
 
     else:
         raise log.AppError(
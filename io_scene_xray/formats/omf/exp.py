@@ -1,11 +1,10 @@
 # standart modules
 import os
-import struct
 import zlib
 
 # blender modules
 import bpy
-import mathutils
+import numpy
 
 # addon modules
 from . import fmt
@@ -143,22 +142,18 @@ def read_motion_params(packed_reader, params_version):
     for motion_index in range(motion_count):
         motion = Motion()
         motion.name = packed_reader.gets()
-        motion.writer.data.extend(packed_reader.getb(24))
+        motion.writer.putb(packed_reader.getb(24))
         if params_version == 4:
             num_marks = packed_reader.uint32()
-            motion.writer.data.extend(struct.pack('<I', num_marks))
+            motion.writer.putf('<I', num_marks)
             for mark_index in range(num_marks):
                 mark_name = packed_reader.gets_rn()
                 mark_count = packed_reader.uint32()
                 mark_name = bytes(mark_name, 'cp1251')
-                motion.writer.data.extend(struct.pack(
-                    '<{}s'.format(len(mark_name)),
-                    mark_name
-                ))
-                motion.writer.data.append(0xd)    # \r char
-                motion.writer.data.append(0xa)    # \n char
-                motion.writer.data.extend(struct.pack('<I', mark_count))
-                motion.writer.data.extend(packed_reader.getb(8 * mark_count))
+                motion.writer.putb(mark_name)
+                motion.writer.putb(b'\r\n')
+                motion.writer.putf('<I', mark_count)
+                motion.writer.putb(packed_reader.getb(8 * mark_count))
         motions_params[motion.name] = motion
     return motions_params
 
@@ -318,6 +313,7 @@ def get_pose_bones_and_groups(context):
     return pose_bones, bone_groups
 
 
+@utils.stats.stage_timer('Parameters')
 def export_motion_params(
         context,
         packed_writer,
@@ -576,6 +572,120 @@ def get_available_params_and_boneparts(context, chunks):
     return available_params, available_boneparts, bone_names, bone_indices
 
 
+def _write_keys(packed_writer, key_fmt, keys):
+    # keys data with crc32 checksum
+    keys_writer = rw.write.PackedWriter()
+    keys_writer.put_array(key_fmt, keys)
+    keys_data = keys_writer.data
+    packed_writer.putf('<I', zlib.crc32(keys_data))
+    packed_writer.putb(keys_data)
+
+
+def quantize_rotations(quaternions):
+    # quaternions: (frames, bones, 4) array of w, x, y, z values.
+    # keys are stored as x, y, -z, w int16 values, rounding
+    # is half to even as in the python round function
+    values = numpy.asarray(quaternions, dtype=numpy.float64)
+    values = values[ ... , (1, 2, 3, 0)] * 0x7fff
+    values[ ... , 2] *= -1.0
+    return numpy.round(values).astype(numpy.int16)
+
+
+def quantize_translations(translations, high_quality):
+    # translations: (frames, bones, 3) array.
+    # returns int keys, size and init (bones, 3) float32 arrays
+    if high_quality:
+        size_max = 0xffff
+        trn_max = 0x7fff
+        trn_min = -0x8000
+        key_dtype = numpy.int16
+    else:
+        size_max = 255
+        trn_max = 127
+        trn_min = -128
+        key_dtype = numpy.int8
+
+    # limits are computed in single precision, the vector
+    # division of mathutils is a multiplication by the reciprocal
+    translations = numpy.asarray(translations, dtype=numpy.float32)
+    min_tr = translations.min(axis=0)
+    max_tr = translations.max(axis=0)
+    tr_init = min_tr + (max_tr - min_tr) * numpy.float32(0.5)
+    tr_size = (max_tr - min_tr) * (
+        numpy.float32(1.0) / numpy.float32(size_max)
+    )
+
+    # quantization is in double precision with truncation toward zero
+    has_size = tr_size > 0.000000001
+    divider = numpy.where(has_size, tr_size, 1.0)
+    values = numpy.trunc(
+        (translations.astype(numpy.float64) - tr_init) / divider
+    )
+    values = numpy.clip(values, trn_min, trn_max)
+    values[ : , ~has_size] = 0.0
+
+    return values.astype(key_dtype), tr_size, tr_init
+
+
+def write_keys(
+        packed_writer,
+        quaternions,
+        translations,
+        bones_indices,
+        high_quality
+    ):
+    # quaternions: (frames, bones, 4), translations: (frames, bones, 3)
+    # arrays of the baked pose bones. bones_indices: pose bones indices
+    # in the order of the exported bones
+    rotation_keys = quantize_rotations(quaternions)
+    translation_keys, tr_size, tr_init = quantize_translations(
+        translations,
+        high_quality
+    )
+    translations = numpy.asarray(translations, dtype=numpy.float32)
+
+    rotation_changed = (rotation_keys != rotation_keys[0]).any(axis=(0, 2))
+    translation_changed = (
+        translation_keys != translation_keys[0]
+    ).any(axis=(0, 2))
+
+    if high_quality:
+        trn_fmt = 'h'
+    else:
+        trn_fmt = 'b'
+
+    for bone_index in bones_indices:
+        # flags
+        flags = 0x0
+        if high_quality:
+            flags |= fmt.KPF_T_HQ
+        if translation_changed[bone_index]:
+            flags |= fmt.FL_T_KEY_PRESENT
+
+        # write rotation
+        if rotation_changed[bone_index]:
+            packed_writer.putf('<B', flags)
+            _write_keys(packed_writer, 'h', rotation_keys[ : , bone_index])
+        else:
+            flags |= fmt.FL_R_KEY_ABSENT
+            packed_writer.putf('<B', flags)
+            packed_writer.put_ndarray('h', rotation_keys[0, bone_index])
+
+        # write translation
+        if flags & fmt.FL_T_KEY_PRESENT:
+            _write_keys(
+                packed_writer,
+                trn_fmt,
+                translation_keys[ : , bone_index]
+            )
+            # size, init
+            packed_writer.put_ndarray('f', tr_size[bone_index])
+            packed_writer.put_ndarray('f', tr_init[bone_index])
+        else:
+            packed_writer.put_ndarray('f', translations[-1, bone_index])
+
+
+@utils.stats.stage_timer('Motions')
 def export_motions(
         arm_obj,
         root_obj,
@@ -590,13 +700,30 @@ def export_motions(
         exp_act_table
     ):
 
-    scn = bpy.context.scene
     new_motions_count = 0
     chunk_id = fmt.MOTIONS_COUNT_CHUNK + 1
     object_motions = exp_act_table.values()
 
     _, scale = utils.ie.get_obj_scale_matrix(root_obj, arm_obj)
 
+    # find parents
+    parents = []
+    for pose_bone in pose_bones:
+        real_parent = utils.bone.find_bone_exportable_parent(pose_bone.bone)
+        if real_parent:
+            parents.append(arm_obj.pose.bones[real_parent.name])
+        else:
+            parents.append(None)
+
+    pose_bones_indices = {
+        pose_bone.name: bone_index
+        for bone_index, pose_bone in enumerate(pose_bones)
+    }
+    bones_indices = [
+        pose_bones_indices[pose_bone.name]
+        for pose_bone in export_bones
+    ]
+
     for motion_name in export_motion_names:
         action_name = act_exp_table.get(motion_name, None)
         if action_name:
@@ -637,12 +764,6 @@ def export_motions(
                 new_motions_count += 1
 
         packed_writer = rw.write.PackedWriter()
-        context.bpy_arm_obj.animation_data.action = action
-
-        if dep_obj:
-            if not dep_obj.animation_data:
-                dep_obj.animation_data_create()
-            dep_obj.animation_data.action = action
 
         # name
         packed_writer.puts(motion_name)
@@ -651,160 +772,26 @@ def export_motions(
         length = int(action.frame_range[1] - action.frame_range[0] + 1)
         packed_writer.putf('<I', length)
 
-        bone_matrices = {}
-        unique_translate = {}
-        start_frame = int(action.frame_range[0])
-        end_frame = int(action.frame_range[1])
-
-        # find parents
-        parents = {}
-        for pose_bone in pose_bones:
-            bone = context.bpy_arm_obj.data.bones[pose_bone.name]
-            real_parent = utils.bone.find_bone_exportable_parent(bone)
-            if real_parent:
-                pose_parent = context.bpy_arm_obj.pose.bones[real_parent.name]
-            else:
-                pose_parent = None
-            parents[pose_bone] = pose_parent
-
-        # collect pose bone matrices
-        for frame_index in range(start_frame, end_frame + 1):
-            scn.frame_set(frame_index)
-
-            for pose_bone in pose_bones:
-                name = pose_bone.name
-                parent = parents[pose_bone]
-                if parent:
-                    parent_matrix = parent.matrix.inverted()
-                else:
-                    parent_matrix = motions.const.MATRIX_BONE_INVERTED
-                matrix = context.multiply(parent_matrix, pose_bone.matrix)
-                trn = matrix.to_translation()
-                trn.x *= scale.x
-                trn.y *= scale.y
-                trn.z *= scale.z
-                trn[2] = -trn[2]
-                unique_translate.setdefault(name, set()).add(tuple(trn))
-                bone_matrices.setdefault(name, []).append(matrix)
-
-        # calculate f-curve amplitude
-        min_translate = {}
-        max_translate = {}
-        for bone_name, translate in unique_translate.items():
-            # min
-            min_x = min(translate, key=lambda i: i[0])[0]
-            min_y = min(translate, key=lambda i: i[1])[1]
-            min_z = min(translate, key=lambda i: i[2])[2]
-            min_translate[bone_name] = mathutils.Vector((min_x, min_y, min_z))
-            # max
-            max_x = max(translate, key=lambda i: i[0])[0]
-            max_y = max(translate, key=lambda i: i[1])[1]
-            max_z = max(translate, key=lambda i: i[2])[2]
-            max_translate[bone_name] = mathutils.Vector((max_x, max_y, max_z))
-
-        # set limits
-        if context.high_quality:
-            size_max = 0xffff
-            trn_max = 0x7fff
-            trn_mix = -0x8000
-        else:
-            size_max = 255
-            trn_max = 127
-            trn_mix = -128
+        # collect baked pose bone transforms
+        baked_motion = motions.bake.bake_motion(
+            context.bpy_arm_obj,
+            action,
+            pose_bones,
+            parents,
+            dep_obj
+        )
+        baked_translations, baked_quaternions, _ = baked_motion
+        baked_translations = baked_translations * tuple(scale)
+        baked_translations[ : , : , 2] *= -1.0
 
         # export keyframes
-        for pose_bone in export_bones:
-            quaternions = []
-            translations = []
-
-            min_tr = min_translate[pose_bone.name]
-            max_tr = max_translate[pose_bone.name]
-
-            tr_init = min_tr + (max_tr - min_tr) / 2
-            tr_size = (max_tr - min_tr) / size_max
-
-            # flags
-            flags = 0x0
-            if context.high_quality:
-                flags |= fmt.KPF_T_HQ
-
-            for matrix in bone_matrices[pose_bone.name]:
-                # rotation
-                quaternion = matrix.to_quaternion()
-                y = int(round(quaternion[1] * 0x7fff, 0))
-                z = int(round(quaternion[2] * 0x7fff, 0))
-                q = int(round(-quaternion[3] * 0x7fff, 0))
-                x = int(round(quaternion[0] * 0x7fff, 0))
-                quaternions.append((y, z, q, x))
-
-                # translation
-                translate = matrix.to_translation()
-                translate[2] = -translate[2]
-                translate.x *= scale.x
-                translate.y *= scale.y
-                translate.z *= scale.z
-                translate_final = [None, None, None]
-                for index in range(3):
-                    if tr_size[index] > 0.000000001:
-                        value = int((translate[index] - tr_init[index]) / tr_size[index])
-                    else:
-                        value = 0
-                    if value > trn_max:
-                        value = trn_max
-                    elif value < trn_mix:
-                        value = trn_mix
-                    translate_final[index] = value
-                translations.append(tuple(translate_final))
-                translate_float = tuple(translate)
-
-                if len(set(translations)) != 1:
-                    flags |= fmt.FL_T_KEY_PRESENT
-
-            # write rotation
-            if len(set(quaternions)) != 1:
-                packed_writer.putf('<B', flags)
-                crc32_temp = 0x0    # temp value
-                crc32_offset = len(packed_writer.data)
-                packed_writer.putf('<I', crc32_temp)
-                for y, z, q, x in quaternions:
-                    packed_writer.putf('<4h', y, z, q, x)
-                # crc32
-                crc32_data_start = crc32_offset + 4
-                crc32_data_end = len(packed_writer.data)
-                crc32_value = zlib.crc32(
-                    packed_writer.data[crc32_data_start : crc32_data_end]
-                )
-                crc32_packed = struct.pack('<I', crc32_value)
-                packed_writer.replace(crc32_offset, crc32_packed)
-            else:
-                flags |= fmt.FL_R_KEY_ABSENT
-                packed_writer.putf('<B', flags)
-                packed_writer.putf('<4h', *quaternions[0])
-
-            # write translation
-            if flags & fmt.FL_T_KEY_PRESENT:
-                crc32_temp = 0x0    # temp value
-                crc32_offset = len(packed_writer.data)
-                packed_writer.putf('<I', crc32_temp)
-                if context.high_quality:
-                    trn_fmt = 'h'
-                else:
-                    trn_fmt = 'b'
-                for translate in translations:
-                    packed_writer.putf('<3' + trn_fmt, *translate)
-                # crc32
-                crc32_data_start = crc32_offset + 4
-                crc32_data_end = len(packed_writer.data)
-                crc32_value = zlib.crc32(
-                    packed_writer.data[crc32_data_start : crc32_data_end]
-                )
-                crc32_packed = struct.pack('<I', crc32_value)
-                packed_writer.replace(crc32_offset, crc32_packed)
-                # size, init
-                packed_writer.putf('<3f', *tr_size)
-                packed_writer.putf('<3f', *tr_init)
-            else:
-                packed_writer.putf('<3f', *translate_float)
+        write_keys(
+            packed_writer,
+            baked_quaternions,
+            baked_translations,
+            bones_indices,
+            context.high_quality
+        )
 
         motions_writer.put(chunk_id, packed_writer)
         chunk_id += 1
@@ -817,6 +804,9 @@ def export_omf(context):
     utils.version.set_active_object(arm_obj)
     xray = arm_obj.xray
 
+    # motions of lazy import are decoded before export
+    imp.load_motion_stubs(arm_obj, xray.motions_collection)
+
     exp_act_table, act_exp_table = collect_motion_names(context, xray)
     bones_count = calculate_bones_count(arm_obj)
 
@@ -884,7 +874,11 @@ def export_omf(context):
 
     main_chunked_writer = rw.write.ChunkedWriter()
     # write motions chunk
-    main_chunked_writer.put(ogf.fmt.Chunks_v4.S_MOTIONS_2, motions_writer)
+    main_chunked_writer.put(
+        ogf.fmt.Chunks_v4.S_MOTIONS_2,
+        motions_writer,
+        compress=context.compress_chunks
+    )
 
     packed_writer = rw.write.PackedWriter()
 
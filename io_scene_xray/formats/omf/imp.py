@@ -1,10 +1,14 @@
+# standart modules
+import os
+
 # blender modules
 import bpy
-import mathutils
+import numpy
 
 # addon modules
 from . import fmt
 from .. import ogf
+from .. import contexts
 from .. import motions
 from ... import text
 from ... import log
@@ -43,59 +47,135 @@ def read_motion_marks(packed_reader):
 
 def examine_motions(data):
     motion_names = []
-    chunked_reader = rw.read.ChunkedReader(data)
+
+    # only the params chunk is loaded, the motions are not decompressed
+    chunks = rw.read.ChunkIndex(data)
 
     # size of motion flags, part, id, speed, power, accrue, falloff
     params_size = 4 + 2 + 2 + 4 + 4 + 4 + 4
 
-    for chunk_id, chunk_data in chunked_reader:
-        if chunk_id == ogf.fmt.Chunks_v4.S_SMPARAMS_1:
-            packed_reader = rw.read.PackedReader(chunk_data)
+    for chunk_data in chunks.get_all(ogf.fmt.Chunks_v4.S_SMPARAMS_1):
+        packed_reader = rw.read.PackedReader(chunk_data)
 
-            # bone partitions
-            params_ver, parts_count = packed_reader.getf('<2H')
+        # bone partitions
+        params_ver, parts_count = packed_reader.getf('<2H')
 
-            for partition_index in range(parts_count):
-                packed_reader.gets()    # partition name
-                bone_count = packed_reader.getf('<H')[0]
+        for partition_index in range(parts_count):
+            packed_reader.gets()    # partition name
+            bone_count = packed_reader.getf('<H')[0]
 
-                for bone in range(bone_count):
-                    if params_ver in (3, 4):
-                        packed_reader.gets()    # bone name
-                        packed_reader.skip(4)    # bone id
+            for bone in range(bone_count):
+                if params_ver in (3, 4):
+                    packed_reader.gets()    # bone name
+                    packed_reader.skip(4)    # bone id
 
-                    elif params_ver == 2:
-                        packed_reader.gets()    # bone name
+                elif params_ver == 2:
+                    packed_reader.gets()    # bone name
 
-                    else:    # version 1
-                        packed_reader.skip(4)    # bone id
+                else:    # version 1
+                    packed_reader.skip(4)    # bone id
 
-            # motion params
-            motion_count = packed_reader.getf('<H')[0]
+        # motion params
+        motion_count = packed_reader.getf('<H')[0]
 
-            for motion_index in range(motion_count):
-                motion_name = packed_reader.gets()
-                packed_reader.skip(params_size)
+        for motion_index in range(motion_count):
+            motion_name = packed_reader.gets()
+            packed_reader.skip(params_size)
 
-                if params_ver == 4:
-                    num_marks = packed_reader.uint32()
-                    for mark_index in range(num_marks):
-                        packed_reader.gets_rn()    # mark name
-                        count = packed_reader.uint32()
-                        packed_reader.skip(count * 8)    # intervals
+            if params_ver == 4:
+                num_marks = packed_reader.uint32()
+                for mark_index in range(num_marks):
+                    packed_reader.gets_rn()    # mark name
+                    count = packed_reader.uint32()
+                    packed_reader.skip(count * 8)    # intervals
 
-                motion_names.append(motion_name)
+            motion_names.append(motion_name)
 
     return motion_names
 
 
-def quat_to_euler(quaternion):
-    return mathutils.Quaternion((
-        quaternion[3] / 0x7fff,
-        quaternion[0] / 0x7fff,
-        quaternion[1] / 0x7fff,
-        -quaternion[2] / 0x7fff
-    )).to_euler('ZXY')
+def get_keys_quaternions(keys):
+    # (K, 4) x, y, -z, w keys -> (K, 4) w, x, y, z quaternions
+    keys = numpy.asarray(keys, dtype=numpy.float64)
+    return numpy.column_stack((
+        keys[ : , 3],
+        keys[ : , 0],
+        keys[ : , 1],
+        -keys[ : , 2]
+    )) / 0x7fff
+
+
+def read_bone_keys(packed_reader, version, length, quat_fmt):
+    # returns (K, 4) quaternions and (K, 3) translations,
+    # absent keys are returned as the arrays with one key
+    if version == 2:
+        flags = packed_reader.getf('<B')[0]
+        t_present = flags & fmt.FL_T_KEY_PRESENT
+        r_absent = flags & fmt.FL_R_KEY_ABSENT
+        hq = flags & fmt.KPF_T_HQ
+
+    elif version == 1:
+        t_present = packed_reader.getf('<B')[0]
+        r_absent = False
+        hq = False
+
+    else:
+        # interleaved quaternion and translation of each key
+        records = packed_reader.get_records(
+            (('quat', '4' + quat_fmt), ('loc', '3f')),
+            length
+        )
+        quaternions = get_keys_quaternions(records['quat'])
+        translations = records['loc'].astype(numpy.float64)
+        translations[ : , 2] *= -1.0
+        return quaternions, translations
+
+    # rotation
+    if r_absent:
+        keys = packed_reader.get_ndarray('h', 1, vec_len=4)
+    else:
+        motion_crc32 = packed_reader.uint32()
+        keys = packed_reader.get_ndarray('h', length, vec_len=4)
+    quaternions = get_keys_quaternions(keys)
+
+    # translation
+    if t_present:
+        motion_crc32 = packed_reader.uint32()
+        if hq:
+            translate_format = 'h'
+        else:
+            translate_format = 'b'
+        keys = packed_reader.get_ndarray(translate_format, length, vec_len=3)
+        t_size = packed_reader.getf('<3f')
+        t_init = packed_reader.getf('<3f')
+        translations = keys * numpy.array(t_size) + t_init
+    else:
+        translations = numpy.array((packed_reader.getf('<3f'), ))
+    translations[ : , 2] *= -1.0
+
+    return quaternions, translations
+
+
+def get_bone_coords(xmat, quaternions, translations):
+    # keys of the six f-curves: x, y, z location and euler rotation.
+    # xmat @ translation @ rotation is composed for all keys at once
+    xmat = numpy.array(xmat)
+    rotation = xmat[ : 3, : 3]
+
+    locations = translations @ rotation.T + xmat[ : 3, 3]
+    matrices = rotation @ motions.bake.get_quaternion_matrices(quaternions)
+    eulers = motions.bake.get_matrices_eulers(matrices, 'ZXY')
+
+    frames_coords = []
+    for values in (locations, eulers):
+        frames = numpy.arange(len(values), dtype=numpy.float32)
+        for axis in range(3):
+            coords = numpy.empty((len(values), 2), dtype=numpy.float32)
+            coords[ : , 0] = frames
+            coords[ : , 1] = values[ : , axis]
+            frames_coords.append(coords.ravel())
+
+    return frames_coords
 
 
 def skip_motion(packed_reader, bone_names, length):
@@ -175,6 +255,15 @@ def read_motion(
 
         cannot_find_bones = set()
         bones_count = len(bone_names)
+
+        quat_fmt = 'h'
+        if version == 0:
+            frame_len = 4 * 2 + 3 * 4    # quaternion: 4h, translate: 3f
+            head_len = len(name) + 1 + 4
+            keys_size = packed_reader.get_size() - head_len
+            if keys_size != length * bones_count * frame_len:
+                quat_fmt = 'f'
+
         for bone_index in range(bones_count):
             bone_name = bone_names.get(bone_index, None)
             if bone_name is None:
@@ -211,113 +300,13 @@ def read_motion(
                 )
                 rotate_fcurves.append(rotate_fcurve)
 
-            bone_rotations = []
-            bone_translations = []
-
-            if version == 2:
-                flags = packed_reader.getf('<B')[0]
-                t_present = flags & fmt.FL_T_KEY_PRESENT
-                r_absent = flags & fmt.FL_R_KEY_ABSENT
-                hq = flags & fmt.KPF_T_HQ
-
-            elif version == 1:
-                t_present = packed_reader.getf('<B')[0]
-                r_absent = False
-                hq = False
-
-            elif version == 0:
-                frame_len = 4 * 2 + 3 * 4    # quaternion: 4H, translate: 3f
-                head_len = len(name) + 1 + 4
-                if len(packed_reader.get_size()) - head_len == length * bones_count * frame_len:
-                    quat_fmt = 'h'
-                else:
-                    quat_fmt = 'f'
-                for bone_index in range(bones_count):
-                    for key_index in range(length):
-                        quat = packed_reader.getf('<4' + quat_fmt)
-                        loc = packed_reader.getf('<3f')
-
-                        euler = mathutils.Quaternion((
-                            quat[3],
-                            quat[0],
-                            quat[1],
-                            -quat[2]
-                        )).to_euler('ZXY')
-                        bone_rotations.append(euler)
-
-                        translate = loc[0], loc[1], -loc[2]
-                        bone_translations.append(translate)
-
-            if version != 0:
-                # rotation
-                if r_absent:
-                    quaternion = packed_reader.getf('<4h')
-                    euler = quat_to_euler(quaternion)
-                    bone_rotations.append(euler)
-                else:
-                    motion_crc32 = packed_reader.uint32()
-                    for key_index in range(length):
-                        quaternion = packed_reader.getf('<4h')
-                        euler = quat_to_euler(quaternion)
-                        bone_rotations.append(euler)
-
-                # translation
-                translations = []
-                if t_present:
-                    motion_crc32 = packed_reader.uint32()
-                    if hq:
-                        translate_format = '3h'
-                    else:
-                        translate_format = '3b'
-                    for key_index in range(length):
-                        translate = packed_reader.getf('<' + translate_format)
-                        translations.append(translate)
-                    t_size = packed_reader.getf('<3f')
-                    t_init = packed_reader.getf('<3f')
-                    for translate in translations:
-                        final_translation = [None, None, None]
-                        for index, component in enumerate(translate):    # x or y or z
-                            final_translation[index] = component * t_size[index] + t_init[index]
-                        final_translation[2] = -final_translation[2]
-                        bone_translations.append(final_translation)
-                else:
-                    translate = packed_reader.getf('<3f')
-                    translate = translate[0], translate[1], -translate[2]
-                    bone_translations.append(translate)
-
-            tr_count = len(bone_translations)
-            rot_count = len(bone_rotations)
-            keys_count = max(tr_count, rot_count)
-            frames_coords = [[], [], [], [], [], []]
-
-            for key_index in range(keys_count):
-                if t_present:
-                    tr_index = key_index
-                else:
-                    tr_index = 0
-                if not r_absent:
-                    rot_index = key_index
-                else:
-                    rot_index = 0
-
-                location = bone_translations[tr_index]
-                rotation = bone_rotations[rot_index]
-
-                mat = context.multiply(
-                    xmat,
-                    mathutils.Matrix.Translation(location),
-                    rotation.to_matrix().to_4x4()
-                )
-                trn = mat.to_translation()
-                rot = mat.to_euler('ZXY')
-
-                if t_present or key_index == 0:
-                    for axis in range(3):
-                        frames_coords[axis].extend((tr_index, trn[axis]))
-
-                if not r_absent or key_index == 0:
-                    for axis in range(3):
-                        frames_coords[axis + 3].extend((rot_index, rot[axis]))
+            quaternions, translations = read_bone_keys(
+                packed_reader,
+                version,
+                length,
+                quat_fmt
+            )
+            frames_coords = get_bone_coords(xmat, quaternions, translations)
 
             # insert keyframes
             fcurves = [*translate_fcurves, *rotate_fcurves]
@@ -332,10 +321,13 @@ def read_motion(
                 )
             )
 
+        return act
+
     else:
         skip_motion(packed_reader, bone_names, length)
 
 
+@utils.stats.stage_timer('Motions')
 def read_motions(data, context, motions_params, bone_names, version=2):
     chunked_reader = rw.read.ChunkedReader(data)
 
@@ -356,6 +348,154 @@ def read_motions(data, context, motions_params, bone_names, version=2):
         )
 
 
+STUB_ERRORS = (
+    KeyError,
+    ValueError,
+    *rw.read.PackedReader.Errors,
+    *rw.read.ChunkedReader.Errors
+)
+
+
+def _get_file_stamp(file_path):
+    # size and modification time, the stubs are valid while they match.
+    # stored as string, the values do not fit in the int property
+    stat = os.stat(file_path)
+    return '{0}:{1}'.format(stat.st_size, stat.st_mtime_ns)
+
+
+def index_motions(data, context, motions_params, bone_names):
+    # motion stubs are added to the motions list instead of actions,
+    # only the names are read. the motion is decoded when it is
+    # selected in the list, compressed motions are decoded at once
+    chunks = rw.read.ChunkIndex(data)
+    motions_list = context.bpy_arm_obj.xray.motions_collection
+    file_path = os.path.abspath(context.filepath)
+    file_stamp = _get_file_stamp(file_path)
+
+    for chunk_id, offset, size, compressed in rw.read.ChunkIndex.scan(data):
+        if chunk_id == fmt.MOTIONS_COUNT_CHUNK:
+            continue
+
+        motion_id = chunk_id - 1
+
+        if compressed:
+            packed_reader = rw.read.PackedReader(chunks[chunk_id])
+            read_motion(
+                motion_id,
+                packed_reader,
+                context,
+                motions_params,
+                bone_names,
+                2    # version
+            )
+            continue
+
+        packed_reader = rw.read.PackedReader(data)
+        packed_reader.set_offset(offset)
+        name = packed_reader.gets(onerror=lambda error: None)
+
+        motion_params = None
+        if name:
+            motion_params = motions_params.by_dict.get(name, None)
+        if not motion_params:
+            motion_params = motions_params.by_list[motion_id]
+            name = motion_params.name
+
+        if context.selected_names is not None:
+            if name not in context.selected_names:
+                continue
+
+        motion = motions_list.add()
+        motion.name = name
+        motion.stub_file = file_path
+        motion.stub_offset = offset
+        motion.stub_chunk = chunk_id
+        motion.stub_file_stamp = file_stamp
+
+
+def _check_motion_stub(motion, motions_data, file_stamp):
+    # the file and the chunk header must be the same as at import
+    offset = motion.stub_offset
+    valid = file_stamp == motion.stub_file_stamp
+    valid = valid and 8 <= offset <= len(motions_data)
+
+    if valid:
+        header = rw.read.PackedReader(motions_data[offset - 8 : offset])
+        chunk_id, size = header.getf('<2I')
+        valid = chunk_id == motion.stub_chunk
+        valid = valid and offset + size <= len(motions_data)
+
+    if not valid:
+        raise log.AppError(
+            text.error.omf_stub_changed,
+            log.props(file=motion.stub_file, motion=motion.name)
+        )
+
+
+def load_motion_stubs(arm_obj, motions_list):
+    # creates actions of the motion stubs, the stubs are grouped by file
+    files = {}
+    for motion in motions_list:
+        if motion.stub_file:
+            files.setdefault(motion.stub_file, []).append(motion)
+
+    for file_path, stubs in files.items():
+        context = contexts.ImportAnimationOnlyContext()
+        context.bpy_arm_obj = arm_obj
+        context.filepath = file_path
+        context.import_bone_parts = False
+        context.add_to_motion_list = False
+
+        # the file is not mapped, the export can overwrite it
+        data = rw.utils.get_file_data(file_path)
+        file_stamp = _get_file_stamp(file_path)
+
+        try:
+            chunks = rw.read.ChunkIndex(data)
+            motions_params, bone_names = read_params(
+                chunks[ogf.fmt.Chunks_v4.S_SMPARAMS_1],
+                context,
+                1    # params chunk
+            )
+            motions_data = chunks[ogf.fmt.Chunks_v4.S_MOTIONS_2]
+        except STUB_ERRORS:
+            raise log.AppError(
+                text.error.omf_stub_changed,
+                log.props(file=file_path)
+            )
+
+        for motion in stubs:
+            _check_motion_stub(motion, motions_data, file_stamp)
+
+            packed_reader = rw.read.PackedReader(motions_data)
+            packed_reader.set_offset(motion.stub_offset)
+            try:
+                act = read_motion(
+                    motion.stub_chunk - 1,
+                    packed_reader,
+                    context,
+                    motions_params,
+                    bone_names,
+                    2    # version
+                )
+            except STUB_ERRORS:
+                raise log.AppError(
+                    text.error.omf_stub_changed,
+                    log.props(file=file_path, motion=motion.name)
+                )
+
+            motion.stub_file = ''
+            motion.stub_offset = 0
+            motion.stub_chunk = 0
+
+            if motion.name != act.name:
+                if not motion.export_name:
+                    motion.export_name = motion.name
+                motion.name = act.name
+                arm_obj.xray.use_custom_motion_names = True
+
+
+@utils.stats.stage_timer('Parameters')
 def read_params(data, context, chunk, bones_indices={}):
     reader = rw.read.PackedReader(data)
 
@@ -444,11 +584,12 @@ def read_params(data, context, chunk, bones_indices={}):
     return motions_params, bone_names
 
 
-def read_main(data, context):
+def read_main(data, context, chunks=None):
     if not context.import_motions and not context.import_bone_parts:
         raise log.AppError(text.error.omf_nothing)
 
-    chunks = rw.utils.get_chunks(data)
+    if chunks is None:
+        chunks = rw.utils.get_chunks(data)
 
     # params
     params_data = chunks.pop(ogf.fmt.Chunks_v4.S_SMPARAMS_1)
@@ -462,15 +603,30 @@ def read_main(data, context):
     # motions
     motions_data = chunks.pop(ogf.fmt.Chunks_v4.S_MOTIONS_2)
     if context.import_motions:
-        read_motions(motions_data, context, motions_params, bone_names)
+        if context.lazy_import:
+            index_motions(motions_data, context, motions_params, bone_names)
+        else:
+            read_motions(motions_data, context, motions_params, bone_names)
 
     for chunk_id, chunk_data in chunks.items():
         log.debug('Unknown OMF chunk: {}'.format(chunk_id))
 
 
+def parse_file(file_path):
+    # first import stage, does not use bpy
+    data = rw.utils.read_file(file_path)
+    return rw.utils.get_chunks(data).load_all()
+
+
 @log.with_context(name='import-omf')
 @utils.stats.timer
-def import_file(context):
+def import_file(context, chunks=None):
     utils.stats.status('Import File', context.filepath)
-    file_data = rw.utils.get_file_data(context.filepath)
-    read_main(file_data, context)
+
+    if chunks is None:
+        file_data = rw.utils.get_file_data(context.filepath)
+    else:
+        file_data = None
+        log.update(file=os.path.abspath(context.filepath))
+
+    read_main(file_data, context, chunks)
@@ -30,6 +30,7 @@ class ImportOmfContext(
     def __init__(self):
         super().__init__()
         self.import_bone_parts = None
+        self.lazy_import = None
 
 
 class ExportOmfContext(
@@ -43,6 +44,7 @@ class ExportOmfContext(
         self.high_quality = None
         self.need_motions = None
         self.need_bone_groups = None
+        self.compress_chunks = None
 
 
 class Motion(bpy.types.PropertyGroup):
@@ -84,6 +86,7 @@ class XRAY_OT_import_omf(
     import_motions = ie.PropObjectMotionsImport()
     import_bone_parts = ie.prop_import_bone_parts()
     add_to_motion_list = ie.prop_skl_add_actions_to_motion_list()
+    lazy_import = ie.prop_omf_lazy_import()
     motions = bpy.props.CollectionProperty(
         type=Motion,
         name='Motions Filter'
@@ -110,9 +113,17 @@ class XRAY_OT_import_omf(
         imp_ctx.import_bone_parts = self.import_bone_parts
         imp_ctx.import_motions = self.import_motions
         imp_ctx.add_to_motion_list = self.add_to_motion_list
+        # motion stubs are stored in the motion list
+        imp_ctx.lazy_import = self.lazy_import and self.add_to_motion_list
 
-        for file in self.files:
-            imp_ctx.filepath = os.path.join(self.directory, file.name)
+        file_paths = [
+            os.path.join(self.directory, file.name)
+            for file in self.files
+        ]
+        parsed_files = utils.ie.parse_files(file_paths, imp.parse_file)
+
+        for file_path, chunks, parse_time in parsed_files:
+            imp_ctx.filepath = file_path
 
             # search selected motions
             if self.motions:
@@ -123,8 +134,11 @@ class XRAY_OT_import_omf(
                 }
 
             # import
+            if chunks is not None:
+                utils.stats.parse_time(parse_time)
+
             try:
-                imp.import_file(imp_ctx)
+                imp.import_file(imp_ctx, chunks)
             except log.AppError as err:
                 imp_ctx.errors.append(err)
 
@@ -167,6 +181,10 @@ class XRAY_OT_import_omf(
         row.active = self.import_motions
         row.prop(self, 'add_to_motion_list')
 
+        row = layout.row()
+        row.active = self.import_motions and self.add_to_motion_list
+        row.prop(self, 'lazy_import')
+
         if not self.import_motions and not self.import_bone_parts:
             layout.label(
                 text=text.error.nothing_imp,
@@ -313,6 +331,7 @@ class XRAY_OT_export_omf_file(
     export_motions = ie.PropObjectMotionsExport()
     export_bone_parts = ie.prop_export_bone_parts()
     high_quality = ie.prop_omf_high_quality()
+    compress_chunks = ie.prop_compress_chunks()
 
     # system properties
     processed = bpy.props.BoolProperty(default=False, options={'HIDDEN'})
@@ -326,6 +345,7 @@ class XRAY_OT_export_omf_file(
         layout.prop(self, 'export_mode', expand=True)
 
         layout.prop(self, 'high_quality')
+        layout.prop(self, 'compress_chunks')
 
         col = layout.column()
         col.active = not self.export_mode in ('OVERWRITE', 'ADD')
@@ -356,6 +376,7 @@ class XRAY_OT_export_omf_file(
         exp_ctx.export_motions = self.export_motions
         exp_ctx.export_bone_parts = self.export_bone_parts
         exp_ctx.high_quality = self.high_quality
+        exp_ctx.compress_chunks = self.compress_chunks
 
         try:
             exp.export_omf_file(exp_ctx)
@@ -375,6 +396,7 @@ class XRAY_OT_export_omf_file(
         self.export_bone_parts = pref.omf_export_bone_parts
         self.export_motions = pref.omf_motions_export
         self.high_quality = pref.omf_high_quality
+        self.compress_chunks = pref.omf_export_compress_chunks
 
         obj = get_arm_objs(self, context)[0]
         self.filepath = utils.ie.add_file_ext(obj.name, OMF_EXT)
@@ -401,6 +423,7 @@ class XRAY_OT_export_omf(utils.ie.BaseOperator):
 
     # export properties
     high_quality = ie.prop_omf_high_quality()
+    compress_chunks = ie.prop_compress_chunks()
 
     # system properties
     processed = bpy.props.BoolProperty(default=False, options={'HIDDEN'})
@@ -410,6 +433,7 @@ class XRAY_OT_export_omf(utils.ie.BaseOperator):
 
         layout = self.layout
         layout.prop(self, 'high_quality')
+        layout.prop(self, 'compress_chunks')
 
     @log.execute_with_logger
     @utils.stats.execute_with_stats
@@ -425,6 +449,7 @@ class XRAY_OT_export_omf(utils.ie.BaseOperator):
         export_context = ExportOmfContext()
 
         export_context.high_quality = self.high_quality
+        export_context.compress_chunks = self.compress_chunks
         export_context.export_mode = 'OVERWRITE'
 
         for obj in arm_objs:
@@ -449,6 +474,7 @@ class XRAY_OT_export_omf(utils.ie.BaseOperator):
         pref = utils.version.get_preferences()
 
         self.high_quality = pref.omf_high_quality
+        self.compress_chunks = pref.omf_export_compress_chunks
 
         arm_objs = get_arm_objs(self, context)
         if not arm_objs:
@@ -0,0 +1,333 @@
+# standart modules
+import os
+import json
+import struct
+
+# blender modules
+import bpy
+
+# addon modules
+from . import details
+from . import motions
+from . import obj
+from . import ogf
+from .. import log
+from .. import rw
+
+
+# file scanners read only the headers and the chunks tables of files,
+# the chunks payload is not loaded. the scan results are cached on disk
+# by file path, modification time and size.
+
+CACHE_VERSION = 1
+CACHE_FILE_NAME = 'scan_cache.json'
+
+SKL_MAIN_CHUNK = 0x1200
+
+SCAN_ERRORS = (
+    struct.error,
+    IndexError,
+    KeyError,
+    ValueError,
+    OSError,
+    log.AppError
+) + rw.read.ChunkedReader.Errors
+
+
+def _get_chunks_count(data):
+    return len(rw.read.ChunkIndex.scan(data))
+
+
+def _get_motions(motions_data):
+    # name, frames count, payload offset and id of every motion.
+    # only the name and the length at the start of the chunk are read
+    motions_list = []
+
+    headers = rw.read.ChunkIndex.scan(motions_data)
+
+    for chunk_id, offset, size, compressed in headers:
+        # the first chunk stores motions count
+        if not chunk_id or compressed:
+            continue
+
+        reader = rw.read.PackedReader(motions_data[offset : offset + size])
+        name = reader.gets(onerror=lambda error: None)
+        length = reader.uint32()
+        motions_list.append([name, length, offset, chunk_id - 1])
+
+    return motions_list
+
+
+def _scan_ogf_chunks(chunks):
+    header = rw.read.PackedReader(chunks[ogf.fmt.HEADER])
+    version, model_type, shader_id = header.getf('<2BH')
+    info = {'version': version}
+
+    if version == ogf.fmt.FORMAT_VERSION_4:
+        ogf_chunks = ogf.fmt.Chunks_v4
+        type_names = ogf.fmt.model_type_names_v4
+
+    elif version == ogf.fmt.FORMAT_VERSION_3:
+        ogf_chunks = ogf.fmt.Chunks_v3
+        type_names = ogf.fmt.model_type_names_v3
+
+    else:
+        return info
+
+    info['model_type'] = type_names.get(model_type, str(model_type))
+
+    # vertices chunk starts with vertex format and vertices count
+    vertices_data = chunks.get(ogf_chunks.VERTICES)
+    if vertices_data is not None:
+        info['vertices'] = rw.read.FastBytes.int_at(vertices_data, 4)
+
+    children_data = chunks.get(ogf_chunks.CHILDREN)
+    if children_data is not None:
+        children = rw.read.ChunkIndex(children_data)
+        info['children'] = len(children)
+        vertices_count = info.get('vertices', 0)
+        for child_id in children:
+            child_chunks = rw.read.ChunkIndex(children[child_id])
+            child_info = _scan_ogf_chunks(child_chunks)
+            vertices_count += child_info.get('vertices', 0)
+        info['vertices'] = vertices_count
+
+    bones_data = chunks.get(ogf_chunks.S_BONE_NAMES)
+    if bones_data is not None:
+        info['bones'] = rw.read.FastBytes.int_at(bones_data, 0)
+
+    motions_data = chunks.get(ogf_chunks.S_MOTIONS_2)
+    if motions_data is not None:
+        info['motions'] = _get_motions(motions_data)
+
+    return info
+
+
+def scan_ogf(data):
+    return _scan_ogf_chunks(rw.read.ChunkIndex(data))
+
+
+def scan_omf(data):
+    chunks = rw.read.ChunkIndex(data)
+    motions_data = chunks[ogf.fmt.Chunks_v4.S_MOTIONS_2]
+    return {'motions': _get_motions(motions_data)}
+
+
+def scan_skl(data):
+    chunks = rw.read.ChunkIndex(data)
+    reader = rw.read.PackedReader(chunks[SKL_MAIN_CHUNK])
+    name = reader.gets(onerror=lambda error: None)
+    frame_start, frame_end = reader.getf('<2I')
+    return {'motions': [[name, int(frame_end - frame_start), 0, 0]]}
+
+
+def scan_skls(data):
+    # skls file has no chunks table, the motions are skipped
+    # without reading of the keys
+    motions_list = []
+    reader = rw.read.PackedReader(data)
+
+    for motion_index in range(reader.uint32()):
+        offset = reader.offset()
+        name = reader.gets(onerror=lambda error: None)
+        frames_offset = reader.offset()
+        frame_start, frame_end = reader.getf('<2I')
+        length = int(frame_end - frame_start)
+        motions_list.append([name, length, offset, motion_index])
+        reader.set_offset(motions.imp.skip_motion_rest(data, frames_offset))
+
+    return {'motions': motions_list}
+
+
+def scan_object(data):
+    main_data = rw.read.ChunkIndex(data)[obj.fmt.Chunks.Object.MAIN]
+    chunks = rw.read.ChunkIndex(main_data)
+    info = {}
+
+    version_data = chunks.get(obj.fmt.Chunks.Object.VERSION)
+    if version_data is not None:
+        info['version'] = rw.read.FastBytes.short_at(version_data, 0)
+
+    meshes_data = chunks.get(obj.fmt.Chunks.Object.MESHES)
+    if meshes_data is not None:
+        info['meshes'] = _get_chunks_count(meshes_data)
+
+    bones_data = chunks.get(obj.fmt.Chunks.Object.BONES1)
+    if bones_data is not None:
+        info['bones'] = _get_chunks_count(bones_data)
+    else:
+        bones_data = chunks.get(obj.fmt.Chunks.Object.BONES)
+        if bones_data is not None:
+            info['bones'] = rw.read.FastBytes.int_at(bones_data, 0)
+
+    motions_data = chunks.get(obj.fmt.Chunks.Object.MOTIONS)
+    if motions_data is not None:
+        info['motions_count'] = rw.read.FastBytes.int_at(motions_data, 0)
+
+    return info
+
+
+def scan_details(data):
+    chunks = rw.read.ChunkIndex(data)
+    header = rw.read.PackedReader(chunks[details.fmt.Chunks.HEADER])
+    version, meshes_count = header.getf('<2I')
+    header.skip(8)    # offset
+    size_x, size_y = header.getf('<2I')
+    return {
+        'version': version,
+        'meshes': meshes_count,
+        'slots': [size_x, size_y]
+    }
+
+
+def scan_dm(data):
+    reader = rw.read.PackedReader(data)
+    reader.gets()    # shader
+    texture = reader.gets(onerror=lambda error: None)
+    flags, min_scale, max_scale, vertices, indices = reader.getf('<I2f2I')
+    return {
+        'texture': texture,
+        'vertices': vertices,
+        'triangles': indices // 3
+    }
+
+
+scanners = {
+    '.ogf': scan_ogf,
+    '.omf': scan_omf,
+    '.skl': scan_skl,
+    '.skls': scan_skls,
+    '.object': scan_object,
+    '.details': scan_details,
+    '.dm': scan_dm
+}
+
+
+def scan_file(file_path):
+    '''
+    Metadata of the file, the format is defined by the extension.
+    Returns dictionary with json-compatible values or None if the
+    format is not supported or the file is broken.
+    '''
+    ext = os.path.splitext(file_path)[-1].lower()
+    scanner = scanners.get(ext)
+    if scanner is None:
+        return None
+
+    try:
+        # only the touched pages of the mapped file are read
+        data = rw.utils.read_file(file_path, use_mmap=True)
+        return scanner(data)
+    except SCAN_ERRORS:
+        return None
+
+
+def get_info_label(info):
+    if not info:
+        return ''
+
+    parts = []
+
+    model_type = info.get('model_type')
+    if model_type:
+        parts.append(model_type)
+
+    for key in ('meshes', 'children', 'vertices', 'triangles', 'bones'):
+        count = info.get(key)
+        if count is not None:
+            parts.append('{0} {1}'.format(count, key))
+
+    slots = info.get('slots')
+    if slots:
+        parts.append('{0}x{1} slots'.format(*slots))
+
+    motions_list = info.get('motions')
+    if motions_list is not None:
+        if len(motions_list) == 1:
+            parts.append('{} frames'.format(motions_list[0][1]))
+        else:
+            parts.append('{} motions'.format(len(motions_list)))
+
+    motions_count = info.get('motions_count')
+    if motions_count is not None:
+        parts.append('{} motions'.format(motions_count))
+
+    return ', '.join(parts)
+
+
+def get_cache_path():
+    config_dir = bpy.utils.user_resource('CONFIG', path='io_scene_xray')
+    return os.path.join(config_dir, CACHE_FILE_NAME)
+
+
+class ScanCache:
+    '''
+    Scan results stored on disk. An entry is valid while modification
+    time and size of the file are not changed.
+    '''
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.__changed = False
+        self.__entries = self.__load()
+
+    def __load(self):
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+            return {}
+
+        return cache.get('files', {})
+
+    def get_info(self, file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            # the file is removed or not available
+            return None
+
+        key = os.path.normcase(os.path.abspath(file_path))
+        entry = self.__entries.get(key)
+
+        if entry and entry[0] == stat.st_mtime and entry[1] == stat.st_size:
+            return entry[2]
+
+        info = scan_file(file_path)
+        self.__entries[key] = [stat.st_mtime, stat.st_size, info]
+        self.__changed = True
+
+        return info
+
+    def save(self):
+        if not self.__changed:
+            return
+
+        cache = {'version': CACHE_VERSION, 'files': self.__entries}
+        temp_path = self.file_path + '.tmp'
+
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(cache, file)
+            os.replace(temp_path, self.file_path)
+        except OSError:
+            log.debug('scan cache is not saved', file=self.file_path)
+            return
+
+        self.__changed = False
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+
+    if _cache is None:
+        _cache = ScanCache(get_cache_path())
+
+    return _cache
@@ -10,9 +10,9 @@ from . import imp
 from . import exp
 from .. import ie
 from .. import motions
+from .. import scan
 from ... import log
 from ... import ui
-from ... import rw
 from ... import utils
 from ... import text
 
@@ -160,8 +160,11 @@ class XRAY_OT_import_skls(
     def _examine_file(file_path):
         if file_path.lower().endswith(skls_ext):
             if os.path.exists(file_path):
-                file_data = rw.utils.read_file(file_path)
-                return motions.imp.examine_motions(file_data)
+                cache = scan.get_cache()
+                scan_info = cache.get_info(file_path)
+                cache.save()
+                if scan_info:
+                    return [motion[0] for motion in scan_info['motions']]
 
         return tuple()
 
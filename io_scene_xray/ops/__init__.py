@@ -12,6 +12,8 @@ from . import fake_user
 from . import invalid_sg
 from . import joint_limits
 from . import level_shaders
+from . import level_lods
+from . import level_cform
 from . import rig
 from . import shader
 from . import motions_browser
@@ -37,6 +39,8 @@ modules = (
     invalid_sg,
     joint_limits,
     level_shaders,
+    level_lods,
+    level_cform,
     rig,
     shader,
     motions_browser,
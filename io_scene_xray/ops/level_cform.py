@@ -0,0 +1,102 @@
+# blender modules
+import bpy
+import mathutils
+
+# addon modules
+from .. import formats
+from .. import utils
+
+
+def _get_cform_objects():
+    return [
+        obj
+        for obj in bpy.data.objects
+            if obj.type == 'MESH' and
+                obj.xray.is_level and
+                obj.xray.level.object_type == 'CFORM'
+    ]
+
+
+class XRAY_OT_drop_to_cform(utils.ie.BaseOperator):
+    bl_idname = 'io_scene_xray.drop_to_cform'
+    bl_label = 'Drop Objects to CForm'
+    bl_description = 'Move the selected objects down to the level cform'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    height = bpy.props.FloatProperty(
+        name='Ray Start Height',
+        description='Height of the ray start above the object origin',
+        default=1.0,
+        min=0.0
+    )
+    distance = bpy.props.FloatProperty(
+        name='Max Distance',
+        default=1000.0,
+        min=0.001
+    )
+
+    def draw(self, context):    # pragma: no cover
+        column = self.layout.column(align=True)
+        column.prop(self, 'height')
+        column.prop(self, 'distance')
+
+    def execute(self, context):
+        cform_objs = _get_cform_objects()
+        if not cform_objs:
+            self.report({'ERROR'}, 'No cform-objects')
+            return {'CANCELLED'}
+
+        bvh = formats.level.cform_bvh.get_objects_bvh(cform_objs)
+        cform_names = {obj.name for obj in cform_objs}
+        moved_count = 0
+        gamemtls = set()
+
+        for obj in context.selected_objects:
+            if obj.name in cform_names:
+                continue
+
+            location = obj.matrix_world.to_translation()
+            origin = (location.x, location.y, location.z + self.height)
+            hit = bvh.ray_cast(origin, (0.0, 0.0, -1.0), self.distance)
+            if not hit:
+                continue
+
+            _, triangle, hit_location = hit
+            offset = mathutils.Vector(hit_location) - location
+            matrix = obj.matrix_world.copy()
+            matrix.translation += offset
+            obj.matrix_world = matrix
+            moved_count += 1
+
+            material = formats.level.cform_bvh.get_triangle_material(
+                bvh,
+                triangle
+            )
+            if material:
+                gamemtls.add(material.xray.gamemtl)
+
+        self.report(
+            {'INFO'},
+            'Moved objects: {0}. Game materials: {1}'.format(
+                moved_count,
+                ', '.join(sorted(gamemtls))
+            )
+        )
+
+        return {'FINISHED'}
+
+    def invoke(self, context, event):    # pragma: no cover
+        wm = context.window_manager
+        return wm.invoke_props_dialog(self)
+
+
+classes = (XRAY_OT_drop_to_cform, )
+
+
+def register():
+    utils.version.register_classes(classes)
+
+
+def unregister():
+    for operator in reversed(classes):
+        bpy.utils.unregister_class(operator)
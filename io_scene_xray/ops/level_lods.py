@@ -0,0 +1,362 @@
+# blender modules
+import bpy
+import bmesh
+import numpy
+
+# addon modules
+from .. import formats
+from .. import utils
+
+
+mode_items = (
+    ('ACTIVE_LEVEL', 'Active Level', ''),
+    ('SELECTED_LEVELS', 'Selected Levels', ''),
+    ('ALL_LEVELS', 'All Levels', ''),
+
+    ('ACTIVE_OBJECT', 'Active Object', ''),
+    ('SELECTED_OBJECTS', 'Selected Objects', '')
+)
+
+
+def _is_lod(obj):
+    xray = obj.xray
+    return (
+        xray.is_level and
+        xray.level.object_type == 'VISUAL' and
+        xray.level.visual_type == 'LOD'
+    )
+
+
+def _collect_lods(obj, lods):
+    for child_obj in obj.children:
+        if _is_lod(child_obj):
+            lods.append(child_obj)
+        else:
+            _collect_lods(child_obj, lods)
+
+
+def _get_lods_groups(mode):
+    # lod objects of every atlas: [(atlas name, lods), ...]
+    groups = []
+
+    if mode in ('ACTIVE_LEVEL', 'SELECTED_LEVELS', 'ALL_LEVELS'):
+        if mode == 'ACTIVE_LEVEL':
+            objs = [bpy.context.active_object, ]
+        elif mode == 'SELECTED_LEVELS':
+            objs = bpy.context.selected_objects
+        else:
+            objs = bpy.data.objects
+
+        for obj in objs:
+            if obj and obj.xray.level.object_type == 'LEVEL':
+                lods = []
+                _collect_lods(obj, lods)
+                if lods:
+                    groups.append((obj.name + ' lods', lods))
+
+    else:
+        if mode == 'ACTIVE_OBJECT':
+            objs = [bpy.context.active_object, ]
+        else:
+            objs = bpy.context.selected_objects
+
+        lods = [obj for obj in objs if obj and _is_lod(obj)]
+        if lods:
+            groups.append(('lods', lods))
+
+    return groups
+
+
+def _get_visual_meshes(lod_obj):
+    meshes = []
+    objs = list(lod_obj.children)
+
+    while objs:
+        obj = objs.pop()
+        if obj.xray.level.visual_type == 'FASTPATH':
+            continue
+        if obj.type == 'MESH':
+            meshes.append(obj)
+        objs.extend(obj.children)
+
+    return meshes
+
+
+def _get_image_pixels(bpy_image, images):
+    # rgba pixels array of image, loaded once
+    if bpy_image.name in images:
+        return images[bpy_image.name]
+
+    width, height = bpy_image.size
+    channels = bpy_image.channels
+    pixels = None
+
+    if width and height and channels:
+        if hasattr(bpy_image.pixels, 'foreach_get'):
+            pixels = numpy.empty(width * height * channels, dtype=numpy.float32)
+            bpy_image.pixels.foreach_get(pixels)
+        else:
+            pixels = numpy.array(bpy_image.pixels[ : ], dtype=numpy.float32)
+
+        pixels = pixels.reshape(height, width, channels)
+
+        if channels < 4:
+            rgba = numpy.ones((height, width, 4), dtype=numpy.float32)
+            rgba[ : , : , : channels] = pixels
+            if channels == 1:
+                rgba[ : , : , 1 : 3] = pixels
+            pixels = rgba
+
+    images[bpy_image.name] = pixels
+
+    return pixels
+
+
+def _get_diffuse_image(material):
+    lmaps = (material.xray.lmap_0, material.xray.lmap_1)
+
+    for bpy_image in utils.cache.get_material_images(material):
+        if bpy_image.name not in lmaps:
+            return bpy_image
+
+
+def _get_layer_data(bpy_mesh, name, default):
+    if name and name in bpy_mesh.vertex_colors:
+        return utils.mesh.get_color_layer_data(bpy_mesh, name)
+
+    colors = numpy.empty((len(bpy_mesh.loops), 3), dtype=numpy.float32)
+    colors[ : ] = default
+
+    return colors
+
+
+def _get_mesh_data(lod_obj, mesh_obj, images, images_pixels):
+    # triangles corners of the visual in the lod object space
+    bm = bmesh.new()
+    bm.from_mesh(mesh_obj.data)
+    bmesh.ops.triangulate(bm, faces=bm.faces)
+    bpy_mesh = bpy.data.meshes.new('.lod-temp-mesh')
+    bm.to_mesh(bpy_mesh)
+    bm.free()
+
+    verts_indices = utils.mesh.get_data_array(
+        bpy_mesh.loops,
+        'vertex_index',
+        dtype=numpy.int32
+    )
+    coords = utils.mesh.get_data_array(bpy_mesh.vertices, 'co', 3)
+    materials_indices = utils.mesh.get_data_array(
+        bpy_mesh.polygons,
+        'material_index',
+        dtype=numpy.int32
+    )
+
+    matrix = numpy.array(lod_obj.matrix_world.inverted())
+    matrix = matrix @ numpy.array(mesh_obj.matrix_world)
+    positions = coords[verts_indices] @ matrix[ : 3, : 3].T + matrix[ : 3, 3]
+
+    # vertex light
+    material = None
+    if bpy_mesh.materials:
+        material = bpy_mesh.materials[0]
+
+    if material:
+        xray = material.xray
+        light_name = xray.light_vert_color
+        hemi_name = xray.hemi_vert_color
+        sun_name = xray.sun_vert_color
+        uv_name = xray.uv_texture
+    else:
+        light_name = hemi_name = sun_name = uv_name = None
+
+    defaults = utils.billboard.DEFAULT_LIGHTS
+    light = _get_layer_data(bpy_mesh, light_name, defaults[0 : 3])
+    hemi = _get_layer_data(bpy_mesh, hemi_name, defaults[3])
+    sun = _get_layer_data(bpy_mesh, sun_name, defaults[4])
+    lights = numpy.column_stack((
+        light,
+        hemi.mean(axis=1),
+        sun.mean(axis=1)
+    ))
+
+    # texture coordinates and images
+    uv_layer = bpy_mesh.uv_layers.get(uv_name or '', bpy_mesh.uv_layers.active)
+
+    if uv_layer:
+        uvs = utils.mesh.get_data_array(uv_layer.data, 'uv', 2)
+    else:
+        uvs = numpy.zeros((len(bpy_mesh.loops), 2), dtype=numpy.float32)
+
+    images_indices = numpy.zeros(len(materials_indices), dtype=numpy.int64)
+    for material_index, material in enumerate(bpy_mesh.materials):
+        pixels = None
+        if material:
+            bpy_image = _get_diffuse_image(material)
+            if bpy_image:
+                pixels = _get_image_pixels(bpy_image, images_pixels)
+        images_indices[materials_indices == material_index] = len(images)
+        images.append(pixels)
+
+    bpy.data.meshes.remove(bpy_mesh)
+
+    return (
+        positions.reshape(-1, 3, 3),
+        lights.reshape(-1, 3, 5),
+        uvs.reshape(-1, 3, 2),
+        images_indices
+    )
+
+
+def _create_lod_mesh(lod_obj, quads, quads_lights, uvs):
+    verts = quads.reshape(-1, 3).tolist()
+    faces = [
+        [face_index * 4 + vert_index for vert_index in range(4)]
+        for face_index in range(utils.billboard.LOD_SAMPLES)
+    ]
+
+    bpy_mesh = bpy.data.meshes.new(lod_obj.data.name)
+    bpy_mesh.from_pydata(verts, (), faces)
+    for material in lod_obj.data.materials:
+        bpy_mesh.materials.append(material)
+
+    quads_lights = numpy.clip(quads_lights.reshape(-1, 5), 0.0, 1.0)
+    lights = {
+        'rgb': [
+            (red, green, blue, 1.0)
+            for red, green, blue in quads_lights[ : , 0 : 3].tolist()
+        ],
+        'hemi': quads_lights[ : , 3].tolist(),
+        'sun': quads_lights[ : , 4].tolist()
+    }
+
+    lod = formats.ogf.imp.lod
+    layers = lod.create_lod_layers(bpy_mesh)
+    lod.assign_lod_layers_values(
+        bpy_mesh,
+        [tuple(uv) for uv in uvs.reshape(-1, 2).tolist()],
+        lights,
+        *layers
+    )
+
+    old_mesh = lod_obj.data
+    lod_obj.data = bpy_mesh
+    if not old_mesh.users:
+        bpy.data.meshes.remove(old_mesh)
+
+
+def _create_atlas(name, pixels):
+    height, width = pixels.shape[ : 2]
+    atlas = bpy.data.images.get(name)
+
+    if atlas is None:
+        atlas = bpy.data.images.new(name, width, height, alpha=True)
+    elif tuple(atlas.size) != (width, height):
+        atlas.scale(width, height)
+
+    if hasattr(atlas.pixels, 'foreach_set'):
+        atlas.pixels.foreach_set(pixels.ravel())
+    else:
+        atlas.pixels[ : ] = pixels.ravel().tolist()
+
+    return atlas
+
+
+def generate_lods(lods, atlas_name, tile_size, create_atlas):
+    lods_in_row, rows_count = utils.billboard.get_atlas_layout(len(lods))
+    images_pixels = {}
+
+    if create_atlas:
+        atlas_pixels = numpy.zeros((
+            rows_count * tile_size,
+            lods_in_row * utils.billboard.LOD_SAMPLES * tile_size,
+            4
+        ), dtype=numpy.float32)
+
+    for lod_index, lod_obj in enumerate(lods):
+        data = []
+        images = []
+        for mesh_obj in _get_visual_meshes(lod_obj):
+            data.append(_get_mesh_data(lod_obj, mesh_obj, images, images_pixels))
+
+        if data:
+            positions, lights, uvs, images_indices = [
+                numpy.concatenate(arrays)
+                for arrays in zip(*data)
+            ]
+        else:
+            positions = lights = uvs = images_indices = ()
+
+        quads, quads_lights, tiles = utils.billboard.build_billboards(
+            positions,
+            lights,
+            uvs=uvs if data else None,
+            images=images,
+            images_indices=images_indices,
+            tile_size=tile_size
+        )
+        uvs = utils.billboard.get_atlas_uvs(lod_index, lods_in_row, rows_count)
+        _create_lod_mesh(lod_obj, quads, quads_lights, uvs)
+
+        if create_atlas:
+            utils.billboard.put_atlas_tiles(
+                atlas_pixels,
+                tiles,
+                lod_index,
+                lods_in_row,
+                rows_count
+            )
+
+    if create_atlas:
+        _create_atlas(atlas_name, atlas_pixels)
+
+
+class XRAY_OT_generate_level_lods(utils.ie.BaseOperator):
+    bl_idname = 'io_scene_xray.generate_level_lods'
+    bl_label = 'Generate Level LODs'
+    bl_description = 'Generate LOD billboards of the LOD visuals children'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mode = bpy.props.EnumProperty(default='ACTIVE_LEVEL', items=mode_items)
+    tile_size = bpy.props.IntProperty(
+        name='Tile Size',
+        default=utils.billboard.TILE_SIZE,
+        min=8,
+        max=512
+    )
+    create_atlas = bpy.props.BoolProperty(name='Create Atlas', default=True)
+
+    def draw(self, context):    # pragma: no cover
+        col = self.layout.column(align=True)
+
+        col.label(text='Mode:')
+        col.prop(self, 'mode', expand=True)
+
+        col.prop(self, 'tile_size')
+        col.prop(self, 'create_atlas')
+
+    def execute(self, context):
+        lods_count = 0
+
+        for atlas_name, lods in _get_lods_groups(self.mode):
+            generate_lods(lods, atlas_name, self.tile_size, self.create_atlas)
+            lods_count += len(lods)
+
+        self.report({'INFO'}, 'Generated LODs: {}'.format(lods_count))
+
+        return {'FINISHED'}
+
+    def invoke(self, context, event):    # pragma: no cover
+        wm = context.window_manager
+        return wm.invoke_props_dialog(self)
+
+
+classes = (XRAY_OT_generate_level_lods, )
+
+
+def register():
+    utils.version.register_classes(classes)
+
+
+def unregister():
+    for operator in reversed(classes):
+        bpy.utils.unregister_class(operator)
@@ -111,6 +111,14 @@ def init_browser(self, context, filepath):
         )
 
 
+def get_scan_info(file_path):
+    # motions names, lengths and offsets are cached on disk
+    cache = formats.scan.get_cache()
+    scan_info = cache.get_info(file_path)
+    cache.save()
+    return scan_info
+
+
 class SklsFile():
     '''
     Used to read animations from .skls file.
@@ -132,24 +140,15 @@ class SklsFile():
 
     def _index_animations(self):
         '''
-        Fills the cache (self.animations) by
-        processing entire binary blob
+        Fills the cache (self.animations) from
+        the scan results of the file
         '''
-        animations_count = self.reader.uint32()
-        for anim_index in range(animations_count):
-            # index animation
-            # first byte of the animation name
-            offset = self.reader.offset()
-            # animation name
-            name = self.reader.gets()
-            offset_skip = self.reader.offset()
-            frame_start, frame_end = self.reader.getf('<2I')
-            length = int(frame_end - frame_start)
+        scan_info = get_scan_info(self.file_path)
+        if scan_info is None:
+            scan_info = formats.scan.scan_skls(self.reader.getv())
+
+        for name, length, offset, anim_index in scan_info['motions']:
             self.animations[name] = (offset, length, anim_index)
-            # skip the rest bytes of skl animation to the next animation
-            self.reader.set_offset(offset_skip)
-            skip = formats.motions.imp.skip_motion_rest(self.reader.getv(), 0)
-            self.reader.skip(skip)
 
 
 class OmfFile():
@@ -196,21 +195,11 @@ class OmfFile():
         motions_data = chunks.pop(formats.ogf.fmt.Chunks_v4.S_MOTIONS_2)
         self.reader = rw.read.PackedReader(motions_data)
 
-        count_chunk, count_size, motions_count = self.reader.getf('<3I')
-
-        for anim_index in range(motions_count):
-            chunk_id, chunk_size = self.reader.getf('<2I')
-            motion_id = chunk_id - 1
-            # index animation
-            # first byte of the animation name
-            offset = self.reader.offset()
-
-            # animation name
-            try:
-                name = self.reader.gets()
-            except:
-                name = None
+        scan_info = get_scan_info(self.file_path)
+        if scan_info is None:
+            scan_info = formats.scan.scan_omf(file_data)
 
+        for name, length, offset, motion_id in scan_info['motions']:
             motion_params = None
             if name:
                 motion_params = self.motions_params.by_dict.get(name, None)
@@ -218,10 +207,7 @@ class OmfFile():
                 motion_params = self.motions_params.by_list[motion_id]
                 name = motion_params.name
 
-            length = self.reader.uint32()
             self.animations[name] = (offset, length, motion_id)
-            # skip the rest bytes of omf animation to the next animation
-            formats.omf.imp.skip_motion(self.reader, self.bone_names, length)
 
 
 class XRAY_OT_browse_motions_file(BaseBrowserOperator):
@@ -7,6 +7,7 @@ import bpy
 
 # addon modules
 from .. import log
+from .. import formats
 from .. import utils
 from .. import text
 
@@ -55,6 +56,11 @@ class XRAY_UL_viewer_list_item(bpy.types.UIList):
                 row.alignment = 'RIGHT'
                 row.label(text=item.date)
 
+            if context.scene.xray.viewer.show_info:
+                row = row.row()
+                row.alignment = 'RIGHT'
+                row.label(text=item.info)
+
 
 def get_size_label(size):
 
@@ -374,6 +380,10 @@ def update_file_list(directory, active_folder=None):
     vwr.dirs_count = 0
     files_size = 0
 
+    # headers info of files is cached on disk
+    if vwr.show_info:
+        scan_cache = formats.scan.get_cache()
+
     for group_key in groups_keys:
         files_list = file_groups[group_key]
         if group_key:    # folders
@@ -395,9 +405,15 @@ def update_file_list(directory, active_folder=None):
             else:
                 vwr.files_count += 1
                 files_size += size
+                if vwr.show_info:
+                    info = scan_cache.get_info(file_path)
+                    file.info = formats.scan.get_info_label(info)
 
             file_index += 1
 
+    if vwr.show_info:
+        scan_cache.save()
+
     if files_size > (2 ** MB_FLAG_OFFSET - 1):
         files_size = int(round(files_size / MB, 0))
         files_size |= MB_FLAG
@@ -597,6 +613,7 @@ class XRayViwerFileProperties(bpy.types.PropertyGroup):
     is_dir = bpy.props.BoolProperty(name='Directory')
     size = bpy.props.IntProperty(name='Size')
     date = bpy.props.StringProperty(name='Date')
+    info = bpy.props.StringProperty(name='Info')
 
 
 class XRayViewerProps(bpy.types.PropertyGroup):
@@ -618,6 +635,11 @@ class XRayViewerProps(bpy.types.PropertyGroup):
     )
     show_size = bpy.props.BoolProperty(default=False, name='Show Size')
     show_date = bpy.props.BoolProperty(default=False, name='Show Date')
+    show_info = bpy.props.BoolProperty(
+        default=False,
+        name='Show Info',
+        update=update_file_list_ext
+    )
     sort = bpy.props.EnumProperty(
         name='Sort',
         items=(
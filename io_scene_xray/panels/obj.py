@@ -70,6 +70,11 @@ def draw_motion_list_elements(layout):
         text='',
         icon='X'
     )
+    layout.operator(
+        ui.motion_list.XRAY_OT_load_motion_stubs.bl_idname,
+        text='',
+        icon='IMPORT'
+    )
     layout.operator(
         ui.motion_list.XRAY_OT_copy_actions.bl_idname,
         text='',
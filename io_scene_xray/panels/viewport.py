@@ -185,6 +185,7 @@ class XRAY_PT_viewer(ui.base.XRayPanel):
                 col_1.prop(viewer_props, 'ignore_ext')
                 col_2.prop(viewer_props, 'show_size')
                 col_2.prop(viewer_props, 'show_date')
+                col_2.prop(viewer_props, 'show_info')
                 col_2.prop(viewer_props, 'group_by_ext')
 
                 row = box.row(align=True)
@@ -461,6 +462,14 @@ class XRAY_PT_batch_tools(ui.base.XRayPanel):
             ops.level_shaders.XRAY_OT_remove_level_shader_nodes.bl_idname,
             icon='CANCEL'
         )
+        column.operator(
+            ops.level_lods.XRAY_OT_generate_level_lods.bl_idname,
+            icon='IMAGE_DATA'
+        )
+        column.operator(
+            ops.level_cform.XRAY_OT_drop_to_cform.bl_idname,
+            icon='SNAP_FACE'
+        )
         column.operator(
             ops.fake_user.XRAY_OT_change_fake_user.bl_idname,
             icon=utils.version.get_icon('FONT_DATA')
@@ -131,6 +131,18 @@ prefs_props = {
         default=False,
         name='Print Batch Import/Export Status to the Console'
     ),
+    'use_parallel_import': bpy.props.BoolProperty(
+        default=False,
+        name='Parse Imported Files in Parallel Threads'
+    ),
+    'use_stats_memory': bpy.props.BoolProperty(
+        default=False,
+        name='Sample Memory Allocations of Import/Export Stages'
+    ),
+    'stats_trace_file': bpy.props.StringProperty(
+        subtype='FILE_PATH',
+        name='Statistics Trace File'
+    ),
 
     'paths_mode': bpy.props.EnumProperty(
         default='BASE',
@@ -205,6 +217,8 @@ prefs_props = {
     'ogf_export_fmt_ver': formats.ie.PropSDKVersion(),
     'ogf_export_hq_motions': formats.ie.prop_omf_high_quality(),
     'ogf_export_use_export_paths': formats.ie.PropUseExportPaths(),
+    'ogf_export_compress_chunks': formats.ie.prop_compress_chunks(),
+    'ogf_export_optimize_indices': formats.ie.prop_optimize_indices(),
 
     # omf import props
     'omf_import_motions': formats.ie.PropObjectMotionsImport(),
@@ -216,6 +230,7 @@ prefs_props = {
     'omf_export_mode': formats.ie.prop_omf_export_mode(),
     'omf_motions_export': formats.ie.PropObjectMotionsExport(),
     'omf_high_quality': formats.ie.prop_omf_high_quality(),
+    'omf_export_compress_chunks': formats.ie.prop_compress_chunks(),
 
     # scene selection import props
     'scene_selection_sdk_version': formats.ie.PropSDKVersion(),
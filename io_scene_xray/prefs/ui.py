@@ -319,6 +319,8 @@ def draw_defaults(prefs):
         box.prop(prefs, 'ogf_export_hq_motions')
         box.prop(prefs, 'ogf_export_use_export_paths')
         box.prop(prefs, 'ogf_texture_names_from_path')
+        box.prop(prefs, 'ogf_export_compress_chunks')
+        box.prop(prefs, 'ogf_export_optimize_indices')
 
     elif prefs.defaults_category == 'OMF':
         # import
@@ -336,6 +338,7 @@ def draw_defaults(prefs):
         box.prop(prefs, 'omf_motions_export')
         box.prop(prefs, 'omf_export_bone_parts')
         box.prop(prefs, 'omf_high_quality')
+        box.prop(prefs, 'omf_export_compress_chunks')
 
     elif prefs.defaults_category == 'SCENE':
         box = layout.box()
@@ -552,6 +555,12 @@ def draw_others(prefs):
     prop_bool(layout, prefs, 'compact_menus')
     prop_bool(layout, prefs, 'check_updates')
     prop_bool(layout, prefs, 'use_batch_status')
+    prop_bool(layout, prefs, 'use_parallel_import')
+    prop_bool(layout, prefs, 'use_stats_memory')
+
+    split = utils.version.layout_split(layout, 0.4)
+    split.label(text='Statistics Trace File:')
+    split.prop(prefs, 'stats_trace_file', text='')
     prop_bool(layout, prefs, 'object_split_normals')
 
     box = layout.box()
@@ -131,11 +131,20 @@ def update_motion_collection_index(self, context):
     obj = context.active_object
     xray = obj.xray
 
+    motion_index = xray.motions_collection_index
+    if motion_index >= len(xray.motions_collection):
+        return
+    motion = xray.motions_collection[motion_index]
+
+    # the stub of lazy import is decoded on the first selection
+    if motion.stub_file and obj.type == 'ARMATURE':
+        # the operator reports the errors
+        bpy.ops.io_scene_xray.load_motion_stubs(active_only=True)
+
     if not xray.play_active_motion:
         return
 
-    motion_index = xray.motions_collection_index
-    motion_name = xray.motions_collection[motion_index].name
+    motion_name = motion.name
 
     if not bpy.data.actions.get(motion_name):
         return
@@ -409,6 +418,12 @@ def update_load_active_motion_refs(self, context):
 class MotionRef(bpy.types.PropertyGroup):
     name = bpy.props.StringProperty()
     export_name = bpy.props.StringProperty(update=update_export_name)
+    # not decoded motion of lazy omf import: file, offset and chunk id
+    # of motion, size and modification time of file as string
+    stub_file = bpy.props.StringProperty()
+    stub_offset = bpy.props.IntProperty()
+    stub_chunk = bpy.props.IntProperty()
+    stub_file_stamp = bpy.props.StringProperty()
 
 
 def get_isroot(self):
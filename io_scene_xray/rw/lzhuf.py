@@ -7,6 +7,10 @@
 # LZHUF.C (c)1989 by Haruyasu Yoshizaki, Haruhiko Okumura, and Kenji Rikitake.
 # All rights reserved. Permission granted for non-commercial use.
 
+# standart modules
+import struct
+
+
 # Huffman coding
 
 N = 4096    # buffer size
@@ -23,19 +27,18 @@ N_MASK = N - 1
 class error(Exception): pass
 
 
-def decompress_buffer(buffer: bytearray, textsize: int) -> bytearray:
+def _decompress_reference(buffer: bytearray, textsize: int) -> bytearray:
+    # line-by-line port of the original Decode(), kept as a reference
     buffer_pos = 0
     buffer_size = len(buffer)
 
-    end_of_stream = False
     def getcz():
-        nonlocal buffer_pos, buffer_size, end_of_stream
-        if buffer_pos == buffer_size:
-            end_of_stream = True
-            return 0
-        result = buffer[buffer_pos]
+        nonlocal buffer_pos
+        # zeros are read past the end of the buffer
         buffer_pos += 1
-        return result
+        if buffer_pos > buffer_size:
+            return 0
+        return buffer[buffer_pos - 1]
 
     getbuf = 0
     getlen = 0
@@ -198,7 +201,8 @@ def decompress_buffer(buffer: bytearray, textsize: int) -> bytearray:
     r = N - F
     count = 0
     while count < textsize:
-        if end_of_stream:
+        # the codes that are already decoded used bits past the end
+        if buffer_pos * 8 - getlen > buffer_size * 8:
             raise error('End of compressed stream')
 
         c = DecodeChar()
@@ -220,6 +224,478 @@ def decompress_buffer(buffer: bytearray, textsize: int) -> bytearray:
     return result
 
 
+
+def _start_huff():
+    # initial state of the huffman tree, see StartHuff()
+    freq = [0] * (T + 1)
+    prnt = [0] * (T + N_CHAR)
+    son = [0] * T
+
+    for i in range(N_CHAR):
+        freq[i] = 1
+        son[i] = i + T
+        prnt[i + T] = i
+
+    i, j = 0, N_CHAR
+    while j <= R:
+        freq[j] = freq[i] + freq[i + 1]
+        son[j] = i
+        prnt[i] = prnt[i + 1] = j
+        i += 2
+        j += 1
+    freq[T] = 0xffff
+    prnt[R] = 0
+
+    return freq, prnt, son
+
+
+def _reconst(freq, prnt, son):
+    # same as reconst() of the reference decoder
+    j = 0
+    for i in range(T):
+        if son[i] >= T:
+            freq[j] = (freq[i] + 1) // 2
+            son[j] = son[i]
+            j += 1
+
+    i, j = 0, N_CHAR
+    while j < T:
+        f = freq[j] = freq[i] + freq[i + 1]
+
+        k = j - 1
+        while f < freq[k]:
+            k -= 1
+        k += 1
+
+        freq[k + 1 : j + 1] = freq[k : j]
+        son[k + 1 : j + 1] = son[k : j]
+
+        freq[k] = f
+        son[k] = i
+        i += 2
+        j += 1
+
+    for i in range(T):
+        k = son[i]
+        if k >= T:
+            prnt[k] = i
+        else:
+            prnt[k] = prnt[k + 1] = i
+
+
+def _decompress_python(buffer: bytearray, textsize: int) -> bytearray:
+    # Table-driven decoder. The huffman tree is adaptive, so characters
+    # are still decoded by walking it, but the walk and the tree update
+    # are inlined, bits are taken from a 64-bit window refilled with
+    # whole 32-bit words, positions are decoded with a single lookup
+    # in the 14-bit position table and matches are copied with slices.
+
+    size = len(buffer)
+
+    # zeros are read past the end of the buffer
+    end_bit = 8 * size
+
+    padding = b'\x00' * (_WINDOW_PADDING - size % 4)
+    data = bytes(buffer) + padding
+    words = struct.unpack('>{}I'.format(len(data) // 4), data)
+    word_index = 0
+    window = 0
+    bits = 0
+
+    freq, prnt, son = _start_huff()
+    tree_size = T
+    root = R
+    max_freq = MAX_FREQ
+    window_mask = _WINDOW_MASK
+    pos_value = _POS_VALUE
+    pos_unused = _POS_UNUSED
+
+    # the output starts with the initial contents of the
+    # ring buffer, so that matches can be copied from it
+    result = bytearray(_HISTORY)
+    append = result.append
+    end = N + textsize
+
+    while len(result) < end:
+        if bits < 32:
+            window = ((window << 32) | words[word_index]) & window_mask
+            word_index += 1
+            bits += 32
+
+        if (word_index << 5) - bits > end_bit:
+            raise error('End of compressed stream')
+
+        # decode char
+        c = son[root]
+        while c < tree_size:
+            bits -= 1
+            c = son[c + ((window >> bits) & 1)]
+        c -= tree_size
+
+        # update tree
+        if freq[root] == max_freq:
+            _reconst(freq, prnt, son)
+
+        node = prnt[c + tree_size]
+        while True:
+            k = freq[node] + 1
+            freq[node] = k
+
+            # if the order is disturbed, exchange nodes
+            l = node + 1
+            if k > freq[l]:
+                while k > freq[l + 1]:
+                    l += 1
+                freq[node] = freq[l]
+                freq[l] = k
+
+                i = son[node]
+                prnt[i] = l
+                if i < tree_size:
+                    prnt[i + 1] = l
+
+                j = son[l]
+                son[l] = i
+
+                prnt[j] = node
+                if j < tree_size:
+                    prnt[j + 1] = node
+                son[node] = j
+
+                node = l
+            node = prnt[node]
+            if node == 0:
+                break
+
+        if c < 256:
+            append(c)
+            continue
+
+        # decode position
+        if bits < 14:
+            window = ((window << 32) | words[word_index]) & window_mask
+            word_index += 1
+            bits += 32
+        bits -= 14
+        code = (window >> bits) & 0x3fff
+        bits += pos_unused[code]
+        distance = pos_value[code] + 1
+
+        # copy match
+        length = c - 255 + THRESHOLD
+        start = len(result) - distance
+        if distance >= length:
+            result += result[start : start + length]
+        else:
+            repeat = result[start : ]
+            result += (repeat * (length // distance + 1))[ : length]
+
+    del result[ : N]
+    return result
+
+
+class Compressor:
+    # Streaming encoder, see Encode() of the original source.
+    # Data is passed in parts with compress(), the encoded bits
+    # produced so far are returned and flush() finishes the stream.
+    # The size of the text is not written, the caller stores it.
+
+    def __init__(self):
+        self._freq, self._prnt, self._son = _start_huff()
+
+        # binary search trees of the dictionary, N means "nil"
+        self._lson = [N] * (N + 1)
+        self._rson = [N] * (N + 257)
+        self._dad = [N] * (N + 1)
+
+        self._text_buf = bytearray(N + F - 1)
+        self._text_buf[ : N - F] = b' ' * (N - F)
+        self._match = [0, 0]    # position, length
+
+        self._input = bytearray()
+        self._input_pos = 0
+        self._output = bytearray()
+        self._put_buf = 0
+        self._put_len = 0
+
+        self._started = False
+        self._finished = False
+        self._s = 0
+        self._r = N - F
+        self._len = 0
+        self._last_match_length = 0
+
+    def compress(self, data):
+        if self._finished:
+            raise error('Compressor is already flushed')
+        self._input += data
+        self._encode(False)
+        return self._take_output()
+
+    def flush(self):
+        if not self._finished:
+            self._encode(True)
+            self._finished = True
+
+            # EncodeEnd()
+            if self._put_len:
+                self._output.append(
+                    (self._put_buf << (8 - self._put_len)) & 0xff
+                )
+                self._put_len = 0
+
+        return self._take_output()
+
+    def _take_output(self):
+        output = self._output
+        self._output = bytearray()
+        return output
+
+    def _encode(self, final):
+        freq = self._freq
+        prnt = self._prnt
+        son = self._son
+        lson = self._lson
+        rson = self._rson
+        dad = self._dad
+        text_buf = self._text_buf
+        match = self._match
+        data = self._input
+        data_pos = self._input_pos
+        data_size = len(data)
+        output = self._output
+        put_buf = self._put_buf
+        put_len = self._put_len
+        p_code = _P_CODE
+        p_len = _P_LEN
+
+        def insert_node(r):
+            cmp = 1
+            p = N + 1 + text_buf[r]
+            rson[r] = lson[r] = N
+            match[1] = 0
+
+            while True:
+                if cmp >= 0:
+                    if rson[p] != N:
+                        p = rson[p]
+                    else:
+                        rson[p] = r
+                        dad[r] = p
+                        return
+                else:
+                    if lson[p] != N:
+                        p = lson[p]
+                    else:
+                        lson[p] = r
+                        dad[r] = p
+                        return
+
+                i = 1
+                while i < F:
+                    cmp = text_buf[r + i] - text_buf[p + i]
+                    if cmp:
+                        break
+                    i += 1
+
+                if i > THRESHOLD:
+                    if i > match[1]:
+                        match[0] = ((r - p) & N_MASK) - 1
+                        match[1] = i
+                        if i >= F:
+                            break
+                    if i == match[1]:
+                        c = ((r - p) & N_MASK) - 1
+                        if c < match[0]:
+                            match[0] = c
+
+            # replace the old node by the new one
+            dad[r] = dad[p]
+            lson[r] = lson[p]
+            rson[r] = rson[p]
+            dad[lson[p]] = r
+            dad[rson[p]] = r
+            if rson[dad[p]] == p:
+                rson[dad[p]] = r
+            else:
+                lson[dad[p]] = r
+            dad[p] = N
+
+        def delete_node(p):
+            if dad[p] == N:
+                return    # not registered
+            if rson[p] == N:
+                q = lson[p]
+            elif lson[p] == N:
+                q = rson[p]
+            else:
+                q = lson[p]
+                if rson[q] != N:
+                    while rson[q] != N:
+                        q = rson[q]
+                    rson[dad[q]] = lson[q]
+                    dad[lson[q]] = dad[q]
+                    lson[q] = lson[p]
+                    dad[lson[p]] = q
+                rson[q] = rson[p]
+                dad[rson[p]] = q
+            dad[q] = dad[p]
+            if rson[dad[p]] == p:
+                rson[dad[p]] = q
+            else:
+                lson[dad[p]] = q
+            dad[p] = N
+
+        def encode_char(c):
+            nonlocal put_buf, put_len
+
+            # travel from leaf to root
+            code = 0
+            code_len = 0
+            k = prnt[c + T]
+            while True:
+                code |= (k & 1) << code_len
+                code_len += 1
+                k = prnt[k]
+                if k == R:
+                    break
+
+            put_buf = (put_buf << code_len) | code
+            put_len += code_len
+            while put_len >= 8:
+                put_len -= 8
+                output.append((put_buf >> put_len) & 0xff)
+            put_buf &= (1 << put_len) - 1
+
+            # update tree
+            if freq[R] == MAX_FREQ:
+                _reconst(freq, prnt, son)
+
+            c = prnt[c + T]
+            while True:
+                k = freq[c] + 1
+                freq[c] = k
+
+                l = c + 1
+                if k > freq[l]:
+                    while k > freq[l + 1]:
+                        l += 1
+                    freq[c] = freq[l]
+                    freq[l] = k
+
+                    i = son[c]
+                    prnt[i] = l
+                    if i < T:
+                        prnt[i + 1] = l
+
+                    j = son[l]
+                    son[l] = i
+
+                    prnt[j] = c
+                    if j < T:
+                        prnt[j + 1] = c
+                    son[c] = j
+
+                    c = l
+                c = prnt[c]
+                if c == 0:
+                    break
+
+        def encode_position(c):
+            nonlocal put_buf, put_len
+
+            # upper 6 bits by table lookup, lower 6 bits verbatim
+            upper = c >> 6
+            code_len = p_len[upper] + 6
+            put_buf = (put_buf << code_len) | p_code[upper] | (c & 0x3f)
+            put_len += code_len
+            while put_len >= 8:
+                put_len -= 8
+                output.append((put_buf >> put_len) & 0xff)
+            put_buf &= (1 << put_len) - 1
+
+        s = self._s
+        r = self._r
+        length = self._len
+
+        if not self._started:
+            if data_size - data_pos < F and not final:
+                return
+            self._started = True
+
+            while length < F and data_pos < data_size:
+                text_buf[r + length] = data[data_pos]
+                data_pos += 1
+                length += 1
+
+            if length:
+                for i in range(1, F + 1):
+                    insert_node(r - i)
+                insert_node(r)
+
+        last_match_length = self._last_match_length
+
+        while length > 0:
+            if not last_match_length:
+                if match[1] > length:
+                    match[1] = length
+                if match[1] <= THRESHOLD:
+                    match[1] = 1
+                    encode_char(text_buf[r])
+                else:
+                    encode_char(255 - THRESHOLD + match[1])
+                    encode_position(match[0])
+                last_match_length = match[1]
+
+            # wait for the next part of the input data
+            if data_size - data_pos < last_match_length and not final:
+                break
+
+            i = 0
+            while i < last_match_length and data_pos < data_size:
+                c = data[data_pos]
+                data_pos += 1
+                delete_node(s)
+                text_buf[s] = c
+                if s < F - 1:
+                    text_buf[s + N] = c
+                s = (s + 1) & N_MASK
+                r = (r + 1) & N_MASK
+                insert_node(r)
+                i += 1
+
+            while i < last_match_length:
+                i += 1
+                delete_node(s)
+                s = (s + 1) & N_MASK
+                r = (r + 1) & N_MASK
+                length -= 1
+                if length:
+                    insert_node(r)
+
+            last_match_length = 0
+
+        # drop the consumed input
+        if data_pos > N:
+            del data[ : data_pos]
+            data_pos = 0
+
+        self._input_pos = data_pos
+        self._s = s
+        self._r = r
+        self._len = length
+        self._last_match_length = last_match_length
+        self._put_buf = put_buf
+        self._put_len = put_len
+
+
+def compress_buffer(data):
+    compressor = Compressor()
+    result = compressor.compress(data)
+    result += compressor.flush()
+    return result
+
+
 # table for encoding and decoding the upper 6 bits of position
 
 D_CODE = tuple(code - 48
@@ -237,3 +713,91 @@ D_LEN = tuple(code - 48
 5555555555555555666666666666666666666666666666666666666666666666\
 7777777777777777777777777777777777777777777777778888888888888888\
 ')
+
+
+# 14-bit lookup tables of the position decoder:
+# 8-bit upper code and up to 6 verbatim bits.
+# _POS_VALUE holds the decoded position, _POS_UNUSED
+# the count of trailing bits that belong to the next code.
+
+_POS_VALUE = []
+_POS_UNUSED = []
+
+for _code in range(1 << 14):
+    _upper = _code >> 6
+    _unused = 8 - D_LEN[_upper]
+    _POS_VALUE.append((D_CODE[_upper] << 6) | ((_code >> _unused) & 0x3f))
+    _POS_UNUSED.append(_unused)
+
+_POS_VALUE = tuple(_POS_VALUE)
+_POS_UNUSED = tuple(_POS_UNUSED)
+
+# encoder tables of the upper 6 bits of position:
+# the code is stored left-aligned to the 6 verbatim bits
+_P_CODE = [0] * 64
+_P_LEN = [0] * 64
+
+for _code in range(255, -1, -1):
+    _upper = D_CODE[_code]
+    _P_LEN[_upper] = D_LEN[_code]
+    _P_CODE[_upper] = (_code >> (8 - D_LEN[_code])) << 6
+
+_P_CODE = tuple(_P_CODE)
+_P_LEN = tuple(_P_LEN)
+
+# initial contents of the ring buffer in the order of age
+_HISTORY = b'\x00' * F + b' ' * (N - F)
+
+_WINDOW_MASK = 0xffffffffffffffff
+_WINDOW_PADDING = 32
+
+
+
+# decompression backends
+
+_backends = {
+    'reference': _decompress_reference,
+    'python': _decompress_python
+}
+
+try:
+    # optional compiled extension with the same interface:
+    # decompress_buffer(buffer, textsize) -> bytes-like object
+    from . import _lzhuf_native
+    _backends['native'] = _lzhuf_native.decompress_buffer
+except ImportError:
+    pass
+
+if 'native' in _backends:
+    _backend_name = 'native'
+else:
+    _backend_name = 'python'
+
+_decompress = _backends[_backend_name]
+
+
+def get_backends():
+    return tuple(_backends.keys())
+
+
+def get_backend():
+    return _backend_name
+
+
+def register_backend(name, function):
+    _backends[name] = function
+
+
+def set_backend(name):
+    global _backend_name, _decompress
+
+    function = _backends.get(name)
+    if function is None:
+        raise error('Unknown lzhuf backend: {}'.format(name))
+
+    _backend_name = name
+    _decompress = function
+
+
+def decompress_buffer(buffer: bytearray, textsize: int) -> bytearray:
+    return _decompress(buffer, textsize)
@@ -1,13 +1,19 @@
 # standart modules
 import struct
+import collections.abc
 
 # blender modules
 try:
     import numpy
 
     NUMPY_FORMATS = {
-        'f': numpy.float32,
-        'I': numpy.uint32
+        'b': numpy.int8,
+        'B': numpy.uint8,
+        'H': numpy.uint16,
+        'h': numpy.int16,
+        'i': numpy.int32,
+        'I': numpy.uint32,
+        'f': numpy.float32
     }
 except:
     numpy = None
@@ -107,34 +113,126 @@ class PackedReader:
             self.__offs += prep.size
         return verts
 
+    @staticmethod
+    def get_dtype(fmt):
+        dtype_format = NUMPY_FORMATS.get(fmt, None)
+
+        if not dtype_format:
+            raise Exception('Unsupported numpy format: {}'.format(fmt))
+
+        return numpy.dtype(dtype_format).newbyteorder('<')
+
+    @staticmethod
+    def get_records_dtype(fields):
+        # fields: sequence of (name, struct format), for example:
+        # (('verts', '3I'), ('material', 'H'), ('sector', 'H'))
+        dtype_fields = []
+
+        for field_name, field_fmt in fields:
+            count = int(field_fmt[ : -1] or 1)
+            dtype = PackedReader.get_dtype(field_fmt[-1])
+
+            if count == 1:
+                dtype_fields.append((field_name, dtype))
+            else:
+                dtype_fields.append((field_name, dtype, (count, )))
+
+        return numpy.dtype(dtype_fields)
+
     def get_array(self, fmt, count, vec_len=1):
         if numpy:
-            dtype_format = NUMPY_FORMATS.get(fmt, None)
+            values = self.get_ndarray(fmt, count, vec_len=vec_len)
+            values = values.reshape(-1, vec_len).tolist()
+
+        else:
+            values = [
+                self.getf('<{0}{1}'.format(vec_len, fmt))
+                for _ in range(count)
+            ]
+
+        return values
 
-            if not dtype_format:
-                raise Exception('Unsupported numpy format: {}'.format(fmt))
+    def get_ndarray(self, fmt, count, vec_len=1):
+        # read-only array of values without conversion to python objects.
+        # the array references the reader data, it is not copied.
+        # without numpy, vec_len=1 values are returned as memoryview.
+        values_count = count * vec_len
+        offs = self._next(struct.calcsize('<' + fmt) * values_count)
 
-            dtype = numpy.dtype(dtype_format)
-            dtype = dtype.newbyteorder('<')
-            size = dtype.itemsize
+        if numpy:
             values = numpy.frombuffer(
                 self.__data,
-                dtype=dtype,
-                count=count * vec_len,
-                offset=self.__offs
+                dtype=self.get_dtype(fmt),
+                count=values_count,
+                offset=offs
             )
-            self.__offs += size * count * vec_len
-            values.shape = (values.shape[0] // vec_len, vec_len)
-            values = values.tolist()
+            if vec_len > 1:
+                values = values.reshape(count, vec_len)
+
+        elif vec_len == 1:
+            size = struct.calcsize('<' + fmt) * values_count
+            values = self._get_view()[offs : offs + size].cast(fmt)
 
         else:
+            prep = self.prep('{0}{1}'.format(vec_len, fmt))
             values = [
-                self.getf('<{0}{1}'.format(vec_len, fmt))
-                for _ in range(count)
+                prep.unpack_from(self.__data, offs + prep.size * index)
+                for index in range(count)
             ]
 
         return values
 
+    def get_records(self, fields, count):
+        # read-only structured array of records, the columns are
+        # accessed by field names. without numpy, list of tuples.
+        if numpy:
+            dtype = self.get_records_dtype(fields)
+            offs = self._next(dtype.itemsize * count)
+            records = numpy.frombuffer(
+                self.__data,
+                dtype=dtype,
+                count=count,
+                offset=offs
+            )
+
+        else:
+            prep = self.prep(''.join(field_fmt for _, field_fmt in fields))
+            offs = self._next(prep.size * count)
+            records = [
+                prep.unpack_from(self.__data, offs + prep.size * index)
+                for index in range(count)
+            ]
+
+        return records
+
+    def get_verts_ndarray(self, count, stride=12, offset=0):
+        # get vertex coordinates with swapped y and z,
+        # stride and offset are used for interleaved vertex data
+        offs = self._next(stride * count)
+
+        if numpy:
+            coords = numpy.ndarray(
+                shape=(count, 3),
+                dtype=self.get_dtype('f'),
+                buffer=self.__data,
+                offset=offs + offset,
+                strides=(stride, 4)
+            )
+            # fancy indexing makes a copy
+            verts = coords[ : , (0, 2, 1)]
+
+        else:
+            prep = self.__S_FFF
+            verts = [None, ] * count
+            for index in range(count):
+                co_x, co_y, co_z = prep.unpack_from(
+                    self.__data,
+                    offs + offset + stride * index
+                )
+                verts[index] = (co_x, co_z, co_y)
+
+        return verts
+
     def byte(self):
         return self.__data[self._next(1)]
 
@@ -196,13 +294,16 @@ class PackedReader:
             onerror(error)
             return str(bts, 'cp1251', errors='replace')
 
-    def getv(self):
+    def _get_view(self):
         view = self.__view
 
         if view is None:
             self.__view = view = memoryview(self.__data)
 
-        return view[self.__offs : ]
+        return view
+
+    def getv(self):
+        return self._get_view()[self.__offs : ]
 
     def get_size(self):
         return len(self.__data)
@@ -220,8 +321,24 @@ class PackedReader:
         return self.__offs >= len(self.__data)
 
 
+MASK_COMPRESSED = 0x80000000
+
+
+def _read_chunk_header(data, offs):
+    # chunk id, payload offset, payload size, compression flag
+    cid = FastBytes.int_at(data, offs)
+    size = FastBytes.int_at(data, offs + 4)
+    compressed = bool(cid & MASK_COMPRESSED)
+    return cid & ~MASK_COMPRESSED, offs + 8, size, compressed
+
+
+def _decompress_chunk(data, offs, size):
+    textsize = FastBytes.int_at(data, offs)
+    buffer = data[offs + 4 : offs + size]
+    return memoryview(lzhuf.decompress_buffer(buffer, textsize))
+
+
 class ChunkedReader:
-    __MASK_COMPRESSED = 0x80000000
     Errors = (lzhuf.error, )
 
     def __init__(self, data, ignore_compression=False):
@@ -239,20 +356,14 @@ class ChunkedReader:
         if offs >= len(data):
             raise StopIteration
 
-        cid = FastBytes.int_at(data, offs)
-        size = FastBytes.int_at(data, offs + 4)
-        offs += 8
+        cid, offs, size, compressed = _read_chunk_header(data, offs)
         self.__offs = offs + size
 
-        if cid & ChunkedReader.__MASK_COMPRESSED:
-            cid &= ~ChunkedReader.__MASK_COMPRESSED
-
+        if compressed:
             if (size == 0) or self.__ignore_compression:
                 return cid, data[offs : offs + size]
 
-            textsize = FastBytes.int_at(data, offs)
-            buffer = data[offs + 4 : offs + size]
-            return cid, memoryview(lzhuf.decompress_buffer(buffer, textsize))
+            return cid, _decompress_chunk(data, offs, size)
 
         return cid, data[offs : offs + size]
 
@@ -271,30 +382,187 @@ class ChunkedReader:
         return data
 
     def get_chunk(self, expected_chunk_id):
-        result = None
-        prev_offs = self.__offs
+        # the headers are read up to the found chunk,
+        # only the found chunk is decompressed
+        data = self.__data
+        offs = self.__offs
+        data_size = len(data)
 
-        while result is None:
-            try:
-                chunk_id, chunk_data = next(self)
-            except StopIteration:
-                break
+        while offs < data_size:
+            cid, offs, size, compressed = _read_chunk_header(data, offs)
 
-            if chunk_id == expected_chunk_id:
-                result = chunk_data
+            if cid == expected_chunk_id:
+                if compressed and size and not self.__ignore_compression:
+                    return _decompress_chunk(data, offs, size)
+                return data[offs : offs + size]
 
-        self.__offs = prev_offs
-        return result
+            offs += size
+
+        return None
+
+    def get_index(self):
+        # index of the rest chunks, the reader is moved to the end
+        index = ChunkIndex(
+            self.__data,
+            self.__ignore_compression,
+            offset=self.__offs,
+            last=True
+        )
+        self.__offs = len(self.__data)
+        return index
 
     def get_size(self):
         return len(self.__data)
 
     def get_chunks_count(self):
-        chunks_count = 0
-
-        for chunk_id, chunk_data in self:
-            chunks_count += 1
-
+        chunks_count = len(ChunkIndex.scan(self.__data, self.__offs))
         self.__offs = 0
 
         return chunks_count
+
+
+class _Chunk:
+    __slots__ = ('data', 'offset', 'size', 'compressed', 'value')
+
+    def __init__(self, data, offset, size, compressed):
+        self.data = data
+        self.offset = offset
+        self.size = size
+        self.compressed = compressed
+        self.value = None
+
+
+class ChunkIndex(collections.abc.MutableMapping):
+    '''
+    Chunks directory made in a single pass over the chunks headers.
+    The payload is sliced and decompressed on the first access only,
+    the decompressed payload is cached. Works as a dictionary of
+    chunk id and data, the duplicate ids are available by index.
+    Indexed access returns the first not empty chunk of the id, or the
+    last chunk of the id when last is set, like the readers dictionary.
+    '''
+
+    def __init__(
+            self,
+            data,
+            ignore_compression=False,
+            ignore_errors=False,
+            offset=0,
+            last=False
+        ):
+        self.__ignore_compression = ignore_compression
+        self.__ignore_errors = ignore_errors
+        self.__last = last
+        self.__chunks = {}
+
+        for cid, offs, size, compressed in self.scan(data, offset):
+            chunk = _Chunk(data, offs, size, compressed)
+            self.__chunks.setdefault(cid, []).append(chunk)
+
+    @staticmethod
+    def scan(data, offset=0):
+        # headers of chunks: (id, payload offset, size, compressed)
+        headers = []
+        data_size = len(data)
+
+        while offset < data_size:
+            header = _read_chunk_header(data, offset)
+            headers.append(header)
+            offset = header[1] + header[2]
+
+        return headers
+
+    def __load(self, chunk):
+        if chunk.value is None:
+            data = chunk.data
+            offs = chunk.offset
+            size = chunk.size
+
+            if chunk.compressed and size and not self.__ignore_compression:
+                try:
+                    chunk.value = _decompress_chunk(data, offs, size)
+                except ChunkedReader.Errors:
+                    if not self.__ignore_errors:
+                        raise
+                    chunk.value = data[offs : offs + size]
+            else:
+                chunk.value = data[offs : offs + size]
+
+            # the source data is not needed
+            chunk.data = None
+
+        return chunk.value
+
+    def __select(self, chunk_id):
+        chunks = self.__chunks[chunk_id]
+        if self.__last:
+            return chunks[-1]
+        # the first not empty chunk
+        for chunk in chunks:
+            if chunk.size:
+                return chunk
+        return chunks[0]
+
+    def __getitem__(self, chunk_id):
+        return self.__load(self.__select(chunk_id))
+
+    def __setitem__(self, chunk_id, chunk_data):
+        chunk = _Chunk(None, 0, len(chunk_data), False)
+        chunk.value = chunk_data
+        self.__chunks[chunk_id] = [chunk, ]
+
+    def __delitem__(self, chunk_id):
+        del self.__chunks[chunk_id]
+
+    def __iter__(self):
+        return iter(self.__chunks)
+
+    def __len__(self):
+        return len(self.__chunks)
+
+    def __contains__(self, chunk_id):
+        return chunk_id in self.__chunks
+
+    def get(self, chunk_id, default=None, first=False):
+        if chunk_id not in self.__chunks:
+            return default
+        if first:
+            return self.__load(self.__chunks[chunk_id][0])
+        return self[chunk_id]
+
+    def get_all(self, chunk_id):
+        # data of every chunk with the id
+        return [
+            self.__load(chunk)
+            for chunk in self.__chunks.get(chunk_id, ())
+        ]
+
+    def load_all(self):
+        # slice and decompress every chunk ahead of the access
+        for chunks in self.__chunks.values():
+            for chunk in chunks:
+                self.__load(chunk)
+        return self
+
+    def count(self, chunk_id):
+        return len(self.__chunks.get(chunk_id, ()))
+
+    def get_size(self, chunk_id):
+        # payload size without decompression
+        chunk = self.__select(chunk_id)
+        if chunk.value is not None:
+            return len(chunk.value)
+        if chunk.compressed and chunk.size and not self.__ignore_compression:
+            return FastBytes.int_at(chunk.data, chunk.offset)
+        return chunk.size
+
+    def is_compressed(self, chunk_id):
+        return self.__select(chunk_id).compressed
+
+    def update(self, other=(), **kwargs):
+        # chunks of other index are copied without loading
+        if isinstance(other, ChunkIndex):
+            for chunk_id, chunks in other.__chunks.items():
+                self.__chunks[chunk_id] = list(chunks)
+        else:
+            super().update(other, **kwargs)
@@ -1,31 +1,42 @@
 # standart modules
 import os
+import mmap
+import contextlib
 
 # addon modules
 from . import read
+from . import write
 from .. import log
 from .. import text
 
 
 def get_chunks(data):
-    chunks = {}
-    chunked_reader = read.ChunkedReader(data)
+    return read.ChunkIndex(data)
 
-    for chunk_id, chunk_data in chunked_reader:
-        if not chunks.get(chunk_id, None):
-            chunks[chunk_id] = chunk_data
 
-    return chunks
+def get_reader_chunks(chunked_reader):
+    return chunked_reader.get_index()
 
 
-def get_reader_chunks(chunked_reader):
-    return {chunk_id: chunk_data for chunk_id, chunk_data in chunked_reader}
+def _map_file(file):
+    try:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        # empty files and file systems without mmap support
+        return None
 
+    # the map is closed when the last slice of it is released
+    return memoryview(mapped)
 
-def read_file(file_path):
+
+def read_file(file_path, use_mmap=False):
     try:
         with open(file_path, 'rb') as file:
-            data = file.read()
+            data = None
+            if use_mmap:
+                data = _map_file(file)
+            if data is None:
+                data = file.read()
         return data
 
     except FileNotFoundError:
@@ -35,7 +46,7 @@ def read_file(file_path):
         )
 
 
-def save_file(file_path, writer):
+def _get_save_path(file_path):
     dir_path = os.path.dirname(file_path)
     file_name = os.path.basename(file_path)
     name, ext = os.path.splitext(file_name)
@@ -53,9 +64,12 @@ def save_file(file_path, writer):
     if not os.path.exists(dir_path):
         os.makedirs(dir_path)
 
+    return file_path
+
+
+def _open_save_file(file_path):
     try:
-        with open(file_path, 'wb') as file:
-            file.write(writer.data)
+        return open(file_path, 'wb')
 
     except PermissionError:
         raise log.AppError(
@@ -64,6 +78,27 @@ def save_file(file_path, writer):
         )
 
 
+def save_file(file_path, writer):
+    file_path = _get_save_path(file_path)
+
+    with _open_save_file(file_path) as file:
+        file.write(writer.data)
+
+
+@contextlib.contextmanager
+def stream_file(file_path):
+    # the file is written by parts:
+    #     with stream_file(file_path) as file_writer:
+    #         with file_writer.chunk(chunk_id):
+    #             file_writer.putb(data)
+    file_path = _get_save_path(file_path)
+
+    with _open_save_file(file_path) as file:
+        file_writer = write.FileChunkedWriter(file)
+        yield file_writer
+        file_writer.flush()
+
+
 def read_text_file(file_path):
     with open(file_path, mode='r', encoding='cp1251') as file:
         data = file.read()
@@ -79,17 +114,17 @@ def check_file_exists(file_path):
         )
 
 
-def get_file_data(file_path, update_log=True):
+def get_file_data(file_path, update_log=True, use_mmap=False):
     abs_path = os.path.abspath(file_path)
     if update_log:
         log.update(file=abs_path)
     check_file_exists(abs_path)
-    file_data = read_file(abs_path)
+    file_data = read_file(abs_path, use_mmap=use_mmap)
     return file_data
 
 
-def get_file_reader(file_path, chunked=False, update_log=True):
-    file_data = get_file_data(file_path, update_log)
+def get_file_reader(file_path, chunked=False, update_log=True, use_mmap=False):
+    file_data = get_file_data(file_path, update_log, use_mmap)
 
     if chunked:
         reader = read.ChunkedReader(memoryview(file_data))
@@ -99,8 +134,8 @@ def get_file_reader(file_path, chunked=False, update_log=True):
     return reader
 
 
-def get_file_chunks(file_path):
-    file_data = get_file_data(file_path)
+def get_file_chunks(file_path, use_mmap=False):
+    file_data = get_file_data(file_path, use_mmap=use_mmap)
     reader = read.ChunkedReader(memoryview(file_data))
     chunks = get_reader_chunks(reader)
 
@@ -1,24 +1,85 @@
 # standart modules
 import struct
+import contextlib
+
+# blender modules
+try:
+    import numpy
+except:
+    numpy = None
 
 # addon modules
+from . import read
+from . import lzhuf
 from .. import log
 from .. import text
 
 
+CHUNK_COMPRESSED = 0x80000000
+BUFFER_SIZE = 2 * 1024 * 1024
+
+_preps = {}
+_S_II = struct.Struct('<2I')
+
+
+def get_prep(fmt):
+    # compiled struct of format, the formats are cached
+    prep = _preps.get(fmt, None)
+
+    if prep is None:
+        prep = _preps[fmt] = struct.Struct(fmt)
+
+    return prep
+
+
 class PackedWriter():
+    __S_FFF = struct.Struct('<3f')
+
     def __init__(self):
         self.data = bytearray()
 
+    def get_size(self):
+        return len(self.data)
+
+    def putb(self, data):
+        # write raw bytes
+        self.data += data
+
     def putp(self, packed_writer):
         self.data += packed_writer.data
 
     def putf(self, fmt, *args):
-        self.data += struct.pack(fmt, *args)
+        try:
+            prep = _preps[fmt]
+        except KeyError:
+            prep = get_prep(fmt)
+
+        self.data += prep.pack(*args)
 
     def putv3f(self, vec):
         # write vertex coord
-        self.data += struct.pack('<3f', vec[0], vec[2], vec[1])
+        self.data += self.__S_FFF.pack(vec[0], vec[2], vec[1])
+
+    def put_array(self, fmt, values):
+        # values: sequence of numbers or sequence of vectors
+        if numpy:
+            dtype = read.PackedReader.get_dtype(fmt)
+            self.put_ndarray(fmt, numpy.asarray(values, dtype=dtype))
+
+        else:
+            values = list(values)
+            if values and isinstance(values[0], (tuple, list)):
+                values = [value for vector in values for value in vector]
+            self.putf('<{0}{1}'.format(len(values), fmt), *values)
+
+    def put_ndarray(self, fmt, array):
+        # write numpy array values converted to the struct format
+        array = numpy.ascontiguousarray(
+            array,
+            dtype=read.PackedReader.get_dtype(fmt)
+        )
+        with memoryview(array) as view:
+            self.data += view.cast('B')
 
     def puts(self, string):
         try:
@@ -33,15 +94,108 @@ class PackedWriter():
         self.data += b'\x00'
 
     def replace(self, offset, byte_list):
-        for byte_index, byte in enumerate(byte_list):
-            self.data[offset + byte_index] = byte
+        self.data[offset : offset + len(byte_list)] = byte_list
 
 
-class ChunkedWriter():
-    def __init__(self):
+class ChunkedWriter(PackedWriter):
+    def put(self, chunk_id, writer, compress=False):
+        data = writer.data
+
+        if compress and data:
+            chunk_id |= CHUNK_COMPRESSED
+            data = struct.pack('<I', len(data)) + lzhuf.compress_buffer(data)
+
+        self.data += _S_II.pack(chunk_id, len(data))
+        self.data += data
+
+    @contextlib.contextmanager
+    def chunk(self, chunk_id):
+        # the chunk data is written in place, the size is written on exit:
+        #     with chunked_writer.chunk(chunk_id):
+        #         chunked_writer.putf('<I', value)
+        offset = len(self.data)
+        self.data += bytes(8)
+        yield self
+        chunk_size = len(self.data) - offset - 8
+        _S_II.pack_into(self.data, offset, chunk_id, chunk_size)
+
+
+class FileChunkedWriter(ChunkedWriter):
+    # chunked writer of opened file, the data is written to the file when
+    # the buffer is full, the chunk sizes are written on the chunk exit:
+    #     with file_writer.chunk(chunk_id):
+    #         file_writer.putb(data)
+    def __init__(self, file, buffer_size=BUFFER_SIZE):
+        super().__init__()
+        self.file = file
+        self.buffer_size = buffer_size
+        self.file_offset = file.tell()
+
+    def tell(self):
+        return self.file_offset + len(self.data)
+
+    def get_size(self):
+        return self.tell()
+
+    def flush(self):
+        self.file.write(self.data)
+        self.file_offset += len(self.data)
         self.data = bytearray()
 
-    def put(self, chunk_id, writer):
-        chunk_size = len(writer.data)
-        self.data += struct.pack('<2I', chunk_id, chunk_size)
-        self.data += writer.data
+    def _check_buffer(self):
+        if len(self.data) >= self.buffer_size:
+            self.flush()
+
+    def putb(self, data):
+        if len(data) >= self.buffer_size:
+            # large data is written without copying
+            self.flush()
+            self.file.write(data)
+            self.file_offset += len(data)
+        else:
+            self.data += data
+            self._check_buffer()
+
+    def putp(self, packed_writer):
+        self.putb(packed_writer.data)
+
+    def putf(self, fmt, *args):
+        super().putf(fmt, *args)
+        self._check_buffer()
+
+    def put_ndarray(self, fmt, array):
+        array = numpy.ascontiguousarray(
+            array,
+            dtype=read.PackedReader.get_dtype(fmt)
+        )
+        with memoryview(array) as view:
+            self.putb(view.cast('B'))
+
+    def put(self, chunk_id, writer, compress=False):
+        data = writer.data
+
+        if compress and data:
+            chunk_id |= CHUNK_COMPRESSED
+            data = struct.pack('<I', len(data)) + lzhuf.compress_buffer(data)
+
+        self.putb(_S_II.pack(chunk_id, len(data)))
+        self.putb(data)
+
+    @contextlib.contextmanager
+    def chunk(self, chunk_id):
+        offset = self.tell()
+        self.data += bytes(8)
+        yield self
+        chunk_size = self.tell() - offset - 8
+        header = _S_II.pack(chunk_id, chunk_size)
+
+        if offset >= self.file_offset:
+            # chunk header is in the buffer
+            buffer_offset = offset - self.file_offset
+            self.data[buffer_offset : buffer_offset + 8] = header
+
+        else:
+            self.flush()
+            self.file.seek(offset)
+            self.file.write(header)
+            self.file.seek(self.file_offset)
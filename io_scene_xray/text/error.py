@@ -173,6 +173,7 @@ omf_no_bone_groups = 'Armature object has no bone groups'
 # omf import
 omf_no_bone = 'Armature does not have all bones that file has'
 omf_nothing = 'Nothing was imported. Change import settings'
+omf_stub_changed = 'OMF-file has been changed after lazy import'
 
 # omf merge
 few_files = 'More than one file needs to be selected'
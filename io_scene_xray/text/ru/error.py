@@ -181,6 +181,7 @@ translations_table = (
     # omf import
     (error.omf_no_bone, 'Арматура не имеет всех костей, которые есть в OMF файле'),
     (error.omf_nothing, 'Ничего не импортировано. Измените настройки импорта'),
+    (error.omf_stub_changed, 'OMF файл был изменён после отложенного импорта'),
 
     # omf merge
     (error.few_files, 'Необходимо выделить больше одного файла'),
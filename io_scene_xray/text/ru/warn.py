@@ -26,6 +26,7 @@ translations_table = (
     (warn.use_active_tex, mat_many_tex + '. Экспортирована активная текстура'),
     (warn.use_selected_tex, mat_many_tex + '. Экспортирована выделенная текстура'),
     (warn.name_has_dot, 'Имя файла имеет больше одной точки. Файл был переименован'),
+    (warn.stats_trace_not_written, 'Невозможно записать трассировку статистики'),
     (warn.obj_many_uv, 'Объект имеет больше одной UV-карты. Экспортирована активная UV-карта'),
     (warn.keymap_assign_more_one, 'Больше одного оператора назначено на'),
 
@@ -102,6 +103,11 @@ translations_table = (
     # level import
     (warn.level_folder_not_spec, 'Не указан параметр "Levels Folder" в настройках аддона. Некоторые текстуры могут быть не загружены'),
 
+    # level cform export
+    (warn.level_cform_degenerate_tris, 'Cform имеет вырожденные треугольники. Треугольники были удалены'),
+    (warn.level_cform_duplicate_tris, 'Cform имеет повторяющиеся треугольники'),
+    (warn.level_cform_overlapping_tris, 'Cform имеет перекрывающиеся треугольники'),
+
     # scene import
     (warn.scene_no_file, 'Не найден файл'),
 
@@ -17,6 +17,7 @@ ready = 'Ready'
 imported = 'Imported'
 сhanged = 'Changed'
 name_has_dot = 'File name contains more than one dot. The file has been renamed'
+stats_trace_not_written = 'Cannot write statistics trace'
 obj_many_uv = 'Object has more than one UV-map. Active UV-map exported'
 keymap_assign_more_one = 'More than one operator is assigned to'
 
@@ -93,6 +94,11 @@ omf_merge_motion_duplicate = 'Animation was not saved because an animation with
 # level import
 level_folder_not_spec = '"Levels Folder" parameter is not specified in the addon settings. Some textures may not be loaded'
 
+# level cform export
+level_cform_degenerate_tris = 'Cform has degenerate triangles. Triangles were removed'
+level_cform_duplicate_tris = 'Cform has duplicate triangles'
+level_cform_overlapping_tris = 'Cform has overlapping triangles'
+
 # scene import
 scene_no_file = 'Cannot find file'
 
@@ -25,7 +25,10 @@ class XRAY_UL_motion_list(bpy.types.UIList):
         row.label(text='', icon=icon)
 
         if data.show_motions_names in ('ACTION', 'BOTH'):
-            row.prop_search(motion, 'name', bpy.data, 'actions', text='')
+            if motion.stub_file:
+                row.label(text=motion.name, icon='TIME')
+            else:
+                row.prop_search(motion, 'name', bpy.data, 'actions', text='')
 
         if data.show_motions_names == 'BOTH':
             if data.use_custom_motion_names:
@@ -165,8 +168,8 @@ class XRAY_OT_clean_actions(bpy.types.Operator):
         for motion_index, motion in enumerate(obj.xray.motions_collection):
             action = bpy.data.actions.get(motion.name)
 
-            # non-existent action
-            if not action:
+            # non-existent action, the stubs of lazy import are kept
+            if not action and not motion.stub_file:
                 remove.add(motion_index)
 
             # duplicated action
@@ -185,6 +188,43 @@ class XRAY_OT_clean_actions(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class XRAY_OT_load_motion_stubs(bpy.types.Operator):
+    bl_idname = 'io_scene_xray.load_motion_stubs'
+    bl_label = 'Load All Motions'
+    bl_description = 'Create actions of all not loaded motions of lazy import'
+    bl_options = {'UNDO'}
+
+    # load only the active motion of the list
+    active_only = bpy.props.BoolProperty(
+        default=False,
+        options={'SKIP_SAVE', 'HIDDEN'}
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        if not obj or obj.type != 'ARMATURE':
+            return False
+
+        return any(
+            motion.stub_file
+            for motion in obj.xray.motions_collection
+        )
+
+    @log.execute_with_logger
+    @utils.stats.execute_with_stats
+    def execute(self, context):
+        obj = context.active_object
+        motions = obj.xray.motions_collection
+
+        if self.active_only:
+            motions = (motions[obj.xray.motions_collection_index], )
+
+        formats.omf.imp.load_motion_stubs(obj, motions)
+        utils.draw.redraw_areas()
+        return {'FINISHED'}
+
+
 MOTION_NAME_PARAM = 'motion_name'
 EXPORT_NAME_PARAM = 'export_name'
 
@@ -374,6 +414,7 @@ classes = (
     XRAY_OT_add_all_actions,
     XRAY_OT_remove_all_actions,
     XRAY_OT_clean_actions,
+    XRAY_OT_load_motion_stubs,
     XRAY_OT_copy_actions,
     XRAY_OT_paste_actions,
     XRAY_OT_sort_actions
@@ -12,8 +12,12 @@ from . import mesh
 from . import action
 from . import bone
 from . import version
+from . import cache
 from . import stats
 from . import tex
+from . import vertex_cache
+from . import progressive
+from . import billboard
 from .. import log
 from .. import text
 
@@ -0,0 +1,305 @@
+# blender modules
+import numpy
+
+
+# lod billboards: the visual is viewed from 8 directions around the
+# vertical axis, every view is a quad with the image of the children.
+# the images and lighting are sampled by the orthographic rasterization.
+
+LOD_SAMPLES = 8
+TILE_SIZE = 64
+
+# lighting of surfaces without vertex colors: light, hemi, sun
+DEFAULT_LIGHTS = (0.0, 0.0, 0.0, 1.0, 1.0)
+
+
+def get_view_axes(frame):
+    '''
+    View axes of the billboard frame.
+    Returns right, up and view direction vectors.
+    '''
+    angle = frame * 2.0 * numpy.pi / LOD_SAMPLES
+    sin, cos = numpy.sin(angle), numpy.cos(angle)
+
+    right = numpy.array((cos, sin, 0.0))
+    up = numpy.array((0.0, 0.0, 1.0))
+    direction = numpy.array((-sin, cos, 0.0))
+
+    return right, up, direction
+
+
+# max count of pixels tested at once
+RASTER_BATCH = 1 << 20
+
+
+def _depth_test(pixels, tris, weights, depths):
+    # the nearest sample of every pixel
+    order = numpy.lexsort((depths, pixels))
+    pixels = pixels[order]
+    first = numpy.ones(len(pixels), dtype=bool)
+    first[1 : ] = pixels[1 : ] != pixels[ : -1]
+    visible = order[first]
+    return pixels[first], tris[visible], weights[visible], depths[visible]
+
+
+def _rasterize_batch(coords, depths, mins, sizes, tris_indices, tile_size):
+    counts = sizes[tris_indices, 0] * sizes[tris_indices, 1]
+    tris = numpy.repeat(tris_indices, counts)
+    local = numpy.arange(len(tris)) - numpy.repeat(
+        numpy.cumsum(counts) - counts,
+        counts
+    )
+    widths = sizes[tris, 0]
+    pixel_x = mins[tris, 0] + local % widths
+    pixel_y = mins[tris, 1] + local // widths
+
+    # barycentric weights of pixel centers
+    corners = coords[tris]
+    edge_1 = corners[ : , 1] - corners[ : , 0]
+    edge_2 = corners[ : , 2] - corners[ : , 0]
+    offset_x = pixel_x + 0.5 - corners[ : , 0, 0]
+    offset_y = pixel_y + 0.5 - corners[ : , 0, 1]
+    area = edge_1[ : , 0] * edge_2[ : , 1] - edge_1[ : , 1] * edge_2[ : , 0]
+
+    weight_1 = (offset_x * edge_2[ : , 1] - offset_y * edge_2[ : , 0]) / area
+    weight_2 = (edge_1[ : , 0] * offset_y - edge_1[ : , 1] * offset_x) / area
+    weights = numpy.column_stack((1.0 - weight_1 - weight_2, weight_1, weight_2))
+
+    inside = weights.min(axis=1) >= -1e-6
+    tris = tris[inside]
+    weights = weights[inside]
+    pixels = (pixel_y * tile_size + pixel_x)[inside]
+    pixel_depths = (depths[tris] * weights).sum(axis=1)
+
+    return _depth_test(pixels, tris, weights, pixel_depths)
+
+
+def rasterize(coords, depths, tile_size):
+    '''
+    Orthographic rasterization with depth test.
+    coords - pixel coordinates of triangles corners (T, 3, 2),
+    depths - depth of corners (T, 3), the nearest surface is visible.
+    Returns indices of covered pixels, triangle indices and
+    barycentric weights (P, 3) of the pixels.
+    '''
+    # pixel centers inside of triangle bounding box
+    mins = numpy.ceil(coords.min(axis=1) - 0.5).astype(numpy.int64)
+    maxs = numpy.floor(coords.max(axis=1) - 0.5).astype(numpy.int64)
+    mins = numpy.maximum(mins, 0)
+    maxs = numpy.minimum(maxs, tile_size - 1)
+    sizes = numpy.maximum(maxs - mins + 1, 0)
+    counts = sizes[ : , 0] * sizes[ : , 1]
+
+    # degenerate triangles are not visible
+    edge_1 = coords[ : , 1] - coords[ : , 0]
+    edge_2 = coords[ : , 2] - coords[ : , 0]
+    area = edge_1[ : , 0] * edge_2[ : , 1] - edge_1[ : , 1] * edge_2[ : , 0]
+    counts[numpy.abs(area) < 1e-12] = 0
+
+    tris_indices = numpy.flatnonzero(counts)
+    batches = numpy.cumsum(counts[tris_indices]) // RASTER_BATCH
+    splits = numpy.flatnonzero(numpy.diff(batches)) + 1
+
+    results = [
+        _rasterize_batch(coords, depths, mins, sizes, batch, tile_size)
+        for batch in numpy.split(tris_indices, splits)
+            if len(batch)
+    ]
+
+    if not results:
+        return (
+            numpy.zeros(0, dtype=numpy.int64),
+            numpy.zeros(0, dtype=numpy.int64),
+            numpy.zeros((0, 3))
+        )
+
+    pixels, tris, weights, pixel_depths = [
+        numpy.concatenate(arrays)
+        for arrays in zip(*results)
+    ]
+    if len(results) > 1:
+        pixels, tris, weights, pixel_depths = _depth_test(
+            pixels,
+            tris,
+            weights,
+            pixel_depths
+        )
+
+    return pixels, tris, weights
+
+
+def sample_images(images, images_indices, uvs):
+    '''
+    Nearest texel of images.
+    images - list of rgba arrays (H, W, 4) or None,
+    images_indices - image index of every sample, uvs - (S, 2).
+    Returns rgba colors of samples, without images the color is white.
+    '''
+    colors = numpy.ones((len(uvs), 4), dtype=numpy.float32)
+
+    for image_index, pixels in enumerate(images):
+        if pixels is None:
+            continue
+        samples = images_indices == image_index
+        if not samples.any():
+            continue
+        height, width = pixels.shape[ : 2]
+        wrapped = uvs[samples] % 1.0
+        column = numpy.minimum((wrapped[ : , 0] * width).astype(numpy.int64), width - 1)
+        row = numpy.minimum((wrapped[ : , 1] * height).astype(numpy.int64), height - 1)
+        colors[samples] = pixels[row, column]
+
+    return colors
+
+
+def _get_corner_lights(pixels, lights, tile_size):
+    # bilinear weights of the samples for every quad corner
+    x = (pixels % tile_size + 0.5) / tile_size
+    y = (pixels // tile_size + 0.5) / tile_size
+    corner_weights = numpy.column_stack((
+        (1.0 - x) * (1.0 - y),
+        x * (1.0 - y),
+        x * y,
+        (1.0 - x) * y
+    ))
+    weights_sum = corner_weights.sum(axis=0)
+    weights_sum[weights_sum == 0.0] = 1.0
+
+    return (corner_weights.T @ lights) / weights_sum[ : , None]
+
+
+def build_billboards(
+        positions,
+        lights,
+        uvs=None,
+        images=(),
+        images_indices=None,
+        tile_size=TILE_SIZE
+    ):
+    '''
+    Generate lod billboard quads of triangles.
+    positions - triangles corners (T, 3, 3), lights - light rgb, hemi
+    and sun of corners (T, 3, 5), uvs - texture coordinates of corners
+    (T, 3, 2), images - rgba arrays of textures, images_indices - image
+    index of every triangle.
+    Returns quads corners (8, 4, 3), quads lights (8, 4, 5) and rgba
+    tiles (8, tile_size, tile_size, 4). The corners of the quad are
+    bottom left, bottom right, top right, top left as seen by the viewer.
+    '''
+    positions = numpy.asarray(positions, dtype=numpy.float64).reshape(-1, 3, 3)
+    lights = numpy.asarray(lights, dtype=numpy.float64).reshape(-1, 3, 5)
+    if uvs is not None:
+        uvs = numpy.asarray(uvs, dtype=numpy.float64).reshape(-1, 3, 2)
+        images_indices = numpy.asarray(images_indices, dtype=numpy.int64)
+
+    quads = numpy.zeros((LOD_SAMPLES, 4, 3))
+    quads_lights = numpy.zeros((LOD_SAMPLES, 4, 5))
+    tiles = numpy.zeros(
+        (LOD_SAMPLES, tile_size, tile_size, 4),
+        dtype=numpy.float32
+    )
+
+    if not len(positions):
+        quads_lights[ : ] = DEFAULT_LIGHTS
+        return quads, quads_lights, tiles
+
+    points = positions.reshape(-1, 3)
+    center = (points.min(axis=0) + points.max(axis=0)) / 2
+    relative = positions - center
+    mean_lights = lights.reshape(-1, 5).mean(axis=0)
+
+    for frame in range(LOD_SAMPLES):
+        right, up, direction = get_view_axes(frame)
+        coord_u = relative @ right
+        coord_v = relative @ up
+        depths = relative @ direction
+
+        min_u, max_u = coord_u.min(), coord_u.max()
+        min_v, max_v = coord_v.min(), coord_v.max()
+        size_u = max(max_u - min_u, 1e-6)
+        size_v = max(max_v - min_v, 1e-6)
+
+        quads[frame] = [
+            center + right * u + up * v
+            for u, v in (
+                (min_u, min_v),
+                (max_u, min_v),
+                (max_u, max_v),
+                (min_u, max_v)
+            )
+        ]
+
+        coords = numpy.stack((
+            (coord_u - min_u) / size_u * tile_size,
+            (coord_v - min_v) / size_v * tile_size
+        ), axis=-1)
+        pixels, tris, weights = rasterize(coords, depths, tile_size)
+
+        if not len(pixels):
+            quads_lights[frame] = mean_lights
+            continue
+
+        # vertex lighting
+        pixel_lights = (lights[tris] * weights[ : , : , None]).sum(axis=1)
+        quads_lights[frame] = _get_corner_lights(pixels, pixel_lights, tile_size)
+
+        # texture colors, uncovered pixels are transparent
+        if uvs is not None:
+            pixel_uvs = (uvs[tris] * weights[ : , : , None]).sum(axis=1)
+            colors = sample_images(images, images_indices[tris], pixel_uvs)
+        else:
+            colors = numpy.ones((len(pixels), 4), dtype=numpy.float32)
+
+        tile = tiles[frame].reshape(-1, 4)
+        tile[pixels] = colors
+
+    return quads, quads_lights, tiles
+
+
+def get_atlas_layout(lods_count):
+    '''
+    Square atlas of billboard tiles, the frames of lod are in a row.
+    Returns lods count in a row and rows count.
+    '''
+    lods_in_row = max(1, int(numpy.ceil(numpy.sqrt(lods_count / LOD_SAMPLES))))
+    rows_count = max(1, int(numpy.ceil(lods_count / lods_in_row)))
+    return lods_in_row, rows_count
+
+
+def get_atlas_uvs(lod_index, lods_in_row, rows_count):
+    '''
+    Texture coordinates of billboard quads in the atlas,
+    the origin is in the bottom left corner of the atlas.
+    Returns array (8, 4, 2) in quad corners order.
+    '''
+    columns_count = lods_in_row * LOD_SAMPLES
+    row = lod_index // lods_in_row
+    first_column = (lod_index % lods_in_row) * LOD_SAMPLES
+
+    uvs = numpy.zeros((LOD_SAMPLES, 4, 2))
+    bottom = 1.0 - (row + 1) / rows_count
+    top = 1.0 - row / rows_count
+
+    for frame in range(LOD_SAMPLES):
+        left = (first_column + frame) / columns_count
+        right = (first_column + frame + 1) / columns_count
+        uvs[frame] = ((left, bottom), (right, bottom), (right, top), (left, top))
+
+    return uvs
+
+
+def put_atlas_tiles(atlas, tiles, lod_index, lods_in_row, rows_count):
+    '''
+    Copy rgba tiles of lod into atlas pixels (H, W, 4),
+    the first row of the pixels is the bottom of the image.
+    '''
+    tile_size = tiles.shape[1]
+    row = rows_count - 1 - lod_index // lods_in_row
+    first_column = (lod_index % lods_in_row) * LOD_SAMPLES
+
+    for frame in range(LOD_SAMPLES):
+        column = first_column + frame
+        atlas[
+            row * tile_size : (row + 1) * tile_size,
+            column * tile_size : (column + 1) * tile_size
+        ] = tiles[frame]
@@ -0,0 +1,165 @@
+# standart modules
+import re
+
+# blender modules
+import bpy
+
+# addon modules
+from . import version
+
+
+# indices of blender data-blocks used to search materials, images and
+# textures during import. the cache lives while the operator is executed,
+# data-blocks created by the addon are added with the add_* functions.
+session = None
+
+NAME_SUFFIX = re.compile(r'\.\d{3}$')
+
+
+def get_base_name(name):
+    # name without numeric suffix: "name.001" -> "name"
+    return NAME_SUFFIX.sub('', name)
+
+
+def get_abs_path(bpy_image):
+    return bpy.path.abspath(bpy_image.filepath)
+
+
+def get_material_images(material):
+    images = []
+
+    if version.IS_28:
+        if material.node_tree:
+            for node in material.node_tree.nodes:
+                if node.type in version.IMAGE_NODES and node.image:
+                    images.append(node.image)
+
+    else:
+        for texture_slot in material.texture_slots:
+            if not texture_slot:
+                continue
+            bpy_image = getattr(texture_slot.texture, 'image', None)
+            if bpy_image:
+                images.append(bpy_image)
+
+    return images
+
+
+def _image_path_keys(bpy_image):
+    return (get_abs_path(bpy_image).lower(), )
+
+
+def _texture_image_keys(bpy_texture):
+    bpy_image = getattr(bpy_texture, 'image', None)
+    if bpy_image:
+        return (get_abs_path(bpy_image), )
+    return ()
+
+
+def _material_name_keys(material):
+    return (get_base_name(material.name), )
+
+
+def _material_eshader_keys(material):
+    return (material.xray.eshader, )
+
+
+def _material_gamemtl_keys(material):
+    return (material.xray.gamemtl, )
+
+
+def _material_image_keys(material):
+    eshader = material.xray.eshader
+    return [
+        (eshader, get_abs_path(bpy_image))
+        for bpy_image in get_material_images(material)
+    ]
+
+
+# bpy.data collection name: {index name: function of keys}
+INDICES = {
+    'images': {
+        'path': _image_path_keys
+    },
+    'textures': {
+        'image': _texture_image_keys
+    },
+    'materials': {
+        'name': _material_name_keys,
+        'eshader': _material_eshader_keys,
+        'gamemtl': _material_gamemtl_keys,
+        'image': _material_image_keys
+    }
+}
+
+
+class DataCache:
+    def __init__(self):
+        # (collection name, index name): {key: [data-blocks]}
+        self.indices = {}
+
+    def _get_index(self, collection, index_name):
+        index = self.indices.get((collection, index_name), None)
+
+        if index is None:
+            index = {}
+            get_keys = INDICES[collection][index_name]
+
+            for data_block in getattr(bpy.data, collection):
+                for key in get_keys(data_block):
+                    index.setdefault(key, []).append(data_block)
+
+            self.indices[(collection, index_name)] = index
+
+        return index
+
+    def get(self, collection, index_name, *keys):
+        # data-blocks in the same order as in bpy.data
+        index = self._get_index(collection, index_name)
+        found = {}
+
+        for key in keys:
+            for data_block in index.get(key, ()):
+                found[data_block.as_pointer()] = data_block
+
+        return sorted(found.values(), key=lambda data_block: data_block.name)
+
+    def add(self, collection, data_block):
+        for (index_collection, index_name), index in self.indices.items():
+            if index_collection != collection:
+                continue
+            get_keys = INDICES[collection][index_name]
+            for key in get_keys(data_block):
+                index.setdefault(key, []).append(data_block)
+
+
+def start_session():
+    global session
+    session = DataCache()
+
+
+def end_session():
+    global session
+    session = None
+
+
+def get_cache():
+    # without session the indices are built for a single search
+    if session:
+        return session
+    return DataCache()
+
+
+def add_material(material):
+    if session:
+        session.add('materials', material)
+
+
+def add_image(bpy_image):
+    if session:
+        session.add('images', bpy_image)
+
+
+def add_texture(bpy_texture):
+    if session:
+        session.add('textures', bpy_texture)
@@ -1,5 +1,9 @@
 # standart modules
 import os
+import time
+import itertools
+import collections
+import concurrent.futures
 
 # blender modules
 import bpy
@@ -8,6 +12,7 @@ import mathutils
 # addon modules
 from . import draw
 from . import mesh
+from . import stats
 from . import version
 from .. import log
 from .. import text
@@ -170,12 +175,103 @@ def get_pref_paths(prop_name):
     return mod_folder, platform_folder
 
 
-def import_files(directory, files, imp_fun, context, results=[]):
-    for file in files:
-        file_path = os.path.join(directory, file.name)
+# files parsed ahead of the creation stage by every worker
+PARSE_AHEAD = 2
+
+
+def _parse_file(parse_fun, file_path):
+    start_time = time.time()
+
+    try:
+        data = parse_fun(file_path)
+    except Exception:
+        # the file is parsed again at the creation stage,
+        # where errors are reported with the import context
+        data = None
+
+    return data, time.time() - start_time
+
+
+def _get_workers_count(files_count):
+    # zero when the files are not parsed before creation
+    pref = version.get_preferences()
+
+    if not pref.use_parallel_import:
+        return 0
+
+    return max(1, min(files_count, os.cpu_count() or 1))
+
+
+def parse_files(file_paths, parse_fun):
+    '''
+    The first import stage. Yields file path, parsed data and parse time
+    in the order of file paths. When parallel import is enabled, the files
+    are parsed in a thread pool, at most PARSE_AHEAD files per worker ahead
+    of the creation stage. The parse function must not use bpy, the log
+    and the statistics. The data is None if the file is not parsed.
+    '''
+    workers_count = _get_workers_count(len(file_paths))
+
+    if workers_count < 2:
+        for file_path in file_paths:
+            if workers_count:
+                data, parse_time = _parse_file(parse_fun, file_path)
+            else:
+                data, parse_time = None, None
+            yield file_path, data, parse_time
+        return
+
+    paths = iter(file_paths)
+    futures = collections.deque()
+
+    with concurrent.futures.ThreadPoolExecutor(workers_count) as pool:
+
+        def submit(file_path):
+            future = pool.submit(_parse_file, parse_fun, file_path)
+            futures.append((file_path, future))
+
+        for file_path in itertools.islice(paths, workers_count * PARSE_AHEAD):
+            submit(file_path)
+
+        while futures:
+            file_path, future = futures.popleft()
+
+            next_path = next(paths, None)
+            if next_path is not None:
+                submit(next_path)
+
+            try:
+                data, parse_time = future.result()
+            except Exception:
+                data, parse_time = None, None
+
+            yield file_path, data, parse_time
+
+
+def import_files(
+        directory,
+        files,
+        imp_fun,
+        context,
+        results=[],
+        parse_fun=None
+    ):
+
+    file_paths = [os.path.join(directory, file.name) for file in files]
+
+    if parse_fun:
+        parsed_files = parse_files(file_paths, parse_fun)
+    else:
+        parsed_files = ((path, None, None) for path in file_paths)
+
+    for file_path, data, parse_time in parsed_files:
 
         try:
-            result = imp_fun(file_path, context)
+            if data is None:
+                result = imp_fun(file_path, context)
+            else:
+                stats.parse_time(parse_time)
+                result = imp_fun(file_path, context, data)
             results.append(result)
 
         except log.AppError as err:
@@ -5,6 +5,7 @@ import os
 import bpy
 
 # addon modules
+from . import cache
 from . import ie
 from . import image
 from . import stats
@@ -108,7 +109,15 @@ def _search_material_and_image(
     bpy_material = None
     bpy_image = None
 
-    for material in bpy.data.materials:
+    # materials named "name" or "name.001"
+    materials = cache.get_cache().get(
+        'materials',
+        'name',
+        name,
+        cache.get_base_name(name)
+    )
+
+    for material in materials:
         # check material name
         correct_name = False
         if material.name == name:
@@ -245,6 +254,7 @@ def _create_texture_27(
         bpy_texture.use_preview_alpha = True
         bpy_image = bpy_texture.image
         stats.created_tex()
+        cache.add_texture(bpy_texture)
 
     # create texture slot
     bpy_texture_slot = bpy_material.texture_slots.add()
@@ -304,6 +314,8 @@ def _create_material_and_image(
                 context
             )
 
+    cache.add_material(bpy_material)
+
     return bpy_material, bpy_image
 
 
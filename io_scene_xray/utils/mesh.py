@@ -2,6 +2,7 @@
 import bpy
 import bmesh
 import mathutils
+import numpy
 
 # addon modules
 from . import ie
@@ -297,3 +298,222 @@ def check_zero_weight_verts(bpy_obj):
             text.error.zero_weights,
             log.props(object=bpy_obj.name, vertices_count=zero_vert_count)
         )
+
+
+def unique_rows(rows):
+    '''
+    Unique rows of 2d array. The axis argument of numpy.unique needs
+    numpy 1.13, blender 2.79 has an older version.
+    Returns sorted unique rows, index of the first occurrence and count
+    of every unique row and unique row index of every row.
+    '''
+    rows = numpy.asarray(rows)
+    rows_count = len(rows)
+
+    if not rows_count:
+        empty = numpy.zeros(0, dtype=numpy.int64)
+        return rows, empty, empty, empty
+
+    # the last key is the primary key of lexsort, the sort is stable
+    order = numpy.lexsort(rows.T[ : : -1])
+    sorted_rows = rows[order]
+
+    changed = numpy.empty(rows_count, dtype=bool)
+    changed[0] = True
+    changed[1 : ] = (sorted_rows[1 : ] != sorted_rows[ : -1]).any(axis=1)
+    starts = numpy.flatnonzero(changed)
+
+    inverse = numpy.empty(rows_count, dtype=numpy.int64)
+    inverse[order] = numpy.cumsum(changed) - 1
+    counts = numpy.diff(numpy.append(starts, rows_count))
+
+    return sorted_rows[starts], order[starts], counts, inverse
+
+
+def get_faces_occurrence(triangles):
+    '''
+    Get the occurrence number of every triangle among the triangles
+    that use the same vertices in any order (duplicates and back faces).
+    Degenerate triangles get -1.
+    '''
+    tris = numpy.asarray(triangles, dtype=numpy.int64).reshape(-1, 3)
+    occurrence = numpy.full(len(tris), -1, dtype=numpy.int64)
+
+    sorted_tris = numpy.sort(tris, axis=1)
+    valid = numpy.flatnonzero(
+        (sorted_tris[:, 0] != sorted_tris[:, 1]) &
+        (sorted_tris[:, 1] != sorted_tris[:, 2])
+    )
+
+    if not len(valid):
+        return occurrence
+
+    _, _, _, groups = unique_rows(sorted_tris[valid])
+
+    # rank of triangle inside group of same triangles
+    order = numpy.argsort(groups, kind='mergesort')
+    sorted_groups = groups[order]
+    starts = numpy.flatnonzero(numpy.concatenate((
+        (True, ),
+        sorted_groups[1 : ] != sorted_groups[ : -1]
+    )))
+    counts = numpy.diff(numpy.append(starts, len(sorted_groups)))
+    ranks = numpy.arange(len(sorted_groups)) - numpy.repeat(starts, counts)
+
+    occurrence[valid[order]] = ranks
+
+    return occurrence
+
+
+def get_unique_faces(triangles):
+    '''
+    Get indices of triangles that can be created: the first
+    occurrence of every triangle without degenerate triangles.
+    '''
+    return numpy.flatnonzero(get_faces_occurrence(triangles) == 0)
+
+
+def create_geometry(bpy_mesh, vertices, triangles, material_indices=None):
+    '''
+    Fill empty mesh with vertices and smooth triangles.
+    Loops are created in triangles order.
+    '''
+    verts = numpy.asarray(vertices, dtype=numpy.float32).reshape(-1, 3)
+    tris = numpy.asarray(triangles, dtype=numpy.int32).reshape(-1, 3)
+
+    faces_count = len(tris)
+    loops_count = faces_count * 3
+
+    bpy_mesh.vertices.add(len(verts))
+    bpy_mesh.vertices.foreach_set('co', verts.ravel())
+
+    bpy_mesh.loops.add(loops_count)
+    bpy_mesh.loops.foreach_set('vertex_index', tris.ravel())
+
+    bpy_mesh.polygons.add(faces_count)
+    bpy_mesh.polygons.foreach_set(
+        'loop_start',
+        numpy.arange(0, loops_count, 3, dtype=numpy.int32)
+    )
+    if version.has_writable_loop_total():
+        bpy_mesh.polygons.foreach_set(
+            'loop_total',
+            numpy.full(faces_count, 3, dtype=numpy.int32)
+        )
+    bpy_mesh.polygons.foreach_set('use_smooth', [True, ] * faces_count)
+
+    if material_indices is not None:
+        bpy_mesh.polygons.foreach_set(
+            'material_index',
+            numpy.asarray(material_indices, dtype=numpy.int32)
+        )
+
+    bpy_mesh.update(calc_edges=True)
+
+
+def create_uv_layer(bpy_mesh, name, uvs, image=None):
+    '''
+    Create uv layer from per-loop uvs.
+    The image is assigned to faces in blender 2.7x.
+    '''
+    if version.IS_28:
+        uv_layer = bpy_mesh.uv_layers.new(name=name)
+    else:
+        uv_texture = bpy_mesh.uv_textures.new(name=name)
+        uv_layer = bpy_mesh.uv_layers[uv_texture.name]
+        if image:
+            for tex_poly in uv_texture.data:
+                tex_poly.image = image
+
+    uvs = numpy.asarray(uvs, dtype=numpy.float32)
+    uv_layer.data.foreach_set('uv', uvs.ravel())
+
+    return uv_layer
+
+
+def create_color_layer(bpy_mesh, name, colors):
+    '''
+    Create vertex color layer from per-loop rgb colors
+    or grayscale values.
+    '''
+    colors = numpy.asarray(colors, dtype=numpy.float32)
+
+    if colors.ndim == 1:
+        colors = numpy.repeat(colors, 3).reshape(-1, 3)
+
+    if version.IS_28:
+        alpha = numpy.ones((len(colors), 1), dtype=numpy.float32)
+        colors = numpy.hstack((colors, alpha))
+
+    color_layer = bpy_mesh.vertex_colors.new(name=name)
+    color_layer.data.foreach_set('color', colors.ravel())
+
+    return color_layer
+
+
+def get_data_array(collection, prop_name, size=1, dtype=numpy.float32):
+    '''
+    Read property of all collection items with foreach_get.
+    Returns array with one row of size values for every item.
+    '''
+    array = numpy.empty(len(collection) * size, dtype=dtype)
+    collection.foreach_get(prop_name, array)
+
+    if size != 1:
+        array = array.reshape(-1, size)
+
+    return array
+
+
+def get_color_layer_data(bpy_mesh, name):
+    '''
+    Read per-loop colors of vertex color layer.
+    Returns rgb colors array.
+    '''
+    color_layer = bpy_mesh.vertex_colors[name]
+
+    if version.IS_28:
+        colors = get_data_array(color_layer.data, 'color', 4)
+    else:
+        colors = get_data_array(color_layer.data, 'color', 3)
+
+    return colors[ : , : 3]
+
+
+def normalize_vectors(vectors):
+    '''
+    Normalize float vectors the same way as mathutils
+    Vector.normalized() does. Zero vectors stay zero.
+    '''
+    squares = vectors * vectors
+    lengths = squares[ : , -1].astype(numpy.float64)
+    for index in range(vectors.shape[1] - 2, -1, -1):
+        lengths += squares[ : , index]
+
+    valid = lengths > 1.0e-35
+    lengths[valid] = numpy.sqrt(lengths[valid])
+    lengths[~valid] = numpy.inf
+
+    return (vectors / lengths[ : , None]).astype(numpy.float32)
+
+
+def weld_vertices(keys):
+    '''
+    Merge loops with equal vertex data in a single pass.
+    keys - array of quantized vertex data, one row for every loop.
+    Returns loop indices of unique vertices in order of first
+    occurrence and unique vertex index of every loop.
+    '''
+    keys = numpy.ascontiguousarray(keys)
+    row_type = numpy.dtype((numpy.void, keys.dtype.itemsize * keys.shape[1]))
+    rows = keys.view(row_type).ravel().tolist()
+
+    welded = {}
+    indices = numpy.fromiter(
+        (welded.setdefault(row, len(welded)) for row in rows),
+        dtype=numpy.uint32,
+        count=len(rows)
+    )
+    _, first_loops = numpy.unique(indices, return_index=True)
+
+    return first_loops, indices
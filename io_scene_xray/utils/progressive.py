@@ -0,0 +1,303 @@
+# standart modules
+import heapq
+
+# blender modules
+import numpy
+
+# addon modules
+from . import mesh
+
+
+# progressive meshes are written as slide windows: every window is a
+# triangle list of the level of detail in the common index buffer,
+# the detail levels use the first vertices of the vertex buffer.
+# the levels are generated by quadric error half-edge collapses.
+
+# triangles count ratio of the next detail level
+LOD_STEP = 0.6
+# triangles count ratio of the last detail level
+MIN_RATIO = 0.1
+# cosine of the max face normal rotation on collapse
+MIN_NORMAL_DOT = 0.2
+
+
+def _get_face_quadrics(positions, triangles):
+    # plane quadrics weighted by triangle area:
+    # a2, ab, ac, ad, b2, bc, bd, c2, cd, d2
+    verts = positions[triangles].astype(numpy.float64)
+    normals = numpy.cross(verts[ : , 1] - verts[ : , 0], verts[ : , 2] - verts[ : , 0])
+    lengths = numpy.sqrt((normals * normals).sum(axis=1))
+    areas = lengths / 2
+
+    valid = lengths > 0.0
+    normals[valid] /= lengths[valid, None]
+    normals[~valid] = 0.0
+
+    a, b, c = normals.T
+    d = -(normals * verts[ : , 0]).sum(axis=1)
+
+    quadrics = numpy.column_stack((
+        a * a, a * b, a * c, a * d,
+        b * b, b * c, b * d,
+        c * c, c * d,
+        d * d
+    ))
+
+    return quadrics * areas[ : , None]
+
+
+def _get_vertex_quadrics(positions, triangles):
+    face_quadrics = _get_face_quadrics(positions, triangles)
+    quadrics = numpy.zeros((len(positions), 10))
+
+    for corner in range(3):
+        numpy.add.at(quadrics, triangles[ : , corner], face_quadrics)
+
+    return quadrics.tolist()
+
+
+def _get_locked_vertices(positions, triangles):
+    # boundary vertices and vertices split by uv or normal seams
+    # are not removed, otherwise holes appear between the visuals
+    locked = numpy.zeros(len(positions), dtype=bool)
+
+    edges = numpy.vstack((
+        triangles[ : , (0, 1)],
+        triangles[ : , (1, 2)],
+        triangles[ : , (2, 0)]
+    ))
+    edges.sort(axis=1)
+    edges, _, counts, _ = mesh.unique_rows(edges)
+    locked[edges[counts != 2].ravel()] = True
+
+    _, _, counts, inverse = mesh.unique_rows(positions)
+    locked[counts[inverse] > 1] = True
+
+    return locked.tolist()
+
+
+def _get_error(quadric, position):
+    a2, ab, ac, ad, b2, bc, bd, c2, cd, d2 = quadric
+    x, y, z = position
+    return (
+        a2 * x * x + 2 * ab * x * y + 2 * ac * x * z + 2 * ad * x +
+        b2 * y * y + 2 * bc * y * z + 2 * bd * y +
+        c2 * z * z + 2 * cd * z +
+        d2
+    )
+
+
+def _get_normal(pos_1, pos_2, pos_3):
+    e1 = (pos_2[0] - pos_1[0], pos_2[1] - pos_1[1], pos_2[2] - pos_1[2])
+    e2 = (pos_3[0] - pos_1[0], pos_3[1] - pos_1[1], pos_3[2] - pos_1[2])
+    return (
+        e1[1] * e2[2] - e1[2] * e2[1],
+        e1[2] * e2[0] - e1[0] * e2[2],
+        e1[0] * e2[1] - e1[1] * e2[0]
+    )
+
+
+def _is_flipped(normal_old, normal_new):
+    dot = sum(old * new for old, new in zip(normal_old, normal_new))
+    len_old = sum(value * value for value in normal_old) ** 0.5
+    len_new = sum(value * value for value in normal_new) ** 0.5
+
+    if not len_new:
+        return True
+    if not len_old:
+        return False
+
+    return dot < MIN_NORMAL_DOT * len_old * len_new
+
+
+class _Simplifier:
+    def __init__(self, positions, triangles):
+        self.positions = positions.tolist()
+        self.faces = triangles.tolist()
+        self.faces_alive = [True, ] * len(self.faces)
+        self.faces_count = len(self.faces)
+
+        self.quadrics = _get_vertex_quadrics(positions, triangles)
+        self.locked = _get_locked_vertices(positions, triangles)
+        self.removed = [False, ] * len(self.positions)
+        self.versions = [0, ] * len(self.positions)
+
+        self.verts_faces = [set() for _ in self.positions]
+        for face_index, face in enumerate(self.faces):
+            for vert_index in face:
+                self.verts_faces[vert_index].add(face_index)
+
+        self.heap = []
+        for vert_index in range(len(self.positions)):
+            self._push_vertex(vert_index)
+
+    def _get_neighbours(self, vert_index):
+        neighbours = set()
+        for face_index in self.verts_faces[vert_index]:
+            neighbours.update(self.faces[face_index])
+        neighbours.discard(vert_index)
+        return neighbours
+
+    def _push_vertex(self, vert_index):
+        # collapses of vertex into neighbours
+        if self.locked[vert_index] or self.removed[vert_index]:
+            return
+
+        quadric = self.quadrics[vert_index]
+        version = self.versions[vert_index]
+
+        for neighbour in self._get_neighbours(vert_index):
+            neighbour_quadric = self.quadrics[neighbour]
+            sum_quadric = [q1 + q2 for q1, q2 in zip(quadric, neighbour_quadric)]
+            error = _get_error(sum_quadric, self.positions[neighbour])
+            heapq.heappush(self.heap, (
+                error,
+                vert_index,
+                neighbour,
+                version,
+                self.versions[neighbour]
+            ))
+
+    def _can_collapse(self, vert_from, vert_to):
+        faces_from = self.verts_faces[vert_from]
+        shared_faces = faces_from & self.verts_faces[vert_to]
+
+        # link condition of the edge
+        common = self._get_neighbours(vert_from) & self._get_neighbours(vert_to)
+        if len(common) > len(shared_faces):
+            return False
+
+        # face normals should not be flipped
+        positions = self.positions
+        for face_index in faces_from - shared_faces:
+            face = self.faces[face_index]
+            new_face = [
+                vert_to if vert_index == vert_from else vert_index
+                for vert_index in face
+            ]
+            normal_old = _get_normal(*(positions[i] for i in face))
+            normal_new = _get_normal(*(positions[i] for i in new_face))
+            if _is_flipped(normal_old, normal_new):
+                return False
+
+        return True
+
+    def _collapse(self, vert_from, vert_to):
+        faces_from = self.verts_faces[vert_from]
+
+        for face_index in faces_from:
+            face = self.faces[face_index]
+
+            if vert_to in face:
+                # degenerate face is removed
+                self.faces_alive[face_index] = False
+                self.faces_count -= 1
+                for vert_index in face:
+                    if vert_index != vert_from:
+                        self.verts_faces[vert_index].discard(face_index)
+
+            else:
+                face[face.index(vert_from)] = vert_to
+                self.verts_faces[vert_to].add(face_index)
+
+        self.verts_faces[vert_from] = set()
+        self.removed[vert_from] = True
+
+        quadric = self.quadrics[vert_to]
+        self.quadrics[vert_to] = [
+            q1 + q2
+            for q1, q2 in zip(quadric, self.quadrics[vert_from])
+        ]
+
+        # the collapse costs of the neighbours are changed
+        self.versions[vert_to] += 1
+        self._push_vertex(vert_to)
+        for neighbour in self._get_neighbours(vert_to):
+            self.versions[neighbour] += 1
+            self._push_vertex(neighbour)
+
+    def collapse_next(self):
+        # returns collapsed vertex or None
+        while self.heap:
+            error, vert_from, vert_to, version_from, version_to = \
+                heapq.heappop(self.heap)
+
+            if self.removed[vert_from] or self.removed[vert_to]:
+                continue
+            if version_from != self.versions[vert_from]:
+                continue
+            if version_to != self.versions[vert_to]:
+                continue
+
+            if not self._can_collapse(vert_from, vert_to):
+                # the vertex is tried again when its neighbourhood changes
+                continue
+
+            self._collapse(vert_from, vert_to)
+
+            return vert_from
+
+    def get_faces(self):
+        return [
+            face
+            for face, alive in zip(self.faces, self.faces_alive)
+                if alive
+        ]
+
+
+def build_slide_windows(positions, triangles):
+    '''
+    Generate progressive mesh detail levels.
+    positions - vertex coordinates array, triangles - vertex indices.
+    Returns vertex order (old index of every new vertex),
+    triangles of all detail levels with new vertex indices and
+    slide windows: (indices offset, triangles count, vertices count).
+    The first window is the full detail mesh.
+    '''
+    positions = numpy.asarray(positions, dtype=numpy.float64).reshape(-1, 3)
+    triangles = numpy.asarray(triangles, dtype=numpy.int64).reshape(-1, 3)
+    vertices_count = len(positions)
+    tris_count = len(triangles)
+
+    simplifier = _Simplifier(positions, triangles)
+    collapsed = []
+    levels = [(triangles.tolist(), 0)]
+
+    min_count = max(1, int(tris_count * MIN_RATIO))
+    next_count = int(tris_count * LOD_STEP)
+
+    while simplifier.faces_count > min_count:
+        vert_index = simplifier.collapse_next()
+        if vert_index is None:
+            break
+        collapsed.append(vert_index)
+
+        if simplifier.faces_count <= next_count:
+            levels.append((simplifier.get_faces(), len(collapsed)))
+            next_count = int(simplifier.faces_count * LOD_STEP)
+
+    # the removed vertices are placed at the end,
+    # in reverse order of removal
+    removed = set(collapsed)
+    order = [
+        vert_index
+        for vert_index in range(vertices_count)
+            if vert_index not in removed
+    ]
+    order.extend(reversed(collapsed))
+    order = numpy.array(order, dtype=numpy.int64)
+
+    remap = numpy.empty(vertices_count, dtype=numpy.int64)
+    remap[order] = numpy.arange(vertices_count)
+
+    windows = []
+    levels_triangles = []
+    offset = 0
+
+    for faces, collapses_count in levels:
+        faces = remap[numpy.array(faces, dtype=numpy.int64).reshape(-1, 3)]
+        windows.append((offset, len(faces), vertices_count - collapses_count))
+        levels_triangles.append(faces)
+        offset += len(faces) * 3
+
+    return order, numpy.vstack(levels_triangles), windows
@@ -1,11 +1,18 @@
 # standart modules
+import os
+import json
 import time
+import contextlib
+import tracemalloc
 
 # blender modules
 import bpy
 
 # addon modules
+from . import cache
 from . import version
+from .. import log
+from .. import text
 
 
 statistics = None
@@ -21,6 +28,7 @@ class Statistics:
         self.context = ''
         self.time_stage = None
         self.stage_name = None
+        self.time_parse = None
         self.date = time.strftime('%Y.%m.%d %H:%M:%S')
 
         self.objs_count = 0
@@ -32,7 +40,20 @@ class Statistics:
         self.acts_count = 0
 
         self.props = None
-        self.print_status = version.get_preferences().use_batch_status
+        pref = version.get_preferences()
+        self.print_status = pref.use_batch_status
+
+        # profiling
+        self.start_time = time.perf_counter()
+        self.stages = []
+        self.stages_stack = []
+        self.trace_file = pref.stats_trace_file
+        self.use_memory = pref.use_stats_memory
+        self.started_tracemalloc = False
+
+        if self.use_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
 
     def info(self, data):
         self.lines.append(data)
@@ -69,8 +90,106 @@ class Statistics:
 
         text_history.from_string(history)
 
+    def stop_tracemalloc(self):
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
     def flush(self):
+        self.stop_tracemalloc()
         self.create_bpy_text()
+        if self.trace_file:
+            write_trace(self, bpy.path.abspath(self.trace_file))
+
+
+class StageRecord:
+    def __init__(self, name, path, depth, start):
+        self.name = name
+        self.path = path
+        self.depth = depth
+        self.start = start
+        self.end = None
+
+        # memory in bytes
+        self.mem_start = None
+        self.mem_alloc = None
+        self.mem_peak = None
+        self.child_peak = 0
+
+
+class StageTimer(contextlib.ContextDecorator):
+    '''
+    Named stage timer. Used as context manager or decorator,
+    stages can be nested.
+    '''
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        begin_stage(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        end_stage()
+        return False
+
+
+def stage_timer(name):
+    return StageTimer(name)
+
+
+def begin_stage(name):
+    global statistics
+    if not statistics:
+        return
+
+    stack = statistics.stages_stack
+
+    if stack:
+        path = stack[-1].path + (name, )
+    else:
+        path = (name, )
+
+    record = StageRecord(name, path, len(stack), time.perf_counter())
+
+    if statistics.use_memory and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        record.mem_start = current
+        if hasattr(tracemalloc, 'reset_peak'):
+            # the peak reached by the parent stage before the child
+            # is kept, the reset would discard it
+            if stack:
+                parent = stack[-1]
+                parent.child_peak = max(parent.child_peak, peak)
+            tracemalloc.reset_peak()
+
+    stack.append(record)
+
+
+def end_stage():
+    global statistics
+    if not statistics or not statistics.stages_stack:
+        return
+
+    record = statistics.stages_stack.pop()
+    record.end = time.perf_counter()
+
+    if record.mem_start is not None and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, record.child_peak)
+        record.mem_alloc = current - record.mem_start
+        record.mem_peak = peak - record.mem_start
+
+        # the peak of the parent stage includes the peak of the child
+        if statistics.stages_stack:
+            parent = statistics.stages_stack[-1]
+            parent.child_peak = max(parent.child_peak, peak)
+
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+    statistics.stages.append(record)
 
 
 def created_obj():
@@ -132,6 +251,13 @@ def stage(stage_name):
         statistics.stage_name = stage_name
 
 
+def parse_time(time_sec):
+    # time of the first import stage of the next file
+    global statistics
+    if statistics:
+        statistics.time_parse = time_sec
+
+
 def update(context):
     global statistics
     if statistics:
@@ -167,17 +293,26 @@ def end_time(start_time):
     if statistics.props:
         file_path = statistics.props[0]
 
+        stages_times = []
+
+        if statistics.time_parse is not None:
+            stages_times.append(('Parse', statistics.time_parse))
+            stages_times.append(('Create', total_time))
+            total_time_str = normalize_time(total_time + statistics.time_parse)
+
         if statistics.time_stage:
-            time_stage_str = normalize_time(statistics.time_stage)
-            others_time_str = normalize_time(
-                total_time - statistics.time_stage
+            stages_times.append((statistics.stage_name, statistics.time_stage))
+            stages_times.append(('Others', total_time - statistics.time_stage))
+
+        if stages_times:
+            stages_str = ', '.join(
+                '{0}: {1:>12}'.format(name, normalize_time(time_sec))
+                for name, time_sec in stages_times
             )
-            total_time_message = '{0} {1:>12} ({2}: {3:>12}, Others: {4:>12}): "{5}"'.format(
+            total_time_message = '{0} {1:>12} ({2}): "{3}"'.format(
                 statistics.status,
                 total_time_str,
-                statistics.stage_name,
-                time_stage_str,
-                others_time_str,
+                stages_str,
                 file_path
             )
 
@@ -195,6 +330,7 @@ def end_time(start_time):
         )
 
     statistics.time_stage = None
+    statistics.time_parse = None
     info(total_time_message)
 
 
@@ -235,6 +371,136 @@ def data_blocks_count_info():
         info(acts_count)
 
 
+def normalize_memory(size):
+    sign = '-' if size < 0 else ''
+    size = abs(size)
+
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return '{0}{1:.1f} {2}'.format(sign, size, unit)
+        size /= 1024
+
+    return '{0}{1:.1f} GB'.format(sign, size)
+
+
+def get_stages_summary(stages):
+    # total time, calls count and memory of stages with the same path
+    summary = {}
+
+    for record in stages:
+        total = summary.get(record.path)
+        if total is None:
+            total = summary[record.path] = {
+                'time': 0.0,
+                'count': 0,
+                'mem_alloc': None,
+                'mem_peak': None
+            }
+
+        total['time'] += record.end - record.start
+        total['count'] += 1
+
+        if record.mem_alloc is not None:
+            total['mem_alloc'] = (total['mem_alloc'] or 0) + record.mem_alloc
+            total['mem_peak'] = max(total['mem_peak'] or 0, record.mem_peak)
+
+    # order stages as a tree by the first start time
+    first_start = {}
+    for record in stages:
+        start = first_start.get(record.path)
+        if start is None or record.start < start:
+            first_start[record.path] = record.start
+
+    paths = sorted(summary, key=lambda path: [
+        first_start[path[ : depth + 1]]
+        for depth in range(len(path))
+    ])
+
+    return [(path, summary[path]) for path in paths]
+
+
+def stages_info():
+    global statistics
+
+    if not statistics.stages:
+        return
+
+    info('\nStages:')
+
+    for path, total in get_stages_summary(statistics.stages):
+        indent = '    ' * len(path)
+        name = path[-1]
+
+        if total['count'] > 1:
+            name = '{0} (x{1})'.format(name, total['count'])
+
+        line = '{0}{1}: {2}'.format(
+            indent,
+            name,
+            normalize_time(total['time'])
+        )
+
+        if total['mem_alloc'] is not None:
+            line += ' (Allocated: {0}, Peak: {1})'.format(
+                normalize_memory(total['mem_alloc']),
+                normalize_memory(total['mem_peak'])
+            )
+
+        info(line)
+
+
+def get_trace(stats):
+    # chrome trace event format, times in microseconds
+    events = []
+    pid = os.getpid()
+
+    for record in sorted(stats.stages, key=lambda rec: rec.start):
+        event = {
+            'name': record.name,
+            'cat': '/'.join(record.path),
+            'ph': 'X',
+            'ts': round((record.start - stats.start_time) * 1e6, 3),
+            'dur': round((record.end - record.start) * 1e6, 3),
+            'pid': pid,
+            'tid': 0
+        }
+
+        if record.mem_alloc is not None:
+            event['args'] = {
+                'mem_alloc': record.mem_alloc,
+                'mem_peak': record.mem_peak
+            }
+
+        events.append(event)
+
+    return {
+        'traceEvents': events,
+        'displayTimeUnit': 'ms',
+        'otherData': {
+            'context': stats.context,
+            'date': stats.date
+        }
+    }
+
+
+def write_trace(stats, file_path):
+    dir_path = os.path.dirname(file_path)
+
+    try:
+        if dir_path and not os.path.exists(dir_path):
+            os.makedirs(dir_path)
+
+        with open(file_path, 'w') as file:
+            json.dump(get_trace(stats), file, indent=1)
+
+    except OSError as err:
+        log.warn(
+            text.warn.stats_trace_not_written,
+            file=file_path,
+            error=str(err)
+        )
+
+
 def timer(method):
 
     def wrapper(*args, **kwargs):
@@ -281,8 +547,15 @@ def execute_with_stats(method):
         # before executing
         statistics = Statistics()
         start_time = time.time()
+        cache.start_session()
 
-        result = method(self, context)
+        try:
+            result = method(self, context)
+        except BaseException:
+            statistics.stop_tracemalloc()
+            raise
+        finally:
+            cache.end_session()
 
         # after executing
         files_count_info = '\n{0}ed Files: {1}'.format(
@@ -291,6 +564,7 @@ def execute_with_stats(method):
         )
         info(files_count_info)
         data_blocks_count_info()
+        stages_info()
 
         statistics.status = '\nTotal Time'
         statistics.props = None
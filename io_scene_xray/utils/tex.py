@@ -5,6 +5,7 @@ import os
 import bpy
 
 # addon modules
+from . import cache
 from . import stats
 
 
@@ -14,6 +15,7 @@ def create_empty_img(tex_path):
     bpy_img.source = 'FILE'
     bpy_img.filepath = tex_path
     stats.created_img()
+    cache.add_image(bpy_img)
 
     return bpy_img
 
@@ -34,14 +36,15 @@ def make_abs_tex_path(tex_folder, tex_relpath):
 
 
 def search_image_by_tex_path(tex_abspath):
-    for bpy_image in bpy.data.images:
-        img_path = bpy.path.abspath(bpy_image.filepath).lower()
-        if img_path == tex_abspath.lower():
-            return bpy_image
+    images = cache.get_cache().get('images', 'path', tex_abspath.lower())
+    if images:
+        return images[0]
 
 
 def search_texture_by_tex_path(name, abs_path):
-    for bpy_tex in bpy.data.textures:
+    textures = cache.get_cache().get('textures', 'image', abs_path)
+
+    for bpy_tex in textures:
 
         if not bpy_tex.name.startswith(name):
             continue
@@ -62,6 +65,7 @@ def load_image_by_tex_path(tex_abspath):
         try:
             bpy_img = bpy.data.images.load(tex_abspath)
             stats.created_img()
+            cache.add_image(bpy_img)
             return bpy_img
 
         except RuntimeError:    # e.g. 'Error: Cannot read ...'
@@ -66,6 +66,10 @@ def has_id_props_ui():
     return bpy.app.version >= (3, 0, 0)
 
 
+def has_writable_loop_total():
+    return bpy.app.version < (4, 0, 0)
+
+
 IS_277 = is_blender_2_77()
 IS_28 = is_blender_2_80()
 IS_29 = is_blender_2_90()
@@ -0,0 +1,213 @@
+# standart modules
+import collections
+
+# blender modules
+import numpy
+
+# addon modules
+from . import stats
+
+
+# vertex cache optimization by Tom Forsyth:
+# "Linear-Speed Vertex Cache Optimisation"
+CACHE_SIZE = 32
+CACHE_DECAY_POWER = 1.5
+LAST_TRI_SCORE = 0.75
+VALENCE_BOOST_SCALE = 2.0
+VALENCE_BOOST_POWER = 0.5
+
+# post-transform cache size used for statistics
+FIFO_SIZE = 16
+
+
+def _get_cache_scores():
+    scores = []
+    scaler = 1.0 / (CACHE_SIZE - 3)
+
+    for cache_position in range(CACHE_SIZE):
+        if cache_position < 3:
+            # the vertices of the last triangle are scored the same,
+            # otherwise the next triangle orientation would be preferred
+            score = LAST_TRI_SCORE
+        else:
+            score = 1.0 - (cache_position - 3) * scaler
+            score = score ** CACHE_DECAY_POWER
+        scores.append(score)
+
+    # vertex is not in cache
+    scores.append(0.0)
+
+    return scores
+
+
+def _get_valence_scores(max_valence):
+    scores = [-1.0, ]    # vertex is not used anymore
+
+    for valence in range(1, max_valence + 1):
+        score = VALENCE_BOOST_SCALE * valence ** -VALENCE_BOOST_POWER
+        scores.append(score)
+
+    return scores
+
+
+def optimize_vertex_cache(triangles, vertices_count):
+    '''
+    Reorder triangles for post-transform vertex cache.
+    triangles - array of vertex indices, one row for every triangle.
+    Returns reordered triangles array.
+    '''
+    triangles = numpy.asarray(triangles).reshape(-1, 3)
+    tris_count = len(triangles)
+    tris = triangles.tolist()
+
+    # triangles of every vertex
+    verts_tris = [[] for _ in range(vertices_count)]
+    for tri_index, tri in enumerate(tris):
+        for vert_index in tri:
+            verts_tris[vert_index].append(tri_index)
+
+    valences = [len(vert_tris) for vert_tris in verts_tris]
+    cache_scores = _get_cache_scores()
+    valence_scores = _get_valence_scores(max(valences, default=0))
+    not_cached = CACHE_SIZE
+
+    cache_positions = [not_cached, ] * vertices_count
+    verts_scores = [valence_scores[valence] for valence in valences]
+    tris_scores = [
+        verts_scores[v1] + verts_scores[v2] + verts_scores[v3]
+        for v1, v2, v3 in tris
+    ]
+    tris_added = [False, ] * tris_count
+
+    order = []
+    cache = []
+    next_tri = 0
+
+    if tris_count:
+        best_tri = max(range(tris_count), key=tris_scores.__getitem__)
+    else:
+        best_tri = None
+
+    while best_tri is not None:
+        tri = tris[best_tri]
+        order.append(best_tri)
+        tris_added[best_tri] = True
+
+        for vert_index in tri:
+            valences[vert_index] -= 1
+            verts_tris[vert_index].remove(best_tri)
+
+        # the triangle vertices are moved to the cache front
+        new_cache = list(tri)
+        new_cache.extend(
+            vert_index
+            for vert_index in cache
+                if vert_index not in tri
+        )
+
+        for vert_index in new_cache[CACHE_SIZE : ]:
+            cache_positions[vert_index] = not_cached
+        cache = new_cache[ : CACHE_SIZE]
+
+        # update scores of the cached and dropped vertices
+        best_tri = None
+        best_score = -1.0
+        for cache_position, vert_index in enumerate(new_cache):
+            if cache_position < CACHE_SIZE:
+                cache_positions[vert_index] = cache_position
+            valence = valences[vert_index]
+            score = valence_scores[valence]
+            if valence:
+                score += cache_scores[cache_positions[vert_index]]
+            score_diff = score - verts_scores[vert_index]
+            verts_scores[vert_index] = score
+
+            for tri_index in verts_tris[vert_index]:
+                tri_score = tris_scores[tri_index] + score_diff
+                tris_scores[tri_index] = tri_score
+                if tri_score > best_score:
+                    best_score = tri_score
+                    best_tri = tri_index
+
+        # the cache does not have triangles to continue,
+        # the next triangle is taken in the original order
+        if best_tri is None:
+            while next_tri < tris_count and tris_added[next_tri]:
+                next_tri += 1
+            if next_tri < tris_count:
+                best_tri = next_tri
+
+    return triangles[order]
+
+
+def optimize_vertex_fetch(triangles, vertices_count):
+    '''
+    Renumber vertices in order of the first use by triangles.
+    Returns triangles with new vertex indices and vertex order:
+    old vertex index of every new vertex.
+    Unused vertices are placed at the end.
+    '''
+    triangles = numpy.asarray(triangles).reshape(-1, 3)
+    indices = triangles.ravel()
+
+    first_use = numpy.full(vertices_count, len(indices), dtype=numpy.int64)
+    numpy.minimum.at(first_use, indices, numpy.arange(len(indices)))
+    order = numpy.argsort(first_use, kind='mergesort')
+
+    remap = numpy.empty(vertices_count, dtype=indices.dtype)
+    remap[order] = numpy.arange(vertices_count)
+
+    return remap[triangles], order
+
+
+def get_cache_stats(triangles, vertices_count, cache_size=FIFO_SIZE):
+    '''
+    Simulate FIFO post-transform vertex cache.
+    Returns average cache miss ratio (cache misses per triangle)
+    and average transformed vertex ratio (cache misses per vertex).
+    '''
+    indices = numpy.asarray(triangles).ravel().tolist()
+    cache = collections.deque()
+    cached = set()
+    misses = 0
+
+    for vert_index in indices:
+        if vert_index in cached:
+            continue
+        misses += 1
+        cache.append(vert_index)
+        cached.add(vert_index)
+        if len(cache) > cache_size:
+            cached.discard(cache.popleft())
+
+    tris_count = len(indices) // 3
+    acmr = misses / tris_count if tris_count else 0.0
+    atvr = misses / vertices_count if vertices_count else 0.0
+
+    return acmr, atvr
+
+
+def optimize(name, triangles, vertices_count):
+    '''
+    Vertex cache and vertex fetch optimization of indexed triangles.
+    The cache statistics are written to the export statistics.
+    Returns triangles and vertex order.
+    '''
+    acmr, atvr = get_cache_stats(triangles, vertices_count)
+
+    triangles = optimize_vertex_cache(triangles, vertices_count)
+    triangles, order = optimize_vertex_fetch(triangles, vertices_count)
+
+    new_acmr, new_atvr = get_cache_stats(triangles, vertices_count)
+    stats.info(
+        'Vertex Cache "{0}": '
+        'ACMR {1:.3f} -> {2:.3f}, ATVR {3:.3f} -> {4:.3f}'.format(
+            name,
+            acmr,
+            new_acmr,
+            atvr,
+            new_atvr
+        )
+    )
+
+    return triangles, order
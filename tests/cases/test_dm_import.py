@@ -24,3 +24,17 @@ class TestDmImport(utils.XRayTestCase):
         if not bpy.app.version >= (2, 80, 0):
             tex = mat.active_texture
             self.assertEqual(tex.name, 'fx\\fx_rainsplash1')
+
+    def test_reuse_material(self):
+        # Arrange
+        original_materials_count = len(bpy.data.materials)
+
+        # Act
+        bpy.ops.xray_import.dm(
+            directory=self.binpath(),
+            files=[{'name': 'test_fmt.dm'}, {'name': 'test_fmt.dm'}],
+        )
+
+        # Assert
+        self.assertReportsNotContains('ERROR')
+        self.assertEqual(len(bpy.data.materials), original_materials_count + 1)
@@ -1,6 +1,11 @@
 from tests import utils
 
+import math
+
 import bpy
+import mathutils
+import numpy
+import io_scene_xray
 
 
 class TestIOMotions(utils.XRayTestCase):
@@ -47,6 +52,100 @@ class TestIOMotions(utils.XRayTestCase):
         self.assertEqual(len(imp_act.fcurves[0].keyframe_points), 5)
         self.assertEqual(imp_act.frame_range[1], 4)
 
+    def test_bake_fcurves(self):
+        # Arrange
+        obj = _prepare_animation()
+        bake = io_scene_xray.formats.motions.bake
+        pbone = obj.pose.bones['cbone']
+        pbone.rotation_mode = 'ZXY'
+        pbone.keyframe_insert('rotation_euler', frame=1, group='cbone')
+        pbone.rotation_euler = (0.5, -1.0, 2.0)
+        pbone.scale = (1.0, 2.0, 1.0)
+        pbone.keyframe_insert('rotation_euler', frame=5, group='cbone')
+        pbone.keyframe_insert('scale', frame=5, group='cbone')
+        action = bpy.data.actions[0]
+        pose_bones, parents = bake.get_exportable_bones(obj)
+
+        # Act
+        matrices, method = bake.bake_action(obj, action, pose_bones, parents)
+        frames = list(range(1, 6))
+        frame_set_matrices = bake._bake_frame_set(
+            obj,
+            action,
+            pose_bones,
+            parents,
+            frames,
+            None
+        )
+
+        # Assert
+        self.assertEqual(method, bake.METHOD_FCURVES)
+        self.assertEqual(matrices.shape, (5, 2, 4, 4))
+        self.assertLess(abs(matrices - frame_set_matrices).max(), 1e-5)
+
+        # constraints require scene update
+        pbone.constraints.new('COPY_ROTATION')
+        _, method = bake.bake_action(obj, action, pose_bones, parents)
+        self.assertEqual(method, bake.METHOD_FRAME_SET)
+
+    def test_bake_cache(self):
+        # Arrange
+        obj = _prepare_animation()
+        bake = io_scene_xray.formats.motions.bake
+        bake.bake_cache.clear()
+        action = bpy.data.actions[0]
+        pose_bones, parents = bake.get_exportable_bones(obj)
+
+        # Act
+        motion = bake.bake_motion(obj, action, pose_bones, parents)
+        cached_motion = bake.bake_motion(obj, action, pose_bones, parents)
+        obj.pose.bones['bone'].keyframe_insert('location', frame=3)
+        changed_motion = bake.bake_motion(obj, action, pose_bones, parents)
+
+        # Assert
+        translations, quaternions, eulers = motion
+        self.assertIs(cached_motion, motion)
+        self.assertIsNot(changed_motion, motion)
+        self.assertEqual(len(bake.bake_cache), 2)
+        self.assertEqual(translations.dtype.name, 'float32')
+        self.assertEqual(translations.shape, (5, 2, 3))
+        self.assertEqual(quaternions.shape, (5, 2, 4))
+        self.assertEqual(eulers.dtype.name, 'float64')
+        self.assertEqual(eulers.shape, (5, 2, 3))
+        self.assertFalse(translations.flags.writeable)
+        self.assertFalse(quaternions.flags.writeable)
+        self.assertFalse(eulers.flags.writeable)
+
+        # least recently used motion is removed
+        bake.bake_cache.budget = bake.bake_cache.size - 1
+        bake.bake_cache.put(('key', ), motion)
+        self.assertEqual(len(bake.bake_cache), 1)
+        self.assertIs(bake.bake_cache.get(('key', )), motion)
+        bake.bake_cache.budget = bake.BAKE_CACHE_BUDGET
+        bake.bake_cache.clear()
+
+    def test_matrices_eulers(self):
+        bake = io_scene_xray.formats.motions.bake
+        eulers = (
+            (0.1, 0.2, 0.3),
+            (-2.5, 1.2, 3.0),
+            (0.4, math.pi / 2, -0.7),
+            (3.0, -0.3, -2.9)
+        )
+
+        for order in ('XYZ', 'XZY', 'YXZ', 'YZX', 'ZXY', 'ZYX'):
+            matrices = numpy.array([
+                mathutils.Euler(euler, order).to_matrix()
+                for euler in eulers
+            ])
+            result = bake.get_matrices_eulers(matrices, order)
+
+            # the same angles as in mathutils are selected
+            for matrix, euler in zip(matrices, result):
+                expected = mathutils.Matrix(matrix).to_euler(order)
+                for axis in range(3):
+                    self.assertAlmostEqual(euler[axis], expected[axis], 4)
+
 
 def _prepare_animation():
     arm = bpy.data.armatures.new('test')
@@ -1,5 +1,7 @@
 import os
+import struct
 import bpy
+import io_scene_xray
 import tests
 
 
@@ -29,3 +31,410 @@ class TestLevel(tests.utils.XRayTestCase):
 
         # Assert
         self.assertReportsNotContains('ERROR')
+
+    def test_vertex_buffer_uv_corrector(self):
+        vb_module = io_scene_xray.formats.level.imp.vb
+        level_fmt = io_scene_xray.formats.level.fmt
+        rw = io_scene_xray.rw
+
+        usage_values = level_fmt.usage_values
+        types_values = level_fmt.types_values
+        tex_coef = level_fmt.UV_COEFFICIENT
+
+        # tangent or binormal only
+        for corr_usage in (level_fmt.TANGENT, level_fmt.BINORMAL):
+            data = bytearray()
+            declaration = (
+                (0, level_fmt.FLOAT3, level_fmt.POSITION),
+                (12, level_fmt.D3DCOLOR, corr_usage),
+                (16, level_fmt.SHORT2, level_fmt.TEXCOORD),
+                (0, level_fmt.UNUSED, level_fmt.POSITION)
+            )
+            for offset, data_type, usage in declaration:
+                data += struct.pack(
+                    '<2H4B',
+                    0,
+                    offset,
+                    types_values[data_type],
+                    0,
+                    usage_values[usage],
+                    0
+                )
+            data += struct.pack('<I', 1)
+            data += struct.pack('<3f4B2h', 1, 2, 3, 0, 0, 0, 255, 1024, 512)
+
+            reader = rw.read.PackedReader(bytes(data))
+            vb = vb_module._import_vertex_buffer_d3d9(reader, 14)
+
+            coord_u = 1024 / tex_coef
+            coord_v = 1 - 512 / tex_coef
+            correct = 32 / 0x8000
+            if corr_usage == level_fmt.TANGENT:
+                coord_u += correct
+            else:
+                coord_v -= correct
+
+            self.assertEqual(vb.position.tolist(), [[1, 3, 2]])
+            self.assertAlmostEqual(vb.uv[0][0], coord_u)
+            self.assertAlmostEqual(vb.uv[0][1], coord_v)
+
+    def test_visual_static_vertices(self):
+        numpy = io_scene_xray.utils.mesh.numpy
+        visual = io_scene_xray.formats.ogf.imp.types.Visual()
+        # slice of a vertex buffer array
+        visual.vertices = numpy.array((
+            (1, 2, 3),
+            (-0.0, 5, 6),
+            (1, 2, 3),
+            (0.0, 5, 6),
+            (1, 2, 3)
+        ), dtype=numpy.float32)[1 : ]
+        back_side = {0: False, 1: False, 2: False, 3: True}
+
+        create_vertices = io_scene_xray.formats.ogf.imp.mesh.create_vertices
+        vertices, remap_vertices = create_vertices(visual, back_side)
+
+        self.assertEqual(vertices.tolist(), [[0, 5, 6], [1, 2, 3], [1, 2, 3]])
+        self.assertEqual(remap_vertices.tolist(), [0, 1, 0, 2])
+
+    def test_unique_rows(self):
+        numpy = io_scene_xray.utils.mesh.numpy
+        rows = numpy.array((
+            (4, 5, 6),
+            (1, 2, 3),
+            (4, 5, 6),
+            (1, 2, 0),
+            (1, 2, 3)
+        ))
+
+        unique, first, counts, inverse = io_scene_xray.utils.mesh.unique_rows(
+            rows
+        )
+
+        self.assertEqual(unique.tolist(), [[1, 2, 0], [1, 2, 3], [4, 5, 6]])
+        self.assertEqual(first.tolist(), [3, 1, 0])
+        self.assertEqual(counts.tolist(), [1, 2, 2])
+        self.assertEqual(inverse.tolist(), [2, 1, 2, 0, 1])
+
+    def test_weld_vertices(self):
+        numpy = io_scene_xray.utils.mesh.numpy
+        keys = numpy.array((
+            (1, 2, 3),
+            (4, 5, 6),
+            (1, 2, 3),
+            (7, 8, 9),
+            (4, 5, 6),
+            (1, 2, 3)
+        ), dtype=numpy.float32)
+
+        unique_loops, indices = io_scene_xray.utils.mesh.weld_vertices(keys)
+
+        self.assertEqual(unique_loops.tolist(), [0, 1, 3])
+        self.assertEqual(indices.tolist(), [0, 1, 0, 2, 1, 0])
+
+    def test_vertex_cache(self):
+        vertex_cache = io_scene_xray.utils.vertex_cache
+        numpy = io_scene_xray.utils.mesh.numpy
+
+        # shuffled triangles of grid
+        size = 16
+        grid = numpy.arange((size + 1) ** 2).reshape(size + 1, size + 1)
+        quads = (
+            grid[ : -1, : -1].ravel(),
+            grid[ : -1, 1 : ].ravel(),
+            grid[1 : , : -1].ravel(),
+            grid[1 : , 1 : ].ravel()
+        )
+        triangles = numpy.vstack((
+            numpy.column_stack((quads[0], quads[1], quads[2])),
+            numpy.column_stack((quads[1], quads[3], quads[2]))
+        ))
+        triangles = triangles[numpy.random.RandomState(0).permutation(len(triangles))]
+        vertices_count = grid.size
+
+        new_triangles, order = vertex_cache.optimize(
+            'grid',
+            triangles,
+            vertices_count
+        )
+
+        self.assertEqual(
+            set(map(tuple, order[new_triangles].tolist())),
+            set(map(tuple, triangles.tolist()))
+        )
+        self.assertEqual(sorted(order.tolist()), list(range(vertices_count)))
+        self.assertLess(
+            vertex_cache.get_cache_stats(new_triangles, vertices_count)[0],
+            vertex_cache.get_cache_stats(triangles, vertices_count)[0]
+        )
+
+    def test_slide_windows(self):
+        progressive = io_scene_xray.utils.progressive
+        numpy = io_scene_xray.utils.mesh.numpy
+
+        # curved grid
+        size = 12
+        grid = numpy.arange((size + 1) ** 2).reshape(size + 1, size + 1)
+        x, y = numpy.meshgrid(numpy.arange(size + 1), numpy.arange(size + 1))
+        positions = numpy.column_stack((
+            x.ravel(),
+            y.ravel(),
+            numpy.sin(x.ravel() / 4) + numpy.cos(y.ravel() / 3)
+        ))
+        quads = (
+            grid[ : -1, : -1].ravel(),
+            grid[ : -1, 1 : ].ravel(),
+            grid[1 : , : -1].ravel(),
+            grid[1 : , 1 : ].ravel()
+        )
+        triangles = numpy.vstack((
+            numpy.column_stack((quads[0], quads[1], quads[2])),
+            numpy.column_stack((quads[1], quads[3], quads[2]))
+        ))
+
+        order, new_triangles, windows = progressive.build_slide_windows(
+            positions,
+            triangles
+        )
+
+        self.assertEqual(sorted(order.tolist()), list(range(grid.size)))
+        self.assertEqual(windows[0], (0, len(triangles), grid.size))
+        self.assertEqual(
+            set(map(tuple, order[new_triangles[ : len(triangles)]].tolist())),
+            set(map(tuple, triangles.tolist()))
+        )
+        self.assertGreater(len(windows), 1)
+
+        for offset, tris_count, verts_count in windows:
+            window = new_triangles[offset // 3 : offset // 3 + tris_count]
+            self.assertEqual(len(window), tris_count)
+            self.assertLess(window.max(), verts_count)
+
+        # detail levels are decreased
+        for window, next_window in zip(windows, windows[1 : ]):
+            self.assertLess(next_window[1], window[1])
+            self.assertLessEqual(next_window[2], window[2])
+
+    def test_export_optimize_indices(self):
+        prefs = tests.utils.get_preferences()
+        prefs.gamemtl_file = os.path.join(self.binpath(), 'gamemtl.xr')
+
+        # Import
+        bpy.ops.xray_import.level(filepath=os.path.join(
+            self.binpath(),
+            'level'
+        ))
+
+        # Export
+        level_obj = bpy.data.objects['tested']
+        tests.utils.set_active_object(level_obj)
+
+        bpy.ops.xray_export.level(
+            directory=self.outpath('test_fmt_level_export_optimized'),
+            optimize_indices=True
+        )
+
+        # Assert
+        self.assertReportsNotContains('ERROR')
+
+    def test_lod_billboards(self):
+        billboard = io_scene_xray.utils.billboard
+        numpy = io_scene_xray.utils.mesh.numpy
+
+        # box triangles
+        coords = numpy.array([
+            (x, y, z)
+            for x in (0.0, 1.0)
+                for y in (0.0, 1.0)
+                    for z in (0.0, 2.0)
+        ])
+        faces = (
+            (0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1),
+            (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)
+        )
+        triangles = []
+        for v1, v2, v3, v4 in faces:
+            triangles.extend(((v1, v2, v3), (v1, v3, v4)))
+        positions = coords[numpy.array(triangles)]
+        lights = numpy.full((len(triangles), 3, 5), 0.5)
+
+        quads, quads_lights, tiles = billboard.build_billboards(
+            positions,
+            lights,
+            tile_size=16
+        )
+
+        self.assertEqual(quads.shape, (billboard.LOD_SAMPLES, 4, 3))
+        self.assertTrue(numpy.allclose(quads_lights, 0.5))
+        self.assertTrue(numpy.allclose(tiles[ : , : , : , 3], 1.0))
+
+        for frame, quad in enumerate(quads):
+            # quads are turned to the viewer
+            normal = numpy.cross(quad[1] - quad[0], quad[3] - quad[0])
+            direction = billboard.get_view_axes(frame)[2]
+            self.assertLess(numpy.dot(normal, direction), 0.0)
+            self.assertAlmostEqual(quad[ : , 2].min(), 0.0)
+            self.assertAlmostEqual(quad[ : , 2].max(), 2.0)
+
+        # atlas tiles do not overlap
+        lods_in_row, rows_count = billboard.get_atlas_layout(20)
+        tiles = set()
+        for lod_index in range(20):
+            uvs = billboard.get_atlas_uvs(lod_index, lods_in_row, rows_count)
+            tiles.update(map(tuple, uvs[ : , 0].tolist()))
+            self.assertTrue(((uvs >= 0.0) & (uvs <= 1.0)).all())
+        self.assertEqual(len(tiles), 20 * billboard.LOD_SAMPLES)
+
+    def test_generate_lods(self):
+        prefs = tests.utils.get_preferences()
+        prefs.gamemtl_file = os.path.join(self.binpath(), 'gamemtl.xr')
+
+        # Import
+        bpy.ops.xray_import.level(filepath=os.path.join(
+            self.binpath(),
+            'level'
+        ))
+
+        # Generate
+        level_obj = bpy.data.objects['tested']
+        tests.utils.set_active_object(level_obj)
+
+        bpy.ops.io_scene_xray.generate_level_lods(
+            mode='ACTIVE_LEVEL',
+            tile_size=16
+        )
+
+        # Export
+        bpy.ops.xray_export.level(
+            directory=self.outpath('test_fmt_level_export_lods')
+        )
+
+        # Assert
+        self.assertReportsNotContains('ERROR')
+
+    def test_cform_triangles(self):
+        cform = io_scene_xray.formats.level.imp.cform
+        rw = io_scene_xray.rw
+        triangles = ((0, 1, 2, 3, 7), (2, 1, 4, 5, 1))
+
+        # version 2 and 3: 3 vertices, 3 unknown uint32, unknown uint16,
+        # sector uint16 and material uint32
+        for version in (2, 3):
+            data = b''.join(
+                struct.pack('<6I2HI', *verts, 9, 9, 9, 9, sector, mat)
+                for *verts, sector, mat in triangles
+            )
+            reader = rw.read.PackedReader(data)
+            verts, sectors, mat_keys = cform.read_tris(reader, version, 2)
+            self.assertEqual(verts.tolist(), [[0, 1, 2], [2, 1, 4]])
+            self.assertEqual(sectors.tolist(), [3, 5])
+            self.assertEqual(mat_keys.tolist(), [7 * 4, 1 * 4])
+            self.assertTrue(reader.is_end())
+
+        # version 4: material with shadows and wallmarks bits
+        data = b''.join(
+            struct.pack('<3I2H', *verts, mat, sector)
+            for *verts, sector, mat in triangles
+        )
+        data += struct.pack('<3I2H', 1, 2, 3, 6 | 0xc000, 0)
+        reader = rw.read.PackedReader(data)
+        verts, sectors, mat_keys = cform.read_tris(reader, 4, 3)
+        self.assertEqual(sectors.tolist(), [3, 5, 0])
+        self.assertEqual(mat_keys.tolist(), [7 * 4, 1 * 4, 6 * 4 + 3])
+        self.assertTrue(reader.is_end())
+
+    def test_cform_bvh(self):
+        cform_bvh = io_scene_xray.formats.level.cform_bvh
+        numpy = io_scene_xray.utils.mesh.numpy
+
+        # grid with the overlapping triangle and the duplicate
+        size = 10
+        grid = numpy.arange((size + 1) ** 2).reshape(size + 1, size + 1)
+        x, y = numpy.meshgrid(numpy.arange(size + 1), numpy.arange(size + 1))
+        positions = numpy.column_stack((
+            x.ravel(),
+            y.ravel(),
+            numpy.zeros(grid.size)
+        )).astype(numpy.float64)
+        quads = (
+            grid[ : -1, : -1].ravel(),
+            grid[ : -1, 1 : ].ravel(),
+            grid[1 : , : -1].ravel(),
+            grid[1 : , 1 : ].ravel()
+        )
+        triangles = numpy.vstack((
+            numpy.column_stack((quads[0], quads[1], quads[2])),
+            numpy.column_stack((quads[1], quads[3], quads[2]))
+        ))
+        grid_count = len(triangles)
+
+        corners = positions[triangles[0]]
+        small = corners + (corners.mean(axis=0) - corners) * 0.5
+        positions = numpy.vstack((positions, small))
+        triangles = numpy.vstack((
+            triangles,
+            (grid.size, grid.size + 1, grid.size + 2),
+            triangles[1],
+            triangles[2, ::-1],
+            (0, 0, 1)
+        ))
+
+        degenerate = cform_bvh.get_degenerate_triangles(positions, triangles)
+        self.assertEqual(numpy.flatnonzero(degenerate).tolist(), [grid_count + 3])
+
+        duplicates = cform_bvh.get_duplicate_triangles(triangles)
+        self.assertEqual(numpy.flatnonzero(duplicates).tolist(), [grid_count + 1])
+
+        welded, remap = cform_bvh.weld_vertices(
+            numpy.vstack((positions, positions + cform_bvh.WELD_DISTANCE * 0.1))
+        )
+        self.assertEqual(len(welded), len(positions))
+        self.assertEqual(remap.tolist(), list(range(len(positions))) * 2)
+
+        bvh = cform_bvh.CformBVH(positions, triangles[ : -1])
+
+        overlaps = bvh.get_overlapping_triangles()
+        self.assertEqual(overlaps.tolist(), [[0, grid_count]])
+
+        # ray casts
+        distance, triangle, location = bvh.ray_cast((2.2, 3.1, 5.0), (0, 0, -1))
+        self.assertAlmostEqual(distance, 5.0)
+        self.assertTrue(numpy.allclose(location, (2.2, 3.1, 0.0)))
+        self.assertIn(
+            tuple(triangles[triangle]),
+            {tuple(tri) for tri in triangles.tolist()}
+        )
+        self.assertIsNone(bvh.ray_cast((2.2, 3.1, 5.0), (0, 0, 1)))
+        self.assertIsNone(bvh.ray_cast((2.2, 3.1, 5.0), (0, 0, -1), 4.0))
+        self.assertIsNone(bvh.ray_cast((20.0, 3.1, 5.0), (0, 0, -1)))
+
+        # nearest triangles
+        distance, triangle, point = bvh.find_nearest((-3.0, 4.5, 4.0))
+        self.assertAlmostEqual(distance, 5.0)
+        self.assertTrue(numpy.allclose(point, (0.0, 4.5, 0.0)))
+        self.assertIsNone(bvh.find_nearest((-3.0, 4.5, 4.0), 4.0))
+
+    def test_export_optimize_cform(self):
+        prefs = tests.utils.get_preferences()
+        prefs.gamemtl_file = os.path.join(self.binpath(), 'gamemtl.xr')
+
+        # Import
+        bpy.ops.xray_import.level(filepath=os.path.join(
+            self.binpath(),
+            'level'
+        ))
+
+        # Drop to cform
+        bpy.ops.io_scene_xray.drop_to_cform()
+
+        # Export
+        level_obj = bpy.data.objects['tested']
+        tests.utils.set_active_object(level_obj)
+
+        bpy.ops.xray_export.level(
+            directory=self.outpath('test_fmt_level_export_cform'),
+            optimize_cform=True
+        )
+
+        # Assert
+        self.assertReportsNotContains('ERROR')
@@ -0,0 +1,97 @@
+import os
+import io_scene_xray
+import tests
+
+
+class TestLzhuf(tests.utils.XRayTestCase):
+    def _read_compressed_chunk(self):
+        file_path = os.path.join(self.binpath(), 'test_fmt_old.object')
+        with open(file_path, 'rb') as file:
+            data = file.read()
+
+        rw = io_scene_xray.rw
+        reader = rw.read.ChunkedReader(data, ignore_compression=True)
+        packed_reader = rw.read.PackedReader(reader.next(0x7777))
+        textsize = packed_reader.uint32()
+        buffer = bytes(packed_reader.getv())
+
+        return buffer, textsize
+
+    def test_backends(self):
+        lzhuf = io_scene_xray.rw.lzhuf
+        buffer, textsize = self._read_compressed_chunk()
+
+        expected = lzhuf._decompress_reference(buffer, textsize)
+        self.assertEqual(len(expected), textsize)
+
+        for backend in lzhuf.get_backends():
+            result = lzhuf._backends[backend](buffer, textsize)
+            self.assertEqual(bytes(result), bytes(expected), backend)
+
+    def test_truncated(self):
+        lzhuf = io_scene_xray.rw.lzhuf
+        buffer, textsize = self._read_compressed_chunk()
+
+        for backend in lzhuf.get_backends():
+            with self.assertRaises(lzhuf.error):
+                lzhuf._backends[backend](buffer[ : len(buffer) // 2], textsize)
+
+    def test_set_backend(self):
+        lzhuf = io_scene_xray.rw.lzhuf
+        prev_backend = lzhuf.get_backend()
+
+        try:
+            lzhuf.set_backend('reference')
+            self.assertEqual(lzhuf.get_backend(), 'reference')
+
+            with self.assertRaises(lzhuf.error):
+                lzhuf.set_backend('unknown')
+
+        finally:
+            lzhuf.set_backend(prev_backend)
+
+    def test_compress(self):
+        lzhuf = io_scene_xray.rw.lzhuf
+        buffer, textsize = self._read_compressed_chunk()
+        data = bytes(lzhuf.decompress_buffer(buffer, textsize))
+
+        # the same stream as the engine compressor writes
+        self.assertEqual(bytes(lzhuf.compress_buffer(data)), buffer)
+
+        # streaming in parts
+        compressor = lzhuf.Compressor()
+        result = bytearray()
+        for offset in range(0, len(data), 100):
+            result += compressor.compress(data[offset : offset + 100])
+        result += compressor.flush()
+        self.assertEqual(bytes(result), buffer)
+
+    def test_round_trip(self):
+        lzhuf = io_scene_xray.rw.lzhuf
+        samples = (
+            b'',
+            b'a',
+            b'abc' * 1000,
+            bytes(range(256)) * 40,
+            bytes((index * 7919) & 0xff for index in range(20000))
+        )
+
+        for data in samples:
+            compressed = lzhuf.compress_buffer(data)
+            result = lzhuf.decompress_buffer(compressed, len(data))
+            self.assertEqual(bytes(result), data)
+
+    def test_compressed_chunk(self):
+        rw = io_scene_xray.rw
+        packed_writer = rw.write.PackedWriter()
+        for index in range(1000):
+            packed_writer.putf('<2I', index, 0x10)
+
+        chunked_writer = rw.write.ChunkedWriter()
+        chunked_writer.put(0x1, packed_writer, compress=True)
+        chunked_writer.put(0x2, packed_writer)
+        self.assertLess(len(chunked_writer.data), len(packed_writer.data) * 2)
+
+        chunks = rw.utils.get_chunks(chunked_writer.data)
+        self.assertEqual(bytes(chunks[0x1]), bytes(packed_writer.data))
+        self.assertEqual(bytes(chunks[0x2]), bytes(packed_writer.data))
@@ -1,6 +1,7 @@
 from tests import utils
 
 import re
+import json
 import bpy
 
 
@@ -40,3 +41,71 @@ class TestOgfImport(utils.XRayTestCase):
             'WARNING',
             re.compile('Description isn\'t properly read')
         )
+
+    def test_import_batch(self):
+        bpy.ops.xray_import.ogf(
+            directory=self.binpath(),
+            files=[
+                {'name': 'test_fmt_ogf_pm_act.ogf'},
+                {'name': 'test_fmt_ogf_pm_1_link.ogf'},
+                {'name': 'test_fmt_ogf_st.ogf'},
+                {'name': 'test_fmt_ogf_gl.ogf'}
+            ],
+        )
+
+        self.assertReportsNotContains('ERROR')
+
+    def test_import_parallel(self):
+        prefs = utils.get_preferences()
+        prefs.use_parallel_import = True
+
+        try:
+            bpy.ops.xray_import.ogf(
+                directory=self.binpath(),
+                files=[
+                    {'name': 'test_fmt_ogf_pm_act.ogf'},
+                    {'name': 'test_fmt_ogf_pm_1_link.ogf'},
+                    {'name': 'test_fmt_ogf_st.ogf'},
+                    {'name': 'test_fmt_ogf_gl.ogf'}
+                ],
+            )
+        finally:
+            prefs.use_parallel_import = False
+
+        self.assertReportsNotContains('ERROR')
+        self.assertReportsContains(
+            'WARNING',
+            re.compile('Description isn\'t properly read')
+        )
+        stats = bpy.data.texts['xray_stats'].as_string()
+        self.assertEqual(stats.count('Parse:'), 4)
+        self.assertEqual(stats.count('Create:'), 4)
+
+    def test_import_stages_trace(self):
+        prefs = utils.get_preferences()
+        trace_path = self.outpath('test_ogf_import_trace.json')
+        prefs.use_stats_memory = True
+        prefs.stats_trace_file = trace_path
+
+        try:
+            bpy.ops.xray_import.ogf(
+                directory=self.binpath(),
+                files=[{'name': 'test_fmt_ogf_pm_act.ogf'}],
+            )
+        finally:
+            prefs.use_stats_memory = False
+            prefs.stats_trace_file = ''
+
+        self.assertReportsNotContains('ERROR')
+        stats = bpy.data.texts['xray_stats'].as_string()
+        self.assertIn('Stages:', stats)
+        self.assertIn('Allocated:', stats)
+
+        with open(trace_path) as file:
+            trace = json.load(file)
+
+        names = {event['name'] for event in trace['traceEvents']}
+        self.assertIn('Mesh', names)
+        for event in trace['traceEvents']:
+            self.assertEqual(event['ph'], 'X')
+            self.assertIn('mem_peak', event['args'])
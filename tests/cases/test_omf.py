@@ -1,4 +1,11 @@
+import os
+import re
+import math
+import zlib
+import struct
+
 import bpy
+import numpy
 import tests
 import io_scene_xray
 
@@ -42,6 +49,44 @@ class TestOmf(tests.utils.XRayTestCase):
             export_bone_parts=True
         )
 
+    def test_compressed_export(self):
+        # import mesh and armature
+        bpy.ops.xray_import.object(
+            directory=self.binpath(),
+            files=[{'name': 'test_fmt_omf.object'}],
+        )
+        arm_obj = bpy.data.objects['test_fmt_omf.object']
+        tests.utils.set_active_object(arm_obj)
+
+        # import motions
+        bpy.ops.xray_import.omf(
+            directory=self.binpath(),
+            files=[{'name': 'test_fmt.omf'}],
+            import_motions=True,
+            import_bone_parts=True,
+            add_to_motion_list=True
+        )
+
+        # export compressed motions
+        bpy.ops.xray_export.omf_file(
+            filepath=self.outpath('test_compressed.omf'),
+            export_mode='OVERWRITE',
+            export_motions=True,
+            export_bone_parts=True,
+            compress_chunks=True
+        )
+
+        # import compressed motions
+        bpy.ops.xray_import.omf(
+            directory=self.outpath(),
+            files=[{'name': 'test_compressed.omf'}],
+            import_motions=True,
+            import_bone_parts=True,
+            add_to_motion_list=True
+        )
+
+        self.assertReportsNotContains('ERROR')
+
     def test_batch_export(self):
         # import mesh and armature
         bpy.ops.xray_import.object(
@@ -192,3 +237,162 @@ class TestOmf(tests.utils.XRayTestCase):
 
         self.assertOutputFiles({'test_1.omf', 'test_2.omf', 'merged.omf'})
         self.assertReportsNotContains()
+
+    def test_keys_encoding(self):
+        formats = io_scene_xray.formats
+        rw = io_scene_xray.rw
+        omf_fmt = formats.omf.fmt
+
+        # keys of a motion of the existing omf are encoded as in the file
+        file_path = os.path.join(self.binpath(), 'test_fmt.omf')
+        chunks = rw.utils.get_chunks(rw.utils.read_file(file_path))
+        motions_data = chunks[formats.ogf.fmt.Chunks_v4.S_MOTIONS_2]
+        motions = rw.utils.get_chunks(motions_data)
+        packed_reader = rw.read.PackedReader(motions[4])
+        self.assertEqual(packed_reader.gets(), 'test_omf_only_rotation')
+        length = packed_reader.uint32()
+        keys_offset = packed_reader.offset()
+
+        read_bone_keys = formats.omf.imp.read_bone_keys
+        quaternions = []
+        translations = []
+        for bone_index in range(2):
+            bone_quaternions, bone_translations = read_bone_keys(
+                packed_reader,
+                2,    # version
+                length,
+                'h'
+            )
+            quaternions.append(bone_quaternions)
+            translations.append(bone_translations.repeat(length, axis=0))
+        quaternions = numpy.stack(quaternions, axis=1)
+        translations = numpy.stack(translations, axis=1)
+        translations[ : , : , 2] *= -1.0
+
+        packed_writer = rw.write.PackedWriter()
+        formats.omf.exp.write_keys(
+            packed_writer,
+            quaternions,
+            translations,
+            (0, 1),
+            False    # high quality
+        )
+        self.assertEqual(
+            bytes(packed_writer.data),
+            bytes(motions[4][keys_offset : ])
+        )
+
+        # fixed motion: animated first bone and static second bone
+        sin_45 = math.sqrt(0.5)
+        quaternions = numpy.array((
+            ((1, 0, 0, 0), (1, 0, 0, 0)),
+            ((sin_45, 0, 0, sin_45), (1, 0, 0, 0)),
+            ((0, 0, 0, 1), (1, 0, 0, 0))
+        ))
+        translations = numpy.array((
+            ((0, 0, 0), (0.5, 0.25, -1)),
+            ((1, 0, 0), (0.5, 0.25, -1)),
+            ((2, 0, 0), (0.5, 0.25, -1))
+        ))
+        packed_writer = rw.write.PackedWriter()
+        formats.omf.exp.write_keys(
+            packed_writer,
+            quaternions,
+            translations,
+            (1, 0),
+            False    # high quality
+        )
+
+        # x, y, -z, w rotation keys and translation keys
+        rotation_keys = struct.pack(
+            '<12h',
+            0, 0, 0, 32767,
+            0, 0, -23170, 23170,
+            0, 0, -32767, 0
+        )
+        translation_keys = struct.pack('<9b', -127, 0, 0, 0, 0, 0, 127, 0, 0)
+        expected = b''.join((
+            struct.pack('<B', omf_fmt.FL_R_KEY_ABSENT),
+            struct.pack('<4h', 0, 0, 0, 32767),
+            struct.pack('<3f', 0.5, 0.25, -1),
+            struct.pack('<B', omf_fmt.FL_T_KEY_PRESENT),
+            struct.pack('<I', zlib.crc32(rotation_keys)),
+            rotation_keys,
+            struct.pack('<I', zlib.crc32(translation_keys)),
+            translation_keys,
+            struct.pack('<3f', 2 / 255, 0, 0),
+            struct.pack('<3f', 1, 0, 0)
+        ))
+        self.assertEqual(bytes(packed_writer.data), expected)
+
+    def test_lazy_import(self):
+        # import mesh and armature
+        bpy.ops.xray_import.object(
+            directory=self.binpath(),
+            files=[{'name': 'test_fmt_omf.object'}],
+        )
+        arm_obj = bpy.data.objects['test_fmt_omf.object']
+        tests.utils.set_active_object(arm_obj)
+        actions_count = len(bpy.data.actions)
+
+        # only the motion stubs are added
+        bpy.ops.xray_import.omf(
+            directory=self.binpath(),
+            files=[{'name': 'test_fmt.omf'}],
+            import_motions=True,
+            import_bone_parts=True,
+            add_to_motion_list=True,
+            lazy_import=True
+        )
+        motions = arm_obj.xray.motions_collection
+        self.assertEqual(len(bpy.data.actions), actions_count)
+        self.assertTrue(len(motions) > 1)
+        self.assertTrue(all(motion.stub_file for motion in motions))
+
+        # the selected motion is decoded
+        arm_obj.xray.motions_collection_index = 1
+        self.assertEqual(len(bpy.data.actions), actions_count + 1)
+        self.assertFalse(motions[1].stub_file)
+        action = bpy.data.actions[motions[1].name]
+        self.assertEqual(len(action.fcurves) % 6, 0)
+
+        # load all
+        bpy.ops.io_scene_xray.load_motion_stubs()
+        self.assertEqual(len(bpy.data.actions), actions_count + len(motions))
+        self.assertFalse(any(motion.stub_file for motion in motions))
+        self.assertReportsNotContains()
+
+    def test_lazy_import_changed_file(self):
+        bpy.ops.xray_import.object(
+            directory=self.binpath(),
+            files=[{'name': 'test_fmt_omf.object'}],
+        )
+        arm_obj = bpy.data.objects['test_fmt_omf.object']
+        tests.utils.set_active_object(arm_obj)
+        actions_count = len(bpy.data.actions)
+
+        bpy.ops.xray_import.omf(
+            directory=self.binpath(),
+            files=[{'name': 'test_fmt.omf'}],
+            import_motions=True,
+            import_bone_parts=True,
+            add_to_motion_list=True,
+            lazy_import=True
+        )
+        motions = arm_obj.xray.motions_collection
+
+        # the file is changed after import
+        for motion in motions:
+            motion.stub_file_stamp = '0:0'
+
+        # the stub is not decoded
+        arm_obj.xray.motions_collection_index = 1
+        self.assertEqual(len(bpy.data.actions), actions_count)
+        self.assertTrue(motions[1].stub_file)
+
+        bpy.ops.io_scene_xray.load_motion_stubs()
+        self.assertEqual(len(bpy.data.actions), actions_count)
+        self.assertReportsContains(
+            'ERROR',
+            re.compile('OMF-file has been changed after lazy import')
+        )
@@ -0,0 +1,251 @@
+import os
+import struct
+import io_scene_xray
+import tests
+
+
+class TestRwUtils(tests.utils.XRayTestCase):
+    def test_read_file_mmap(self):
+        rw = io_scene_xray.rw
+        file_path = os.path.join(self.binpath(), 'level.geom')
+
+        data = rw.utils.read_file(file_path)
+        mapped_data = rw.utils.read_file(file_path, use_mmap=True)
+
+        self.assertIsInstance(mapped_data, memoryview)
+        self.assertEqual(bytes(mapped_data), data)
+
+        # chunks are slices of the mapped file
+        mapped_reader = rw.utils.get_file_reader(
+            file_path,
+            chunked=True,
+            update_log=False,
+            use_mmap=True
+        )
+        mapped_chunks = rw.utils.get_reader_chunks(mapped_reader)
+        chunks = rw.utils.get_chunks(data)
+        self.assertEqual(mapped_chunks.keys(), chunks.keys())
+
+        for chunk_id, chunk_data in mapped_chunks.items():
+            self.assertIsInstance(chunk_data, memoryview)
+            self.assertEqual(bytes(chunk_data), bytes(chunks[chunk_id]))
+
+    def test_chunk_index(self):
+        rw = io_scene_xray.rw
+        packed_writer = rw.write.PackedWriter()
+        for index in range(100):
+            packed_writer.putf('<I', index)
+
+        chunked_writer = rw.write.ChunkedWriter()
+        chunked_writer.put(0x1, rw.write.PackedWriter())
+        chunked_writer.put(0x1, packed_writer)
+        chunked_writer.put(0x2, packed_writer, compress=True)
+        chunked_writer.put(0x3, packed_writer, compress=True)
+        chunked_writer.put(0x1, packed_writer)
+        data = bytearray(chunked_writer.data)
+
+        # damage the payload of the last compressed chunk
+        offset = len(data) - len(packed_writer.data) - 8 - 16
+        data[offset : offset + 16] = b'\xff' * 16
+
+        chunks = rw.read.ChunkIndex(data)
+        self.assertEqual(list(chunks), [0x1, 0x2, 0x3])
+        self.assertEqual(chunks.count(0x1), 3)
+        self.assertEqual(len(chunks.get_all(0x1)), 3)
+        self.assertEqual(bytes(chunks[0x1]), bytes(packed_writer.data))
+        self.assertEqual(bytes(chunks.get(0x1, first=True)), b'')
+
+        # the readers chunks keep the last chunk of the id
+        reader = rw.read.ChunkedReader(data)
+        last_chunks = rw.utils.get_reader_chunks(reader)
+        self.assertEqual(bytes(last_chunks[0x1]), bytes(packed_writer.data))
+        empty_data = bytes(data) + struct.pack('<2I', 0x1, 0)
+        reader = rw.read.ChunkedReader(empty_data)
+        last_chunks = rw.utils.get_reader_chunks(reader)
+        self.assertEqual(last_chunks.count(0x1), 4)
+        self.assertEqual(bytes(last_chunks[0x1]), b'')
+        self.assertEqual(last_chunks.get_size(0x1), 0)
+        ogf_utility = io_scene_xray.formats.ogf.imp.utility
+        ogf_chunks = ogf_utility.get_ogf_chunks(empty_data)
+        self.assertEqual(bytes(ogf_chunks[0x1]), b'')
+        self.assertEqual(bytes(ogf_chunks[0x2]), bytes(packed_writer.data))
+        self.assertEqual(bytes(chunks[0x2]), bytes(packed_writer.data))
+        self.assertIs(chunks[0x2], chunks[0x2])
+
+        # compressed payload is not decoded until the access
+        self.assertTrue(chunks.is_compressed(0x3))
+        self.assertEqual(chunks.get_size(0x3), len(packed_writer.data))
+        with self.assertRaises(rw.read.ChunkedReader.Errors):
+            chunks[0x3]
+
+        raw_chunks = rw.read.ChunkIndex(data, ignore_errors=True)
+        self.assertLess(len(raw_chunks[0x3]), len(packed_writer.data))
+
+        # every chunk is decompressed ahead of the access
+        loaded_chunks = rw.utils.get_chunks(chunked_writer.data).load_all()
+        self.assertEqual(
+            [bytes(chunk) for chunk in loaded_chunks.get_all(0x3)],
+            [bytes(packed_writer.data)]
+        )
+        with self.assertRaises(rw.read.ChunkedReader.Errors):
+            rw.read.ChunkIndex(data).load_all()
+
+        # dictionary operations
+        self.assertEqual(bytes(chunks.pop(0x2)), bytes(packed_writer.data))
+        self.assertNotIn(0x2, chunks)
+        self.assertIsNone(chunks.pop(0x2, None))
+        other_chunks = rw.utils.get_chunks(chunked_writer.data)
+        chunks.update(other_chunks)
+        self.assertEqual(bytes(chunks[0x3]), bytes(packed_writer.data))
+
+        # headers only reader operations
+        reader = rw.read.ChunkedReader(data)
+        self.assertEqual(reader.get_chunks_count(), 5)
+        self.assertEqual(bytes(reader.get_chunk(0x2)), bytes(packed_writer.data))
+        self.assertEqual(bytes(reader.get_chunk(0x1)), b'')
+        self.assertIsNone(reader.get_chunk(0x4))
+
+    def test_read_empty_file_mmap(self):
+        rw = io_scene_xray.rw
+        file_path = self.outpath('empty')
+
+        with open(file_path, 'wb'):
+            pass
+
+        data = rw.utils.read_file(file_path, use_mmap=True)
+        self.assertEqual(len(data), 0)
+
+
+class TestPackedReader(tests.utils.XRayTestCase):
+    def test_bulk_readers(self):
+        rw = io_scene_xray.rw
+        data = struct.pack(
+            '<4B2H2h2i2I2f',
+            1, 2, 3, 255,
+            7, 0xffff,
+            -5, 5,
+            -70000, 70000,
+            1, 0xffffffff,
+            0.5, -2.0
+        )
+        packed_reader = rw.read.PackedReader(data)
+
+        for fmt, values in (
+                ('B', [1, 2, 3, 255]),
+                ('H', [7, 0xffff]),
+                ('h', [-5, 5]),
+                ('i', [-70000, 70000]),
+                ('I', [1, 0xffffffff]),
+                ('f', [0.5, -2.0])
+            ):
+            array = packed_reader.get_ndarray(fmt, len(values))
+            self.assertEqual(array.tolist(), values)
+
+        self.assertTrue(packed_reader.is_end())
+
+        # records
+        data = struct.pack('<3I2H', 1, 2, 3, 4, 5) * 2
+        packed_reader = rw.read.PackedReader(data)
+        records = packed_reader.get_records(
+            (('verts', '3I'), ('material', 'H'), ('sector', 'H')),
+            2
+        )
+        self.assertEqual(records['verts'].tolist(), [[1, 2, 3], [1, 2, 3]])
+        self.assertEqual(records['material'].tolist(), [4, 4])
+        self.assertEqual(records['sector'].tolist(), [5, 5])
+        self.assertTrue(packed_reader.is_end())
+
+        # interleaved vertices with swapped y and z
+        data = struct.pack('<H3fH3f', 1, 1.0, 2.0, 3.0, 2, 4.0, 5.0, 6.0)
+        packed_reader = rw.read.PackedReader(data)
+        verts = packed_reader.get_verts_ndarray(2, stride=14, offset=2)
+        self.assertEqual(verts.tolist(), [[1.0, 3.0, 2.0], [4.0, 6.0, 5.0]])
+        self.assertTrue(packed_reader.is_end())
+
+        # vectors
+        packed_reader = rw.read.PackedReader(struct.pack('<6f', *range(6)))
+        array = packed_reader.get_ndarray('f', 2, vec_len=3)
+        self.assertEqual(array.shape, (2, 3))
+        packed_reader.set_offset(0)
+        self.assertEqual(
+            packed_reader.get_array('f', 2, vec_len=3),
+            array.tolist()
+        )
+
+
+class TestPackedWriter(tests.utils.XRayTestCase):
+    def test_buffered_writes(self):
+        rw = io_scene_xray.rw
+        packed_writer = rw.write.PackedWriter()
+        expected = bytearray()
+
+        for index in range(1000):
+            packed_writer.putf('<IH', index, 7)
+            expected += struct.pack('<IH', index, 7)
+
+        packed_writer.puts('name')
+        packed_writer.putv3f((1.0, 2.0, 3.0))
+        packed_writer.put_array('H', [(1, 2, 3), (4, 5, 6)])
+        packed_writer.put_array('f', [0.5, -2.0])
+        expected += b'name\x00' + struct.pack('<3f', 1.0, 3.0, 2.0)
+        expected += struct.pack('<6H2f', 1, 2, 3, 4, 5, 6, 0.5, -2.0)
+
+        self.assertEqual(packed_writer.get_size(), len(expected))
+        self.assertEqual(packed_writer.data, expected)
+
+        # the data can be changed in place by the caller
+        packed_writer.data.extend(b'\x01\x02')
+        packed_writer.putf('<B', 3)
+        self.assertEqual(packed_writer.data, expected + b'\x01\x02\x03')
+
+    def test_nested_chunks(self):
+        rw = io_scene_xray.rw
+
+        packed_writer = rw.write.PackedWriter()
+        packed_writer.putf('<I', 5)
+        chunked_writer = rw.write.ChunkedWriter()
+        chunked_writer.put(2, packed_writer)
+        copied_writer = rw.write.ChunkedWriter()
+        copied_writer.put(1, chunked_writer)
+        copied_writer.put(3, rw.write.PackedWriter())
+
+        nested_writer = rw.write.ChunkedWriter()
+        with nested_writer.chunk(1):
+            with nested_writer.chunk(2):
+                nested_writer.putf('<I', 5)
+        with nested_writer.chunk(3):
+            pass
+
+        self.assertEqual(nested_writer.data, copied_writer.data)
+
+        chunks = rw.utils.get_chunks(nested_writer.data)
+        self.assertEqual(list(chunks.keys()), [1, 3])
+        self.assertEqual(rw.utils.get_chunks(chunks[1]), {2: packed_writer.data})
+
+    def test_file_chunked_writer(self):
+        rw = io_scene_xray.rw
+        file_path = self.outpath('stream.bin')
+
+        expected = rw.write.ChunkedWriter()
+        with open(file_path, 'wb') as file:
+            # small buffer, chunk headers are written to the file
+            file_writer = rw.write.FileChunkedWriter(file, buffer_size=16)
+
+            for writer in (expected, file_writer):
+                with writer.chunk(1):
+                    writer.putf('<I', 10)
+                    with writer.chunk(2):
+                        for index in range(100):
+                            writer.putf('<I', index)
+                    writer.putb(bytes(range(50)))
+                with writer.chunk(3):
+                    pass
+                packed_writer = rw.write.PackedWriter()
+                packed_writer.putf('<2H', 1, 2)
+                writer.put(4, packed_writer)
+
+            file_writer.flush()
+            self.assertEqual(file_writer.get_size(), len(expected.data))
+
+        with open(file_path, 'rb') as file:
+            self.assertEqual(file.read(), expected.data)
@@ -0,0 +1,104 @@
+import os
+import shutil
+import io_scene_xray
+import tests
+
+
+class TestScan(tests.utils.XRayTestCase):
+    def test_scan_motions(self):
+        formats = io_scene_xray.formats
+        rw = io_scene_xray.rw
+
+        # omf
+        file_path = self.binpath('test_fmt.omf')
+        info = formats.scan.scan_file(file_path)
+        data = rw.utils.read_file(file_path)
+        self.assertEqual(
+            [motion[0] for motion in info['motions']],
+            formats.omf.imp.examine_motions(data)
+        )
+
+        # the offset points to the motion name in the motions chunk
+        motions_data = rw.utils.get_chunks(data)[
+            formats.ogf.fmt.Chunks_v4.S_MOTIONS_2
+        ]
+        for name, length, offset, motion_id in info['motions']:
+            reader = rw.read.PackedReader(motions_data)
+            reader.set_offset(offset)
+            self.assertEqual(reader.gets(), name)
+            self.assertEqual(reader.uint32(), length)
+
+        # skls
+        file_path = self.binpath('test_fmt.skls')
+        info = formats.scan.scan_file(file_path)
+        data = rw.utils.read_file(file_path)
+        self.assertEqual(
+            [motion[0] for motion in info['motions']],
+            list(formats.motions.imp.examine_motions(data))
+        )
+
+        # skl
+        info = formats.scan.scan_file(self.binpath('test_fmt.skl'))
+        self.assertEqual(info['motions'], [['xact', 10, 0, 0]])
+
+    def test_scan_models(self):
+        scan = io_scene_xray.formats.scan
+
+        info = scan.scan_file(self.binpath('test_fmt_ogf_v3.ogf'))
+        self.assertEqual(info['version'], 3)
+        self.assertEqual(info['model_type'], 'SKELETON_RIGID')
+        self.assertEqual(info['bones'], 1)
+
+        info = scan.scan_file(self.binpath('test_fmt_armature.object'))
+        self.assertEqual(info['meshes'], 1)
+        self.assertEqual(info['bones'], 2)
+        self.assertEqual(info['motions_count'], 1)
+
+        info = scan.scan_file(self.binpath('test_fmt_v3.details'))
+        self.assertEqual(info['slots'], [5, 5])
+
+        info = scan.scan_file(self.binpath('test_fmt.dm'))
+        self.assertEqual(info['vertices'], 5)
+        self.assertEqual(scan.get_info_label(info), '5 vertices, 4 triangles')
+
+        # broken and unsupported files
+        file_path = self.outpath('broken.ogf')
+        with open(file_path, 'wb') as file:
+            file.write(b'\x01\x00\x00\x00\xff\x00')
+        self.assertIsNone(scan.scan_file(file_path))
+        self.assertIsNone(scan.scan_file(self.outpath('unsupported.xyz')))
+
+        # not readable file
+        dir_path = self.outpath('folder.ogf')
+        os.makedirs(dir_path, exist_ok=True)
+        self.assertIsNone(scan.scan_file(dir_path))
+
+    def test_scan_cache(self):
+        scan = io_scene_xray.formats.scan
+        cache_path = self.outpath('scan_cache.json')
+        file_path = self.outpath('test_fmt.dm')
+        shutil.copyfile(self.binpath('test_fmt.dm'), file_path)
+
+        cache = scan.ScanCache(cache_path)
+        info = cache.get_info(file_path)
+        cache.save()
+        self.assertTrue(os.path.exists(cache_path))
+
+        # the file is not scanned again, the entry
+        # is invalid after the file change
+        scan_file = scan.scan_file
+        scan.scan_file = lambda file_path: {'changed': True}
+        try:
+            self.assertEqual(scan.ScanCache(cache_path).get_info(file_path), info)
+            with open(file_path, 'ab') as file:
+                file.write(b'\x00')
+            self.assertEqual(
+                scan.ScanCache(cache_path).get_info(file_path),
+                {'changed': True}
+            )
+        finally:
+            scan.scan_file = scan_file
+
+        # the file is removed after the listing
+        os.remove(file_path)
+        self.assertIsNone(scan.ScanCache(cache_path).get_info(file_path))
@@ -0,0 +1,195 @@
+import os
+import sys
+import tempfile
+from optparse import OptionParser
+
+import bpy
+import addon_utils
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import bench_gen
+import bench_utils
+
+
+# full import/export benchmarks, executed by blender:
+#   blender --factory-startup -noaudio -b --python utils/bench_blender.py -- -s large -o results.json
+
+xray = None
+out_dir = None
+
+
+def reset_scene():
+    bpy.ops.wm.read_homefile()
+    addon_utils.enable('io_scene_xray', default_set=True)
+
+
+def select_object(name):
+    obj = bpy.data.objects[name]
+    bpy.ops.object.select_all(action='DESELECT')
+    xray.utils.version.set_active_object(obj)
+    xray.utils.version.select_object(obj)
+
+
+def check(result, name):
+    if result != {'FINISHED'}:
+        raise Exception('{0} failed: {1}'.format(name, result))
+
+
+def import_ogf(files):
+    directory, file_name = os.path.split(files['skeleton.ogf'])
+    check(bpy.ops.xray_import.ogf(
+        directory=directory,
+        files=[{'name': file_name}]
+    ), 'ogf import')
+
+
+def import_omf(files):
+    directory, file_name = os.path.split(files['skeleton.omf'])
+    select_object('skeleton.ogf')
+    check(bpy.ops.xray_import.omf(
+        directory=directory,
+        files=[{'name': file_name}],
+        import_motions=True,
+        import_bone_parts=True,
+        add_to_motion_list=True
+    ), 'omf import')
+
+
+def export_ogf(files):
+    select_object('skeleton.ogf')
+    check(bpy.ops.xray_export.ogf_file(
+        filepath=os.path.join(out_dir, 'skeleton.ogf'),
+        fmt_version='soc',
+        texture_name_from_image_path=False
+    ), 'ogf export')
+
+
+def export_omf(files):
+    select_object('skeleton.ogf')
+    check(bpy.ops.xray_export.omf_file(
+        filepath=os.path.join(out_dir, 'skeleton.omf'),
+        export_mode='OVERWRITE',
+        export_motions=True,
+        export_bone_parts=True
+    ), 'omf export')
+
+
+def import_details(files):
+    directory, file_name = os.path.split(files['level.details'])
+    check(bpy.ops.xray_import.details(
+        directory=directory,
+        files=[{'name': file_name}]
+    ), 'details import')
+
+
+def export_details(files):
+    select_object('level.details')
+    check(bpy.ops.xray_export.details_file(
+        filepath=os.path.join(out_dir, 'level.details'),
+        format_version='builds_1569-cop',
+        tex_name_from_path=False
+    ), 'details export')
+
+
+def import_level(files):
+    check(bpy.ops.xray_import.level(filepath=files['level']), 'level import')
+
+
+def export_level(files):
+    level_name = os.path.basename(os.path.dirname(files['level']))
+    select_object(level_name)
+    check(bpy.ops.xray_export.level(
+        directory=os.path.join(out_dir, level_name)
+    ), 'level export')
+
+
+def get_file_size(files, file_name):
+    file_path = files.get(file_name)
+    if not file_path:
+        return None
+
+    size = os.path.getsize(file_path)
+
+    # level data is stored in several files
+    for ext in ('geom', 'cform'):
+        ext_path = file_path + os.extsep + ext
+        if file_name == 'level' and os.path.exists(ext_path):
+            size += os.path.getsize(ext_path)
+
+    return size
+
+
+# name, scene preparation functions, measured function, input file
+BENCHMARKS = (
+    ('import_ogf', (), import_ogf, 'skeleton.ogf'),
+    ('export_ogf', (import_ogf, ), export_ogf, None),
+    ('import_omf', (import_ogf, ), import_omf, 'skeleton.omf'),
+    ('export_omf', (import_ogf, import_omf), export_omf, None),
+    ('import_details', (), import_details, 'level.details'),
+    ('export_details', (import_details, ), export_details, None),
+    ('import_level', (), import_level, 'level'),
+    ('export_level', (import_level, ), export_level, None)
+)
+
+
+def get_argv():
+    # blender arguments are before "--"
+    if '--' in sys.argv:
+        return sys.argv[sys.argv.index('--') + 1 : ]
+    return []
+
+
+def main():
+    global xray, out_dir
+
+    parser = OptionParser(usage='Usage: blender -b --python bench_blender.py -- [options]')
+    bench_utils.add_common_options(parser)
+    parser.add_option(
+        '-l', '--level', default=os.path.join(
+            bench_utils.repo_dir, 'tests', 'tested', 'level'
+        ),
+        help='path to the game level file'
+    )
+    (options, args) = parser.parse_args(get_argv())
+
+    xray, blender_version = bench_utils.import_addon()
+    files = bench_gen.generate(options.data, options.size)
+    files['level'] = os.path.abspath(options.level)
+    out_dir = tempfile.mkdtemp(prefix='xray_bench_')
+
+    results = {}
+    for name, setup_funs, bench_fun, file_name in BENCHMARKS:
+        if options.filter and options.filter not in name:
+            continue
+
+        def setup():
+            reset_scene()
+            for setup_fun in setup_funs:
+                setup_fun(files)
+
+        result = bench_utils.measure(
+            lambda: bench_fun(files),
+            options.repeat,
+            get_file_size(files, file_name),
+            setup=setup
+        )
+        results[name] = result
+        bench_utils.print_result(name, result)
+
+    if options.output:
+        meta = bench_utils.get_meta(xray, blender_version, options.size)
+        bench_utils.save_results(options.output, meta, results)
+
+    if options.compare:
+        regressions = bench_utils.compare_results(
+            options.compare,
+            results,
+            options.threshold
+        )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
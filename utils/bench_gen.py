@@ -0,0 +1,601 @@
+import os
+import math
+import random
+import struct
+from optparse import OptionParser
+
+
+# deterministic synthetic assets for the benchmarks.
+# files are written with plain struct, so the generators do not
+# depend on the addon writers being benchmarked.
+
+SEED = 0x12071980
+
+# scales of the generated assets
+SIZES = {
+    'small': {
+        'level_vertices': 20000,
+        'level_buffers': 4,
+        'cform_vertices': 20000,
+        'cform_sectors': 8,
+        'ogf_bones': 32,
+        'ogf_children': 4,
+        'ogf_vertices': 4000,
+        'omf_motions': 20,
+        'omf_length': 60,
+        'details_meshes': 8,
+        'details_slots': 64,
+        'ltx_sections': 500
+    },
+    'large': {
+        'level_vertices': 500000,
+        'level_buffers': 16,
+        'cform_vertices': 400000,
+        'cform_sectors': 64,
+        'ogf_bones': 64,
+        'ogf_children': 8,
+        'ogf_vertices': 30000,
+        'omf_motions': 200,
+        'omf_length': 120,
+        'details_meshes': 32,
+        'details_slots': 512,
+        'ltx_sections': 10000
+    }
+}
+
+XRLC_VERSION = 14
+CFORM_VERSION = 4
+
+# level.geom chunks (xrlc version 14)
+GEOM_HEADER = 0x1
+GEOM_VB = 0x9
+GEOM_IB = 0xa
+GEOM_SWIS = 0xb
+
+# d3d9 vertex declaration
+D3D_FLOAT3 = 2
+D3D_COLOR = 4
+D3D_SHORT2 = 6
+D3D_UNUSED = 17
+USAGE_POSITION = 0
+USAGE_NORMAL = 3
+USAGE_TEXCOORD = 5
+USAGE_TANGENT = 6
+USAGE_BINORMAL = 7
+USAGE_COLOR = 10
+
+# (type, usage, usage_index, size)
+LIGHTMAP_DECL = (
+    (D3D_FLOAT3, USAGE_POSITION, 0, 12),
+    (D3D_COLOR, USAGE_NORMAL, 0, 4),
+    (D3D_COLOR, USAGE_TANGENT, 0, 4),
+    (D3D_COLOR, USAGE_BINORMAL, 0, 4),
+    (D3D_SHORT2, USAGE_TEXCOORD, 0, 4),
+    (D3D_SHORT2, USAGE_TEXCOORD, 1, 4)
+)
+VERTEX_COLOR_DECL = (
+    (D3D_FLOAT3, USAGE_POSITION, 0, 12),
+    (D3D_COLOR, USAGE_NORMAL, 0, 4),
+    (D3D_COLOR, USAGE_TANGENT, 0, 4),
+    (D3D_COLOR, USAGE_BINORMAL, 0, 4),
+    (D3D_COLOR, USAGE_COLOR, 0, 4),
+    (D3D_SHORT2, USAGE_TEXCOORD, 0, 4)
+)
+
+# ogf
+OGF_VERSION = 4
+OGF_SKELETON_RIGID = 0xa
+OGF_SKELETON_GEOMDEF_ST = 0x5
+OGF_TEXTURE = 2
+OGF_VERTICES = 3
+OGF_INDICES = 4
+OGF_CHILDREN = 9
+OGF_S_BONE_NAMES = 13
+OGF_S_MOTIONS_2 = 14
+OGF_S_SMPARAMS_1 = 15
+OGF_S_IKDATA_2 = 16
+OGF_FVF_2L = 2 * 0x12071980
+
+# omf
+OMF_PARAMS_VERSION = 4
+OMF_T_KEY_PRESENT = 1 << 0
+OMF_R_KEY_ABSENT = 1 << 1
+OMF_T_HQ = 1 << 2
+
+# details
+DETAILS_VERSION = 3
+DETAILS_HEADER = 0x0
+DETAILS_MESHES = 0x1
+DETAILS_SLOTS = 0x2
+
+
+def put_chunk(data, chunk_id, chunk_data):
+    data += struct.pack('<2I', chunk_id, len(chunk_data))
+    data += chunk_data
+
+
+def put_str(data, string):
+    data += string.encode('cp1251')
+    data += b'\x00'
+
+
+def get_bone_name(bone_index):
+    return 'bone_{:0>3}'.format(bone_index)
+
+
+def grid_vertices(rand, count):
+    # a noisy height field, close to real level geometry
+    side = max(2, int(math.sqrt(count)))
+    verts = []
+
+    for index in range(count):
+        row, column = divmod(index, side)
+        verts.append((
+            column * 0.5,
+            rand.uniform(-1.0, 1.0),
+            row * 0.5
+        ))
+
+    return verts, side
+
+
+def grid_triangles(count, side):
+    tris = []
+    rows = count // side
+
+    for row in range(rows - 1):
+        for column in range(side - 1):
+            vert_1 = row * side + column
+            vert_2 = vert_1 + 1
+            vert_3 = vert_1 + side
+            vert_4 = vert_3 + 1
+            tris.append((vert_1, vert_3, vert_2))
+            tris.append((vert_2, vert_3, vert_4))
+
+    return tris
+
+
+def _write_vertex_buffer(data, rand, decl, verts_count):
+    # declaration
+    offset = 0
+    for data_type, usage, usage_index, size in decl:
+        data += struct.pack('<2H4B', 0, offset, data_type, 0, usage, usage_index)
+        offset += size
+    data += struct.pack('<2H4B', 0xff, 0, D3D_UNUSED, 0, 0, 0)
+
+    data += struct.pack('<I', verts_count)
+
+    # vertices
+    verts, _ = grid_vertices(rand, verts_count)
+    packers = {
+        D3D_FLOAT3: struct.Struct('<3f'),
+        D3D_COLOR: struct.Struct('<4B'),
+        D3D_SHORT2: struct.Struct('<2h')
+    }
+    randrange = rand.randrange
+
+    for vert in verts:
+        for data_type, usage, usage_index, size in decl:
+            if data_type == D3D_FLOAT3:
+                data += packers[data_type].pack(*vert)
+            elif data_type == D3D_COLOR:
+                data += packers[data_type].pack(
+                    randrange(256),
+                    randrange(256),
+                    randrange(256),
+                    randrange(256)
+                )
+            else:
+                data += packers[data_type].pack(
+                    randrange(-0x8000, 0x8000),
+                    randrange(-0x8000, 0x8000)
+                )
+
+
+def gen_level_geom(file_path, sizes, seed=SEED):
+    rand = random.Random(seed)
+    buffers_count = sizes['level_buffers']
+    verts_count = sizes['level_vertices'] // buffers_count
+
+    data = bytearray()
+
+    header = struct.pack('<2H', XRLC_VERSION, 0)
+    put_chunk(data, GEOM_HEADER, header)
+
+    # vertex buffers
+    vbs = bytearray(struct.pack('<I', buffers_count))
+    for buffer_index in range(buffers_count):
+        if buffer_index % 2:
+            decl = VERTEX_COLOR_DECL
+        else:
+            decl = LIGHTMAP_DECL
+        _write_vertex_buffer(vbs, rand, decl, verts_count)
+    put_chunk(data, GEOM_VB, vbs)
+
+    # index buffers
+    side = max(2, int(math.sqrt(verts_count)))
+    tris = grid_triangles(verts_count, side)
+    indices = [index for tri in tris for index in tri]
+
+    ibs = bytearray(struct.pack('<I', buffers_count))
+    for buffer_index in range(buffers_count):
+        ibs += struct.pack('<I', len(indices))
+        ibs += struct.pack('<{}H'.format(len(indices)), *indices)
+    put_chunk(data, GEOM_IB, ibs)
+
+    # slide window items
+    put_chunk(data, GEOM_SWIS, struct.pack('<I', 0))
+
+    _save(file_path, data)
+
+
+def gen_level_cform(file_path, sizes, seed=SEED):
+    rand = random.Random(seed)
+    verts_count = sizes['cform_vertices']
+    sectors_count = sizes['cform_sectors']
+
+    verts, side = grid_vertices(rand, verts_count)
+    tris = grid_triangles(verts_count, side)
+
+    data = bytearray()
+    data += struct.pack('<3I', CFORM_VERSION, len(verts), len(tris))
+    data += struct.pack('<6f', 0, -1, 0, side * 0.5, 1, side * 0.5)
+
+    for vert in verts:
+        data += struct.pack('<3f', *vert)
+
+    tri_struct = struct.Struct('<3I2H')
+    for tri_index, tri in enumerate(tris):
+        # 0-13 bits game material, 14 bit shadows, 15 bit wallmarks
+        material = rand.randrange(0x40) | rand.choice((0, 0x4000, 0x8000))
+        sector = tri_index * sectors_count // len(tris)
+        data += tri_struct.pack(*tri, material, sector)
+
+    _save(file_path, data)
+
+
+def _write_ogf_header(data, model_type):
+    header = bytearray()
+    header += struct.pack('<2BH', OGF_VERSION, model_type, 0)
+    header += struct.pack('<6f', -1, -1, -1, 1, 1, 1)    # bbox
+    header += struct.pack('<4f', 0, 0, 0, 1)    # bsphere
+    put_chunk(data, 1, header)
+
+
+def _write_ogf_bones(data, bones_count):
+    names = bytearray(struct.pack('<I', bones_count))
+
+    for bone_index in range(bones_count):
+        put_str(names, get_bone_name(bone_index))
+        if bone_index:
+            put_str(names, get_bone_name((bone_index - 1) // 2))
+        else:
+            put_str(names, '')
+        names += struct.pack('<9f', 1, 0, 0, 0, 1, 0, 0, 0, 1)
+        names += struct.pack('<3f', 0, 0, 0)
+        names += struct.pack('<3f', 0.1, 0.1, 0.1)
+
+    put_chunk(data, OGF_S_BONE_NAMES, names)
+
+    ik_data = bytearray()
+    for bone_index in range(bones_count):
+        ik_data += struct.pack('<I', 1)    # version
+        put_str(ik_data, 'default_object')
+        ik_data += struct.pack('<2H', 0, 0)    # shape type and flags
+        ik_data += struct.pack('<9f', 1, 0, 0, 0, 1, 0, 0, 0, 1)
+        ik_data += struct.pack('<6f', 0, 0, 0, 0.1, 0.1, 0.1)
+        ik_data += struct.pack('<4f', 0, 0, 0, 0.1)    # sphere
+        ik_data += struct.pack('<8f', 0, 0, 0, 0, 1, 0, 0.1, 0.1)    # cylinder
+        ik_data += struct.pack('<I', 0)    # joint type
+        for axis in range(3):
+            ik_data += struct.pack('<4f', -1, 1, 1, 1)
+        ik_data += struct.pack('<2f', 1, 1)    # spring, damping
+        ik_data += struct.pack('<I', 0)    # ik flags
+        ik_data += struct.pack('<3f', 0, 0, 0)    # breakable, friction
+        # bind rotation and translation
+        ik_data += struct.pack('<3f', 0, 0, 0)
+        ik_data += struct.pack('<3f', 0, 0.1 if bone_index else 0, 0)
+        ik_data += struct.pack('<4f', 1, 0, 0, 0)    # mass and center
+
+    put_chunk(data, OGF_S_IKDATA_2, ik_data)
+
+
+def _write_ogf_child(rand, child_index, sizes):
+    verts_count = sizes['ogf_vertices']
+    bones_count = sizes['ogf_bones']
+
+    data = bytearray()
+    _write_ogf_header(data, OGF_SKELETON_GEOMDEF_ST)
+
+    texture = bytearray()
+    put_str(texture, 'bench\\texture_{}'.format(child_index))
+    put_str(texture, 'models\\model')
+    put_chunk(data, OGF_TEXTURE, texture)
+
+    verts, side = grid_vertices(rand, verts_count)
+    vert_struct = struct.Struct('<2H15f')
+    vertices = bytearray(struct.pack('<2I', OGF_FVF_2L, len(verts)))
+
+    for vert_index, (coord_x, coord_y, coord_z) in enumerate(verts):
+        bone_1 = rand.randrange(bones_count)
+        bone_2 = rand.randrange(bones_count)
+        vertices += vert_struct.pack(
+            bone_1, bone_2,
+            coord_x, coord_y, coord_z,
+            0, 1, 0,    # normal
+            1, 0, 0,    # tangent
+            0, 0, 1,    # binormal
+            rand.random(),    # weight
+            (vert_index % side) / side,
+            (vert_index // side) / side
+        )
+
+    put_chunk(data, OGF_VERTICES, vertices)
+
+    tris = grid_triangles(len(verts), side)
+    indices = [index for tri in tris for index in tri]
+    indices_data = struct.pack('<I', len(indices))
+    indices_data += struct.pack('<{}H'.format(len(indices)), *indices)
+    put_chunk(data, OGF_INDICES, indices_data)
+
+    return data
+
+
+def gen_ogf(file_path, sizes, seed=SEED):
+    rand = random.Random(seed)
+
+    data = bytearray()
+    _write_ogf_header(data, OGF_SKELETON_RIGID)
+
+    children = bytearray()
+    for child_index in range(sizes['ogf_children']):
+        put_chunk(children, child_index, _write_ogf_child(
+            rand,
+            child_index,
+            sizes
+        ))
+    put_chunk(data, OGF_CHILDREN, children)
+
+    _write_ogf_bones(data, sizes['ogf_bones'])
+
+    _save(file_path, data)
+
+
+def _write_motion(data, rand, name, bones_count, length):
+    put_str(data, name)
+    data += struct.pack('<I', length)
+    randrange = rand.randrange
+
+    for bone_index in range(bones_count):
+        flags = rand.choice((
+            0,
+            OMF_T_KEY_PRESENT,
+            OMF_T_KEY_PRESENT | OMF_T_HQ,
+            OMF_R_KEY_ABSENT
+        ))
+        data += struct.pack('<B', flags)
+
+        # rotation
+        if flags & OMF_R_KEY_ABSENT:
+            data += struct.pack('<4h', 0, 0, 0, 0x7fff)
+        else:
+            data += struct.pack('<I', 0)    # crc32
+            keys = []
+            for key_index in range(length):
+                angle = key_index / length * math.pi
+                keys.extend((
+                    int(math.sin(angle) * 0x7fff),
+                    0,
+                    0,
+                    int(math.cos(angle) * 0x7fff)
+                ))
+            data += struct.pack('<{}h'.format(len(keys)), *keys)
+
+        # translation
+        if flags & OMF_T_KEY_PRESENT:
+            data += struct.pack('<I', 0)    # crc32
+            if flags & OMF_T_HQ:
+                trn_fmt = 'h'
+                trn_max = 0x8000
+            else:
+                trn_fmt = 'b'
+                trn_max = 0x80
+            keys = [
+                randrange(-trn_max, trn_max)
+                for _ in range(length * 3)
+            ]
+            data += struct.pack('<{0}{1}'.format(len(keys), trn_fmt), *keys)
+            data += struct.pack('<3f', 0.001, 0.001, 0.001)    # size
+            data += struct.pack('<3f', 0, 0, 0)    # init
+        else:
+            data += struct.pack('<3f', 0, 0.1 if bone_index else 0, 0)
+
+
+def gen_omf(file_path, sizes, seed=SEED):
+    rand = random.Random(seed)
+    bones_count = sizes['ogf_bones']
+    motions_count = sizes['omf_motions']
+    motion_names = ['motion_{:0>4}'.format(i) for i in range(motions_count)]
+
+    data = bytearray()
+
+    # motions
+    motions = bytearray()
+    put_chunk(motions, 0, struct.pack('<I', motions_count))
+    for motion_index, motion_name in enumerate(motion_names):
+        motion = bytearray()
+        _write_motion(
+            motion,
+            rand,
+            motion_name,
+            bones_count,
+            sizes['omf_length']
+        )
+        put_chunk(motions, motion_index + 1, motion)
+    put_chunk(data, OGF_S_MOTIONS_2, motions)
+
+    # params
+    params = bytearray(struct.pack('<2H', OMF_PARAMS_VERSION, 1))
+    put_str(params, 'default')
+    params += struct.pack('<H', bones_count)
+    for bone_index in range(bones_count):
+        put_str(params, get_bone_name(bone_index))
+        params += struct.pack('<I', bone_index)
+
+    params += struct.pack('<H', motions_count)
+    for motion_index, motion_name in enumerate(motion_names):
+        put_str(params, motion_name)
+        params += struct.pack('<I', 0)    # flags
+        params += struct.pack('<2H', 0, motion_index)
+        params += struct.pack('<4f', 1, 1, 2, 2)
+        params += struct.pack('<I', 0)    # marks count
+    put_chunk(data, OGF_S_SMPARAMS_1, params)
+
+    _save(file_path, data)
+
+
+def gen_details(file_path, sizes, seed=SEED):
+    rand = random.Random(seed)
+    meshes_count = sizes['details_meshes']
+    slots_side = sizes['details_slots']
+
+    data = bytearray()
+
+    header = struct.pack(
+        '<2I2i2I',
+        DETAILS_VERSION,
+        meshes_count,
+        slots_side // 2,
+        slots_side // 2,
+        slots_side,
+        slots_side
+    )
+    put_chunk(data, DETAILS_HEADER, header)
+
+    # meshes
+    meshes = bytearray()
+    for mesh_index in range(meshes_count):
+        mesh = bytearray()
+        put_str(mesh, 'details\\blend')
+        put_str(mesh, 'detail\\detail_grass_{}'.format(mesh_index))
+        verts_count = 4 + mesh_index % 4 * 4
+        quads_count = verts_count // 4
+        mesh += struct.pack('<I2f2I', 0, 0.5, 1.5, verts_count, quads_count * 6)
+        for vert_index in range(verts_count):
+            quad, corner = divmod(vert_index, 4)
+            mesh += struct.pack(
+                '<5f',
+                (corner % 2) * 0.5 - 0.25,
+                (corner // 2) * 0.5,
+                quad * 0.1,
+                corner % 2,
+                1 - corner // 2
+            )
+        indices = []
+        for quad in range(quads_count):
+            start = quad * 4
+            indices.extend((start, start + 2, start + 1))
+            indices.extend((start + 1, start + 2, start + 3))
+        mesh += struct.pack('<{}H'.format(len(indices)), *indices)
+        put_chunk(meshes, mesh_index, mesh)
+    put_chunk(data, DETAILS_MESHES, meshes)
+
+    # slots
+    slots = bytearray()
+    slot_struct = struct.Struct('<2I4H')
+    randrange = rand.randrange
+    for slot_index in range(slots_side * slots_side):
+        y_base = randrange(0x1000)
+        y_height = randrange(0x100)
+        ids = [randrange(meshes_count) for _ in range(4)]
+        data_1 = y_base | y_height << 12 | ids[0] << 20 | ids[1] << 26
+        data_2 = ids[2] | ids[3] << 6 | randrange(1 << 20) << 12
+        slots += slot_struct.pack(
+            data_1,
+            data_2,
+            *(randrange(0x10000) for _ in range(4))
+        )
+    put_chunk(data, DETAILS_SLOTS, slots)
+
+    _save(file_path, data)
+
+
+def gen_ltx(file_path, sizes, seed=SEED):
+    rand = random.Random(seed)
+    lines = []
+
+    for section_index in range(sizes['ltx_sections']):
+        if section_index:
+            parent = 'section_{:0>5}'.format(rand.randrange(section_index))
+            lines.append('[section_{0:0>5}]:{1} ; comment'.format(
+                section_index,
+                parent
+            ))
+        else:
+            lines.append('[section_00000]')
+        for key_index in range(rand.randrange(4, 16)):
+            lines.append('key_{0} = {1}, {2:.4f}, "value {0}"'.format(
+                key_index,
+                rand.randrange(1000),
+                rand.random()
+            ))
+        lines.append('')
+
+    with open(file_path, 'w', encoding='cp1251') as file:
+        file.write('\n'.join(lines))
+
+
+def _save(file_path, data):
+    with open(file_path, 'wb') as file:
+        file.write(data)
+
+
+GENERATORS = (
+    ('level.geom', gen_level_geom),
+    ('level.cform', gen_level_cform),
+    ('skeleton.ogf', gen_ogf),
+    ('skeleton.omf', gen_omf),
+    ('level.details', gen_details),
+    ('bench.ltx', gen_ltx)
+)
+
+
+def generate(dir_path, size='small', seed=SEED):
+    # returns {file name: file path}, files are generated once per size
+    sizes = SIZES[size]
+    dir_path = os.path.join(dir_path, '{0}_{1:x}'.format(size, seed))
+    if not os.path.exists(dir_path):
+        os.makedirs(dir_path)
+
+    files = {}
+    for file_name, gen_fun in GENERATORS:
+        file_path = os.path.join(dir_path, file_name)
+        if not os.path.exists(file_path):
+            gen_fun(file_path, sizes, seed)
+        files[file_name] = file_path
+
+    return files
+
+
+def main():
+    parser = OptionParser(usage='Usage: bench_gen.py <output folder> [options]')
+    parser.add_option(
+        '-s', '--size', default='small', choices=tuple(SIZES.keys()),
+        help='assets size: {}'.format(', '.join(SIZES.keys()))
+    )
+    parser.add_option(
+        '--seed', type='int', default=SEED,
+        help='random generator seed'
+    )
+    (options, args) = parser.parse_args()
+    if len(args) != 1:
+        parser.print_help()
+        return
+
+    files = generate(args[0], options.size, options.seed)
+    for file_name, file_path in files.items():
+        print('{0:>14}: {1} bytes'.format(file_name, os.path.getsize(file_path)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+import struct
+from optparse import OptionParser
+
+sys.path.append(os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    '../io_scene_xray/rw'
+)))
+
+import lzhuf
+
+
+MASK_COMPRESSED = 0x80000000
+
+
+def collect_chunks(data, chunks):
+    offs = 0
+    size = len(data)
+
+    while offs + 8 <= size:
+        cid, chunk_size = struct.unpack_from('<2I', data, offs)
+        offs += 8
+
+        if offs + chunk_size > size:
+            break
+
+        if cid & MASK_COMPRESSED and chunk_size > 4:
+            textsize = struct.unpack_from('<I', data, offs)[0]
+            buffer = bytes(data[offs + 4 : offs + chunk_size])
+
+            # skip data that only looks like a compressed chunk
+            try:
+                lzhuf.decompress_buffer(buffer, textsize)
+                chunks.append((buffer, textsize))
+            except (lzhuf.error, IndexError):
+                pass
+
+        offs += chunk_size
+
+
+def collect_files(paths):
+    files = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                for name in names:
+                    files.append(os.path.join(root, name))
+        else:
+            files.append(path)
+
+    return files
+
+
+def bench(chunks, backends, repeat):
+    results = {}
+    expected = None
+
+    for backend in backends:
+        lzhuf.set_backend(backend)
+        outputs = []
+        best = None
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            outputs = [
+                lzhuf.decompress_buffer(buffer, textsize)
+                for buffer, textsize in chunks
+            ]
+            elapsed = time.perf_counter() - start
+            if best is None or elapsed < best:
+                best = elapsed
+
+        outputs = [bytes(output) for output in outputs]
+        if expected is None:
+            expected = outputs
+        elif outputs != expected:
+            raise Exception('backend "{}" output differs'.format(backend))
+
+        size = sum(map(len, outputs))
+        results[backend] = (size, best)
+
+    return results
+
+
+def main():
+    parser = OptionParser(
+        usage='Usage: bench_lzhuf.py <files or folders> [options]'
+    )
+    parser.add_option(
+        '-b', '--backends',
+        default=','.join(lzhuf.get_backends()),
+        help='comma separated backends (default: all available)'
+    )
+    parser.add_option(
+        '-r', '--repeat', type='int', default=3,
+        help='number of runs, the best one is reported'
+    )
+    (options, args) = parser.parse_args()
+    if not args:
+        parser.print_help()
+        sys.exit(2)
+
+    chunks = []
+    for file_path in collect_files(args):
+        with open(file_path, 'rb') as file:
+            collect_chunks(file.read(), chunks)
+
+    if not chunks:
+        print('compressed chunks not found')
+        sys.exit(1)
+
+    print('compressed chunks: {}'.format(len(chunks)))
+    print('compressed size: {} bytes'.format(sum(len(c[0]) for c in chunks)))
+
+    backends = options.backends.split(',')
+    results = bench(chunks, backends, options.repeat)
+
+    for backend, (size, elapsed) in results.items():
+        print('{0:>10}: {1:8.3f} MB/s ({2:.3f} sec)'.format(
+            backend,
+            size / elapsed / 1024 / 1024,
+            elapsed
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+import sys
+import types
+from optparse import OptionParser
+
+import bench_gen
+import bench_utils
+
+
+# standalone benchmarks of the parse stages, do not require blender:
+#   python utils/bench_parse.py -s large -o results.json
+#   python utils/bench_parse.py -s large -c results.json
+
+xray = None
+
+
+def read(file_path):
+    with open(file_path, 'rb') as file:
+        return file.read()
+
+
+def bench_file_chunks(files, sizes):
+    rw = xray.rw
+    file_path = files['level.geom']
+
+    def run():
+        rw.utils.get_file_chunks(file_path, use_mmap=True)
+
+    return run, len(read(file_path))
+
+
+def bench_chunked_reader(files, sizes):
+    rw = xray.rw
+    data = read(files['skeleton.omf'])
+
+    def walk(chunk_data):
+        for chunk_id, sub_data in rw.read.ChunkedReader(chunk_data):
+            if chunk_id == bench_gen.OGF_S_MOTIONS_2:
+                walk(sub_data)
+
+    return lambda: walk(data), len(data)
+
+
+def bench_packed_reader(files, sizes):
+    # the same reads as level.cform import does
+    rw = xray.rw
+    data = read(files['level.cform'])
+
+    def run():
+        packed_reader = rw.read.PackedReader(data)
+        version, verts_count, tris_count = packed_reader.getf('<3I')
+        packed_reader.skip(24)
+        packed_reader.get_ndarray('f', verts_count, vec_len=3)
+        packed_reader.get_records(
+            xray.formats.level.imp.cform.TRIS_FIELDS_V4,
+            tris_count
+        )
+
+    return run, len(data)
+
+
+def bench_packed_writer(files, sizes):
+    # per vertex writes and chunks, as the exporters do
+    rw = xray.rw
+    data = read(files['level.cform'])
+    packed_reader = rw.read.PackedReader(data)
+    version, verts_count, tris_count = packed_reader.getf('<3I')
+    packed_reader.skip(24)
+    verts = packed_reader.get_array('f', verts_count, vec_len=3)
+
+    def run():
+        chunked_writer = rw.write.ChunkedWriter()
+        with chunked_writer.chunk(0):
+            for index, vert in enumerate(verts):
+                packed_writer = rw.write.PackedWriter()
+                packed_writer.putf('<I', index)
+                packed_writer.putv3f(vert)
+                chunked_writer.put(index, packed_writer)
+        chunked_writer.put_array('f', verts)
+
+    return run, verts_count * 12
+
+
+def bench_packed_reader_strings(files, sizes):
+    rw = xray.rw
+    data = read(files['skeleton.omf'])
+    chunks = rw.utils.get_chunks(data)
+    params_data = chunks[bench_gen.OGF_S_SMPARAMS_1]
+
+    def run():
+        packed_reader = rw.read.PackedReader(params_data)
+        packed_reader.getf('<2H')
+        packed_reader.gets()
+        for _ in range(packed_reader.getf('<H')[0]):
+            packed_reader.gets()
+            packed_reader.uint32()
+        for _ in range(packed_reader.getf('<H')[0]):
+            packed_reader.gets()
+            packed_reader.getf('<I2H4fI')
+
+    return run, len(params_data)
+
+
+def _get_lzhuf_input(files):
+    # text and binary data, as in real compressed chunks
+    text_data = read(files['bench.ltx'])
+    binary_data = read(files['level.cform'])[ : len(text_data)]
+    return [text_data, binary_data]
+
+
+def bench_lzhuf_compress(files, sizes):
+    lzhuf = xray.rw.lzhuf
+    buffers = _get_lzhuf_input(files)
+
+    def run():
+        for buffer in buffers:
+            lzhuf.compress_buffer(buffer)
+
+    return run, sum(map(len, buffers))
+
+
+def bench_lzhuf_decompress(files, sizes):
+    lzhuf = xray.rw.lzhuf
+    buffers = [
+        (lzhuf.compress_buffer(buffer), len(buffer))
+        for buffer in _get_lzhuf_input(files)
+    ]
+
+    def run():
+        for buffer, textsize in buffers:
+            lzhuf.decompress_buffer(buffer, textsize)
+
+    return run, sum(size for _, size in buffers)
+
+
+def bench_ltx(files, sizes):
+    rw = xray.rw
+    data = read(files['bench.ltx']).decode('cp1251')
+
+    def run():
+        parser = rw.ltx.LtxParser()
+        parser.from_str(data)
+
+    return run, len(data)
+
+
+def _get_geom_chunks(files):
+    level_fmt = xray.formats.level.fmt
+    data = read(files['level.geom'])
+    chunks = xray.rw.utils.get_chunks(data)
+    level = types.SimpleNamespace(xrlc_version=bench_gen.XRLC_VERSION)
+    return level, chunks, level_fmt.ver_chunks[level.xrlc_version]
+
+
+def bench_level_vb(files, sizes):
+    vb = xray.formats.level.imp.vb
+    level, chunks, chunks_ids = _get_geom_chunks(files)
+
+    def run():
+        vb.import_vertex_buffers(level, dict(chunks), chunks_ids)
+
+    return run, len(chunks[chunks_ids.VB])
+
+
+def bench_level_ib(files, sizes):
+    ib = xray.formats.level.imp.ib
+    level, chunks, chunks_ids = _get_geom_chunks(files)
+
+    def run():
+        ib.import_indices_buffers(level, dict(chunks), chunks_ids)
+
+    return run, len(chunks[chunks_ids.IB])
+
+
+def bench_ogf_geometry(files, sizes):
+    ogf = xray.formats.ogf
+    rw = xray.rw
+    data = read(files['skeleton.ogf'])
+    chunks = rw.utils.get_chunks(data)
+    children = list(rw.read.ChunkedReader(chunks[ogf.fmt.Chunks_v4.CHILDREN]))
+
+    def run():
+        for child_id, child_data in children:
+            child_chunks = ogf.imp.utility.read_chunks(child_data)
+            visual = ogf.imp.types.Visual()
+            ogf.imp.verts.read_skeleton_vertices(
+                child_chunks,
+                ogf.fmt.Chunks_v4,
+                visual
+            )
+            ogf.imp.indices.read_indices(
+                child_chunks,
+                ogf.fmt.Chunks_v4,
+                visual
+            )
+            ogf.imp.indices.convert_indices_to_triangles(visual)
+
+    return run, len(chunks[ogf.fmt.Chunks_v4.CHILDREN])
+
+
+def bench_ogf_bones(files, sizes):
+    ogf = xray.formats.ogf
+    chunks = xray.rw.utils.get_chunks(read(files['skeleton.ogf']))
+
+    def run():
+        visual = ogf.imp.types.Visual()
+        ogf.imp.bone.read_bone_names(dict(chunks), ogf.fmt.Chunks_v4, visual)
+
+    return run, len(chunks[ogf.fmt.Chunks_v4.S_BONE_NAMES])
+
+
+def bench_omf_examine(files, sizes):
+    omf = xray.formats.omf
+    data = read(files['skeleton.omf'])
+
+    return lambda: omf.imp.examine_motions(data), len(data)
+
+
+def bench_omf_motions(files, sizes):
+    # motion keys are decoded and skipped, creating
+    # of actions is measured in blender benchmarks
+    omf = xray.formats.omf
+    data = read(files['skeleton.omf'])
+    chunks = xray.rw.utils.get_chunks(data)
+
+    motions_params = omf.imp.MotionsParams()
+    for motion_name in omf.imp.examine_motions(data):
+        params = omf.imp.MotionParams()
+        params.name = motion_name
+        motions_params.by_dict[motion_name] = params
+        motions_params.by_list.append(params)
+
+    bones_count = sizes['ogf_bones']
+    bone_names = {
+        bone_index: bench_gen.get_bone_name(bone_index)
+        for bone_index in range(bones_count)
+    }
+    context = types.SimpleNamespace(selected_names=())
+    motions_data = chunks[xray.formats.ogf.fmt.Chunks_v4.S_MOTIONS_2]
+
+    def run():
+        omf.imp.read_motions(motions_data, context, motions_params, bone_names)
+
+    return run, len(motions_data)
+
+
+def bench_details_slots(files, sizes):
+    # the same reads as details import does
+    details = xray.formats.details
+    rw = xray.rw
+    chunks = rw.utils.get_chunks(read(files['level.details']))
+    slots_data = chunks[details.fmt.Chunks.SLOTS]
+    color_indices = details.utility.generate_color_indices()
+
+    def run():
+        header = details.read.read_header(
+            rw.read.PackedReader(chunks[details.fmt.Chunks.HEADER])
+        )
+        packed_reader = rw.read.PackedReader(slots_data)
+        details.read.read_slots_v3(packed_reader, header, color_indices)
+
+    return run, len(slots_data)
+
+
+BENCHMARKS = (
+    ('file_chunks', bench_file_chunks),
+    ('chunked_reader', bench_chunked_reader),
+    ('packed_reader', bench_packed_reader),
+    ('packed_reader_strings', bench_packed_reader_strings),
+    ('packed_writer', bench_packed_writer),
+    ('lzhuf_compress', bench_lzhuf_compress),
+    ('lzhuf_decompress', bench_lzhuf_decompress),
+    ('ltx', bench_ltx),
+    ('level_vb', bench_level_vb),
+    ('level_ib', bench_level_ib),
+    ('ogf_geometry', bench_ogf_geometry),
+    ('ogf_bones', bench_ogf_bones),
+    ('omf_examine', bench_omf_examine),
+    ('omf_motions', bench_omf_motions),
+    ('details_slots', bench_details_slots)
+)
+
+def main():
+    global xray
+
+    parser = OptionParser(usage='Usage: bench_parse.py [options]')
+    bench_utils.add_common_options(parser)
+    (options, args) = parser.parse_args()
+
+    xray, blender_version = bench_utils.import_addon()
+    sizes = bench_gen.SIZES[options.size]
+    files = bench_gen.generate(options.data, options.size)
+
+    results = {}
+    for name, bench_fun in BENCHMARKS:
+        if options.filter and options.filter not in name:
+            continue
+        run, size = bench_fun(files, sizes)
+        run = xray.log.with_context(name)(run)
+        results[name] = bench_utils.measure(run, options.repeat, size)
+        bench_utils.print_result(name, results[name])
+
+    if options.output:
+        meta = bench_utils.get_meta(xray, blender_version, options.size)
+        bench_utils.save_results(options.output, meta, results)
+
+    if options.compare:
+        regressions = bench_utils.compare_results(
+            options.compare,
+            results,
+            options.threshold
+        )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+import types
+import platform
+import tempfile
+import subprocess
+
+
+utils_dir = os.path.dirname(os.path.abspath(__file__))
+repo_dir = os.path.dirname(utils_dir)
+
+
+class _BlenderModule(types.ModuleType):
+    # stands in for blender modules when the benchmarks run in a plain
+    # python interpreter. addon modules only touch blender api at import
+    # time (classes, properties, decorators), the benchmarked parse
+    # functions do not use it.
+    _classes = {}
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        module = _BlenderModule('{0}.{1}'.format(self.__name__, name))
+        setattr(self, name, module)
+        return module
+
+    def __call__(self, *args, **kwargs):
+        # decorators must keep the decorated function
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return _BlenderModule(self.__name__ + '()')
+
+    def __iter__(self):
+        return iter(())
+
+    def __mro_entries__(self, bases):
+        # used as a base class: class Operator(bpy.types.Operator)
+        cls = self._classes.get(self.__name__)
+        if cls is None:
+            name = self.__name__.split('.')[-1]
+            cls = self._classes[self.__name__] = type(name, (), {})
+        return (cls, )
+
+
+BLENDER_MODULES = (
+    'bpy',
+    'bpy_extras',
+    'bmesh',
+    'mathutils',
+    'gpu',
+    'gpu_extras',
+    'bgl',
+    'blf',
+    'addon_utils',
+    'idprop'
+)
+
+
+def import_addon():
+    # returns the addon package and blender version or None
+    sys.path.insert(0, repo_dir)
+
+    try:
+        import bpy
+        blender_version = bpy.app.version
+
+    except ImportError:
+        blender_version = None
+
+        for module_name in BLENDER_MODULES:
+            sys.modules[module_name] = _BlenderModule(module_name)
+
+        bpy = sys.modules['bpy']
+        bpy.app.version = (2, 93, 0)
+        bpy.app.version_string = '2.93.0'
+        bpy.app.background = True
+
+    import io_scene_xray
+    import io_scene_xray.rw
+    import io_scene_xray.formats
+
+    return io_scene_xray, blender_version
+
+
+def get_git_commit():
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=repo_dir,
+            stderr=subprocess.DEVNULL
+        )
+        return commit.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_meta(addon, blender_version, size):
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+
+    if blender_version:
+        blender_version = '.'.join(map(str, blender_version))
+
+    return {
+        'addon_version': '.'.join(map(str, addon.bl_info['version'])),
+        'commit': get_git_commit(),
+        'blender': blender_version,
+        'python': platform.python_version(),
+        'numpy': numpy_version,
+        'platform': platform.platform(),
+        'size': size,
+        'date': time.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+def measure(fun, repeat, size=None, setup=None):
+    # best time is the most stable one, mean time is reported as well
+    times = []
+
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fun()
+        times.append(time.perf_counter() - start)
+
+    best = min(times)
+    result = {
+        'best': best,
+        'mean': sum(times) / len(times),
+        'repeat': repeat
+    }
+
+    if size:
+        result['bytes'] = size
+        result['mb_per_sec'] = size / best / 1024 / 1024
+
+    return result
+
+
+def print_result(name, result):
+    line = '{0:>24}: {1:9.4f} sec'.format(name, result['best'])
+
+    if 'mb_per_sec' in result:
+        line += ' {:9.2f} MB/s'.format(result['mb_per_sec'])
+
+    print(line)
+
+
+def save_results(file_path, meta, results):
+    with open(file_path, 'w') as file:
+        json.dump({'meta': meta, 'results': results}, file, indent=4)
+
+
+def compare_results(file_path, results, threshold):
+    # prints the ratio with the baseline results, returns regressions
+    with open(file_path, 'r') as file:
+        baseline = json.load(file)['results']
+
+    regressions = []
+    print('\nCompared with {}:'.format(file_path))
+
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+
+        ratio = result['best'] / base['best']
+        if ratio > 1.0 + threshold:
+            regressions.append(name)
+            mark = ' REGRESSION'
+        else:
+            mark = ''
+
+        print('{0:>24}: {1:6.2f}x{2}'.format(name, ratio, mark))
+
+    return regressions
+
+
+def add_common_options(parser):
+    parser.add_option(
+        '-s', '--size', default='small',
+        help='synthetic assets size: small, large'
+    )
+    parser.add_option(
+        '-d', '--data', default=os.path.join(tempfile.gettempdir(), 'xray_bench'),
+        help='folder of the generated assets'
+    )
+    parser.add_option(
+        '-r', '--repeat', type='int', default=3,
+        help='number of runs, the best one is compared'
+    )
+    parser.add_option(
+        '-k', '--filter', default=None,
+        help='run benchmarks whose name contains this substring'
+    )
+    parser.add_option(
+        '-o', '--output', default=None,
+        help='save results to json file'
+    )
+    parser.add_option(
+        '-c', '--compare', default=None,
+        help='compare with results json file of the previous run'
+    )
+    parser.add_option(
+        '-t', '--threshold', type='float', default=0.1,
+        help='allowed slowdown relative to the compared results'
+    )